@@ -0,0 +1,115 @@
+"""
+RCM Excel 내보내기 벤치마크
+일반 워크북(전체 행 fetchall 후 작성)과 write-only 스트리밍 방식(write_xlsx) 비교
+
+사용법:
+    python benchmarks/bench_excel_export.py --rows 50000
+결과는 JSON으로 출력된다. (시간: 초, 메모리: tracemalloc 최대 할당 MB)
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+from catcher_excel import write_xlsx
+from catcher_link1 import RCM_EXPORT_COLUMNS
+
+SELECT_SQL = f"SELECT {', '.join(column for column, _ in RCM_EXPORT_COLUMNS)} FROM ca_rcm_detail ORDER BY control_code"
+
+
+def build_database(path, rows):
+    """벤치마크용 ca_rcm_detail 테이블 생성"""
+    conn = sqlite3.connect(path)
+    conn.execute(f"CREATE TABLE ca_rcm_detail ({', '.join(column for column, _ in RCM_EXPORT_COLUMNS)})")
+    conn.executemany(
+        f"INSERT INTO ca_rcm_detail VALUES ({', '.join('?' for _ in RCM_EXPORT_COLUMNS)})",
+        ((f'TLC-{n:06d}', f'통제 {n}', f'통제 {n}에 대한 설명 ' * 3, 'Y' if n % 3 else 'N', '월별', '예방',
+          '수동', '구매', '발주 누락', '전표', '완전성 확인', str(n % 500), '샘플 검토') for n in range(rows))
+    )
+    conn.commit()
+    conn.close()
+
+
+def legacy_export(db_path, out_path):
+    """기존 방식: 전체 행 fetchall 후 일반 워크북에 작성"""
+    conn = sqlite3.connect(db_path)
+    rows = conn.execute(SELECT_SQL).fetchall()
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.append([label for _, label in RCM_EXPORT_COLUMNS])
+    for row in rows:
+        sheet.append(list(row))
+    workbook.save(out_path)
+    conn.close()
+    return len(rows)
+
+
+def streaming_export(db_path, out_path):
+    """스트리밍 방식: 커서 순회 + write-only 워크북"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    count = 0
+
+    def rows():
+        nonlocal count
+        for row in conn.execute(SELECT_SQL):
+            count += 1
+            yield row
+
+    with open(out_path, 'wb') as fileobj:
+        write_xlsx(fileobj, [('RCM', RCM_EXPORT_COLUMNS, rows())])
+    conn.close()
+    return count
+
+
+def measure(func, db_path, out_path):
+    """실행 시간과 최대 메모리 측정 (tracemalloc 오버헤드를 피하려고 따로 실행)"""
+    started = time.perf_counter()
+    count = func(db_path, out_path)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(db_path, out_path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'rows': count, 'seconds': round(elapsed, 3), 'peak_mb': round(peak / 1024 / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RCM Excel 내보내기 벤치마크')
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    db_path = os.path.join(workdir, 'bench.db')
+    out_path = os.path.join(workdir, 'export.xlsx')
+    try:
+        build_database(db_path, args.rows)
+        legacy = measure(legacy_export, db_path, out_path)
+        streaming = measure(streaming_export, db_path, out_path)
+        result = {
+            'benchmark': 'excel_export',
+            'rows': args.rows,
+            'legacy': legacy,
+            'streaming': streaming,
+            'speedup': round(legacy['seconds'] / streaming['seconds'], 2) if streaming['seconds'] else None,
+            'memory_ratio': round(legacy['peak_mb'] / streaming['peak_mb'], 1) if streaming['peak_mb'] else None,
+        }
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    finally:
+        for path in (db_path, out_path):
+            if os.path.exists(path):
+                os.unlink(path)
+        os.rmdir(workdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+RCM Excel 업로드 파싱 벤치마크
+기존 방식(전체 로드 + sheet.cell 랜덤 접근)과 스트리밍 방식(RcmSheetReader) 비교
+
+사용법:
+    python benchmarks/bench_excel_ingest.py --rows 50000
+결과는 JSON으로 출력된다. (시간: 초, 메모리: tracemalloc 최대 할당 MB)
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook, load_workbook
+from catcher_excel import RcmSheetReader
+from catcher_link1 import perform_auto_mapping
+
+HEADERS = ['통제코드', '통제명', '통제설명', '핵심통제여부', '통제빈도', '통제유형',
+           '통제성격', '모집단', '완전성점검', '모집단수', '테스트절차', '비고']
+
+
+def build_workbook(path, rows):
+    """벤치마크용 RCM Excel 파일 생성 (write-only 모드)"""
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('RCM')
+    ws.append(HEADERS)
+    for n in range(rows):
+        ws.append([f'TLC-{n:06d}', f'통제 {n}', f'통제 {n}에 대한 설명 ' * 3, 'Y' if n % 3 else 'N',
+                   '월별', '예방', '수동', '전표', '완전성 확인', str(n % 500), '샘플 검토', ''])
+    wb.save(path)
+
+
+def legacy_parse(path):
+    """기존 방식: 워크북 전체 로드 후 셀 단위 접근"""
+    workbook = load_workbook(path)
+    sheet = workbook['RCM'] if 'RCM' in workbook.sheetnames else workbook.active
+    headers = [cell.value if cell.value else '' for cell in sheet[1]]
+    mapping = perform_auto_mapping(headers)
+    count = 0
+    for row_num in range(2, sheet.max_row + 1):
+        control = {}
+        for db_field, col_idx in mapping.items():
+            cell_value = sheet.cell(row=row_num, column=col_idx + 1).value
+            control[db_field] = str(cell_value) if cell_value is not None else ''
+        if control.get('control_code'):
+            count += 1
+    return count
+
+
+def streaming_parse(path):
+    """스트리밍 방식: read-only 모드 1회 순회"""
+    with RcmSheetReader(path) as reader:
+        mapping = perform_auto_mapping(reader.headers)
+        return sum(1 for _ in reader.iter_controls(mapping))
+
+
+def measure(func, path):
+    """실행 시간과 최대 메모리 측정 (tracemalloc 오버헤드를 피하려고 따로 실행)"""
+    started = time.perf_counter()
+    count = func(path)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'rows': count, 'seconds': round(elapsed, 3), 'peak_mb': round(peak / 1024 / 1024, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='RCM Excel 파싱 벤치마크')
+    parser.add_argument('--rows', type=int, default=50000)
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    os.close(fd)
+    try:
+        build_workbook(path, args.rows)
+        legacy = measure(legacy_parse, path)
+        streaming = measure(streaming_parse, path)
+        result = {
+            'benchmark': 'excel_ingest',
+            'rows': args.rows,
+            'legacy': legacy,
+            'streaming': streaming,
+            'speedup': round(legacy['seconds'] / streaming['seconds'], 2) if streaming['seconds'] else None,
+            'memory_ratio': round(legacy['peak_mb'] / streaming['peak_mb'], 1) if streaming['peak_mb'] else None,
+        }
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    finally:
+        os.unlink(path)
+
+
+if __name__ == '__main__':
+    main()
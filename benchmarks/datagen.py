@@ -0,0 +1,248 @@
+"""
+벤치마크용 합성 ICFR 데이터 생성기
+회사/사용자/RCM/통제/평가 세션/활동 로그를 가진 SQLite DB와 업로드용 RCM Excel 파일 생성
+
+같은 seed와 규모 옵션이면 항상 같은 데이터를 만든다 (커밋 간 결과 비교용).
+스키마는 migrations.base_schema + 전체 마이그레이션을 적용한 상태다.
+
+사용법:
+    python benchmarks/datagen.py --out bench.db --companies 5 --controls-per-rcm 300
+    python benchmarks/datagen.py --excel rcm.xlsx --controls-per-rcm 5000
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from openpyxl import Workbook
+from migrations import apply_migrations
+from migrations.base_schema import create_base_schema
+from catcher_link4 import rebuild_dashboard_rollup
+
+DEFAULT_SCALE = {
+    'companies': 5,
+    'users_per_company': 4,
+    'rcms_per_user': 2,
+    'controls_per_rcm': 200,
+    'sessions_per_rcm': 2,
+    'activity_rows': 20000,
+}
+
+CATEGORIES = ('ELC', 'TLC', 'ITGC')
+PROCESS_AREAS = ('구매', '매출', '재고', '자금', '인사', '결산', 'IT 일반')
+FREQUENCIES = ('수시', '일별', '주별', '월별', '분기별', '연간')
+CONTROL_TYPES = ('예방', '적발')
+CONTROL_NATURES = ('수동', '자동', 'IT 의존 수동')
+RISKS = ('발주 누락', '중복 지급', '미승인 거래', '재고 실사 차이', '권한 오남용', '결산 분개 오류')
+ACTIONS = ('LOGIN', 'RCM_VIEW', 'RCM_LIST', 'DESIGN_EVAL_SAVE', 'OPERATION_EVAL_SAVE', 'RCM_EXPORT')
+EXCEL_HEADERS = ['통제코드', '통제명', '통제설명', '핵심통제여부', '통제빈도', '통제유형',
+                 '통제성격', '모집단', '완전성점검', '모집단수', '테스트절차', '비고']
+
+BASE_DATE = datetime(2026, 1, 1)
+
+
+def _control_values(rng, rcm_index, n):
+    """통제 1개의 속성 값 (RCM 상세, Excel 공용)"""
+    area = PROCESS_AREAS[(rcm_index + n) % len(PROCESS_AREAS)]
+    risk = rng.choice(RISKS)
+    return {
+        'control_code': f'C{rcm_index:03d}-{n:05d}',
+        'control_name': f'{area} 통제 {n}',
+        'control_description': f'{area} 담당자는 {risk} 위험을 방지하기 위해 증빙을 검토하고 승인한다. ' * 2,
+        'key_control': 'Y' if rng.random() < 0.4 else 'N',
+        'control_frequency': rng.choice(FREQUENCIES),
+        'control_type': rng.choice(CONTROL_TYPES),
+        'control_nature': rng.choice(CONTROL_NATURES),
+        'population': f'{area} 전표',
+        'population_completeness_check': '시스템 조회 건수와 대사',
+        'population_count': str(rng.randint(10, 5000)),
+        'test_procedure': f'표본 {rng.choice((5, 10, 25, 40))}건을 추출하여 승인 증빙 확인',
+        'process_area': area,
+        'risk_description': f'{risk}로 인한 재무제표 왜곡 위험',
+    }
+
+
+def generate_database(path, companies=None, users_per_company=None, rcms_per_user=None,
+                      controls_per_rcm=None, sessions_per_rcm=None, activity_rows=None, seed=42):
+    """합성 데이터 DB 생성 (기존 파일은 덮어씀), 생성 규모와 대표 ID 반환"""
+    scale = dict(DEFAULT_SCALE)
+    for key, value in (('companies', companies), ('users_per_company', users_per_company),
+                       ('rcms_per_user', rcms_per_user), ('controls_per_rcm', controls_per_rcm),
+                       ('sessions_per_rcm', sessions_per_rcm), ('activity_rows', activity_rows)):
+        if value is not None:
+            scale[key] = value
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    create_base_schema(conn)
+    apply_migrations(conn)
+
+    users = []  # (user_id, company_index, email, name)
+    for c in range(scale['companies']):
+        for u in range(scale['users_per_company']):
+            email = f'user{c:02d}{u:02d}@company{c:02d}.example'
+            name = f'사용자{c:02d}{u:02d}'
+            cursor = conn.execute('''
+                INSERT INTO ca_user (user_email, user_name, company_name, user_password, admin_flag)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (email, name, f'회사{c:02d}', 'x', 'Y' if c == 0 and u == 0 else 'N'))
+            users.append((cursor.lastrowid, c, email, name))
+    company_users = {}
+    for user in users:
+        company_users.setdefault(user[1], []).append(user)
+
+    detail_columns = list(_control_values(rng, 0, 0))
+    detail_sql = (f"INSERT INTO ca_rcm_detail (rcm_id, {', '.join(detail_columns)}) "
+                  f"VALUES (?, {', '.join('?' for _ in detail_columns)})")
+    rcm_ids = []
+    rcm_index = 0
+    for user_id, company, _, _ in users:
+        for _ in range(scale['rcms_per_user']):
+            category = CATEGORIES[rcm_index % len(CATEGORIES)]
+            cursor = conn.execute('''
+                INSERT INTO ca_rcm (rcm_name, control_category, description, upload_user_id, original_filename)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (f'{category} RCM {rcm_index:03d}', category, '벤치마크 데이터', user_id, f'rcm_{rcm_index}.xlsx'))
+            rcm_id = cursor.lastrowid
+            rcm_ids.append(rcm_id)
+            conn.execute('INSERT INTO ca_rcm_revision (rcm_id) VALUES (?)', (rcm_id,))
+            conn.executemany(
+                'INSERT INTO ca_user_rcm (user_id, rcm_id, permission_type, granted_by) VALUES (?, ?, ?, ?)',
+                [(member[0], rcm_id, 'ADMIN' if member[0] == user_id else 'READ', user_id)
+                 for member in company_users[company]]
+            )
+            controls = [_control_values(rng, rcm_index, n) for n in range(scale['controls_per_rcm'])]
+            conn.executemany(detail_sql, [(rcm_id, *control.values()) for control in controls])
+            _generate_evaluations(conn, rng, rcm_id, user_id, controls, scale['sessions_per_rcm'])
+            rcm_index += 1
+        conn.commit()
+
+    _generate_activity(conn, rng, users, rcm_ids, scale['activity_rows'])
+    conn.commit()
+    rebuild_dashboard_rollup(conn)
+    conn.execute('ANALYZE')
+    conn.close()
+
+    return {
+        'seed': seed,
+        'scale': scale,
+        'user_ids': [user[0] for user in users],
+        'rcm_ids': rcm_ids,
+    }
+
+
+def _generate_evaluations(conn, rng, rcm_id, user_id, controls, sessions):
+    """설계평가 세션 (통제의 70%) 및 첫 세션 기반 운영평가 (통제의 50%)"""
+    for s in range(sessions):
+        cursor = conn.execute('''
+            INSERT INTO ca_design_evaluation_header (rcm_id, user_id, evaluation_session, total_controls)
+            VALUES (?, ?, ?, ?)
+        ''', (rcm_id, user_id, f'{2024 + s}년 설계평가', len(controls)))
+        header_id = cursor.lastrowid
+        conn.executemany('''
+            INSERT INTO ca_design_evaluation_line
+                (header_id, control_code, control_sequence, description_adequacy, improvement_suggestion,
+                 overall_effectiveness, evaluation_rationale, recommended_actions, evaluation_date)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [(header_id, control['control_code'], n + 1, rng.choice(('적절', '부적절')), '',
+               rng.choice(('효과적', '효과적', '비효과적')), '통제 설계 문서 검토 결과', '',
+               (BASE_DATE + timedelta(days=n % 300)).isoformat(sep=' '))
+              for n, control in enumerate(controls) if rng.random() < 0.7])
+
+        if s == 0:
+            cursor = conn.execute('''
+                INSERT INTO ca_operation_evaluation_header (rcm_id, design_header_id, user_id, total_controls)
+                VALUES (?, ?, ?, ?)
+            ''', (rcm_id, header_id, user_id, len(controls)))
+            operation_id = cursor.lastrowid
+            conn.executemany('''
+                INSERT INTO ca_operation_evaluation_line
+                    (header_id, control_code, sample_size, exception_count, test_result, test_procedure, findings)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [(operation_id, control['control_code'], 25, exceptions,
+                   '효과적' if exceptions == 0 else '비효과적', control['test_procedure'], '')
+                  for control in controls if rng.random() < 0.5
+                  for exceptions in (rng.choice((0, 0, 0, 1)),)])
+
+
+def _generate_activity(conn, rng, users, rcm_ids, rows):
+    """활동 로그 행 생성 (1년에 걸쳐 분포)"""
+    def activity():
+        for n in range(rows):
+            user_id, _, email, name = rng.choice(users)
+            action = rng.choice(ACTIONS)
+            yield (user_id, email, name, action, action, f'/rcm/{rng.choice(rcm_ids)}/view',
+                   '10.0.0.1', 'bench', json.dumps({'n': n}),
+                   (BASE_DATE + timedelta(seconds=n * 31536000 // max(rows, 1))).isoformat(sep=' '))
+
+    conn.executemany('''
+        INSERT INTO ca_user_activity_log
+            (user_id, user_email, user_name, action_type, page_name, url_path, ip_address, user_agent,
+             additional_info, created_date)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', activity())
+
+
+def generate_rcm_workbook(path, controls, seed=42):
+    """업로드 벤치마크용 RCM Excel 파일 생성 (write-only 모드)"""
+    rng = random.Random(seed)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet('RCM')
+    sheet.append(EXCEL_HEADERS)
+    for n in range(controls):
+        values = _control_values(rng, 999, n)
+        sheet.append([values['control_code'], values['control_name'], values['control_description'],
+                      values['key_control'], values['control_frequency'], values['control_type'],
+                      values['control_nature'], values['population'], values['population_completeness_check'],
+                      values['population_count'], values['test_procedure'], ''])
+    workbook.save(path)
+
+
+def add_scale_arguments(parser):
+    """규모 옵션 (datagen, run_benchmarks 공용)"""
+    parser.add_argument('--companies', type=int, default=DEFAULT_SCALE['companies'])
+    parser.add_argument('--users-per-company', type=int, default=DEFAULT_SCALE['users_per_company'])
+    parser.add_argument('--rcms-per-user', type=int, default=DEFAULT_SCALE['rcms_per_user'])
+    parser.add_argument('--controls-per-rcm', type=int, default=DEFAULT_SCALE['controls_per_rcm'])
+    parser.add_argument('--sessions-per-rcm', type=int, default=DEFAULT_SCALE['sessions_per_rcm'])
+    parser.add_argument('--activity-rows', type=int, default=DEFAULT_SCALE['activity_rows'])
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def scale_from_args(args):
+    return {key: getattr(args, key) for key in DEFAULT_SCALE}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='벤치마크용 합성 데이터 생성')
+    parser.add_argument('--out', help='생성할 SQLite DB 경로')
+    parser.add_argument('--excel', help='생성할 RCM Excel 파일 경로 (통제 수는 --controls-per-rcm)')
+    add_scale_arguments(parser)
+    args = parser.parse_args()
+    if not args.out and not args.excel:
+        parser.error('--out 또는 --excel 중 하나 이상 지정해야 합니다')
+
+    result = {}
+    if args.out:
+        summary = generate_database(args.out, seed=args.seed, **scale_from_args(args))
+        result['database'] = {'path': args.out, 'scale': summary['scale'],
+                              'users': len(summary['user_ids']), 'rcms': len(summary['rcm_ids'])}
+    if args.excel:
+        generate_rcm_workbook(args.excel, args.controls_per_rcm, seed=args.seed)
+        result['excel'] = {'path': args.excel, 'controls': args.controls_per_rcm}
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,386 @@
+"""
+Catcher 동시 부하 테스트
+합성 사용자들이 실제 사용 패턴(RCM 목록, 상세 조회, 평가 자동 저장, 업로드)을 동시에 재현하며
+처리량, p50/p95/p99 지연, 'database is locked' 오류율을 측정한다.
+
+실행 방식:
+- inprocess (기본): 앱을 import해 WSGI 인터페이스(Flask test client)로 직접 호출
+- http: --url로 지정한 로컬 서버에 HTTP 요청 (서버는 같은 DB, sqlite 세션 저장소를 사용해야 함)
+
+클라이언트는 --clients개 스레드이며, --processes를 주면 프로세스마다 그만큼의 스레드를 띄운다.
+inprocess + 여러 프로세스는 워커 프로세스 여러 개가 같은 SQLite 파일에 쓰는 상황과 같다.
+
+사용법:
+    python benchmarks/load_test.py --clients 16 --duration 30
+    python benchmarks/load_test.py --clients 8 --processes 4 --duration 60 --output load.json
+    python benchmarks/load_test.py --mode http --url http://127.0.0.1:5001 --db catcher.db --clients 32
+"""
+
+import argparse
+import http.cookiejar
+import io
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import add_scale_arguments, generate_database, generate_rcm_workbook, scale_from_args
+
+# 동작별 가중치 (평가자가 화면을 보며 자동 저장하는 비율 기준)
+DEFAULT_MIX = {
+    'browse_rcms': 20,
+    'open_detail': 20,
+    'load_controls': 10,
+    'autosave_design': 30,
+    'autosave_operation': 18,
+    'upload': 2,
+}
+LOCKED_MESSAGE = 'database is locked'
+
+
+def parse_mix(text):
+    """'browse_rcms=20,autosave_design=50' 형식을 가중치 dict로 변환"""
+    mix = {}
+    for item in text.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError(f'알 수 없는 동작: {name}')
+        mix[name] = float(weight)
+    return mix
+
+
+def load_profiles(db_path, controls_per_rcm=200):
+    """일반 사용자별 접근 가능한 RCM, 통제 코드, 설계평가 세션 이름과 관리자 정보"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        users = [dict(row) for row in conn.execute('''
+            SELECT user_id, user_name, user_email, company_name, admin_flag
+            FROM ca_user WHERE effective_end_date IS NULL ORDER BY user_id
+        ''')]
+        rcms = {}
+        for row in conn.execute('''
+            SELECT r.rcm_id, MIN(h.evaluation_session) AS design_session
+            FROM ca_rcm r LEFT JOIN ca_design_evaluation_header h ON h.rcm_id = r.rcm_id
+            WHERE r.is_active = 'Y' GROUP BY r.rcm_id
+        '''):
+            controls = [c[0] for c in conn.execute(
+                'SELECT control_code FROM ca_rcm_detail WHERE rcm_id = ? ORDER BY control_code LIMIT ?',
+                (row['rcm_id'], controls_per_rcm))]
+            if controls:
+                rcms[row['rcm_id']] = {'controls': controls, 'design_session': row['design_session']}
+
+        profiles = []
+        for user in users:
+            if user['admin_flag'] == 'Y':
+                continue
+            rcm_ids = [r[0] for r in conn.execute(
+                "SELECT rcm_id FROM ca_user_rcm WHERE user_id = ? AND is_active = 'Y' ORDER BY rcm_id",
+                (user['user_id'],)) if r[0] in rcms]
+            if rcm_ids:
+                profiles.append({'user': user, 'rcms': {rcm_id: rcms[rcm_id] for rcm_id in rcm_ids}})
+        admin = next((user for user in users if user['admin_flag'] == 'Y'), None)
+    finally:
+        conn.close()
+    if not profiles:
+        raise SystemExit('부하를 줄 사용자/RCM이 없습니다 (datagen.py로 만든 DB를 사용하세요)')
+    return profiles, admin
+
+
+class InProcessDriver:
+    """Flask test client (WSGI 직접 호출) 기반 요청"""
+
+    def __init__(self, app, user):
+        self.client = app.test_client()
+        with self.client.session_transaction() as session:
+            session['user_id'] = user['user_id']
+            session['user_info'] = user
+
+    def request(self, method, url, json_body=None, form=None):
+        """(상태 코드, 본문 텍스트), 처리되지 않은 예외는 500으로 본다"""
+        if form is not None:
+            form = {name: (io.BytesIO(value[1]), value[0]) if isinstance(value, tuple) else value
+                    for name, value in form.items()}
+        try:
+            response = self.client.open(url, method=method, json=json_body, data=form)
+            return response.status_code, response.get_data(as_text=True)
+        except Exception as e:
+            return 500, str(e)
+
+
+class HttpDriver:
+    """로컬 서버에 HTTP 요청 (세션은 ca_session에 직접 발급)"""
+
+    def __init__(self, base_url, sid, cookie_name='session'):
+        self.base_url = base_url.rstrip('/')
+        self.cookie = f'{cookie_name}={sid}'
+
+    def request(self, method, url, json_body=None, form=None):
+        headers = {'Cookie': self.cookie}
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        elif form is not None:
+            body, content_type = _encode_multipart(form)
+            headers['Content-Type'] = content_type
+        req = urllib.request.Request(self.base_url + url, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(req, timeout=60) as response:
+                return response.status, response.read().decode('utf-8', 'replace')
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode('utf-8', 'replace')
+        except OSError as e:
+            return 599, str(e)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+urllib.request.install_opener(urllib.request.build_opener(
+    _NoRedirect, urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar())))
+
+
+def _encode_multipart(form):
+    """form dict를 multipart/form-data로 인코딩 (파일 값은 (파일명, bytes))"""
+    boundary = uuid.uuid4().hex
+    parts = []
+    for name, value in form.items():
+        if isinstance(value, tuple):
+            filename, content = value
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                         f'filename="{filename}"\r\nContent-Type: application/octet-stream\r\n\r\n'.encode('utf-8')
+                         + content + b'\r\n')
+        else:
+            parts.append(f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+                         f'{value}\r\n'.encode('utf-8'))
+    parts.append(f'--{boundary}--\r\n'.encode('utf-8'))
+    return b''.join(parts), f'multipart/form-data; boundary={boundary}'
+
+
+def classify(status, body):
+    """응답 결과 분류: ok / locked / error"""
+    if LOCKED_MESSAGE in body:
+        return 'locked'
+    if status in (200, 304):
+        return 'ok'
+    return 'error'
+
+
+def client_loop(driver, admin_driver, profile, mix, deadline, think_ms, workbook, seed):
+    """마감 시각까지 가중치에 따라 동작을 골라 실행, (동작, 초, 결과) 목록 반환"""
+    rng = random.Random(seed)
+    actions, weights = zip(*mix.items())
+    rcm_ids = list(profile['rcms'])
+    user_id = profile['user']['user_id']
+    samples = []
+
+    while time.time() < deadline:
+        action = rng.choices(actions, weights)[0]
+        rcm_id = rng.choice(rcm_ids)
+        rcm = profile['rcms'][rcm_id]
+        control_code = rng.choice(rcm['controls'])
+
+        if action == 'browse_rcms':
+            call = (driver, 'GET', '/rcm/', None, None)
+        elif action == 'open_detail':
+            call = (driver, 'GET', f'/rcm/{rcm_id}/view', None, None)
+        elif action == 'load_controls':
+            call = (driver, 'GET', f'/rcm/api/{rcm_id}/controls?limit=100', None, None)
+        elif action == 'autosave_design':
+            call = (driver, 'POST', '/design/api/save', {
+                'rcm_id': rcm_id, 'control_code': control_code, 'evaluation_session': '부하 테스트 설계평가',
+                'evaluation_data': {'description_adequacy': '적절', 'overall_effectiveness': '효과적',
+                                    'evaluation_rationale': f'자동 저장 {rng.random():.6f}'}}, None)
+        elif action == 'autosave_operation':
+            if not rcm['design_session']:
+                continue
+            call = (driver, 'POST', '/operation/api/save', {
+                'rcm_id': rcm_id, 'control_code': control_code, 'design_session': rcm['design_session'],
+                'evaluation_data': {'sample_size': 25, 'exception_count': 0, 'test_result': '효과적',
+                                    'test_procedure': '표본 검토', 'findings': ''}}, None)
+        else:
+            if admin_driver is None:
+                continue
+            call = (admin_driver, 'POST', '/rcm/process_upload', None, {
+                'rcm_name': f'부하 테스트 업로드 {uuid.uuid4().hex[:8]}', 'upload_mode': 'individual',
+                'control_category': 'TLC', 'target_user_id': str(user_id), 'async_mode': '1',
+                'excel_file': ('load_test.xlsx', workbook)})
+
+        target, method, url, json_body, form = call
+        started = time.perf_counter()
+        status, body = target.request(method, url, json_body=json_body, form=form)
+        samples.append((action, time.perf_counter() - started, classify(status, body)))
+        if think_ms:
+            time.sleep(rng.uniform(0, 2 * think_ms) / 1000.0)
+    return samples
+
+
+def _make_driver(options, user):
+    if options['mode'] == 'http':
+        from catcher_session import issue_session
+        sid = issue_session({'user_id': user['user_id'], 'user_info': user})
+        return HttpDriver(options['url'], sid)
+    from catcher import app
+    return InProcessDriver(app, user)
+
+
+def run_clients(options, client_indices):
+    """한 프로세스 안에서 클라이언트 스레드 실행 (다중 프로세스 모드의 자식 진입점)"""
+    os.environ['CATCHER_DB_PATH'] = options['db_path']
+    profiles, admin = load_profiles(options['db_path'])
+    with open(options['workbook_path'], 'rb') as fileobj:
+        workbook = fileobj.read()
+
+    drivers = []
+    for index in client_indices:
+        profile = profiles[index % len(profiles)]
+        admin_driver = _make_driver(options, admin) if admin and options['mix'].get('upload') else None
+        drivers.append((index, profile, _make_driver(options, profile['user']), admin_driver))
+
+    results = [None] * len(drivers)
+    deadline = time.time() + options['duration']
+
+    def worker(slot, index, profile, driver, admin_driver):
+        results[slot] = client_loop(driver, admin_driver, profile, options['mix'], deadline,
+                                    options['think_ms'], workbook, options['seed'] + index)
+
+    threads = [threading.Thread(target=worker, args=(slot, *entry)) for slot, entry in enumerate(drivers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    activity = None
+    if options['mode'] == 'inprocess':
+        from catcher_activity import get_activity_writer
+        from catcher_jobs import get_executor
+        get_executor().shutdown(wait=True)  # 등록된 업로드 작업이 끝난 뒤 DB 정리
+        writer = get_activity_writer()
+        writer.flush()
+        stats = writer.stats()
+        activity = {key: stats[key] for key in ('written', 'dropped', 'failed')}
+    return [sample for samples in results for sample in samples], activity
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return None
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered))) - 1))
+    return round(ordered[index] * 1000, 2)
+
+
+def summarize(samples, elapsed):
+    """처리량, 지연 백분위, 오류율"""
+    ordered = sorted(latency for _, latency, _ in samples)
+    outcomes = {'ok': 0, 'locked': 0, 'error': 0}
+    for _, _, outcome in samples:
+        outcomes[outcome] += 1
+    total = len(samples)
+    return {
+        'requests': total,
+        'throughput_rps': round(total / elapsed, 1) if elapsed else None,
+        'p50_ms': _percentile(ordered, 0.50),
+        'p95_ms': _percentile(ordered, 0.95),
+        'p99_ms': _percentile(ordered, 0.99),
+        'max_ms': round(ordered[-1] * 1000, 2) if ordered else None,
+        'locked': outcomes['locked'],
+        'errors': outcomes['error'],
+        'locked_rate': round(outcomes['locked'] / total, 4) if total else 0,
+        'error_rate': round((outcomes['locked'] + outcomes['error']) / total, 4) if total else 0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catcher 동시 부하 테스트')
+    add_scale_arguments(parser)
+    parser.add_argument('--mode', choices=('inprocess', 'http'), default='inprocess')
+    parser.add_argument('--url', default='http://127.0.0.1:5001', help='http 모드 서버 주소')
+    parser.add_argument('--db', help='사용할 DB (http 모드에서는 서버와 같은 파일, 없으면 합성 DB 생성)')
+    parser.add_argument('--clients', type=int, default=8, help='프로세스당 클라이언트 스레드 수')
+    parser.add_argument('--processes', type=int, default=1)
+    parser.add_argument('--duration', type=float, default=20, help='측정 시간(초)')
+    parser.add_argument('--think-ms', type=float, default=0, help='요청 사이 평균 대기(ms)')
+    parser.add_argument('--mix', type=parse_mix, help='동작 가중치 (예: browse_rcms=20,autosave_design=80)')
+    parser.add_argument('--upload-controls', type=int, default=200)
+    parser.add_argument('--output', help='결과 JSON 파일 경로')
+    args = parser.parse_args()
+    if args.mode == 'http' and not args.db:
+        parser.error('http 모드에서는 서버가 사용하는 --db를 지정해야 합니다')
+
+    workdir = tempfile.mkdtemp(prefix='catcher-load-')
+    db_path = args.db or os.path.join(workdir, 'load.db')
+    workbook_path = os.path.join(workdir, 'upload.xlsx')
+    if not args.db:
+        generate_database(db_path, seed=args.seed, **scale_from_args(args))
+    generate_rcm_workbook(workbook_path, args.upload_controls, seed=args.seed)
+    os.environ['CATCHER_DB_PATH'] = db_path
+    os.environ.setdefault('CATCHER_UPLOAD_DIR', workdir)
+
+    options = {
+        'mode': args.mode, 'url': args.url, 'db_path': db_path, 'workbook_path': workbook_path,
+        'duration': args.duration, 'think_ms': args.think_ms, 'seed': args.seed,
+        'mix': args.mix or DEFAULT_MIX,
+    }
+    chunks = [list(range(p * args.clients, (p + 1) * args.clients)) for p in range(args.processes)]
+
+    started = time.perf_counter()
+    if args.processes == 1:
+        outputs = [run_clients(options, chunks[0])]
+    else:
+        # 자식 프로세스가 앱과 연결 풀을 각자 새로 만들도록 spawn 사용
+        with multiprocessing.get_context('spawn').Pool(args.processes) as pool:
+            outputs = pool.starmap(run_clients, [(options, chunk) for chunk in chunks])
+    elapsed = time.perf_counter() - started
+
+    samples = [sample for process_samples, _ in outputs for sample in process_samples]
+    by_action = {}
+    for sample in samples:
+        by_action.setdefault(sample[0], []).append(sample)
+    activity = [stats for _, stats in outputs if stats]
+
+    result = {
+        'benchmark': 'load',
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'mode': args.mode,
+        'clients': args.clients * args.processes,
+        'processes': args.processes,
+        'duration_seconds': round(elapsed, 2),
+        'think_ms': args.think_ms,
+        'mix': options['mix'],
+        'overall': summarize(samples, elapsed),
+        'actions': {name: summarize(items, elapsed) for name, items in sorted(by_action.items())},
+    }
+    if activity:
+        result['activity_log'] = {key: sum(stats[key] for stats in activity) for key in activity[0]}
+
+    if not args.db:
+        from catcher_db import close_pools
+        close_pools()
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(db_path + suffix):
+                os.unlink(db_path + suffix)
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fileobj:
+            fileobj.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
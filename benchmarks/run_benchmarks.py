@@ -0,0 +1,243 @@
+"""
+Catcher 벤치마크 모음
+합성 데이터 DB(datagen.py)에 대해 주요 화면/API를 반복 실행하고 시나리오별 지연 통계를 JSON으로 출력
+
+시나리오:
+- upload_ingest: RCM Excel 업로드 저장 (ingest_rcm_workbook, 개별 모드)
+- rcm_list: RCM 목록 화면 (get_user_rcms)
+- rcm_view: RCM 상세 화면 렌더링
+- design_sessions: 설계평가 세션 목록 API
+- design_save_single: 설계평가 단건 저장 API
+- design_save_batch: 설계평가 일괄 저장 API (--batch-size개 통제)
+
+같은 seed/규모로 만든 DB에서 실행하므로 커밋 간 결과를 비교할 수 있다.
+--compare에 이전 결과 파일을 주면 시나리오별 중앙값 비율(현재/이전)을 함께 출력한다.
+
+사용법:
+    python benchmarks/run_benchmarks.py --output before.json
+    python benchmarks/run_benchmarks.py --compare before.json --only rcm_view,rcm_list
+"""
+
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from datagen import add_scale_arguments, generate_database, generate_rcm_workbook, scale_from_args
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def summarize(samples):
+    """반복 실행 시간(초) 목록의 통계 (ms)"""
+    ordered = sorted(samples)
+    p95_index = min(len(ordered) - 1, max(0, round(0.95 * len(ordered)) - 1))
+    mean = statistics.fmean(ordered)
+    return {
+        'iterations': len(ordered),
+        'min_ms': round(ordered[0] * 1000, 3),
+        'median_ms': round(statistics.median(ordered) * 1000, 3),
+        'p95_ms': round(ordered[p95_index] * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+        'mean_ms': round(mean * 1000, 3),
+        'ops_per_sec': round(1 / mean, 1) if mean else None,
+    }
+
+
+def run_scenario(func, iterations, warmup):
+    """warmup 후 iterations회 실행 시간 측정"""
+    for n in range(warmup):
+        func(n)
+    samples = []
+    for n in range(warmup, warmup + iterations):
+        started = time.perf_counter()
+        func(n)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def _pick_subject(db_path):
+    """측정 대상 사용자/RCM: 본인이 올린 RCM이 있는 첫 일반 사용자"""
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        row = conn.execute('''
+            SELECT u.user_id, u.user_name, u.user_email, u.company_name, u.admin_flag, r.rcm_id
+            FROM ca_user u JOIN ca_rcm r ON r.upload_user_id = u.user_id
+            WHERE u.admin_flag = 'N' AND r.is_active = 'Y'
+            ORDER BY u.user_id, r.rcm_id LIMIT 1
+        ''').fetchone()
+        if row is None:
+            raise SystemExit('측정할 사용자/RCM이 없습니다 (datagen.py로 만든 DB를 사용하세요)')
+        controls = [r[0] for r in conn.execute(
+            'SELECT control_code FROM ca_rcm_detail WHERE rcm_id = ? ORDER BY control_code', (row['rcm_id'],))]
+        session_name = conn.execute(
+            'SELECT evaluation_session FROM ca_design_evaluation_header WHERE rcm_id = ? ORDER BY header_id LIMIT 1',
+            (row['rcm_id'],)
+        ).fetchone()
+    finally:
+        conn.close()
+    user = {key: row[key] for key in ('user_id', 'user_name', 'user_email', 'company_name', 'admin_flag')}
+    return user, row['rcm_id'], controls, session_name[0] if session_name else '벤치마크 설계평가'
+
+
+def build_scenarios(app, user, rcm_id, controls, session_name, workbook_path, batch_size):
+    """시나리오 이름 → 실행 함수(n) 목록"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = user['user_id']
+        session['user_info'] = user
+
+    def request(method, url, **kwargs):
+        response = client.open(url, method=method, **kwargs)
+        if response.status_code != 200:
+            raise RuntimeError(f'{method} {url} → {response.status_code}')
+        if response.is_json and response.get_json().get('success') is False:
+            raise RuntimeError(f'{method} {url} → {response.get_json()}')
+        return response
+
+    def evaluation(n):
+        return {'description_adequacy': '적절', 'improvement_suggestion': '',
+                'overall_effectiveness': '효과적' if n % 2 else '비효과적',
+                'evaluation_rationale': f'벤치마크 평가 {n}', 'recommended_actions': ''}
+
+    def upload_ingest(n):
+        from catcher_auth import create_rcm
+        from catcher_link1 import ingest_rcm_workbook
+        with app.app_context():
+            target_id = create_rcm(f'벤치마크 업로드 {n}', 'TLC', '', user['user_id'], 'bench.xlsx')
+            ingest_rcm_workbook(workbook_path, 'individual', f'벤치마크 업로드 {n}', 'TLC', '',
+                                user['user_id'], 'bench.xlsx', user['user_id'], rcm_id=target_id)
+
+    def design_save_single(n):
+        request('POST', '/design/api/save', json={
+            'rcm_id': rcm_id, 'control_code': controls[n % len(controls)],
+            'evaluation_session': session_name, 'evaluation_data': evaluation(n)})
+
+    def design_save_batch(n):
+        start = (n * batch_size) % len(controls)
+        codes = (controls[start:] + controls[:start])[:batch_size]
+        request('POST', '/design/api/save-batch', json={
+            'rcm_id': rcm_id, 'evaluation_session': session_name,
+            'evaluations': [{'control_code': code, 'evaluation_data': evaluation(n)} for code in codes]})
+
+    return {
+        'upload_ingest': upload_ingest,
+        'rcm_list': lambda n: request('GET', '/rcm/'),
+        'rcm_view': lambda n: request('GET', f'/rcm/{rcm_id}/view'),
+        'design_sessions': lambda n: request('GET', f'/design/api/sessions/{rcm_id}'),
+        'design_save_single': design_save_single,
+        'design_save_batch': design_save_batch,
+    }
+
+
+def compare(result, baseline):
+    """시나리오별 중앙값 비교 (ratio < 1이면 빨라짐)"""
+    comparison = {}
+    for name, stats in result['scenarios'].items():
+        before = baseline.get('scenarios', {}).get(name)
+        if before and before.get('median_ms'):
+            comparison[name] = {
+                'baseline_median_ms': before['median_ms'],
+                'median_ms': stats['median_ms'],
+                'median_ratio': round(stats['median_ms'] / before['median_ms'], 3),
+            }
+    return {'baseline_commit': baseline.get('commit'), 'scenarios': comparison}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catcher 벤치마크 모음')
+    add_scale_arguments(parser)
+    parser.add_argument('--db', help='기존 벤치마크 DB 사용 (지정하면 생성하지 않음, 측정 중 데이터가 바뀜)')
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--upload-controls', type=int, default=1000, help='업로드 시나리오 Excel 통제 수')
+    parser.add_argument('--upload-iterations', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=50, help='일괄 저장 시나리오 통제 수')
+    parser.add_argument('--only', help='실행할 시나리오 (쉼표 구분)')
+    parser.add_argument('--output', help='결과 JSON 파일 경로 (기본: 표준 출력만)')
+    parser.add_argument('--compare', help='비교할 이전 결과 JSON 파일')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='catcher-bench-')
+    db_path = args.db or os.path.join(workdir, 'bench.db')
+    workbook_path = os.path.join(workdir, 'upload.xlsx')
+
+    generation = None
+    if not args.db:
+        started = time.perf_counter()
+        generate_database(db_path, seed=args.seed, **scale_from_args(args))
+        generation = round(time.perf_counter() - started, 3)
+    generate_rcm_workbook(workbook_path, args.upload_controls, seed=args.seed)
+
+    # 앱은 DB 경로가 정해진 뒤에 import (시작 시 마이그레이션 적용)
+    os.environ['CATCHER_DB_PATH'] = db_path
+    os.environ.setdefault('CATCHER_UPLOAD_DIR', workdir)
+    from catcher import app
+    from catcher_activity import get_activity_writer
+    from catcher_db import close_pools
+
+    user, rcm_id, controls, session_name = _pick_subject(db_path)
+    scenarios = build_scenarios(app, user, rcm_id, controls, session_name, workbook_path, args.batch_size)
+    selected = args.only.split(',') if args.only else list(scenarios)
+    unknown = [name for name in selected if name not in scenarios]
+    if unknown:
+        parser.error(f'알 수 없는 시나리오: {", ".join(unknown)}')
+
+    result = {
+        'benchmark': 'suite',
+        'commit': _git_commit(),
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'seed': args.seed,
+        'scale': scale_from_args(args) if not args.db else None,
+        'generation_seconds': generation,
+        'scenarios': {},
+    }
+    try:
+        for name in selected:
+            if name == 'upload_ingest':
+                iterations, warmup = args.upload_iterations, 1
+            else:
+                iterations, warmup = args.iterations, args.warmup
+            result['scenarios'][name] = run_scenario(scenarios[name], iterations, warmup)
+        get_activity_writer().flush()
+    finally:
+        close_pools()
+        if not args.db:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(db_path + suffix):
+                    os.unlink(db_path + suffix)
+        os.unlink(workbook_path)
+        os.rmdir(workdir)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as fileobj:
+            result['comparison'] = compare(result, json.load(fileobj))
+    output = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fileobj:
+            fileobj.write(output + '\n')
+    print(output)
+
+
+if __name__ == '__main__':
+    main()
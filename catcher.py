@@ -5,39 +5,116 @@ Catcher - 내부회계관리제도(ICFR) 통합 관리 시스템
 
 from flask import Flask, render_template, redirect, url_for, session, request, flash
 import os
+import sqlite3
 import sys
 
 # Catcher 루트 경로를 Python path에 추가
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-app = Flask(__name__)
-app.secret_key = os.getenv('FLASK_SECRET_KEY', 'catcher_secret_key_150606')
+from catcher_db import env_int, get_db_path
+
+def create_app(config=None):
+    """Flask 앱 생성 (설정 dict를 기본 설정 위에 덮어씀)
+
+    디버그 모드는 CATCHER_DEBUG=1 또는 config={'DEBUG': True}로 명시할 때만 켜진다.
+    """
+    app = Flask(__name__)
+    app.secret_key = os.getenv('FLASK_SECRET_KEY', 'catcher_secret_key_150606')
+
+    # 설정
+    app.config['DEBUG'] = env_int('CATCHER_DEBUG', 0) == 1
+    app.config['JSON_AS_ASCII'] = False  # 한글 지원
+
+    # 세션 설정 - 브라우저 종료 시 만료
+    app.config.update(
+        SESSION_COOKIE_SECURE=False,  # 로컬 개발환경
+        SESSION_COOKIE_HTTPONLY=True,
+        SESSION_COOKIE_SAMESITE='Lax'
+    )
+    if config:
+        app.config.update(config)
+
+    # 서버 측 세션 저장소 (쿠키에는 세션 ID만 저장, CATCHER_SESSION_BACKEND=cookie 이면 기본 쿠키 세션)
+    from catcher_session import init_session, revoke_sessions_command, purge_sessions_command
+    init_session(app)
+
+    # 요청별 처리 시간 / 쿼리 계측 (CATCHER_INSTRUMENTATION=1 일 때만)
+    from catcher_instrument import init_instrumentation
+    init_instrumentation(app)
+
+    # 요청 수/지연 메트릭 및 /metrics (관리자 또는 CATCHER_METRICS_TOKEN)
+    from catcher_metrics import init_metrics
+    init_metrics(app)
+
+    # Blueprint 등록 (Link 기반 구조)
+    from catcher_link1 import bp_link1  # RCM 관리
+    from catcher_link2 import bp_link2  # 설계평가
+    from catcher_link3 import bp_link3  # 운영평가
+    from catcher_link4 import bp_link4  # 대시보드
+
+    app.register_blueprint(bp_link1)
+    app.register_blueprint(bp_link2)
+    app.register_blueprint(bp_link3)
+    app.register_blueprint(bp_link4)
+
+    # 메인/로그인 라우트 및 에러 핸들러
+    app.add_url_rule('/', 'index', index)
+    app.add_url_rule('/login', 'login', login, methods=['GET', 'POST'])
+    app.add_url_rule('/logout', 'logout', logout)
+    app.register_error_handler(404, page_not_found)
+    app.register_error_handler(500, internal_server_error)
+
+    # 앱 컨텍스트에서 DB 연결 관리
+    app.teardown_appcontext(close_db)
+
+    # CLI 명령
+    from catcher_progress import reconcile_progress_command  # 평가 진행률 재계산
+    from catcher_link4 import rebuild_dashboard_command  # 대시보드 집계 재생성
+    from catcher_mapping import import_standard_controls_command, map_controls_command  # 표준 통제 매핑
+    from catcher_completeness import evaluate_completeness_command  # RCM 완전성 점수
+    from catcher_dedup import rebuild_dedup_index_command  # 유사 통제 인덱스
+    from catcher_evidence import gc_evidence_command  # 증빙 파일 정리
+    app.cli.add_command(reconcile_progress_command)
+    app.cli.add_command(rebuild_dashboard_command)
+    app.cli.add_command(import_standard_controls_command)
+    app.cli.add_command(map_controls_command)
+    app.cli.add_command(evaluate_completeness_command)
+    app.cli.add_command(rebuild_dedup_index_command)
+    app.cli.add_command(gc_evidence_command)
+    app.cli.add_command(revoke_sessions_command)
+    app.cli.add_command(purge_sessions_command)
+
+    apply_pending_migrations()
+    recover_upload_jobs()
+    return app
+
+
+def apply_pending_migrations():
+    """스키마 마이그레이션 적용 (DB 파일이 있을 때만)"""
+    db_path = get_db_path()
+    if not os.path.exists(db_path):
+        return
+    from migrations import apply_migrations
+    conn = sqlite3.connect(db_path)
+    try:
+        apply_migrations(conn)
+    finally:
+        conn.close()
+
+
+def recover_upload_jobs():
+    """재시작으로 중단된 업로드 작업을 FAILED로 표시 (DB 파일이 있을 때만)"""
+    db_path = get_db_path()
+    if not os.path.exists(db_path):
+        return
+    from catcher_jobs import fail_orphaned_upload_jobs
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        fail_orphaned_upload_jobs(conn)
+    finally:
+        conn.close()
 
-# 설정
-app.config['DEBUG'] = True
-app.config['JSON_AS_ASCII'] = False  # 한글 지원
 
-# 세션 설정 - 브라우저 종료 시 만료
-app.config.update(
-    SESSION_COOKIE_SECURE=False,  # 로컬 개발환경
-    SESSION_COOKIE_HTTPONLY=True,
-    SESSION_COOKIE_SAMESITE='Lax'
-)
-
-# Blueprint 등록 (Link 기반 구조)
-from catcher_link1 import bp_link1  # RCM 관리
-from catcher_link2 import bp_link2  # 설계평가
-from catcher_link3 import bp_link3  # 운영평가
-
-app.register_blueprint(bp_link1)
-app.register_blueprint(bp_link2)
-app.register_blueprint(bp_link3)
-
-# 데이터베이스 경로
-DB_PATH = os.path.join(os.path.dirname(__file__), 'catcher.db')
-
-# 앱 컨텍스트에서 DB 연결 관리
-@app.teardown_appcontext
 def close_db(error):
     """요청 종료 시 DB 연결 닫기"""
     from catcher_auth import close_db
@@ -51,19 +128,15 @@ def is_logged_in():
 def get_user_info():
     """현재 로그인한 사용자 정보 반환"""
     if is_logged_in():
-        if 'user_info' in session:
-            return session['user_info']
         from catcher_auth import get_current_user
         return get_current_user()
     return None
 
-@app.route('/')
 def index():
     """메인 화면 - RCM, 설계평가, 운영평가, 대시보드 카드 표시"""
     return render_template('index.html')
 
 # 로그인/로그아웃
-@app.route('/login', methods=['GET', 'POST'])
 def login():
     """로그인 페이지 (Snowball 방식)"""
     from catcher_auth import authenticate_user, get_db
@@ -119,7 +192,6 @@ def login():
     # GET 요청 또는 다른 action
     return render_template('login.html', remote_addr=request.remote_addr, next=next_page)
 
-@app.route('/logout')
 def logout():
     """로그아웃"""
     session.clear()
@@ -134,21 +206,21 @@ def logout():
 # 운영평가 모듈 라우트 - Blueprint에서 처리
 # /operation은 operation.operation_evaluation으로 자동 연결됨
 
-# 대시보드 라우트
-@app.route('/dashboard')
-def dashboard():
-    """통합 대시보드"""
-    return render_template('dashboard.html')
+# 대시보드 모듈 라우트 - Blueprint에서 처리
+# /dashboard는 dashboard.dashboard로 자동 연결됨
 
 # 에러 핸들러
-@app.errorhandler(404)
 def page_not_found(e):
     return render_template('404.html'), 404
 
-@app.errorhandler(500)
 def internal_server_error(e):
     return render_template('500.html'), 500
 
+
+# 기본 앱 (flask --app catcher, 개발 서버, 기존 import 호환)
+# 운영 환경은 gunicorn -c gunicorn.conf.py (이 앱을 catcher:app으로 사용, create_app을 다시 부르지 않음)
+app = create_app()
+
 if __name__ == '__main__':
     # 템플릿 및 static 폴더 확인
     template_dir = os.path.join(os.path.dirname(__file__), 'templates')
@@ -163,6 +235,7 @@ if __name__ == '__main__':
         print(f"✓ static 폴더 생성: {static_dir}")
 
     # 데이터베이스 확인
+    DB_PATH = get_db_path()
     if not os.path.exists(DB_PATH):
         print(f"⚠️  경고: 데이터베이스 파일이 없습니다: {DB_PATH}")
         print("   snowball.db를 복사하여 catcher.db로 만들어주세요.")
@@ -180,7 +253,10 @@ if __name__ == '__main__':
     print("📝 RCM 모듈: ELC, TLC, ITGC 등록 및 관리")
     print("📝 설계평가: 통제 설계 효과성 평가")
     print("📝 운영평가: 통제 운영 효과성 평가")
-    print("📝 대시보드: 개발 예정")
+    print("📝 대시보드: 평가 결과 집계 현황")
+    print("=" * 60)
+    print(f"🔧 개발 서버 (디버그: {'켜짐' if app.config['DEBUG'] else '꺼짐, CATCHER_DEBUG=1로 사용'})")
+    print("🚀 운영 환경: gunicorn -c gunicorn.conf.py")
     print("=" * 60)
 
-    app.run(host='0.0.0.0', port=5001, debug=True)
+    app.run(host='0.0.0.0', port=5001, debug=app.config['DEBUG'])
@@ -0,0 +1,205 @@
+"""
+Catcher Activity Log Writer
+사용자 활동 로그 비동기 배치 기록
+
+요청 스레드는 로그 레코드를 메모리 큐에 넣기만 하고, 전용 writer 스레드가
+N건 또는 M밀리초마다 executemany로 한 트랜잭션에 모아서 기록한다.
+(레코드의 access_time 기본값은 실제 기록 시각이므로 최대 M밀리초 늦어질 수 있음)
+
+환경 변수:
+- CATCHER_ACTIVITY_LOG_ASYNC: 0이면 기존처럼 요청 안에서 즉시 기록 (기본: 1)
+- CATCHER_ACTIVITY_LOG_BATCH_SIZE: 한 번에 기록할 최대 건수 (기본: 200)
+- CATCHER_ACTIVITY_LOG_FLUSH_MS: 배치 최대 대기 시간(ms) (기본: 500)
+- CATCHER_ACTIVITY_LOG_MAX_QUEUE: 큐 최대 크기 (기본: 10000)
+- CATCHER_ACTIVITY_LOG_POLICY: 큐가 가득 찼을 때 'drop'(버림) 또는 'block'(대기 후 버림) (기본: drop)
+"""
+
+import atexit
+import os
+import queue
+import sqlite3
+import threading
+import time
+import traceback
+from catcher_db import get_db_path, get_pool, env_int
+
+INSERT_ACTIVITY_SQL = '''
+    INSERT INTO ca_user_activity_log (
+        user_id, user_email, user_name, action_type, page_name, url_path,
+        ip_address, user_agent, additional_info
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# 큐 제어용 표식
+_FLUSH = object()
+_STOP = object()
+
+
+def is_async_enabled():
+    """비동기 기록 사용 여부"""
+    return os.getenv('CATCHER_ACTIVITY_LOG_ASYNC', '1') != '0'
+
+
+class ActivityLogWriter:
+    """활동 로그 배치 writer (전용 스레드 1개)"""
+
+    def __init__(self, batch_size=None, flush_interval_ms=None, max_queue=None, policy=None,
+                 block_timeout=0.05):
+        self.batch_size = batch_size or env_int('CATCHER_ACTIVITY_LOG_BATCH_SIZE', 200)
+        self.flush_interval = (flush_interval_ms if flush_interval_ms is not None
+                               else env_int('CATCHER_ACTIVITY_LOG_FLUSH_MS', 500)) / 1000.0
+        self.max_queue = max_queue or env_int('CATCHER_ACTIVITY_LOG_MAX_QUEUE', 10000)
+        self.policy = policy or os.getenv('CATCHER_ACTIVITY_LOG_POLICY', 'drop')
+        self.block_timeout = block_timeout
+
+        self._queue = queue.Queue(maxsize=self.max_queue)
+        self._thread = None
+        self._pid = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'written': 0,
+            'dropped': 0,
+            'failed': 0,
+            'batches': 0,
+            'max_depth': 0,
+        }
+
+    def _ensure_started(self):
+        """writer 스레드 기동 (fork된 워커에서는 새로 기동)"""
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='catcher-activity-log', daemon=True)
+            self._thread.start()
+
+    def _count(self, key, amount=1):
+        with self._stats_lock:
+            self._stats[key] += amount
+
+    def submit(self, db_path, row):
+        """로그 레코드를 큐에 추가 (버려진 경우 False)"""
+        self._ensure_started()
+        try:
+            if self.policy == 'block':
+                self._queue.put((db_path, row), timeout=self.block_timeout)
+            else:
+                self._queue.put_nowait((db_path, row))
+        except queue.Full:
+            self._count('dropped')
+            return False
+
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self._stats['enqueued'] += 1
+            if depth > self._stats['max_depth']:
+                self._stats['max_depth'] = depth
+        return True
+
+    def _run(self):
+        """writer 스레드 본체: N건 또는 M밀리초 단위로 배치 기록"""
+        while True:
+            item = self._queue.get()
+            batch = []
+            control = None
+            if item is _FLUSH or item is _STOP:
+                control = item
+            else:
+                batch.append(item)
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=remaining)
+                    except queue.Empty:
+                        break
+                    if item is _FLUSH or item is _STOP:
+                        control = item
+                        break
+                    batch.append(item)
+
+            if batch:
+                self._write(batch)
+            for _ in range(len(batch) + (1 if control is not None else 0)):
+                self._queue.task_done()
+            if control is _STOP:
+                return
+
+    def _write(self, batch):
+        """배치를 DB별로 묶어 한 트랜잭션으로 기록"""
+        rows_by_db = {}
+        for db_path, row in batch:
+            rows_by_db.setdefault(db_path, []).append(row)
+
+        for db_path, rows in rows_by_db.items():
+            try:
+                with get_pool(db_path).connection() as conn:
+                    with conn:
+                        conn.executemany(INSERT_ACTIVITY_SQL, rows)
+                self._count('written', len(rows))
+                self._count('batches')
+            except sqlite3.Error:
+                traceback.print_exc()
+                self._count('failed', len(rows))
+
+    def flush(self, timeout=5.0):
+        """큐에 쌓인 로그를 즉시 기록하고 완료될 때까지 대기"""
+        if self._thread is None or not self._thread.is_alive():
+            return self._queue.unfinished_tasks == 0
+        self._queue.put(_FLUSH)
+        deadline = time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def stop(self, timeout=5.0):
+        """남은 로그를 모두 기록하고 writer 스레드 종료"""
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def queue_depth(self):
+        """현재 큐 길이"""
+        return self._queue.qsize()
+
+    def stats(self):
+        """writer 통계 반환"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats.update({
+            'queue_depth': self._queue.qsize(),
+            'max_queue': self.max_queue,
+            'policy': self.policy,
+        })
+        return stats
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_activity_writer():
+    """프로세스 단일 writer 반환"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = ActivityLogWriter()
+                atexit.register(_writer.stop)
+    return _writer
+
+
+def enqueue_activity(row):
+    """현재 DB 대상으로 활동 로그 레코드 추가"""
+    return get_activity_writer().submit(get_db_path(), row)
@@ -6,25 +6,68 @@ Snowball 데이터베이스 스키마 사용
 import sqlite3
 import os
 from functools import wraps
-from flask import session, redirect, url_for, g, request
-from datetime import datetime
+from flask import session, redirect, url_for, g, request, has_app_context
+from datetime import datetime, timezone
 import hashlib
+from catcher_db import DEFAULT_DB_PATH, env_int, get_pool
+from catcher_cache import TTLCache
+from catcher_activity import INSERT_ACTIVITY_SQL, enqueue_activity, is_async_enabled
 
-# 데이터베이스 경로
-DB_PATH = os.path.join(os.path.dirname(__file__), 'catcher.db')
+# 데이터베이스 경로 (실제 연결 경로는 CATCHER_DB_PATH 환경 변수 우선)
+DB_PATH = DEFAULT_DB_PATH
 
 def get_db():
-    """데이터베이스 연결 반환"""
+    """데이터베이스 연결 반환 (연결 풀에서 요청 단위로 대여)"""
     if 'db' not in g:
-        g.db = sqlite3.connect(DB_PATH)
-        g.db.row_factory = sqlite3.Row
+        g.db_pool = get_pool()
+        g.db = g.db_pool.acquire()
     return g.db
 
+# 사용자별 권한 캐시: user_id -> {'is_admin', 'rcm_ids'}
+# 요청 안에서는 g에 메모하고, 요청 사이에는 TTL/LRU 캐시를 사용한다.
+# CATCHER_AUTH_CACHE_TTL(초)이 0이면 프로세스 캐시를 끈다.
+_auth_cache = TTLCache(max_size=env_int('CATCHER_AUTH_CACHE_SIZE', 1024),
+                       ttl=env_int('CATCHER_AUTH_CACHE_TTL', 60), name='auth')
+
+def _load_user_authorization(user_id):
+    """DB에서 사용자 관리자 여부와 권한이 부여된 RCM 목록 조회"""
+    db = get_db()
+    user = db.execute('SELECT admin_flag FROM ca_user WHERE user_id = ?', (user_id,)).fetchone()
+    is_admin = bool(user and user['admin_flag'] == 'Y')
+    rcm_ids = frozenset()
+    if not is_admin:
+        rcm_ids = frozenset(row['rcm_id'] for row in db.execute('''
+            SELECT rcm_id FROM ca_user_rcm
+            WHERE user_id = ? AND is_active = 'Y'
+        ''', (user_id,)))
+    return {'is_admin': is_admin, 'rcm_ids': rcm_ids}
+
+def get_user_authorization(user_id):
+    """사용자 권한 정보 조회 (요청 단위 메모 → 프로세스 캐시 → DB)"""
+    memo = g.setdefault('auth_memo', {})
+    if user_id not in memo:
+        memo[user_id] = _auth_cache.get_or_load(user_id, lambda: _load_user_authorization(user_id))
+    return memo[user_id]
+
+def invalidate_user_authorization(user_id=None):
+    """권한 캐시 무효화 (user_id가 없으면 전체)"""
+    if user_id is None:
+        _auth_cache.clear()
+    else:
+        _auth_cache.invalidate(user_id)
+
+    if has_app_context():
+        if user_id is None:
+            g.pop('auth_memo', None)
+        else:
+            g.get('auth_memo', {}).pop(user_id, None)
+
 def close_db(e=None):
-    """데이터베이스 연결 닫기"""
+    """데이터베이스 연결 반환 (연결 풀로 되돌림)"""
     db = g.pop('db', None)
+    pool = g.pop('db_pool', None)
     if db is not None:
-        db.close()
+        pool.release(db)
 
 def hash_password(password):
     """비밀번호 해싱"""
@@ -45,16 +88,18 @@ def admin_required(f):
     def decorated_function(*args, **kwargs):
         if 'user_info' not in session:
             return redirect(url_for('login'))
-        user_info = session['user_info']
-        if user_info.get('admin_flag') != 'Y':
+        # 세션에 저장된 admin_flag 대신 현재 권한으로 확인 (권한 변경 즉시 반영)
+        if not get_user_authorization(session['user_info']['user_id'])['is_admin']:
             return redirect(url_for('index'))
         return f(*args, **kwargs)
     return decorated_function
 
 def get_current_user():
-    """현재 로그인한 사용자 정보 반환"""
+    """현재 로그인한 사용자 정보 반환 (admin_flag는 현재 권한 기준)"""
     if 'user_info' in session:
-        return session['user_info']
+        user_info = session['user_info']
+        is_admin = get_user_authorization(user_info['user_id'])['is_admin']
+        return dict(user_info, admin_flag='Y' if is_admin else 'N')
     return None
 
 def authenticate_user(email, password):
@@ -73,6 +118,8 @@ def authenticate_user(email, password):
         db.execute('UPDATE ca_user SET last_login = CURRENT_TIMESTAMP WHERE user_id = ?',
                   (user['user_id'],))
         db.commit()
+        # 로그인 시 권한 정보를 새로 읽도록 캐시 무효화
+        invalidate_user_authorization(user['user_id'])
         return dict(user)
     return None
 
@@ -87,6 +134,7 @@ def create_user(user_name, user_email, password, company_name, department='', ad
             VALUES (?, ?, ?, ?, ?, ?)
         ''', (user_name, user_email, hashed_password, company_name, department, admin_flag))
         db.commit()
+        invalidate_user_authorization(cursor.lastrowid)
         return cursor.lastrowid
     except sqlite3.IntegrityError:
         return None  # 이미 존재하는 이메일
@@ -98,6 +146,7 @@ def create_rcm(rcm_name, control_category, description, upload_user_id, original
         INSERT INTO ca_rcm (rcm_name, control_category, description, upload_user_id, original_filename)
         VALUES (?, ?, ?, ?, ?)
     ''', (rcm_name, control_category, description, upload_user_id, original_filename))
+    bump_rcm_revision(db, cursor.lastrowid)
     db.commit()
     return cursor.lastrowid
 
@@ -106,8 +155,7 @@ def get_user_rcms(user_id, control_category=None):
     db = get_db()
 
     # 먼저 사용자가 관리자인지 확인
-    user = db.execute('SELECT admin_flag FROM ca_user WHERE user_id = ?', (user_id,)).fetchone()
-    is_admin = user and user['admin_flag'] == 'Y'
+    is_admin = get_user_authorization(user_id)['is_admin']
 
     if is_admin:
         # 관리자는 모든 RCM에 접근 가능
@@ -156,21 +204,19 @@ def get_user_rcms(user_id, control_category=None):
     return [dict(rcm) for rcm in rcms]
 
 def has_rcm_access(user_id, rcm_id):
-    """사용자가 특정 RCM에 접근 권한이 있는지 확인"""
-    db = get_db()
+    """사용자가 특정 RCM에 접근 권한이 있는지 확인 (권한 캐시 사용)"""
+    authorization = get_user_authorization(user_id)
 
-    # 먼저 관리자인지 확인
-    user = db.execute('SELECT admin_flag FROM ca_user WHERE user_id = ?', (user_id,)).fetchone()
-    if user and user['admin_flag'] == 'Y':
+    # 관리자는 모든 RCM에 접근 가능
+    if authorization['is_admin']:
         return True
 
-    # 일반 사용자는 명시적 권한 확인
-    access = db.execute('''
-        SELECT mapping_id FROM ca_user_rcm
-        WHERE user_id = ? AND rcm_id = ? AND is_active = 'Y'
-    ''', (user_id, rcm_id)).fetchone()
-
-    return access is not None
+    # 일반 사용자는 명시적 권한 확인 (JSON 요청의 문자열 ID도 허용)
+    try:
+        rcm_id = int(rcm_id)
+    except (TypeError, ValueError):
+        return False
+    return rcm_id in authorization['rcm_ids']
 
 def grant_rcm_access(user_id, rcm_id, granted_by, permission_type='READ'):
     """사용자에게 RCM 접근 권한 부여"""
@@ -181,7 +227,6 @@ def grant_rcm_access(user_id, rcm_id, granted_by, permission_type='READ'):
             VALUES (?, ?, ?, ?)
         ''', (user_id, rcm_id, permission_type, granted_by))
         db.commit()
-        return True
     except sqlite3.IntegrityError:
         # 이미 권한이 있는 경우 업데이트
         db.execute('''
@@ -190,7 +235,28 @@ def grant_rcm_access(user_id, rcm_id, granted_by, permission_type='READ'):
             WHERE user_id = ? AND rcm_id = ?
         ''', (permission_type, granted_by, user_id, rcm_id))
         db.commit()
-        return True
+    invalidate_user_authorization(user_id)
+    return True
+
+# RCM 상세 데이터 중 업로드로 갱신되는 컬럼 (rcm_id, control_code 제외)
+RCM_DETAIL_FIELDS = (
+    'control_name', 'control_description',
+    'key_control', 'control_frequency', 'control_type', 'control_nature',
+    'population', 'population_completeness_check', 'population_count',
+    'test_procedure', 'process_area', 'risk_description'
+)
+
+# 페이지 조회에서 선택 가능한 컬럼과 목록 화면 기본 컬럼
+RCM_DETAIL_COLUMNS = ('detail_id', 'rcm_id', 'control_code') + RCM_DETAIL_FIELDS
+RCM_DETAIL_LIST_COLUMNS = (
+    'detail_id', 'control_code', 'control_name', 'control_description',
+    'key_control', 'control_frequency', 'control_type', 'process_area'
+)
+# 서버 측 필터로 허용하는 컬럼 (값 완전 일치)
+RCM_DETAIL_FILTER_COLUMNS = ('key_control', 'control_frequency', 'control_type', 'process_area')
+# 상세 화면에서 한 번에 보여주는 통제 수
+RCM_DETAIL_PAGE_SIZE = 100
+RCM_DETAIL_MAX_PAGE_SIZE = 500
 
 def get_rcm_details(rcm_id):
     """RCM 상세 데이터 조회"""
@@ -202,6 +268,67 @@ def get_rcm_details(rcm_id):
     ''', (rcm_id,)).fetchall()
     return [dict(detail) for detail in details]
 
+def _rcm_detail_filter_clause(rcm_id, filters):
+    """rcm_id + 필터 조건 WHERE 절과 파라미터 생성 (빈 값은 무시)"""
+    conditions = ['rcm_id = ?']
+    params = [rcm_id]
+    for column in RCM_DETAIL_FILTER_COLUMNS:
+        value = (filters or {}).get(column)
+        if value:
+            conditions.append(f'{column} = ?')
+            params.append(value)
+    return ' AND '.join(conditions), params
+
+def get_rcm_details_page(rcm_id, after=None, limit=100, filters=None, columns=None):
+    """RCM 상세 데이터 keyset 페이지 조회 (control_code 순)
+
+    after: 이전 페이지의 next_cursor (마지막 control_code)
+    columns: 조회할 컬럼 (기본: 목록 화면 컬럼), 허용되지 않은 컬럼은 ValueError
+    반환: {'controls': [...], 'next_cursor': 다음 페이지 커서 또는 None}
+    """
+    columns = tuple(columns or RCM_DETAIL_LIST_COLUMNS)
+    invalid = [column for column in columns if column not in RCM_DETAIL_COLUMNS]
+    if invalid:
+        raise ValueError(f"조회할 수 없는 컬럼입니다: {', '.join(invalid)}")
+    if 'control_code' not in columns:
+        columns = ('control_code',) + columns
+
+    where, params = _rcm_detail_filter_clause(rcm_id, filters)
+    if after:
+        where += ' AND control_code > ?'
+        params.append(after)
+
+    db = get_db()
+    rows = db.execute(f'''
+        SELECT {', '.join(columns)} FROM ca_rcm_detail
+        WHERE {where}
+        ORDER BY control_code
+        LIMIT ?
+    ''', (*params, limit + 1)).fetchall()
+
+    controls = [dict(row) for row in rows[:limit]]
+    next_cursor = controls[-1]['control_code'] if len(rows) > limit else None
+    return {'controls': controls, 'next_cursor': next_cursor}
+
+def get_rcm_detail_filter_options(rcm_id):
+    """필터 선택 목록용 컬럼별 값 목록 조회"""
+    db = get_db()
+    options = {}
+    for column in RCM_DETAIL_FILTER_COLUMNS:
+        rows = db.execute(f'''
+            SELECT DISTINCT {column} FROM ca_rcm_detail
+            WHERE rcm_id = ? AND {column} IS NOT NULL AND {column} != ''
+            ORDER BY {column}
+        ''', (rcm_id,)).fetchall()
+        options[column] = [row[0] for row in rows]
+    return options
+
+def count_rcm_details(rcm_id, filters=None):
+    """RCM 통제 수 조회 (COUNT(*), 필터 옵션)"""
+    where, params = _rcm_detail_filter_clause(rcm_id, filters)
+    db = get_db()
+    return db.execute(f'SELECT COUNT(*) FROM ca_rcm_detail WHERE {where}', params).fetchone()[0]
+
 def get_rcm_info(rcm_id):
     """RCM 기본 정보 조회"""
     db = get_db()
@@ -213,71 +340,155 @@ def get_rcm_info(rcm_id):
     ''', (rcm_id,)).fetchone()
     return dict(rcm) if rcm else None
 
-def save_rcm_details(rcm_id, controls_data):
-    """RCM 상세 데이터 저장 (Excel 업로드 후)"""
+def bump_rcm_revision(conn, rcm_id=None, details=False):
+    """RCM 리비전 증가 (조회 화면 ETag 무효화, 호출한 쪽 트랜잭션 안에서 실행)
+
+    rcm_id가 없으면 전체 RCM의 리비전을 올린다.
+    details가 True이면(통제 내용/매핑 변경) 완전성 평가 기준인 detail_revision도 올린다.
+    """
+    detail_delta = 1 if details else 0
+    if rcm_id is None:
+        conn.execute('''
+            INSERT INTO ca_rcm_revision (rcm_id, detail_revision) SELECT rcm_id, ? FROM ca_rcm WHERE true
+            ON CONFLICT(rcm_id) DO UPDATE SET revision = revision + 1, detail_revision = detail_revision + ?,
+                                              last_modified = CURRENT_TIMESTAMP
+        ''', (detail_delta, detail_delta))
+    else:
+        conn.execute('''
+            INSERT INTO ca_rcm_revision (rcm_id, detail_revision) VALUES (?, ?)
+            ON CONFLICT(rcm_id) DO UPDATE SET revision = revision + 1, detail_revision = detail_revision + ?,
+                                              last_modified = CURRENT_TIMESTAMP
+        ''', (rcm_id, detail_delta, detail_delta))
+
+def get_rcm_revision(rcm_id):
+    """RCM 리비전 조회, 반환: {'revision': n, 'last_modified': UTC datetime 또는 None}"""
+    row = get_db().execute(
+        'SELECT revision, last_modified FROM ca_rcm_revision WHERE rcm_id = ?', (rcm_id,)
+    ).fetchone()
+    if not row:
+        return {'revision': 0, 'last_modified': None}
+    last_modified = None
+    if row['last_modified']:
+        last_modified = datetime.strptime(row['last_modified'], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    return {'revision': row['revision'], 'last_modified': last_modified}
+
+UPSERT_RCM_DETAIL_SQL = '''
+    INSERT INTO ca_rcm_detail (rcm_id, control_code, {columns})
+    VALUES (?, ?, {placeholders})
+    ON CONFLICT(rcm_id, control_code) DO UPDATE SET {assignments}
+'''.format(
+    columns=', '.join(RCM_DETAIL_FIELDS),
+    placeholders=', '.join('?' for _ in RCM_DETAIL_FIELDS),
+    assignments=', '.join(f'{field} = excluded.{field}' for field in RCM_DETAIL_FIELDS)
+)
+
+def _control_content_hash(values):
+    """통제 내용 해시 (변경 여부 비교용)"""
+    digest = hashlib.sha1()
+    for value in values:
+        digest.update(b'\x00' if value is None else str(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+def _iter_chunks(items, size):
+    """이터러블을 size 단위 리스트로 분할"""
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def bulk_upsert_rcm_details(rcm_id, controls, skip_unchanged=True, chunk_size=500):
+    """RCM 상세 데이터 일괄 저장 (INSERT ... ON CONFLICT DO UPDATE, 단일 트랜잭션)
+
+    controls는 리스트뿐 아니라 제너레이터도 가능하며 chunk_size 단위로 처리한다.
+    skip_unchanged가 True이면 기존 내용과 해시가 같은 통제는 쓰지 않는다.
+    반환: {'inserted': n, 'updated': n, 'unchanged': n, 'skipped': n}
+    'skipped'는 control_code가 없어 저장하지 않은 행 수
+    """
     db = get_db()
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+    select_columns = ', '.join(RCM_DETAIL_FIELDS)
 
-    for control in controls_data:
-        try:
-            db.execute('''
-                INSERT INTO ca_rcm_detail (
-                    rcm_id, control_code, control_name, control_description,
-                    key_control, control_frequency, control_type, control_nature,
-                    population, population_completeness_check, population_count,
-                    test_procedure
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                rcm_id,
-                control.get('control_code'),
-                control.get('control_name'),
-                control.get('control_description'),
-                control.get('key_control'),
-                control.get('control_frequency'),
-                control.get('control_type'),
-                control.get('control_nature'),
-                control.get('population'),
-                control.get('population_completeness_check'),
-                control.get('population_count'),
-                control.get('test_procedure')
-            ))
-        except sqlite3.IntegrityError:
-            # 중복된 control_code는 업데이트
-            db.execute('''
-                UPDATE ca_rcm_detail SET
-                    control_name = ?, control_description = ?,
-                    key_control = ?, control_frequency = ?, control_type = ?, control_nature = ?,
-                    population = ?, population_completeness_check = ?, population_count = ?,
-                    test_procedure = ?
-                WHERE rcm_id = ? AND control_code = ?
-            ''', (
-                control.get('control_name'),
-                control.get('control_description'),
-                control.get('key_control'),
-                control.get('control_frequency'),
-                control.get('control_type'),
-                control.get('control_nature'),
-                control.get('population'),
-                control.get('population_completeness_check'),
-                control.get('population_count'),
-                control.get('test_procedure'),
-                rcm_id,
-                control.get('control_code')
-            ))
+    with db:
+        for chunk in _iter_chunks(controls, chunk_size):
+            # 같은 chunk 안의 중복 control_code는 마지막 행 기준
+            incoming = {}
+            for control in chunk:
+                control_code = control.get('control_code')
+                if not control_code:
+                    counts['skipped'] += 1
+                    continue
+                values = tuple(control.get(field) for field in RCM_DETAIL_FIELDS)
+                if control_code in incoming:
+                    counts['updated'] += 1
+                incoming[control_code] = values
 
-    db.commit()
+            if not incoming:
+                continue
+
+            codes = list(incoming)
+            existing = db.execute(f'''
+                SELECT control_code, {select_columns} FROM ca_rcm_detail
+                WHERE rcm_id = ? AND control_code IN ({', '.join('?' for _ in codes)})
+            ''', (rcm_id, *codes)).fetchall()
+            existing_hashes = {row[0]: _control_content_hash(tuple(row)[1:]) for row in existing}
+
+            rows = []
+            for control_code, values in incoming.items():
+                if control_code not in existing_hashes:
+                    counts['inserted'] += 1
+                elif skip_unchanged and existing_hashes[control_code] == _control_content_hash(values):
+                    counts['unchanged'] += 1
+                    continue
+                else:
+                    counts['updated'] += 1
+                rows.append((rcm_id, control_code) + values)
+
+            if rows:
+                db.executemany(UPSERT_RCM_DETAIL_SQL, rows)
+
+        if counts['inserted'] or counts['updated']:
+            bump_rcm_revision(db, rcm_id, details=True)
+
+    return counts
+
+def save_rcm_details(rcm_id, controls_data, refresh=True):
+    """RCM 상세 데이터 저장 (Excel 업로드 후)
+
+    refresh가 True이면 저장 후 refresh_rcm_derived_data를 호출한다.
+    여러 번 나눠 저장하는 업로드는 refresh=False로 저장하고 마지막에 한 번 호출한다.
+    반환: bulk_upsert_rcm_details와 동일한 건수 dict
+    """
+    counts = bulk_upsert_rcm_details(rcm_id, controls_data)
+    if refresh:
+        refresh_rcm_derived_data(rcm_id, counts)
+    return counts
+
+def refresh_rcm_derived_data(rcm_id, counts):
+    """통제 저장 후 파생 데이터 갱신 (counts: 저장 건수 합계)
+
+    통제가 바뀌었으면 완전성 점수를 다시 계산하고 새/변경 통제를 유사 통제 인덱스에 추가한다.
+    통제가 추가되었으면 평가 헤더 통제 수와 대시보드 집계도 갱신한다.
+    """
+    from catcher_completeness import refresh_completeness
+    from catcher_dedup import index_rcm_controls
+    from catcher_link4 import refresh_rcm_dashboard
+    if counts['inserted'] or counts['updated']:
+        refresh_completeness(get_db(), [rcm_id])
+        index_rcm_controls(get_db(), rcm_id)
+    if counts['inserted']:
+        refresh_rcm_dashboard(get_db(), rcm_id)
 
 def log_user_activity(user_info, activity_type, description, url, ip_address, user_agent, additional_info=None):
-    """사용자 활동 로그 기록"""
+    """사용자 활동 로그 기록 (기본: 백그라운드 writer에 위임)"""
     if not user_info:
         return
 
-    db = get_db()
-    db.execute('''
-        INSERT INTO ca_user_activity_log (
-            user_id, user_email, user_name, action_type, page_name, url_path,
-            ip_address, user_agent, additional_info
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (
+    row = (
         user_info['user_id'],
         user_info.get('user_email', ''),
         user_info.get('user_name', ''),
@@ -287,5 +498,12 @@ def log_user_activity(user_info, activity_type, description, url, ip_address, us
         ip_address,
         user_agent,
         str(additional_info) if additional_info else None
-    ))
+    )
+
+    if is_async_enabled():
+        enqueue_activity(row)
+        return
+
+    db = get_db()
+    db.execute(INSERT_ACTIVITY_SQL, row)
     db.commit()
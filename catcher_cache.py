@@ -0,0 +1,91 @@
+"""
+Catcher Cache
+프로세스 단위 TTL + LRU 캐시 (스레드 안전)
+
+여러 워커 프로세스 사이에는 공유되지 않으므로, 다른 프로세스에서 발생한 변경은
+TTL이 지난 뒤에 반영된다. ttl이 0 이하이면 캐시를 사용하지 않는다.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+_MISSING = object()
+
+# 이름을 붙여 만든 캐시 (메트릭 노출용)
+_named_caches = {}
+
+
+class TTLCache:
+    """만료 시간과 최대 개수를 가진 LRU 캐시"""
+
+    def __init__(self, max_size=1024, ttl=60.0, name=None):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        if name:
+            _named_caches[name] = self
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and self.max_size > 0
+
+    def get(self, key, default=None):
+        """키 조회 (만료된 항목은 삭제하고 default 반환)"""
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self._stats['misses'] += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._stats['misses'] += 1
+                return default
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def set(self, key, value):
+        """값 저장 (최대 개수를 넘으면 가장 오래 사용하지 않은 항목 제거)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats['evictions'] += 1
+
+    def get_or_load(self, key, loader):
+        """캐시에 없으면 loader()로 값을 만들어 저장 후 반환"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value)
+        return value
+
+    def invalidate(self, key):
+        """키 하나 무효화"""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        """전체 무효화"""
+        with self._lock:
+            self._entries.clear()
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """캐시 통계"""
+        with self._lock:
+            return dict(self._stats, size=len(self._entries))
+
+
+def named_caches():
+    """이름이 있는 캐시 목록 {이름: TTLCache}"""
+    return dict(_named_caches)
@@ -0,0 +1,172 @@
+"""
+Catcher RCM Completeness
+RCM별 필수 항목 기재율과 표준 통제 매핑률로 완전성 점수 계산 (ca_rcm_completeness_eval, 마이그레이션 20261018_010)
+
+RCM 여러 개를 ca_rcm_detail에 대한 GROUP BY 집계 쿼리 한 번으로 계산하며, Python에서 통제 행을 순회하지 않는다.
+결과는 계산 당시 통제 내용 리비전(ca_rcm_revision.detail_revision, 마이그레이션 20261018_015)과 함께 저장하고,
+그 값이 바뀐 RCM만 다시 계산한다. detail_revision은 통제 저장(bulk_upsert_rcm_details)과 표준 통제 매핑 때만
+올라가므로 평가 저장으로는 다시 계산되지 않는다.
+활성 표준 통제 유무(매핑률 반영 여부, 마이그레이션 20261018_016)도 함께 저장해, 표준 통제를 처음 적재하거나
+모두 비활성화하면 모든 RCM이 다시 계산 대상이 된다.
+계산은 업로드 저장 후(RCM별 1회), 자동 매핑 후, evaluate-completeness 명령에서 하고 조회 API는 읽기만 한다.
+
+점수(0~100) = 필수 항목 기재율 × FIELD_WEIGHT + 표준 통제 매핑률 × COVERAGE_WEIGHT
+활성 표준 통제가 없으면 매핑률은 제외하고 기재율만 사용한다.
+
+사용법: flask --app catcher evaluate-completeness [--rcm-id N] [--force]
+"""
+
+import json
+import click
+from flask.cli import with_appcontext
+from catcher_auth import get_db
+
+# 완전성 점검 대상 필수 항목 (control_code는 저장 시 필수라 제외)
+REQUIRED_FIELDS = (
+    'control_name', 'control_description', 'key_control', 'control_frequency',
+    'control_type', 'control_nature', 'risk_description', 'test_procedure',
+)
+FIELD_WEIGHT = 0.7
+COVERAGE_WEIGHT = 0.3
+ID_CHUNK_SIZE = 500
+
+_MISSING_COLUMNS = ',\n'.join(
+    f"SUM(COALESCE(TRIM({field}), '') = '') AS missing_{field}" for field in REQUIRED_FIELDS)
+
+UPSERT_EVAL_SQL = '''
+    INSERT INTO ca_rcm_completeness_eval
+        (rcm_id, revision, coverage_applicable, total_controls, mapped_controls, missing_fields_count,
+         completeness_score, eval_details, eval_date)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(rcm_id) DO UPDATE SET
+        revision = excluded.revision,
+        coverage_applicable = excluded.coverage_applicable,
+        total_controls = excluded.total_controls,
+        mapped_controls = excluded.mapped_controls,
+        missing_fields_count = excluded.missing_fields_count,
+        completeness_score = excluded.completeness_score,
+        eval_details = excluded.eval_details,
+        eval_date = excluded.eval_date
+'''
+
+
+COVERAGE_APPLICABLE_SQL = "SELECT EXISTS (SELECT 1 FROM ca_standard_control WHERE is_active = 'Y')"
+
+
+def _chunks(ids):
+    ids = list(ids)
+    for start in range(0, len(ids), ID_CHUNK_SIZE):
+        yield ids[start:start + ID_CHUNK_SIZE]
+
+
+def _placeholders(ids):
+    return ', '.join('?' for _ in ids)
+
+
+def stale_rcm_ids(conn, rcm_ids=None):
+    """결과가 없거나 계산 후 통제 내용 리비전 또는 매핑률 반영 여부가 바뀐 활성 RCM ID 목록"""
+    coverage_applicable = conn.execute(COVERAGE_APPLICABLE_SQL).fetchone()[0]
+    sql = '''
+        SELECT r.rcm_id FROM ca_rcm r
+        LEFT JOIN ca_rcm_revision v ON v.rcm_id = r.rcm_id
+        LEFT JOIN ca_rcm_completeness_eval e ON e.rcm_id = r.rcm_id
+        WHERE r.is_active = 'Y'
+          AND (e.rcm_id IS NULL OR e.revision != COALESCE(v.detail_revision, 0)
+               OR e.coverage_applicable != ?)
+    '''
+    if rcm_ids is None:
+        return [row[0] for row in conn.execute(sql + ' ORDER BY r.rcm_id', (coverage_applicable,))]
+    stale = []
+    for chunk in _chunks(rcm_ids):
+        stale.extend(row[0] for row in conn.execute(
+            f'{sql} AND r.rcm_id IN ({_placeholders(chunk)}) ORDER BY r.rcm_id', (coverage_applicable, *chunk)))
+    return stale
+
+
+def _score(total, missing_fields, mapped, coverage_applicable):
+    if not total:
+        return 0.0
+    field_rate = 1 - missing_fields / (total * len(REQUIRED_FIELDS))
+    if not coverage_applicable:
+        return round(field_rate * 100, 1)
+    return round((field_rate * FIELD_WEIGHT + mapped / total * COVERAGE_WEIGHT) * 100, 1)
+
+
+def evaluate_rcm_completeness(conn, rcm_ids):
+    """RCM 완전성 계산 후 저장, 반환: 계산한 RCM 수"""
+    rcm_ids = list(rcm_ids)
+    if not rcm_ids:
+        return 0
+    coverage_applicable = conn.execute(COVERAGE_APPLICABLE_SQL).fetchone()[0] == 1
+
+    with conn:
+        for chunk in _chunks(rcm_ids):
+            # 리비전을 먼저 읽어, 집계 도중 통제가 바뀌면 다음 실행에서 다시 계산되게 한다
+            revisions = dict(conn.execute(f'''
+                SELECT rcm_id, detail_revision FROM ca_rcm_revision WHERE rcm_id IN ({_placeholders(chunk)})
+            ''', chunk).fetchall())
+            aggregates = {row['rcm_id']: row for row in conn.execute(f'''
+                SELECT rcm_id,
+                       COUNT(*) AS total_controls,
+                       {_MISSING_COLUMNS},
+                       SUM(mapped_std_control_id IS NOT NULL AND COALESCE(mapping_status, '') != 'REVIEW')
+                           AS mapped_controls,
+                       SUM(mapping_status = 'REVIEW') AS review_controls
+                FROM ca_rcm_detail
+                WHERE rcm_id IN ({_placeholders(chunk)})
+                GROUP BY rcm_id
+            ''', chunk)}
+
+            rows = []
+            for rcm_id in chunk:
+                aggregate = aggregates.get(rcm_id)
+                total = aggregate['total_controls'] if aggregate else 0
+                missing_by_field = {field: aggregate[f'missing_{field}'] if aggregate else 0
+                                    for field in REQUIRED_FIELDS}
+                missing = sum(missing_by_field.values())
+                mapped = aggregate['mapped_controls'] if aggregate else 0
+                details = {
+                    'missing_by_field': missing_by_field,
+                    'review_controls': aggregate['review_controls'] if aggregate else 0,
+                    'coverage_applicable': coverage_applicable,
+                }
+                rows.append((rcm_id, revisions.get(rcm_id, 0), int(coverage_applicable), total, mapped, missing,
+                             _score(total, missing, mapped, coverage_applicable),
+                             json.dumps(details, ensure_ascii=False)))
+            conn.executemany(UPSERT_EVAL_SQL, rows)
+    return len(rcm_ids)
+
+
+def refresh_completeness(conn, rcm_ids=None, force=False):
+    """통제 내용 리비전이 바뀐 RCM만 다시 계산 (force이면 대상 전체), 반환: 계산한 RCM 수"""
+    if force:
+        targets = rcm_ids if rcm_ids is not None else [
+            row[0] for row in conn.execute("SELECT rcm_id FROM ca_rcm WHERE is_active = 'Y'")]
+    else:
+        targets = stale_rcm_ids(conn, rcm_ids)
+    return evaluate_rcm_completeness(conn, targets)
+
+
+def get_completeness_scores(conn, rcm_ids):
+    """저장된 완전성 결과 조회, 반환: {rcm_id: 결과 dict} (계산되지 않은 RCM은 제외)"""
+    scores = {}
+    for chunk in _chunks(rcm_ids):
+        for row in conn.execute(f'''
+            SELECT rcm_id, total_controls, mapped_controls, missing_fields_count,
+                   completeness_score, eval_details, eval_date
+            FROM ca_rcm_completeness_eval WHERE rcm_id IN ({_placeholders(chunk)})
+        ''', chunk):
+            result = dict(row)
+            result['eval_details'] = json.loads(result['eval_details'] or '{}')
+            scores[result.pop('rcm_id')] = result
+    return scores
+
+
+@click.command('evaluate-completeness')
+@click.option('--rcm-id', type=int, default=None, help='특정 RCM만 계산')
+@click.option('--force', is_flag=True, help='리비전이 같아도 다시 계산')
+@with_appcontext
+def evaluate_completeness_command(rcm_id, force):
+    """RCM 완전성 점수 계산 (바뀐 RCM만)"""
+    count = refresh_completeness(get_db(), [rcm_id] if rcm_id else None, force=force)
+    click.echo(f'✓ 완전성 평가: {count}개 RCM 계산')
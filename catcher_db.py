@@ -0,0 +1,260 @@
+"""
+Catcher Database Connection Pool
+PRAGMA 튜닝된 SQLite 연결을 요청 간에 재사용하는 연결 풀
+
+환경 변수:
+- CATCHER_DB_PATH: 데이터베이스 파일 경로 (기본: catcher.db)
+- CATCHER_DB_POOL_SIZE: 최대 연결 수 (기본: 16)
+- CATCHER_DB_POOL_TIMEOUT: 연결 대기 최대 시간(초) (기본: 30)
+- CATCHER_DB_HEALTH_CHECK_SECONDS: 유휴 연결 상태 점검 주기(초) (기본: 30)
+- CATCHER_DB_CACHE_KB: 연결당 page cache 크기(KiB) (기본: 20000)
+- CATCHER_DB_MMAP_SIZE: mmap 크기(byte) (기본: 256MB)
+- CATCHER_DB_BUSY_TIMEOUT_MS: 잠금 대기 시간(ms) (기본: 5000)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+# 기본 데이터베이스 경로
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'catcher.db')
+
+# 새 연결에 사용할 sqlite3.Connection 클래스 (계측 사용 시 catcher_instrument가 교체)
+connection_factory = sqlite3.Connection
+
+
+def get_db_path():
+    """현재 설정된 데이터베이스 경로 반환 (CATCHER_DB_PATH 우선)"""
+    return os.getenv('CATCHER_DB_PATH', DEFAULT_DB_PATH)
+
+
+def env_int(name, default):
+    """정수형 환경 변수 읽기"""
+    value = os.getenv(name)
+    if value is None or value.strip() == '':
+        return default
+    return int(value)
+
+
+class PoolTimeoutError(sqlite3.OperationalError):
+    """풀에서 제한 시간 내에 연결을 얻지 못한 경우"""
+
+
+class ConnectionPool:
+    """크기 제한이 있는 SQLite 연결 풀
+
+    - 같은 스레드에서 중첩 획득 시 동일 연결을 반환 (스레드별 checkout)
+    - 최근 반환된 연결을 먼저 재사용하여 page cache 적중률 유지
+    - 일정 시간 유휴 상태였던 연결은 재사용 전 상태 점검
+    """
+
+    def __init__(self, db_path, max_size=None, timeout=None, health_check_interval=None,
+                 cache_kb=None, mmap_size=None, busy_timeout_ms=None):
+        self.db_path = db_path
+        self.max_size = max_size if max_size is not None else env_int('CATCHER_DB_POOL_SIZE', 16)
+        self.timeout = timeout if timeout is not None else env_int('CATCHER_DB_POOL_TIMEOUT', 30)
+        self.health_check_interval = (health_check_interval if health_check_interval is not None
+                                      else env_int('CATCHER_DB_HEALTH_CHECK_SECONDS', 30))
+        self.cache_kb = cache_kb if cache_kb is not None else env_int('CATCHER_DB_CACHE_KB', 20000)
+        self.mmap_size = mmap_size if mmap_size is not None else env_int('CATCHER_DB_MMAP_SIZE', 268435456)
+        self.busy_timeout_ms = (busy_timeout_ms if busy_timeout_ms is not None
+                                else env_int('CATCHER_DB_BUSY_TIMEOUT_MS', 5000))
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        self._idle = []  # (connection, 반환 시각) - 마지막 요소가 가장 최근
+        self._local = threading.local()
+        self._checked_out = set()  # 사용 중인 연결 id
+        self._created = 0
+        self._in_use = 0
+        self._closed = False
+        self._stats = {
+            'checkouts': 0,
+            'reentrant_checkouts': 0,
+            'waits': 0,
+            'wait_time_ms': 0.0,
+            'timeouts': 0,
+            'peak_in_use': 0,
+            'connections_created': 0,
+            'health_check_failures': 0,
+        }
+
+    def _connect(self):
+        """새 연결 생성 및 PRAGMA 적용"""
+        conn = sqlite3.connect(self.db_path, timeout=self.busy_timeout_ms / 1000.0,
+                               check_same_thread=False, factory=connection_factory)
+        conn.row_factory = sqlite3.Row
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('PRAGMA synchronous = NORMAL')
+        conn.execute(f'PRAGMA cache_size = -{int(self.cache_kb)}')
+        conn.execute(f'PRAGMA mmap_size = {int(self.mmap_size)}')
+        conn.execute('PRAGMA temp_store = MEMORY')
+        conn.execute(f'PRAGMA busy_timeout = {int(self.busy_timeout_ms)}')
+        return conn
+
+    def _is_healthy(self, conn):
+        """유휴 연결 상태 점검"""
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def acquire(self):
+        """연결 획득 (같은 스레드의 중첩 호출은 동일 연결 반환)"""
+        held = getattr(self._local, 'conn', None)
+        if held is not None and id(held) in self._checked_out:
+            self._local.depth += 1
+            with self._lock:
+                self._stats['reentrant_checkouts'] += 1
+            return held
+
+        conn = None
+        idle_since = None
+        with self._available:
+            if self._closed:
+                raise sqlite3.ProgrammingError('연결 풀이 닫혔습니다.')
+
+            if not self._idle and self._created >= self.max_size:
+                # 반환될 때까지 대기
+                self._stats['waits'] += 1
+                started = time.monotonic()
+                deadline = started + self.timeout
+                while not self._idle and self._created >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f'DB 연결을 {self.timeout}초 내에 얻지 못했습니다. (풀 크기: {self.max_size})')
+                    self._available.wait(remaining)
+                self._stats['wait_time_ms'] += (time.monotonic() - started) * 1000
+
+            if self._idle:
+                conn, idle_since = self._idle.pop()
+            else:
+                # 연결 생성 슬롯 예약 (실제 연결은 잠금 밖에서 생성)
+                self._created += 1
+                self._stats['connections_created'] += 1
+
+            self._in_use += 1
+            self._stats['checkouts'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._in_use)
+
+        try:
+            if conn is not None and time.monotonic() - idle_since >= self.health_check_interval:
+                if not self._is_healthy(conn):
+                    with self._lock:
+                        self._stats['health_check_failures'] += 1
+                        self._stats['connections_created'] += 1
+                    try:
+                        conn.close()
+                    except sqlite3.Error:
+                        pass
+                    conn = None
+            if conn is None:
+                conn = self._connect()
+        except Exception:
+            with self._available:
+                self._created -= 1
+                self._in_use -= 1
+                self._available.notify()
+            raise
+
+        with self._lock:
+            self._checked_out.add(id(conn))
+        self._local.conn = conn
+        self._local.depth = 1
+        return conn
+
+    def release(self, conn):
+        """연결 반환 (미완료 트랜잭션은 롤백)"""
+        if getattr(self._local, 'conn', None) is conn:
+            self._local.depth -= 1
+            if self._local.depth > 0:
+                return
+            self._local.conn = None
+
+        discard = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            discard = True
+
+        with self._available:
+            self._checked_out.discard(id(conn))
+            self._in_use -= 1
+            if discard or self._closed:
+                self._created -= 1
+                conn.close()
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._available.notify()
+
+    @contextmanager
+    def connection(self):
+        """with 블록 동안 연결 사용 (요청 컨텍스트 밖 백그라운드 작업용)"""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        """풀 사용 통계 반환"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'db_path': self.db_path,
+                'max_size': self.max_size,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'open_connections': self._created,
+            })
+        return stats
+
+    def close(self):
+        """유휴 연결을 모두 닫고 풀 종료 (사용 중 연결은 반환 시 닫힘)"""
+        with self._available:
+            self._closed = True
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._created -= 1
+                conn.close()
+            self._available.notify_all()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(db_path=None):
+    """데이터베이스 경로별 연결 풀 반환 (없으면 생성)"""
+    db_path = db_path or get_db_path()
+    pool = _pools.get(db_path)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(db_path)
+            if pool is None:
+                pool = ConnectionPool(db_path)
+                _pools[db_path] = pool
+    return pool
+
+
+def pool_stats():
+    """생성된 모든 연결 풀의 사용 통계 목록"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def close_pools():
+    """모든 연결 풀 종료 (테스트 정리, 워커 fork 후 재초기화용)"""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,225 @@
+"""
+Catcher Control Dedup
+RCM 간 유사 중복 통제 탐지 (MinHash 서명 + LSH 버킷, 마이그레이션 20261018_011)
+
+통제명 + 통제설명을 문자 SHINGLE_SIZE-gram으로 나눠 NUM_PERM개 해시의 최솟값(MinHash 서명)을 만들고,
+서명을 LSH_BANDS개 band로 나눈 버킷을 ca_control_lsh_bucket에 저장한다.
+유사 통제 조회는 같은 버킷에 들어간 후보만 서명으로 Jaccard 유사도를 추정하므로 전체 쌍을 비교하지 않는다.
+band당 ROWS_PER_BAND행이면 Jaccard 약 (1/LSH_BANDS)^(1/ROWS_PER_BAND) ≈ 0.5 이상에서 후보로 잡힌다.
+
+인덱싱은 서명이 없는 통제만 계산하며 업로드 저장 후 RCM별로 한 번 호출한다 (조회 API는 읽기만 함).
+통제명/설명이 바뀌면 트리거가 서명을 지우므로 다음 인덱싱에서 다시 계산된다.
+
+환경 변수:
+- CATCHER_DEDUP_THRESHOLD: 유사 통제로 볼 추정 Jaccard 유사도 x100 (기본: 70)
+
+사용법: flask --app catcher rebuild-dedup-index [--rcm-id N]
+"""
+
+import hashlib
+import zlib
+import click
+import numpy as np
+from flask.cli import with_appcontext
+from catcher_auth import get_db
+from catcher_db import env_int
+from catcher_mapping import control_text
+
+SHINGLE_SIZE = 3
+NUM_PERM = 64
+LSH_BANDS = 16
+ROWS_PER_BAND = NUM_PERM // LSH_BANDS
+SIMILAR_LIMIT = 20
+
+# 서명은 DB에 저장되므로 해시 계수는 프로세스/배포와 무관하게 고정
+_PRIME = np.uint64(4294967311)  # 2^32보다 큰 소수
+_rng = np.random.RandomState(20261018)
+_A = _rng.randint(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64)[:, None]
+_B = _rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64)[:, None]
+
+
+def default_threshold():
+    return env_int('CATCHER_DEDUP_THRESHOLD', 70) / 100
+
+
+def shingles(text):
+    """문자 shingle 집합 (짧은 텍스트는 전체를 하나로)"""
+    if len(text) <= SHINGLE_SIZE:
+        return {text} if text else set()
+    return {text[start:start + SHINGLE_SIZE] for start in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def minhash_signature(text):
+    """MinHash 서명 (uint64 배열, 텍스트가 비어 있으면 None)"""
+    items = shingles(text)
+    if not items:
+        return None
+    hashes = np.fromiter((zlib.crc32(item.encode('utf-8')) for item in items), dtype=np.uint64, count=len(items))
+    # (a·x + b) mod p: a, b, x < 2^32이므로 uint64에서 넘치지 않음
+    return ((_A * hashes + _B) % _PRIME).min(axis=1)
+
+
+def band_hashes(signature):
+    """band별 버킷 해시 (signed 64비트 정수, SQLite INTEGER 범위)"""
+    return [int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'big', signed=True)
+            for band in signature.reshape(LSH_BANDS, ROWS_PER_BAND)]
+
+
+def _load_signature(blob):
+    return np.frombuffer(blob, dtype=np.uint64)
+
+
+def index_rcm_controls(conn, rcm_id=None):
+    """서명이 없는 통제의 MinHash/LSH 버킷 저장 (rcm_id가 없으면 전체), 반환: 인덱싱한 통제 수"""
+    # rcm_id 조건을 OR로 합치면 전체 ca_rcm_detail을 훑으므로 쿼리를 나눈다 (RCM 지정 시 rcm_id 인덱스 사용)
+    sql = '''
+        SELECT d.detail_id, d.rcm_id, d.control_name, d.control_description
+        FROM ca_rcm_detail d
+        LEFT JOIN ca_control_minhash m ON m.detail_id = d.detail_id
+        WHERE m.detail_id IS NULL
+    '''
+    if rcm_id is None:
+        rows = conn.execute(sql).fetchall()
+    else:
+        rows = conn.execute(sql + ' AND d.rcm_id = ?', (rcm_id,)).fetchall()
+    if not rows:
+        return 0
+
+    signatures = []
+    buckets = []
+    for detail_id, detail_rcm_id, name, description in rows:
+        signature = minhash_signature(control_text(name, description))
+        # 텍스트가 없는 통제도 행을 남겨 다음 인덱싱 대상에서 제외 (버킷은 만들지 않음)
+        signatures.append((detail_id, detail_rcm_id, signature.tobytes() if signature is not None else None))
+        if signature is not None:
+            buckets.extend((band, bucket, detail_id, detail_rcm_id)
+                           for band, bucket in enumerate(band_hashes(signature)))
+    with conn:
+        conn.executemany('INSERT OR REPLACE INTO ca_control_minhash (detail_id, rcm_id, signature) VALUES (?, ?, ?)',
+                         signatures)
+        conn.executemany('''
+            INSERT OR IGNORE INTO ca_control_lsh_bucket (band, bucket_hash, detail_id, rcm_id) VALUES (?, ?, ?, ?)
+        ''', buckets)
+    return len(rows)
+
+
+def similar_controls(conn, detail_id, threshold=None, limit=SIMILAR_LIMIT, rcm_ids=None):
+    """통제와 유사한 다른 통제 목록 (활성 RCM, 유사도 내림차순)
+
+    rcm_ids가 주어지면 해당 RCM의 통제만 반환한다 (권한 범위).
+    반환: [{'detail_id', 'rcm_id', 'rcm_name', 'control_code', 'control_name', 'similarity'}]
+    """
+    threshold = default_threshold() if threshold is None else threshold
+    source = conn.execute('SELECT signature FROM ca_control_minhash WHERE detail_id = ?', (detail_id,)).fetchone()
+    if not source or source[0] is None:
+        return []
+
+    candidates = conn.execute('''
+        SELECT DISTINCT m.detail_id, m.signature
+        FROM ca_control_lsh_bucket b
+        JOIN ca_control_lsh_bucket c ON c.band = b.band AND c.bucket_hash = b.bucket_hash
+        JOIN ca_control_minhash m ON m.detail_id = c.detail_id
+        WHERE b.detail_id = ? AND c.detail_id != ?
+    ''', (detail_id, detail_id)).fetchall()
+    if not candidates:
+        return []
+
+    # 후보 서명을 한 번에 비교 (일치하는 해시 비율 = 추정 Jaccard)
+    matrix = np.frombuffer(b''.join(row[1] for row in candidates), dtype=np.uint64).reshape(-1, NUM_PERM)
+    scores = (matrix == _load_signature(source[0])).mean(axis=1)
+    matched = {candidates[i][0]: float(scores[i]) for i in np.flatnonzero(scores >= threshold)}
+    if not matched:
+        return []
+
+    ids = list(matched)
+    rows = conn.execute(f'''
+        SELECT d.detail_id, d.rcm_id, r.rcm_name, d.control_code, d.control_name
+        FROM ca_rcm_detail d
+        JOIN ca_rcm r ON r.rcm_id = d.rcm_id
+        WHERE d.detail_id IN ({', '.join('?' for _ in ids)}) AND r.is_active = 'Y'
+    ''', ids).fetchall()
+    results = [dict(row, similarity=round(matched[row['detail_id']], 3)) for row in rows
+               if rcm_ids is None or row['rcm_id'] in rcm_ids]
+    results.sort(key=lambda item: (-item['similarity'], item['detail_id']))
+    return results[:limit]
+
+
+def duplicate_clusters(conn, rcm_id, threshold=None):
+    """RCM 안의 유사 중복 통제 묶음 (2개 이상, 큰 묶음 먼저)
+
+    같은 버킷에 들어간 쌍만 서명으로 확인하고 union-find로 묶는다.
+    반환: [{'controls': [{'detail_id', 'control_code', 'control_name'}], 'max_similarity'}]
+    """
+    threshold = default_threshold() if threshold is None else threshold
+    pairs = [tuple(row) for row in conn.execute('''
+        SELECT DISTINCT a.detail_id, c.detail_id
+        FROM ca_control_lsh_bucket a
+        JOIN ca_control_lsh_bucket c
+          ON c.band = a.band AND c.bucket_hash = a.bucket_hash AND c.detail_id > a.detail_id
+        WHERE a.rcm_id = ? AND c.rcm_id = ?
+    ''', (rcm_id, rcm_id))]
+    if not pairs:
+        return []
+
+    signatures = {row[0]: _load_signature(row[1]) for row in conn.execute(
+        'SELECT detail_id, signature FROM ca_control_minhash WHERE rcm_id = ? AND signature IS NOT NULL',
+        (rcm_id,))}
+    left = np.stack([signatures[a] for a, _ in pairs])
+    right = np.stack([signatures[b] for _, b in pairs])
+    scores = (left == right).mean(axis=1)
+
+    parent = {}
+
+    def find(node):
+        parent.setdefault(node, node)
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    best = {}
+    for (a, b), score in zip(pairs, scores):
+        if score < threshold:
+            continue
+        root_a, root_b = find(a), find(b)
+        if root_a != root_b:
+            parent[root_b] = root_a
+        best[(a, b)] = float(score)
+
+    groups = {}
+    for node in parent:
+        groups.setdefault(find(node), []).append(node)
+    if not groups:
+        return []
+
+    members = [node for group in groups.values() for node in group]
+    details = {row['detail_id']: dict(row) for row in conn.execute(f'''
+        SELECT detail_id, control_code, control_name FROM ca_rcm_detail
+        WHERE detail_id IN ({', '.join('?' for _ in members)})
+    ''', members)}
+    max_scores = {}
+    for (a, _), score in best.items():
+        root = find(a)
+        max_scores[root] = max(max_scores.get(root, 0.0), score)
+    clusters = []
+    for root, group in groups.items():
+        group.sort()
+        clusters.append({
+            'controls': [details[node] for node in group if node in details],
+            'max_similarity': round(max_scores[root], 3),
+        })
+    clusters.sort(key=lambda cluster: (-len(cluster['controls']), cluster['controls'][0]['detail_id']))
+    return clusters
+
+
+@click.command('rebuild-dedup-index')
+@click.option('--rcm-id', type=int, default=None, help='특정 RCM만 다시 계산')
+@with_appcontext
+def rebuild_dedup_index_command(rcm_id):
+    """통제 MinHash/LSH 인덱스 재생성"""
+    db = get_db()
+    with db:
+        db.execute('DELETE FROM ca_control_lsh_bucket WHERE ? IS NULL OR rcm_id = ?', (rcm_id, rcm_id))
+        db.execute('DELETE FROM ca_control_minhash WHERE ? IS NULL OR rcm_id = ?', (rcm_id, rcm_id))
+    count = index_rcm_controls(db, rcm_id)
+    click.echo(f'✓ 유사 통제 인덱스: {count}개 통제')
@@ -0,0 +1,75 @@
+"""
+Catcher Conditional GET
+RCM 리비전(ca_rcm_revision) 기반 ETag / Last-Modified 처리
+
+조회 화면과 API는 DB 조회와 템플릿 렌더링 전에 not_modified_response()로
+If-None-Match / If-Modified-Since를 확인해 변경이 없으면 304를 바로 반환한다.
+응답은 사용자별 내용(권한, 본인 세션)을 포함하므로 Cache-Control은 private으로 둔다.
+
+ETag에는 배포 토큰(RELEASE_TOKEN)을 섞어, 템플릿이나 정적 파일이 바뀐 배포 이후에는
+이전 ETag가 일치하지 않도록 한다.
+"""
+
+import hashlib
+import os
+from flask import request, session, current_app
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_CONTROL = 'private, no-cache'
+
+
+def _compute_release_token():
+    """배포 토큰 (CATCHER_RELEASE 또는 templates/static 파일의 최종 수정 시각, 워커 간 동일)"""
+    release = os.environ.get('CATCHER_RELEASE')
+    if release:
+        return release
+    latest = 0
+    for directory in ('templates', 'static'):
+        for root, _, files in os.walk(os.path.join(BASE_DIR, directory)):
+            for name in files:
+                latest = max(latest, os.path.getmtime(os.path.join(root, name)))
+    return str(int(latest))
+
+
+RELEASE_TOKEN = _compute_release_token()
+
+
+def make_etag(*parts):
+    """리소스 식별 값으로 강한 ETag 값 생성 (따옴표 없는 값)"""
+    digest = hashlib.sha1(RELEASE_TOKEN.encode('utf-8'))
+    for part in parts:
+        digest.update(b'\x1f')
+        digest.update(str(part).encode('utf-8'))
+    return digest.hexdigest()[:32]
+
+
+def not_modified_response(etag, last_modified=None):
+    """클라이언트 캐시가 유효하면 304 응답, 아니면 None
+
+    If-None-Match가 있으면 그것만 비교하고(RFC 9110), 없을 때 If-Modified-Since를 본다.
+    표시할 flash 메시지가 남아 있으면 304를 보내지 않는다.
+    """
+    if request.method not in ('GET', 'HEAD') or session.get('_flashes'):
+        return None
+
+    if request.if_none_match:
+        matched = request.if_none_match.contains(etag)
+    elif last_modified and request.if_modified_since:
+        matched = last_modified.replace(microsecond=0) <= request.if_modified_since
+    else:
+        matched = False
+
+    if not matched:
+        return None
+    response = current_app.response_class(status=304)
+    return with_validators(response, etag, last_modified)
+
+
+def with_validators(response, etag, last_modified=None):
+    """응답에 ETag / Last-Modified / Cache-Control 헤더 설정"""
+    response = current_app.make_response(response)
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = CACHE_CONTROL
+    return response
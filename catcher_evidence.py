@@ -0,0 +1,200 @@
+"""
+Catcher Evidence Store
+운영평가 증빙/모집단/표본 파일의 내용 주소 기반 저장소 (ca_evidence_blob, 마이그레이션 20261018_013)
+
+파일은 SHA-256으로 저장 위치가 정해지며(<루트>/ab/cd/<sha256>), 같은 내용은 세션/회사가 달라도 한 번만 저장된다.
+업로드는 1MB 단위로 읽으면서 해시를 계산해 임시 파일에 쓰고, 해시가 나오면 최종 위치로 옮긴다(메모리에 전체를 올리지 않음).
+첨부(ca_evidence_attachment)가 추가/삭제되면 트리거가 blob 참조 수를 증감하고,
+참조 수 0인 blob은 유예 시간이 지난 뒤 gc-evidence 명령으로 파일과 함께 삭제한다.
+다운로드는 send_file(conditional)로 Range 요청과 ETag(SHA-256)를 처리한다.
+
+static/ 아래는 인증 없이 제공되므로 저장소는 static 밖에 둔다.
+
+환경 변수:
+- CATCHER_EVIDENCE_DIR: 저장소 루트 (기본: 앱 폴더/uploads/evidence)
+- CATCHER_EVIDENCE_GC_GRACE_SECONDS: 참조가 없어진 blob 삭제 유예 시간(초) (기본: 3600)
+
+사용법: flask --app catcher gc-evidence
+"""
+
+import hashlib
+import os
+import tempfile
+import time
+import click
+from flask.cli import with_appcontext
+from catcher_auth import get_db
+from catcher_db import env_int
+
+ATTACHMENT_TYPES = ('EVIDENCE', 'POPULATION', 'SAMPLE')
+CHUNK_SIZE = 1 << 20
+
+
+def evidence_root():
+    return os.getenv('CATCHER_EVIDENCE_DIR') or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'uploads', 'evidence')
+
+
+def blob_path(sha256):
+    """SHA-256 → 저장 경로 (앞 2글자/다음 2글자 디렉터리로 분산)"""
+    return os.path.join(evidence_root(), sha256[:2], sha256[2:4], sha256)
+
+
+def _tmp_dir():
+    path = os.path.join(evidence_root(), 'tmp')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def spool_stream(stream):
+    """스트림을 저장소 임시 폴더에 쓰면서 SHA-256 계산, 반환: (임시 파일 경로, sha256, 크기)
+
+    저장 전에 내용을 확인해야 하는 경우(모집단 파일) 임시 파일을 읽은 뒤 publish_spooled 또는 discard_spooled를 호출한다.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=_tmp_dir(), delete=False) as tmp:
+        try:
+            for block in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                digest.update(block)
+                tmp.write(block)
+                size += len(block)
+        except BaseException:
+            discard_spooled(tmp.name)
+            raise
+    return tmp.name, digest.hexdigest(), size
+
+
+def discard_spooled(tmp_path):
+    """저장하지 않을 임시 파일 삭제"""
+    if os.path.exists(tmp_path):
+        os.unlink(tmp_path)
+
+
+def publish_spooled(conn, tmp_path, sha256, size):
+    """임시 파일을 저장소로 옮김 (이미 있는 내용이면 임시 파일 삭제)
+
+    blob 행의 last_referenced를 먼저 갱신한 뒤 파일을 두므로, 같은 blob을 GC가 동시에 지우지 않는다.
+    """
+    try:
+        with conn:
+            conn.execute('''
+                INSERT INTO ca_evidence_blob (sha256, size_bytes) VALUES (?, ?)
+                ON CONFLICT(sha256) DO UPDATE SET last_referenced = CURRENT_TIMESTAMP
+            ''', (sha256, size))
+        path = blob_path(sha256)
+        if os.path.exists(path):
+            os.unlink(tmp_path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            os.replace(tmp_path, path)
+    except BaseException:
+        discard_spooled(tmp_path)
+        raise
+
+
+def store_stream(conn, stream):
+    """스트림을 저장소에 저장 (이미 있는 내용이면 기존 파일 사용), 반환: (sha256, 크기)"""
+    tmp_path, sha256, size = spool_stream(stream)
+    publish_spooled(conn, tmp_path, sha256, size)
+    return sha256, size
+
+
+def attach(conn, line_id, sha256, attachment_type='EVIDENCE', original_filename=None,
+           content_type=None, user_id=None):
+    """운영평가 라인에 blob 첨부 (참조 수는 트리거가 증가, 호출한 쪽 트랜잭션), 반환: attachment_id"""
+    if attachment_type not in ATTACHMENT_TYPES:
+        raise ValueError(f'첨부 유형은 {", ".join(ATTACHMENT_TYPES)} 중 하나여야 합니다.')
+    return conn.execute('''
+        INSERT INTO ca_evidence_attachment
+            (line_id, sha256, attachment_type, original_filename, content_type, uploaded_by)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', (line_id, sha256, attachment_type, original_filename, content_type, user_id)).lastrowid
+
+
+def detach(conn, attachment_id):
+    """첨부 삭제 (blob 파일은 GC가 정리), 반환: 삭제 여부"""
+    with conn:
+        return conn.execute('DELETE FROM ca_evidence_attachment WHERE attachment_id = ?',
+                            (attachment_id,)).rowcount > 0
+
+
+def get_attachment(conn, attachment_id):
+    """첨부 조회 (RCM ID, 평가자 ID, 파일 크기 포함), 없으면 None"""
+    row = conn.execute('''
+        SELECT a.*, b.size_bytes, h.rcm_id, h.user_id AS owner_id, l.control_code
+        FROM ca_evidence_attachment a
+        JOIN ca_evidence_blob b ON b.sha256 = a.sha256
+        JOIN ca_operation_evaluation_line l ON l.line_id = a.line_id
+        JOIN ca_operation_evaluation_header h ON h.header_id = l.header_id
+        WHERE a.attachment_id = ?
+    ''', (attachment_id,)).fetchone()
+    return dict(row) if row else None
+
+
+def list_attachments(conn, line_id):
+    """운영평가 라인의 첨부 목록"""
+    return [dict(row) for row in conn.execute('''
+        SELECT a.attachment_id, a.sha256, a.attachment_type, a.original_filename, a.content_type,
+               a.uploaded_date, b.size_bytes
+        FROM ca_evidence_attachment a
+        JOIN ca_evidence_blob b ON b.sha256 = a.sha256
+        WHERE a.line_id = ?
+        ORDER BY a.attachment_id
+    ''', (line_id,))]
+
+
+def collect_garbage(conn, grace_seconds=None):
+    """참조 수 0이고 유예 시간이 지난 blob과 오래된 임시 파일 삭제
+
+    반환: {'blobs': 삭제한 blob 수, 'bytes': 회수한 크기, 'tmp_files': 삭제한 임시 파일 수}
+    """
+    grace_seconds = env_int('CATCHER_EVIDENCE_GC_GRACE_SECONDS', 3600) if grace_seconds is None else grace_seconds
+    result = {'blobs': 0, 'bytes': 0, 'tmp_files': 0}
+    candidates = conn.execute('''
+        SELECT sha256, size_bytes FROM ca_evidence_blob
+        WHERE ref_count = 0 AND last_referenced <= datetime('now', ?)
+    ''', (f'-{grace_seconds} seconds',)).fetchall()
+
+    for sha256, size in candidates:
+        with conn:
+            deleted = conn.execute('''
+                DELETE FROM ca_evidence_blob
+                WHERE sha256 = ? AND ref_count = 0 AND last_referenced <= datetime('now', ?)
+            ''', (sha256, f'-{grace_seconds} seconds')).rowcount
+        if not deleted:
+            continue
+        path = blob_path(sha256)
+        # 파일을 치운 뒤 그 사이 같은 내용이 다시 업로드되었으면 되돌림
+        trash = os.path.join(_tmp_dir(), f'gc-{sha256}')
+        try:
+            os.replace(path, trash)
+        except FileNotFoundError:
+            continue
+        if conn.execute('SELECT 1 FROM ca_evidence_blob WHERE sha256 = ?', (sha256,)).fetchone():
+            os.replace(trash, path)
+            continue
+        os.unlink(trash)
+        result['blobs'] += 1
+        result['bytes'] += size
+
+    # 업로드 중 중단되어 남은 임시 파일
+    tmp_dir = _tmp_dir()
+    for name in os.listdir(tmp_dir):
+        path = os.path.join(tmp_dir, name)
+        try:
+            if os.path.getmtime(path) <= time.time() - grace_seconds:
+                os.unlink(path)
+                result['tmp_files'] += 1
+        except FileNotFoundError:
+            pass
+    return result
+
+
+@click.command('gc-evidence')
+@click.option('--grace-seconds', type=int, default=None, help='참조가 없어진 뒤 삭제까지 유예 시간(초)')
+@with_appcontext
+def gc_evidence_command(grace_seconds):
+    """참조되지 않는 증빙 파일 정리"""
+    result = collect_garbage(get_db(), grace_seconds)
+    click.echo(f"✓ 증빙 파일 정리: {result['blobs']}개 ({result['bytes']} bytes), 임시 파일 {result['tmp_files']}개")
@@ -0,0 +1,148 @@
+"""
+Catcher Excel
+RCM Excel 파일 스트리밍 읽기 (openpyxl read-only 모드) 및 내보내기 (write-only 모드)
+
+읽기: 워크북 전체를 메모리에 올리지 않고 iter_rows(values_only=True)로 한 번만 순회하며,
+자동 매핑된 컬럼 인덱스를 미리 만든 itemgetter로 투영해 통제 dict를 생성한다.
+
+쓰기: DB 커서를 행 단위로 순회하며 write-only 시트에 append하고, 완성된 파일은
+임시 파일에서 chunk 단위로 응답한다. 행 수와 관계없이 워커 메모리는 일정하다.
+"""
+
+import re
+import tempfile
+from operator import itemgetter
+from flask import send_file
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+
+RCM_SHEET_NAME = 'RCM'
+VALID_CATEGORIES = ('ELC', 'TLC', 'ITGC')
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+# 파일명에 쓸 수 없는 문자
+_FILENAME_UNSAFE_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+
+def _cell_text(value):
+    """셀 값을 저장용 문자열로 변환 (빈 셀은 '')"""
+    return str(value) if value is not None else ''
+
+
+class RcmSheetReader:
+    """RCM 시트 스트리밍 reader
+
+    with RcmSheetReader(path) as reader:
+        mapping = perform_auto_mapping(reader.headers)
+        for control in reader.iter_controls(mapping):
+            ...
+    """
+
+    def __init__(self, path):
+        self.workbook = load_workbook(path, read_only=True, data_only=True)
+        if RCM_SHEET_NAME in self.workbook.sheetnames:
+            self.sheet = self.workbook[RCM_SHEET_NAME]
+        else:
+            self.sheet = self.workbook.active
+
+        self._rows = self.sheet.iter_rows(values_only=True)
+        first_row = next(self._rows, None) or ()
+        self.headers = [value if value else '' for value in first_row]
+        self.rows_read = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """워크북 파일 핸들 닫기 (read-only 모드는 명시적으로 닫아야 함)"""
+        self.workbook.close()
+
+    def _projector(self, indexes):
+        """컬럼 인덱스 튜플 → 행 투영 함수 (짧은 행은 None으로 채움)"""
+        if not indexes:
+            return lambda row: ()
+        width = max(indexes) + 1
+        if len(indexes) == 1:
+            index = indexes[0]
+            getter = lambda row: (row[index],)
+        else:
+            getter = itemgetter(*indexes)
+
+        def project(row):
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            return getter(row)
+        return project
+
+    def iter_rows(self, mapping, category_col_idx=None):
+        """헤더 이후 데이터 행을 (카테고리, 통제 dict)로 생성
+
+        category_col_idx가 주어지면 카테고리 값(대문자)을, 아니면 None을 반환한다.
+        """
+        fields = tuple(mapping.keys())
+        project = self._projector(tuple(mapping.values()))
+
+        for row in self._rows:
+            self.rows_read += 1
+            category = None
+            if category_col_idx is not None:
+                raw = row[category_col_idx] if category_col_idx < len(row) else None
+                category = _cell_text(raw).strip().upper()
+
+            control = dict(zip(fields, map(_cell_text, project(row))))
+            yield category, control
+
+    def iter_controls(self, mapping):
+        """control_code가 있는 통제 dict만 생성 (개별 업로드용)"""
+        for _, control in self.iter_rows(mapping):
+            if control.get('control_code'):
+                yield control
+
+    def iter_categorized_controls(self, mapping, category_col_idx):
+        """(카테고리, 통제 dict) 생성 - 유효하지 않은 카테고리와 control_code 없는 행 제외"""
+        for category, control in self.iter_rows(mapping, category_col_idx):
+            if category not in VALID_CATEGORIES:
+                continue
+            if control.get('control_code'):
+                yield category, control
+
+
+def _export_value(value):
+    """셀 값 변환 (Excel이 허용하지 않는 제어 문자 제거)"""
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub('', value)
+    return value
+
+
+def write_xlsx(fileobj, sheets):
+    """write-only 워크북 작성
+
+    sheets: (시트명, [(컬럼, 헤더), ...], 행 iterable) 목록
+    행은 sqlite3.Row 또는 dict처럼 컬럼명으로 조회할 수 있어야 한다.
+    """
+    workbook = Workbook(write_only=True)
+    for title, columns, rows in sheets:
+        sheet = workbook.create_sheet(title)
+        sheet.append([label for _, label in columns])
+        keys = [column for column, _ in columns]
+        for row in rows:
+            sheet.append([_export_value(row[key]) for key in keys])
+    workbook.save(fileobj)
+
+
+def send_xlsx(sheets, filename):
+    """워크북을 임시 파일에 작성한 뒤 첨부 파일로 스트리밍 응답
+
+    임시 파일은 이름 없이 생성되어 응답이 끝나 파일이 닫히면 삭제된다.
+    """
+    fileobj = tempfile.TemporaryFile()
+    try:
+        write_xlsx(fileobj, sheets)
+        fileobj.seek(0)
+    except Exception:
+        fileobj.close()
+        raise
+    return send_file(fileobj, mimetype=XLSX_MIMETYPE, as_attachment=True,
+                     download_name=_FILENAME_UNSAFE_RE.sub('_', filename))
@@ -0,0 +1,182 @@
+"""
+Catcher Instrumentation
+요청별 처리 시간, DB 쿼리 수/시간, 느린 쿼리 로그, Server-Timing 헤더
+
+CATCHER_INSTRUMENTATION=1 일 때만 켜진다. 켜지면 연결 풀이 sqlite3.Connection 대신
+InstrumentedConnection으로 연결을 만들어 execute/executemany 시간을 잰다.
+꺼져 있으면 연결 클래스와 요청 훅이 등록되지 않으므로 추가 비용이 없다.
+
+시간은 execute 호출 구간만 측정하므로, 커서를 순회하며 행을 가져오는 시간은 포함되지 않는다.
+
+환경 변수:
+- CATCHER_INSTRUMENTATION: 1이면 사용 (기본: 0)
+- CATCHER_SLOW_QUERY_MS: 느린 쿼리 기준(ms) (기본: 200)
+- CATCHER_SLOW_QUERY_LOG: 느린 쿼리 로그 파일 경로 (기본: 로거 설정을 따름)
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from flask import g, request
+import catcher_db
+from catcher_db import env_int
+
+SLOW_QUERY_MS = env_int('CATCHER_SLOW_QUERY_MS', 200)
+
+slow_query_logger = logging.getLogger('catcher.slow_query')
+
+_local = threading.local()
+_endpoint_stats = {}
+_endpoint_lock = threading.Lock()
+
+# SQL 리터럴 마스킹 (문자열, 숫자)
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def is_enabled():
+    return env_int('CATCHER_INSTRUMENTATION', 0) == 1
+
+
+def redact_sql(sql):
+    """로그용 SQL (리터럴을 ?로 바꾸고 공백 정리)"""
+    sql = _STRING_LITERAL_RE.sub('?', sql)
+    sql = _NUMBER_LITERAL_RE.sub('?', sql)
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def _record_query(sql, elapsed, param_count):
+    """쿼리 1건 기록 (현재 요청 통계, 느린 쿼리 로그)"""
+    stats = getattr(_local, 'stats', None)
+    if stats is not None:
+        stats['queries'] += 1
+        stats['query_time'] += elapsed
+
+    elapsed_ms = elapsed * 1000
+    if elapsed_ms >= SLOW_QUERY_MS:
+        endpoint = stats['endpoint'] if stats is not None else '-'
+        slow_query_logger.warning('slow query %.1fms endpoint=%s params=%d sql=%s',
+                                  elapsed_ms, endpoint, param_count, redact_sql(sql))
+
+
+def _param_count(parameters):
+    try:
+        return len(parameters)
+    except TypeError:
+        return 0
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """execute 시간을 기록하는 커서"""
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - started, _param_count(parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - started, 0)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """execute 시간을 기록하는 연결 (연결 풀의 connection factory)"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - started, _param_count(parameters))
+
+    def executemany(self, sql, seq_of_parameters):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_query(sql, time.perf_counter() - started, 0)
+
+
+def get_endpoint_stats():
+    """엔드포인트별 누적 통계 복사본
+
+    반환: {endpoint: {'requests', 'total_ms', 'max_ms', 'queries', 'query_ms'}}
+    """
+    with _endpoint_lock:
+        return {endpoint: dict(stats) for endpoint, stats in _endpoint_stats.items()}
+
+
+def reset_endpoint_stats():
+    with _endpoint_lock:
+        _endpoint_stats.clear()
+
+
+def _start_request():
+    _local.stats = {
+        'endpoint': request.endpoint or 'unknown',
+        'started': time.perf_counter(),
+        'queries': 0,
+        'query_time': 0.0,
+    }
+
+
+def _finish_request(response):
+    stats = getattr(_local, 'stats', None)
+    if stats is None:
+        return response
+    total_ms = (time.perf_counter() - stats['started']) * 1000
+    query_ms = stats['query_time'] * 1000
+
+    response.headers['Server-Timing'] = (
+        f'db;desc="{stats["queries"]} queries";dur={query_ms:.1f}, total;dur={total_ms:.1f}'
+    )
+
+    with _endpoint_lock:
+        endpoint = _endpoint_stats.setdefault(stats['endpoint'], {
+            'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'query_ms': 0.0
+        })
+        endpoint['requests'] += 1
+        endpoint['total_ms'] += total_ms
+        endpoint['max_ms'] = max(endpoint['max_ms'], total_ms)
+        endpoint['queries'] += stats['queries']
+        endpoint['query_ms'] += query_ms
+    g.request_stats = dict(stats, total_ms=total_ms)
+    return response
+
+
+def _clear_request(error=None):
+    _local.stats = None
+
+
+def init_instrumentation(app, enabled=None):
+    """계측 사용 시 연결 factory 교체 및 요청 훅 등록, 사용 여부 반환"""
+    if enabled is None:
+        enabled = is_enabled()
+    if not enabled:
+        return False
+
+    catcher_db.connection_factory = InstrumentedConnection
+    catcher_db.close_pools()  # 이미 만든 일반 연결은 버리고 계측 연결로 다시 생성
+
+    log_path = app.config.get('SLOW_QUERY_LOG') or os.getenv('CATCHER_SLOW_QUERY_LOG')
+    if log_path and not slow_query_logger.handlers:
+        handler = logging.FileHandler(log_path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+        slow_query_logger.addHandler(handler)
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_clear_request)
+    return True
@@ -0,0 +1,229 @@
+"""
+Catcher Upload Jobs
+RCM 업로드 백그라운드 작업 (작업 테이블 + 워커 스레드 풀)
+
+POST 요청은 파일을 저장하고 ca_rcm_upload_job에 작업을 등록한 뒤 바로 반환하며,
+워커가 앱 컨텍스트 안에서 파싱/저장/권한 부여를 수행하면서 진행 상황을 기록한다.
+작업이 실패하면 작업이 만든 RCM(일부만 저장된 RCM)을 비활성화한다.
+작업을 큐에 넣은 프로세스(호스트, pid)를 기록하며, 앱/워커 시작 시 그 프로세스가 없어진
+PENDING/RUNNING 작업(재시작으로 중단된 작업)을 FAILED로 표시한다 (fail_orphaned_upload_jobs).
+
+환경 변수:
+- CATCHER_UPLOAD_WORKERS: 업로드 워커 스레드 수 (기본: 2)
+- CATCHER_UPLOAD_DIR: 작업 대기 중인 업로드 파일 저장 경로 (기본: 시스템 임시 폴더)
+"""
+
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from catcher_auth import bump_rcm_revision, get_db, invalidate_user_authorization
+from catcher_db import env_int
+from catcher_metrics import REGISTRY
+
+UPLOAD_JOB_DURATION = REGISTRY.histogram(
+    'catcher_upload_job_duration_seconds', '업로드 작업 처리 시간(초)', ('mode', 'status'),
+    buckets=(1, 5, 15, 30, 60, 120, 300, 600, 1800))
+UPLOAD_ROWS = REGISTRY.counter(
+    'catcher_upload_rows_total', '업로드 작업에서 저장한 통제 행 수 (처리량은 작업 시간과 함께 계산)', ('mode',))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """업로드 워커 스레드 풀 반환 (fork된 워커에서는 새로 생성)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None or _executor._pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=env_int('CATCHER_UPLOAD_WORKERS', 2),
+                                           thread_name_prefix='catcher-upload')
+            _executor._pid = os.getpid()
+    return _executor
+
+
+def _upload_dir():
+    path = os.getenv('CATCHER_UPLOAD_DIR') or tempfile.gettempdir()
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def enqueue_upload_job(file, user_info, target_user_id, rcm_name, upload_mode,
+                       control_category, description):
+    """업로드 파일 저장 후 작업 등록 및 워커에 제출, job_id 반환"""
+    job_id = uuid.uuid4().hex
+    file_path = os.path.join(_upload_dir(), f'rcm_upload_{job_id}.xlsx')
+    file.save(file_path)
+
+    db = get_db()
+    db.execute('''
+        INSERT INTO ca_rcm_upload_job (
+            job_id, user_id, target_user_id, rcm_name, upload_mode,
+            control_category, description, original_filename, file_path, worker_host, worker_pid
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (job_id, user_info['user_id'], target_user_id, rcm_name, upload_mode,
+          control_category or None, description, file.filename, file_path,
+          socket.gethostname(), os.getpid()))
+    db.commit()
+
+    app = current_app._get_current_object()
+    get_executor().submit(run_upload_job, app, job_id, dict(user_info))
+    return job_id
+
+
+def get_upload_job(job_id):
+    """업로드 작업 조회 (JSON 컬럼은 dict로 변환)"""
+    db = get_db()
+    job = db.execute('SELECT * FROM ca_rcm_upload_job WHERE job_id = ?', (job_id,)).fetchone()
+    if not job:
+        return None
+    job = dict(job)
+    job['category_counts'] = json.loads(job['category_counts'] or '{}')
+    job['rcm_ids'] = json.loads(job['rcm_ids'] or '{}')
+    return job
+
+
+def _update_job(db, job_id, **fields):
+    """작업 상태 갱신 (즉시 커밋하여 상태 API에서 보이도록)"""
+    assignments = ', '.join(f'{name} = ?' for name in fields)
+    db.execute(f'UPDATE ca_rcm_upload_job SET {assignments} WHERE job_id = ?',
+               (*fields.values(), job_id))
+    db.commit()
+
+
+def _deactivate_rcms(db, rcm_ids):
+    """실패한 작업이 만든 RCM 비활성화 (RCM 삭제와 같은 처리, 호출한 쪽 트랜잭션)"""
+    for rcm_id in set(rcm_ids):
+        db.execute("UPDATE ca_rcm SET is_active = 'N' WHERE rcm_id = ?", (rcm_id,))
+        bump_rcm_revision(db, rcm_id)
+
+
+def _job_rcm_ids(db, job_id):
+    row = db.execute('SELECT rcm_ids FROM ca_rcm_upload_job WHERE job_id = ?', (job_id,)).fetchone()
+    return [rcm_id for rcm_id in json.loads(row[0] or '{}').values() if rcm_id] if row else []
+
+
+def _process_alive(pid):
+    if pid is None:
+        return False
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def fail_orphaned_upload_jobs(conn):
+    """처리하던 프로세스가 없어진 PENDING/RUNNING 작업을 FAILED로 표시하고 만든 RCM 비활성화
+
+    다른 호스트의 작업은 건드리지 않는다. 반환: 정리한 작업 수
+    """
+    host = socket.gethostname()
+    orphans = [
+        (job_id, file_path) for job_id, file_path, worker_host, worker_pid in conn.execute('''
+            SELECT job_id, file_path, worker_host, worker_pid FROM ca_rcm_upload_job
+            WHERE status IN ('PENDING', 'RUNNING')
+        ''').fetchall()
+        if worker_host in (None, host) and not _process_alive(worker_pid)
+    ]
+    if not orphans:
+        return 0
+    with conn:
+        for job_id, _ in orphans:
+            _deactivate_rcms(conn, _job_rcm_ids(conn, job_id))
+            conn.execute('''
+                UPDATE ca_rcm_upload_job
+                SET status = 'FAILED', error_message = ?, completed_date = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            ''', ('서버 재시작으로 작업이 중단되었습니다. 다시 업로드해 주세요.', job_id))
+    for _, file_path in orphans:
+        if file_path and os.path.exists(file_path):
+            os.unlink(file_path)
+    invalidate_user_authorization()
+    return len(orphans)
+
+
+def run_upload_job(app, job_id, user_info):
+    """워커 스레드에서 업로드 작업 실행"""
+    from catcher_auth import create_rcm, log_user_activity
+    from catcher_link1 import ingest_rcm_workbook
+
+    started = time.perf_counter()
+    status = 'FAILED'
+    with app.app_context():
+        db = get_db()
+        job = dict(db.execute('SELECT * FROM ca_rcm_upload_job WHERE job_id = ?', (job_id,)).fetchone())
+        db.execute('''
+            UPDATE ca_rcm_upload_job SET status = 'RUNNING', started_date = CURRENT_TIMESTAMP
+            WHERE job_id = ?
+        ''', (job_id,))
+        db.commit()
+
+        def on_progress(progress):
+            _update_job(db, job_id,
+                        rows_parsed=progress['rows_parsed'],
+                        rows_written=progress['rows_written'],
+                        category_counts=json.dumps(progress['category_counts']),
+                        rcm_ids=json.dumps(progress['rcm_ids']))
+
+        try:
+            rcm_id = None
+            if job['upload_mode'] == 'individual':
+                rcm_id = create_rcm(job['rcm_name'], job['control_category'], job['description'],
+                                    job['target_user_id'], job['original_filename'])
+                _update_job(db, job_id, rcm_ids=json.dumps({job['control_category']: rcm_id}))
+
+            result = ingest_rcm_workbook(
+                job['file_path'], job['upload_mode'], job['rcm_name'], job['control_category'],
+                job['description'], job['target_user_id'], job['original_filename'],
+                job['user_id'], rcm_id=rcm_id, on_progress=on_progress
+            )
+
+            on_progress(result)
+            db.execute('''
+                UPDATE ca_rcm_upload_job SET status = 'COMPLETED', completed_date = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            ''', (job_id,))
+            db.commit()
+            status = 'COMPLETED'
+
+        except Exception as e:
+            status = 'FAILED'
+            traceback.print_exc()
+            db.rollback()
+            _deactivate_rcms(db, _job_rcm_ids(db, job_id))
+            db.execute('''
+                UPDATE ca_rcm_upload_job
+                SET status = 'FAILED', error_message = ?, completed_date = CURRENT_TIMESTAMP
+                WHERE job_id = ?
+            ''', (str(e), job_id))
+            db.commit()
+            invalidate_user_authorization()
+
+        else:
+            # 작업은 이미 COMPLETED로 기록되었으므로 이후 단계가 실패해도 RCM을 비활성화하지 않는다
+            try:
+                UPLOAD_ROWS.inc(result['rows_written'], mode=job['upload_mode'])
+                log_user_activity(user_info, 'RCM_UPLOAD_COMPLETE',
+                                f"RCM 업로드 완료 - {job['rcm_name']}",
+                                '/rcm/process_upload', None, None,
+                                {'job_id': job_id, 'mode': job['upload_mode'],
+                                 'rcm_ids': result['rcm_ids'],
+                                 'total_controls': sum(result['category_counts'].values())})
+            except Exception:
+                traceback.print_exc()
+
+        finally:
+            UPLOAD_JOB_DURATION.observe(time.perf_counter() - started, mode=job['upload_mode'], status=status)
+            if os.path.exists(job['file_path']):
+                os.unlink(job['file_path'])
@@ -1,17 +1,41 @@
 """
 Catcher Link 1: RCM 관리
 ELC/TLC/ITGC RCM 등록, 업로드, 조회, 삭제
+
+환경 변수:
+- CATCHER_MAPPING_ON_UPLOAD: 1이면 업로드 저장 후 표준 통제 자동 매핑 실행 (동기/백그라운드 공통, 기본: 1)
 """
 
+import traceback
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session
 from catcher_auth import (
     login_required, admin_required, get_current_user, get_user_rcms,
-    has_rcm_access, get_rcm_details, get_rcm_info, create_rcm,
-    save_rcm_details, grant_rcm_access, log_user_activity, get_db
+    has_rcm_access, get_rcm_info, create_rcm,
+    save_rcm_details, refresh_rcm_derived_data, grant_rcm_access, log_user_activity, get_db,
+    invalidate_user_authorization, get_rcm_details_page, count_rcm_details,
+    get_rcm_revision, bump_rcm_revision, get_user_authorization,
+    get_rcm_detail_filter_options, RCM_DETAIL_FILTER_COLUMNS,
+    RCM_DETAIL_PAGE_SIZE, RCM_DETAIL_MAX_PAGE_SIZE
 )
+from catcher_db import env_int
+from catcher_excel import RcmSheetReader, send_xlsx, RCM_SHEET_NAME
+from catcher_jobs import enqueue_upload_job, get_upload_job
+from catcher_etag import make_etag, not_modified_response, with_validators
+from catcher_search import search_rcm_controls, SEARCH_MIN_TERM_LENGTH, SEARCH_PAGE_SIZE, SEARCH_MAX_PAGE_SIZE
+from catcher_completeness import get_completeness_scores, stale_rcm_ids
+from catcher_dedup import similar_controls, duplicate_clusters
 
 bp_link1 = Blueprint('rcm', __name__, url_prefix='/rcm')
 
+# Excel 내보내기 컬럼 (헤더는 업로드 자동 매핑으로 다시 읽을 수 있는 이름)
+RCM_EXPORT_COLUMNS = (
+    ('control_code', '통제코드'), ('control_name', '통제명'), ('control_description', '통제설명'),
+    ('key_control', '핵심통제'), ('control_frequency', '통제빈도'), ('control_type', '통제유형'),
+    ('control_nature', '통제성격'), ('process_area', '프로세스'), ('risk_description', '위험설명'),
+    ('population', '모집단'), ('population_completeness_check', '완전성점검'),
+    ('population_count', '모집단수'), ('test_procedure', '테스트절차')
+)
+
 def get_user_info():
     """현재 로그인한 사용자 정보 반환"""
     return get_current_user()
@@ -92,25 +116,72 @@ def rcm_view(rcm_id):
         flash('해당 RCM에 대한 접근 권한이 없습니다.')
         return redirect(url_for('rcm.rcm_list'))
 
+    # 리비전이 그대로면 조회/렌더링 없이 304
+    revision = get_rcm_revision(rcm_id)
+    etag = make_etag('rcm_view', rcm_id, revision['revision'], user_info['user_id'])
+    not_modified = not_modified_response(etag, revision['last_modified'])
+    if not_modified:
+        log_user_activity(user_info, 'RCM_VIEW', f'RCM 상세 조회 - RCM ID: {rcm_id}',
+                         f'/rcm/{rcm_id}/view', request.remote_addr,
+                         request.headers.get('User-Agent'),
+                         {'rcm_id': rcm_id, 'not_modified': True})
+        return not_modified
+
     # RCM 기본 정보
     rcm_info = get_rcm_info(rcm_id)
     if not rcm_info:
         flash('RCM을 찾을 수 없습니다.')
         return redirect(url_for('rcm.rcm_list'))
 
-    # RCM 상세 데이터 (통제 목록)
-    rcm_details = get_rcm_details(rcm_id)
+    # RCM 상세 데이터 (첫 페이지만 렌더링, 나머지는 통제 목록 API로 추가 로드)
+    control_count = count_rcm_details(rcm_id)
+    first_page = get_rcm_details_page(rcm_id, limit=RCM_DETAIL_PAGE_SIZE)
 
     log_user_activity(user_info, 'RCM_VIEW', f'RCM 상세 조회 - {rcm_info["rcm_name"]}',
                      f'/rcm/{rcm_id}/view', request.remote_addr,
                      request.headers.get('User-Agent'),
-                     {'rcm_id': rcm_id, 'control_count': len(rcm_details)})
+                     {'rcm_id': rcm_id, 'control_count': control_count})
+
+    return with_validators(render_template('rcm/rcm_view.html',
+                                           rcm_info=rcm_info,
+                                           rcm_details=first_page['controls'],
+                                           next_cursor=first_page['next_cursor'],
+                                           control_count=control_count,
+                                           filter_options=get_rcm_detail_filter_options(rcm_id),
+                                           is_logged_in=is_logged_in(),
+                                           user_info=user_info),
+                           etag, revision['last_modified'])
+
+# RCM Excel 내보내기
+@bp_link1.route('/<int:rcm_id>/export')
+@login_required
+def rcm_export(rcm_id):
+    """RCM 통제 목록 Excel 다운로드 (write-only 스트리밍)"""
+    user_info = get_user_info()
 
-    return render_template('rcm/rcm_view.html',
-                         rcm_info=rcm_info,
-                         rcm_details=rcm_details,
-                         is_logged_in=is_logged_in(),
-                         user_info=user_info)
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        flash('해당 RCM에 대한 접근 권한이 없습니다.')
+        return redirect(url_for('rcm.rcm_list'))
+
+    rcm_info = get_rcm_info(rcm_id)
+    if not rcm_info:
+        flash('RCM을 찾을 수 없습니다.')
+        return redirect(url_for('rcm.rcm_list'))
+
+    rows = get_db().execute(f'''
+        SELECT {', '.join(column for column, _ in RCM_EXPORT_COLUMNS)}
+        FROM ca_rcm_detail
+        WHERE rcm_id = ?
+        ORDER BY control_code
+    ''', (rcm_id,))
+
+    log_user_activity(user_info, 'RCM_EXPORT', f'RCM Excel 내보내기 - {rcm_info["rcm_name"]}',
+                     f'/rcm/{rcm_id}/export', request.remote_addr,
+                     request.headers.get('User-Agent'),
+                     {'rcm_id': rcm_id})
+
+    return send_xlsx([(RCM_SHEET_NAME, RCM_EXPORT_COLUMNS, rows)],
+                     f'{rcm_info["rcm_name"]}.xlsx')
 
 # RCM 업로드 페이지
 @bp_link1.route('/upload')
@@ -175,6 +246,26 @@ def rcm_process_upload():
         if not file.filename.lower().endswith(('.xlsx', '.xls')):
             return jsonify({'success': False, 'message': 'Excel 파일(.xlsx, .xls)만 업로드 가능합니다.'})
 
+        # 백그라운드 작업 모드: 파일만 저장하고 즉시 job_id 반환 (진행 상황은 상태 API로 조회)
+        if request.form.get('async_mode') == '1':
+            job_id = enqueue_upload_job(
+                file, user_info, target_user_id, rcm_name, upload_mode,
+                control_category, description
+            )
+
+            log_user_activity(user_info, 'RCM_UPLOAD_QUEUED',
+                            f'RCM 업로드 작업 등록 - {rcm_name}',
+                            '/rcm/process_upload', request.remote_addr,
+                            request.headers.get('User-Agent'),
+                            {'job_id': job_id, 'mode': upload_mode})
+
+            return jsonify({
+                'success': True,
+                'message': 'RCM 업로드 작업이 등록되었습니다.',
+                'job_id': job_id,
+                'status_url': url_for('rcm.rcm_upload_status_api', job_id=job_id)
+            })
+
         # RCM 생성 (개별 업로드 모드에서만)
         if upload_mode == 'individual':
             rcm_id = create_rcm(rcm_name, control_category, description, target_user_id, file.filename)
@@ -182,9 +273,7 @@ def rcm_process_upload():
             rcm_id = None  # 통합 모드에서는 나중에 카테고리별로 생성
 
         # Excel 파일 읽기
-        from openpyxl import load_workbook
         import tempfile
-        import json
         import os
 
         # 임시 파일로 저장
@@ -193,75 +282,19 @@ def rcm_process_upload():
         temp_file.close()
 
         try:
-            # Excel 파일 읽기
-            workbook = load_workbook(temp_file.name)
-
-            # RCM 시트 선택
-            if 'RCM' in workbook.sheetnames:
-                sheet = workbook['RCM']
-            else:
-                sheet = workbook.active
-
-            # 헤더 추출
-            headers = []
-            for cell in sheet[1]:
-                headers.append(cell.value if cell.value else '')
-
-            # 샘플 데이터 추출 (최대 5행)
-            sample_data = []
-            max_sample_rows = min(6, sheet.max_row)
-            for row_num in range(2, max_sample_rows + 1):
-                row_data = []
-                for col_num in range(1, len(headers) + 1):
-                    cell_value = sheet.cell(row=row_num, column=col_num).value
-                    row_data.append(str(cell_value) if cell_value is not None else '')
-                sample_data.append(row_data)
-
-            # 자동 매핑 수행
-            auto_mapping = perform_auto_mapping(headers)
+            # Excel 파일 스트리밍 읽기 및 저장
+            try:
+                result = ingest_rcm_workbook(
+                    temp_file.name, upload_mode, rcm_name, control_category, description,
+                    target_user_id, file.filename, user_info['user_id'], rcm_id=rcm_id
+                )
+            except ValueError as e:
+                return jsonify({'success': False, 'message': str(e)})
+
+            rcm_ids = result['rcm_ids']
+            total_controls = sum(result['category_counts'].values())
 
             if upload_mode == 'integrated':
-                # 통합 업로드 모드: 카테고리 컬럼 찾기
-                category_col_idx = find_category_column(headers)
-                if category_col_idx is None:
-                    return jsonify({
-                        'success': False,
-                        'message': '통합 업로드 모드에서는 "카테고리" 또는 "category" 컬럼이 필요합니다.'
-                    })
-
-                # 카테고리별로 RCM 생성 및 데이터 저장
-                categories_data = {'ELC': [], 'TLC': [], 'ITGC': []}
-                rcm_ids = {}
-
-                # 데이터를 카테고리별로 분류
-                for row_num in range(2, sheet.max_row + 1):
-                    category_value = str(sheet.cell(row=row_num, column=category_col_idx + 1).value or '').strip().upper()
-
-                    if category_value not in ['ELC', 'TLC', 'ITGC']:
-                        continue  # 잘못된 카테고리는 건너뛰기
-
-                    control = {}
-                    for db_field, col_idx in auto_mapping.items():
-                        cell_value = sheet.cell(row=row_num, column=col_idx + 1).value
-                        control[db_field] = str(cell_value) if cell_value is not None else ''
-
-                    if control.get('control_code'):
-                        categories_data[category_value].append(control)
-
-                # 각 카테고리별로 RCM 생성
-                total_controls = 0
-                for category, controls in categories_data.items():
-                    if controls:  # 해당 카테고리에 데이터가 있는 경우만
-                        category_rcm_name = f"{rcm_name} - {category}"
-                        category_rcm_id = create_rcm(category_rcm_name, category, description,
-                                                    target_user_id, file.filename)
-                        rcm_ids[category] = category_rcm_id
-
-                        # 데이터 저장
-                        save_rcm_details(category_rcm_id, controls)
-                        grant_rcm_access(target_user_id, category_rcm_id, user_info['user_id'], 'READ')
-                        total_controls += len(controls)
-
                 log_user_activity(user_info, 'RCM_UPLOAD_COMPLETE',
                                 f'RCM 통합 업로드 완료 - {rcm_name}',
                                 '/rcm/process_upload', request.remote_addr,
@@ -277,36 +310,17 @@ def rcm_process_upload():
                     'controls_count': total_controls
                 })
             else:
-                # 개별 업로드 모드 (기존 로직)
-                controls_data = []
-                for row_num in range(2, sheet.max_row + 1):
-                    control = {}
-                    for db_field, col_idx in auto_mapping.items():
-                        cell_value = sheet.cell(row=row_num, column=col_idx + 1).value
-                        control[db_field] = str(cell_value) if cell_value is not None else ''
-
-                    # 필수 필드 확인
-                    if control.get('control_code'):
-                        controls_data.append(control)
-
-                # RCM 상세 데이터 저장
-                if controls_data:
-                    save_rcm_details(rcm_id, controls_data)
-
-                # 사용자에게 RCM 접근 권한 부여
-                grant_rcm_access(target_user_id, rcm_id, user_info['user_id'], 'READ')
-
                 log_user_activity(user_info, 'RCM_UPLOAD_COMPLETE',
                                 f'RCM 업로드 완료 - {rcm_name} ({control_category})',
                                 '/rcm/process_upload', request.remote_addr,
                                 request.headers.get('User-Agent'),
-                                {'rcm_id': rcm_id, 'category': control_category, 'controls_count': len(controls_data)})
+                                {'rcm_id': rcm_id, 'category': control_category, 'controls_count': total_controls})
 
                 return jsonify({
                     'success': True,
-                    'message': f'RCM이 성공적으로 업로드되었습니다. (통제 수: {len(controls_data)})',
+                    'message': f'RCM이 성공적으로 업로드되었습니다. (통제 수: {total_controls})',
                     'rcm_id': rcm_id,
-                    'controls_count': len(controls_data)
+                    'controls_count': total_controls
                 })
 
         finally:
@@ -318,6 +332,32 @@ def rcm_process_upload():
         traceback.print_exc()
         return jsonify({'success': False, 'message': f'업로드 중 오류가 발생했습니다: {str(e)}'}), 500
 
+# RCM 업로드 작업 상태 조회 API
+@bp_link1.route('/api/upload/<job_id>/status')
+@admin_required
+def rcm_upload_status_api(job_id):
+    """RCM 업로드 작업 진행 상황 조회 API"""
+    job = get_upload_job(job_id)
+    if not job:
+        return jsonify({'success': False, 'message': '업로드 작업을 찾을 수 없습니다.'}), 404
+
+    return jsonify({
+        'success': True,
+        'job_id': job['job_id'],
+        'status': job['status'],
+        'rcm_name': job['rcm_name'],
+        'upload_mode': job['upload_mode'],
+        'rows_parsed': job['rows_parsed'],
+        'rows_written': job['rows_written'],
+        'category_counts': job['category_counts'],
+        'rcm_ids': job['rcm_ids'],
+        'controls_count': sum(job['category_counts'].values()),
+        'error_message': job['error_message'],
+        'created_date': job['created_date'],
+        'started_date': job['started_date'],
+        'completed_date': job['completed_date']
+    })
+
 def find_category_column(headers):
     """카테고리 컬럼 찾기 (통합 업로드용)"""
     category_keywords = ['카테고리', 'category', '구분', 'type', 'class']
@@ -328,6 +368,92 @@ def find_category_column(headers):
             return idx
     return None
 
+def ingest_rcm_workbook(path, upload_mode, rcm_name, control_category, description,
+                        target_user_id, original_filename, granted_by, rcm_id=None,
+                        on_progress=None, chunk_size=500):
+    """RCM Excel 파일을 스트리밍으로 읽어 저장 (동기 업로드와 백그라운드 작업 공용)
+
+    개별 모드는 rcm_id(미리 생성된 RCM)에 저장하고, 통합 모드는 카테고리별 첫 통제가
+    나올 때 "RCM명 - 카테고리" RCM을 생성한다. RCM을 생성하거나 chunk를 저장할 때마다
+    on_progress(진행 dict) 호출 (작업이 만든 RCM이 바로 기록되도록).
+    완전성 점수 등 파생 데이터는 chunk마다가 아니라 모든 행을 저장한 뒤 RCM별로 한 번 갱신하며,
+    그 전에 표준 통제 자동 매핑을 실행한다 (CATCHER_MAPPING_ON_UPLOAD).
+    통합 모드에서 카테고리 컬럼이 없으면 ValueError.
+    반환: {'rcm_ids', 'category_counts', 'rows_parsed', 'rows_written'}
+    """
+    with RcmSheetReader(path) as reader:
+        auto_mapping = perform_auto_mapping(reader.headers)
+
+        if upload_mode == 'integrated':
+            category_col_idx = find_category_column(reader.headers)
+            if category_col_idx is None:
+                raise ValueError('통합 업로드 모드에서는 "카테고리" 또는 "category" 컬럼이 필요합니다.')
+            controls = reader.iter_categorized_controls(auto_mapping, category_col_idx)
+            rcm_ids = {}
+        else:
+            controls = ((control_category, control) for control in reader.iter_controls(auto_mapping))
+            rcm_ids = {control_category: rcm_id}
+
+        progress = {
+            'rcm_ids': rcm_ids,
+            'category_counts': {category: 0 for category in rcm_ids},
+            'rows_parsed': 0,
+            'rows_written': 0,
+        }
+        buffers = {}
+        saved = {}  # 카테고리별 저장 건수 합계
+
+        def flush(category):
+            counts = save_rcm_details(rcm_ids[category], buffers.pop(category), refresh=False)
+            total = saved.setdefault(category, dict.fromkeys(counts, 0))
+            for key, value in counts.items():
+                total[key] += value
+            progress['category_counts'][category] += counts['inserted'] + counts['updated'] + counts['unchanged']
+            progress['rows_written'] += counts['inserted'] + counts['updated']
+            progress['rows_parsed'] = reader.rows_read
+            if on_progress:
+                on_progress(progress)
+
+        for category, control in controls:
+            if category not in rcm_ids:
+                rcm_ids[category] = create_rcm(f"{rcm_name} - {category}", category, description,
+                                               target_user_id, original_filename)
+                progress['category_counts'][category] = 0
+                if on_progress:
+                    on_progress(progress)
+            buffers.setdefault(category, []).append(control)
+            if len(buffers[category]) >= chunk_size:
+                flush(category)
+
+        for category in list(buffers):
+            flush(category)
+        progress['rows_parsed'] = reader.rows_read
+
+    map_uploaded_controls(get_db(), rcm_ids.values())
+    for category, counts in saved.items():
+        refresh_rcm_derived_data(rcm_ids[category], counts)
+
+    # 사용자에게 RCM 접근 권한 부여
+    for category_rcm_id in rcm_ids.values():
+        grant_rcm_access(target_user_id, category_rcm_id, granted_by, 'READ')
+
+    return progress
+
+def map_uploaded_controls(db, rcm_ids):
+    """업로드된 RCM 표준 통제 자동 매핑 후 완전성 재계산 (실패해도 업로드 결과는 유지)"""
+    if env_int('CATCHER_MAPPING_ON_UPLOAD', 1) != 1:
+        return
+    try:
+        from catcher_completeness import refresh_completeness
+        from catcher_mapping import map_rcm_controls
+        rcm_ids = list(rcm_ids)
+        for rcm_id in rcm_ids:
+            map_rcm_controls(db, rcm_id)
+        refresh_completeness(db, rcm_ids)  # 매핑률 반영
+    except Exception:
+        traceback.print_exc()
+        db.rollback()
+
 def perform_auto_mapping(headers):
     """Excel 헤더 자동 매핑"""
     mapping = {}
@@ -373,7 +499,9 @@ def rcm_delete(rcm_id):
     try:
         db = get_db()
         db.execute('UPDATE ca_rcm SET is_active = ? WHERE rcm_id = ?', ('N', rcm_id))
+        bump_rcm_revision(db, rcm_id)
         db.commit()
+        invalidate_user_authorization()
 
         log_user_activity(user_info, 'RCM_DELETE',
                         f'RCM 삭제 - RCM ID: {rcm_id}',
@@ -401,18 +529,154 @@ def rcm_status_api(rcm_id):
     if not has_rcm_access(user_info['user_id'], rcm_id):
         return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
 
+    revision = get_rcm_revision(rcm_id)
+    etag = make_etag('rcm_status', rcm_id, revision['revision'])
+    not_modified = not_modified_response(etag, revision['last_modified'])
+    if not_modified:
+        return not_modified
+
     rcm_info = get_rcm_info(rcm_id)
     if not rcm_info:
         return jsonify({'success': False, 'message': 'RCM을 찾을 수 없습니다.'}), 404
 
-    rcm_details = get_rcm_details(rcm_id)
-
-    return jsonify({
+    return with_validators(jsonify({
         'success': True,
         'rcm_id': rcm_id,
         'rcm_name': rcm_info['rcm_name'],
         'control_category': rcm_info['control_category'],
-        'total_controls': len(rcm_details),
+        'total_controls': count_rcm_details(rcm_id),
         'upload_date': rcm_info['upload_date'],
         'completion_date': rcm_info['completion_date']
+    }), etag, revision['last_modified'])
+
+# RCM API - 완전성 점수
+@bp_link1.route('/api/completeness')
+@login_required
+def rcm_completeness_api():
+    """RCM 완전성 점수 조회 API
+
+    쿼리 파라미터: rcm_id(여러 개 가능, 없으면 접근 가능한 RCM 전체)
+    저장된 결과만 반환하며 다시 계산하지 않는다 (계산은 업로드/매핑 후와 evaluate-completeness 명령).
+    계산 후 통제가 바뀐 RCM은 stale이 True이다.
+    """
+    user_info = get_user_info()
+    accessible = [rcm['rcm_id'] for rcm in get_user_rcms(user_info['user_id'])]
+    requested = request.args.getlist('rcm_id', type=int)
+    if requested:
+        if not set(requested) <= set(accessible):
+            return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
+        accessible = requested
+
+    db = get_db()
+    scores = get_completeness_scores(db, accessible)
+    stale = set(stale_rcm_ids(db, accessible))
+    return jsonify({
+        'success': True,
+        'scores': {str(rcm_id): dict(scores[rcm_id], stale=rcm_id in stale)
+                   for rcm_id in accessible if rcm_id in scores}
     })
+
+# RCM API - 유사 통제
+@bp_link1.route('/api/controls/<int:detail_id>/similar')
+@login_required
+def rcm_similar_controls_api(detail_id):
+    """통제와 유사한 다른 RCM/같은 RCM 통제 조회 API (MinHash/LSH)
+
+    쿼리 파라미터: threshold(추정 유사도 0~1), limit
+    결과는 사용자가 접근 가능한 RCM의 통제로 한정한다.
+    """
+    user_info = get_user_info()
+    db = get_db()
+    detail = db.execute('SELECT rcm_id FROM ca_rcm_detail WHERE detail_id = ?', (detail_id,)).fetchone()
+    if not detail:
+        return jsonify({'success': False, 'message': '통제를 찾을 수 없습니다.'}), 404
+    if not has_rcm_access(user_info['user_id'], detail['rcm_id']):
+        return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
+
+    authorization = get_user_authorization(user_info['user_id'])
+    controls = similar_controls(
+        db, detail_id,
+        threshold=request.args.get('threshold', type=float),
+        limit=max(1, min(request.args.get('limit', 20, type=int), 100)),
+        rcm_ids=None if authorization['is_admin'] else authorization['rcm_ids'])
+    return jsonify({'success': True, 'detail_id': detail_id, 'controls': controls})
+
+# RCM API - RCM 내 유사 중복 통제 묶음
+@bp_link1.route('/api/<int:rcm_id>/duplicates')
+@login_required
+def rcm_duplicates_api(rcm_id):
+    """RCM 안의 유사 중복 통제 묶음 조회 API (쿼리 파라미터: threshold)"""
+    user_info = get_user_info()
+
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
+
+    db = get_db()
+    clusters = duplicate_clusters(db, rcm_id, threshold=request.args.get('threshold', type=float))
+    return jsonify({'success': True, 'rcm_id': rcm_id, 'clusters': clusters})
+
+# RCM API - 통제 목록 (keyset 페이지)
+@bp_link1.route('/api/<int:rcm_id>/controls')
+@login_required
+def rcm_controls_api(rcm_id):
+    """RCM 통제 목록 페이지 조회 API
+
+    쿼리 파라미터: after(이전 페이지 next_cursor), limit, fields(쉼표 구분 컬럼),
+    key_control / control_frequency / control_type / process_area (필터)
+    첫 페이지(after 없음)에는 필터 적용 후 전체 건수(total)를 함께 반환한다.
+    """
+    user_info = get_user_info()
+
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
+
+    after = request.args.get('after') or None
+    limit = request.args.get('limit', RCM_DETAIL_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, RCM_DETAIL_MAX_PAGE_SIZE))
+    fields = [field.strip() for field in request.args.get('fields', '').split(',') if field.strip()]
+    filters = {column: request.args.get(column) for column in RCM_DETAIL_FILTER_COLUMNS}
+
+    try:
+        page = get_rcm_details_page(rcm_id, after=after, limit=limit,
+                                    filters=filters, columns=fields or None)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+
+    result = {
+        'success': True,
+        'controls': page['controls'],
+        'next_cursor': page['next_cursor']
+    }
+    if not after:
+        result['total'] = count_rcm_details(rcm_id, filters)
+    return jsonify(result)
+
+# RCM API - 통제 검색
+@bp_link1.route('/api/search')
+@login_required
+def rcm_search_api():
+    """통제 전문 검색 API
+
+    쿼리 파라미터: q(검색어, 공백 구분 AND), rcm_id(특정 RCM 한정), page, limit
+    결과의 control_name_html / snippet_html은 이스케이프된 HTML(<mark> 하이라이트)이다.
+    검색어가 모두 SEARCH_MIN_TERM_LENGTH 글자 미만이면 rcm_id가 있어야 한다 (없으면 400).
+    """
+    user_info = get_user_info()
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'message': '검색어를 입력하세요.'}), 400
+
+    rcm_id = request.args.get('rcm_id', type=int)
+    if rcm_id is not None and not has_rcm_access(user_info['user_id'], rcm_id):
+        return jsonify({'success': False, 'message': '접근 권한이 없습니다.'}), 403
+
+    page = max(request.args.get('page', 1, type=int), 1)
+    limit = request.args.get('limit', SEARCH_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, SEARCH_MAX_PAGE_SIZE))
+
+    result = search_rcm_controls(user_info['user_id'], query, rcm_id=rcm_id, page=page, limit=limit)
+    if result['mode'] == 'too_short':
+        return jsonify(dict(result, success=False, query=query,
+                            message=f'검색어를 {SEARCH_MIN_TERM_LENGTH}글자 이상 입력하거나 RCM을 선택하세요.')), 400
+    return jsonify(dict(result, success=True, query=query))
@@ -6,12 +6,49 @@ Design Effectiveness Testing - snowball link6 기반
 from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session
 from catcher_auth import (
     login_required, get_current_user, get_user_rcms,
-    get_rcm_details, get_rcm_info, has_rcm_access,
-    log_user_activity, get_db
+    get_rcm_details_page, count_rcm_details, get_rcm_info, has_rcm_access,
+    log_user_activity, get_db, get_user_authorization, get_rcm_revision, bump_rcm_revision,
+    RCM_DETAIL_PAGE_SIZE
 )
+from catcher_etag import make_etag, not_modified_response, with_validators
+from catcher_excel import send_xlsx
+from catcher_link4 import refresh_dashboard_rollup
 
 bp_link2 = Blueprint('design', __name__, url_prefix='/design')
 
+# 평가 화면 통제 목록에 표시하는 컬럼
+EVALUATION_LIST_COLUMNS = ('control_code', 'control_name', 'control_description', 'key_control', 'control_frequency')
+
+# 설계평가 라인 저장 컬럼
+DESIGN_EVALUATION_FIELDS = (
+    'description_adequacy', 'improvement_suggestion', 'overall_effectiveness',
+    'evaluation_rationale', 'recommended_actions'
+)
+# 일괄 저장 요청당 최대 통제 수
+DESIGN_BATCH_MAX_SIZE = 2000
+
+# Excel 내보내기 컬럼
+DESIGN_EXPORT_COLUMNS = (
+    ('evaluation_session', '평가 세션'), ('control_code', '통제코드'), ('control_name', '통제명'),
+    ('key_control', '핵심통제'), ('description_adequacy', '설명 적정성'),
+    ('improvement_suggestion', '개선 제안'), ('overall_effectiveness', '종합 효과성'),
+    ('evaluation_rationale', '평가 근거'), ('recommended_actions', '권고 조치'),
+    ('evaluation_date', '평가 일자')
+)
+
+UPSERT_DESIGN_LINE_SQL = '''
+    INSERT INTO ca_design_evaluation_line (header_id, control_code, {columns}, evaluation_date)
+    VALUES (?, ?, {placeholders}, CURRENT_TIMESTAMP)
+    ON CONFLICT(header_id, control_code) DO UPDATE SET
+        {assignments},
+        evaluation_date = CURRENT_TIMESTAMP,
+        last_updated = CURRENT_TIMESTAMP
+'''.format(
+    columns=', '.join(DESIGN_EVALUATION_FIELDS),
+    placeholders=', '.join('?' for _ in DESIGN_EVALUATION_FIELDS),
+    assignments=',\n        '.join(f'{field} = excluded.{field}' for field in DESIGN_EVALUATION_FIELDS)
+)
+
 
 def get_user_info():
     """현재 로그인한 사용자 정보 반환"""
@@ -78,14 +115,26 @@ def design_evaluation_rcm():
         flash('해당 RCM에 대한 접근 권한이 없습니다.', 'error')
         return redirect(url_for('design.design_evaluation'))
 
+    # GET 재조회는 리비전이 그대로면 조회/렌더링 없이 304
+    revision = get_rcm_revision(rcm_id)
+    etag = make_etag('design_rcm', rcm_id, revision['revision'], user_info['user_id'])
+    not_modified = not_modified_response(etag, revision['last_modified'])
+    if not_modified:
+        log_user_activity(user_info, 'PAGE_ACCESS', 'RCM 설계평가',
+                         '/design/rcm', request.remote_addr,
+                         request.headers.get('User-Agent'),
+                         {'rcm_id': rcm_id, 'not_modified': True})
+        return not_modified
+
     # RCM 정보 조회
     rcm_info = get_rcm_info(rcm_id)
     if not rcm_info:
         flash('RCM을 찾을 수 없습니다.', 'error')
         return redirect(url_for('design.design_evaluation'))
 
-    # RCM 세부 데이터 조회
-    rcm_details = get_rcm_details(rcm_id)
+    # RCM 세부 데이터 조회 (첫 페이지만 렌더링, 나머지는 통제 목록 API로 추가 로드)
+    control_count = count_rcm_details(rcm_id)
+    first_page = get_rcm_details_page(rcm_id, limit=RCM_DETAIL_PAGE_SIZE, columns=EVALUATION_LIST_COLUMNS)
 
     # 평가 세션 목록 조회
     evaluation_sessions = get_evaluation_sessions(rcm_id, user_info['user_id'])
@@ -94,13 +143,17 @@ def design_evaluation_rcm():
                      '/design/rcm', request.remote_addr,
                      request.headers.get('User-Agent'))
 
-    return render_template('design/design_rcm_detail.html',
-                         rcm_id=rcm_id,
-                         rcm_info=rcm_info,
-                         rcm_details=rcm_details,
-                         evaluation_sessions=evaluation_sessions,
-                         is_logged_in=is_logged_in(),
-                         user_info=user_info)
+    return with_validators(render_template('design/design_rcm_detail.html',
+                                           rcm_id=rcm_id,
+                                           rcm_info=rcm_info,
+                                           rcm_details=first_page['controls'],
+                                           next_cursor=first_page['next_cursor'],
+                                           control_count=control_count,
+                                           list_columns=EVALUATION_LIST_COLUMNS,
+                                           evaluation_sessions=evaluation_sessions,
+                                           is_logged_in=is_logged_in(),
+                                           user_info=user_info),
+                           etag, revision['last_modified'])
 
 
 @bp_link2.route('/api/save', methods=['POST'])
@@ -159,6 +212,73 @@ def save_design_evaluation_api():
         }), 500
 
 
+@bp_link2.route('/api/save-batch', methods=['POST'])
+@login_required
+def save_design_evaluation_batch_api():
+    """설계평가 결과 일괄 저장 API
+
+    요청: {rcm_id, evaluation_session, evaluations: [{control_code, evaluation_data}, ...]}
+    응답의 results에 통제별 저장 결과(saved/error)를 요청 순서대로 반환한다.
+    """
+    user_info = get_user_info()
+
+    data = request.get_json() or {}
+    rcm_id = data.get('rcm_id')
+    evaluation_session = data.get('evaluation_session')
+    evaluations = data.get('evaluations')
+
+    # 필수 데이터 검증
+    if not all([rcm_id, evaluation_session]) or not isinstance(evaluations, list) or not evaluations:
+        return jsonify({
+            'success': False,
+            'message': '필수 데이터가 누락되었습니다.'
+        })
+
+    if len(evaluations) > DESIGN_BATCH_MAX_SIZE:
+        return jsonify({
+            'success': False,
+            'message': f'한 번에 최대 {DESIGN_BATCH_MAX_SIZE}개 통제까지 저장할 수 있습니다.'
+        }), 400
+
+    try:
+        # 접근 권한 확인 (요청당 1회)
+        if not has_rcm_access(user_info['user_id'], rcm_id):
+            return jsonify({
+                'success': False,
+                'message': '해당 RCM에 대한 접근 권한이 없습니다.'
+            })
+
+        results = save_design_evaluation_batch(
+            rcm_id=rcm_id,
+            user_id=user_info['user_id'],
+            session_name=evaluation_session,
+            evaluations=evaluations
+        )
+        saved = sum(1 for result in results if result['status'] == 'saved')
+
+        log_user_activity(user_info, 'DESIGN_EVAL_SAVE_BATCH',
+                        f'설계평가 일괄 저장 - {saved}건',
+                        '/design/api/save-batch', request.remote_addr,
+                        request.headers.get('User-Agent'),
+                        {'rcm_id': rcm_id, 'saved': saved, 'failed': len(results) - saved})
+
+        return jsonify({
+            'success': True,
+            'message': f'설계평가 {saved}건이 저장되었습니다.',
+            'saved': saved,
+            'failed': len(results) - saved,
+            'results': results
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': f'저장 중 오류가 발생했습니다: {str(e)}'
+        }), 500
+
+
 @bp_link2.route('/api/sessions/<int:rcm_id>')
 @login_required
 def get_evaluation_sessions_api(rcm_id):
@@ -172,13 +292,19 @@ def get_evaluation_sessions_api(rcm_id):
             'message': '접근 권한이 없습니다.'
         }), 403
 
+    revision = get_rcm_revision(rcm_id)
+    etag = make_etag('design_sessions', rcm_id, revision['revision'], user_info['user_id'])
+    not_modified = not_modified_response(etag, revision['last_modified'])
+    if not_modified:
+        return not_modified
+
     try:
         sessions = get_evaluation_sessions(rcm_id, user_info['user_id'])
 
-        return jsonify({
+        return with_validators(jsonify({
             'success': True,
             'sessions': sessions
-        })
+        }), etag, revision['last_modified'])
 
     except Exception as e:
         return jsonify({
@@ -187,6 +313,33 @@ def get_evaluation_sessions_api(rcm_id):
         }), 500
 
 
+@bp_link2.route('/<int:rcm_id>/export')
+@login_required
+def design_evaluation_export(rcm_id):
+    """설계평가 결과 Excel 다운로드 (session 파라미터가 없으면 전체 세션 이력)"""
+    user_info = get_user_info()
+
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        flash('해당 RCM에 대한 접근 권한이 없습니다.', 'error')
+        return redirect(url_for('design.design_evaluation'))
+
+    rcm_info = get_rcm_info(rcm_id)
+    if not rcm_info:
+        flash('RCM을 찾을 수 없습니다.', 'error')
+        return redirect(url_for('design.design_evaluation'))
+
+    session_name = request.args.get('session') or None
+    rows = iter_design_evaluation_rows(rcm_id, user_info['user_id'], session_name)
+
+    log_user_activity(user_info, 'DESIGN_EVAL_EXPORT', f'설계평가 Excel 내보내기 - {rcm_info["rcm_name"]}',
+                     f'/design/{rcm_id}/export', request.remote_addr,
+                     request.headers.get('User-Agent'),
+                     {'rcm_id': rcm_id, 'session_name': session_name})
+
+    filename = f'{rcm_info["rcm_name"]}_설계평가_{session_name or "전체"}.xlsx'
+    return send_xlsx([('설계평가', DESIGN_EXPORT_COLUMNS, rows)], filename)
+
+
 @bp_link2.route('/api/create-session', methods=['POST'])
 @login_required
 def create_evaluation_session_api():
@@ -271,25 +424,37 @@ def get_evaluation_sessions(rcm_id, user_id):
         return [dict(session) for session in sessions]
 
 
+def iter_design_evaluation_rows(rcm_id, user_id, session_name=None):
+    """내보내기용 설계평가 행 커서 (세션 x 통제, 미평가 통제 포함)
+
+    관리자가 아니면 본인 세션만 포함한다.
+    """
+    conditions = ['h.rcm_id = ?']
+    params = [rcm_id]
+    if session_name:
+        conditions.append('h.evaluation_session = ?')
+        params.append(session_name)
+    if not get_user_authorization(user_id)['is_admin']:
+        conditions.append('h.user_id = ?')
+        params.append(user_id)
+
+    return get_db().execute(f'''
+        SELECT h.evaluation_session, d.control_code, d.control_name, d.key_control,
+               {', '.join(f'l.{field}' for field in DESIGN_EVALUATION_FIELDS)}, l.evaluation_date
+        FROM ca_design_evaluation_header h
+        JOIN ca_rcm_detail d ON d.rcm_id = h.rcm_id
+        LEFT JOIN ca_design_evaluation_line l
+               ON l.header_id = h.header_id AND l.control_code = d.control_code
+        WHERE {' AND '.join(conditions)}
+        ORDER BY h.start_date, h.header_id, d.control_code
+    ''', params)
+
+
 def save_design_evaluation_data(rcm_id, control_code, user_id, session_name, evaluation_data):
     """설계평가 데이터 저장"""
     with get_db() as conn:
         # 헤더 ID 조회 또는 생성
-        header = conn.execute('''
-            SELECT header_id FROM ca_design_evaluation_header
-            WHERE rcm_id = ? AND user_id = ? AND evaluation_session = ?
-        ''', (rcm_id, user_id, session_name)).fetchone()
-
-        if not header:
-            # 헤더가 없으면 생성
-            cursor = conn.execute('''
-                INSERT INTO ca_design_evaluation_header
-                (rcm_id, user_id, evaluation_session, evaluation_status)
-                VALUES (?, ?, ?, 'IN_PROGRESS')
-            ''', (rcm_id, user_id, session_name))
-            header_id = cursor.lastrowid
-        else:
-            header_id = header['header_id']
+        header_id = _get_or_create_design_header(conn, rcm_id, user_id, session_name)
 
         # 라인 데이터 저장
         existing = conn.execute('''
@@ -333,16 +498,87 @@ def save_design_evaluation_data(rcm_id, control_code, user_id, session_name, eva
                 evaluation_data.get('recommended_actions')
             ))
 
-        # 헤더의 진행률 업데이트
+        # 헤더 수정 시각 갱신 (진행률 카운터는 라인 트리거가 같은 트랜잭션에서 갱신)
         conn.execute('''
             UPDATE ca_design_evaluation_header
             SET last_updated = CURRENT_TIMESTAMP
             WHERE header_id = ?
         ''', (header_id,))
+        refresh_dashboard_rollup(conn, 'DESIGN', header_id)
+        bump_rcm_revision(conn, rcm_id)
 
         conn.commit()
 
 
+def save_design_evaluation_batch(rcm_id, user_id, session_name, evaluations):
+    """설계평가 데이터 일괄 저장 (단일 트랜잭션, executemany upsert)
+
+    evaluations: [{'control_code': ..., 'evaluation_data': {...}}, ...]
+    반환: 요청 순서대로 [{'control_code', 'status': 'saved'|'error', 'message'}]
+    같은 control_code가 여러 번 오면 마지막 항목을 저장한다.
+    """
+    results = []
+    rows = {}
+    for item in evaluations:
+        control_code = item.get('control_code') if isinstance(item, dict) else None
+        evaluation_data = item.get('evaluation_data') if isinstance(item, dict) else None
+        if not control_code or not isinstance(evaluation_data, dict):
+            results.append({'control_code': control_code, 'status': 'error',
+                            'message': '필수 데이터가 누락되었습니다.'})
+            continue
+        results.append({'control_code': control_code, 'status': 'saved'})
+        rows[control_code] = tuple(evaluation_data.get(field) for field in DESIGN_EVALUATION_FIELDS)
+
+    conn = get_db()
+    with conn:
+        # RCM에 없는 통제코드 제외
+        known_codes = set()
+        codes = list(rows)
+        for start in range(0, len(codes), 500):
+            chunk = codes[start:start + 500]
+            known_codes.update(row[0] for row in conn.execute(f'''
+                SELECT control_code FROM ca_rcm_detail
+                WHERE rcm_id = ? AND control_code IN ({', '.join('?' for _ in chunk)})
+            ''', (rcm_id, *chunk)))
+
+        for result in results:
+            if result['status'] == 'saved' and result['control_code'] not in known_codes:
+                result.update(status='error', message='RCM에 없는 통제코드입니다.')
+                rows.pop(result['control_code'], None)
+
+        if rows:
+            header_id = _get_or_create_design_header(conn, rcm_id, user_id, session_name)
+            conn.executemany(UPSERT_DESIGN_LINE_SQL, [
+                (header_id, control_code) + values for control_code, values in rows.items()
+            ])
+            conn.execute('''
+                UPDATE ca_design_evaluation_header
+                SET last_updated = CURRENT_TIMESTAMP
+                WHERE header_id = ?
+            ''', (header_id,))
+            refresh_dashboard_rollup(conn, 'DESIGN', header_id)
+            bump_rcm_revision(conn, rcm_id)
+
+    return results
+
+
+def _get_or_create_design_header(conn, rcm_id, user_id, session_name):
+    """설계평가 헤더 ID 조회 (없으면 생성)"""
+    header = conn.execute('''
+        SELECT header_id FROM ca_design_evaluation_header
+        WHERE rcm_id = ? AND user_id = ? AND evaluation_session = ?
+    ''', (rcm_id, user_id, session_name)).fetchone()
+    if header:
+        return header['header_id']
+
+    cursor = conn.execute('''
+        INSERT INTO ca_design_evaluation_header
+        (rcm_id, user_id, evaluation_session, evaluation_status, total_controls)
+        VALUES (?, ?, ?, 'IN_PROGRESS', (SELECT COUNT(*) FROM ca_rcm_detail WHERE rcm_id = ?))
+    ''', (rcm_id, user_id, session_name, rcm_id))
+    return cursor.lastrowid
+
+
 def create_design_evaluation_session(rcm_id, user_id, session_name):
     """설계평가 세션 생성"""
     with get_db() as conn:
@@ -358,6 +594,7 @@ def create_design_evaluation_session(rcm_id, user_id, session_name):
             VALUES (?, ?, ?, 'IN_PROGRESS', ?)
         ''', (rcm_id, user_id, session_name, total_controls))
         header_id = cursor.lastrowid
+        bump_rcm_revision(conn, rcm_id)
         conn.commit()
 
         return header_id
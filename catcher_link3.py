@@ -3,15 +3,33 @@ Catcher Link 3: 운영평가
 Operating Effectiveness Testing - snowball link7 기반
 """
 
-from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session
+from flask import Blueprint, request, jsonify, render_template, redirect, url_for, flash, session, send_file
 from catcher_auth import (
     login_required, get_current_user, get_user_rcms,
-    get_rcm_details, get_rcm_info, has_rcm_access,
-    log_user_activity, get_db
+    get_rcm_details_page, count_rcm_details, get_rcm_info, has_rcm_access,
+    log_user_activity, get_db, get_user_authorization, get_rcm_revision, bump_rcm_revision,
+    RCM_DETAIL_PAGE_SIZE
 )
+from catcher_etag import make_etag, not_modified_response, with_validators
+from catcher_excel import send_xlsx
+from catcher_link4 import refresh_dashboard_rollup
+from catcher_sampling import draw_sample, check_population_filename, store_sample, get_sample
+from catcher_evidence import (spool_stream, publish_spooled, discard_spooled, attach, detach, get_attachment,
+                              list_attachments, blob_path, ATTACHMENT_TYPES)
 
 bp_link3 = Blueprint('operation', __name__, url_prefix='/operation')
 
+# 평가 화면 통제 목록에 표시하는 컬럼
+EVALUATION_LIST_COLUMNS = ('control_code', 'control_name', 'control_description', 'key_control', 'control_frequency')
+
+# Excel 내보내기 컬럼
+OPERATION_EXPORT_COLUMNS = (
+    ('design_session', '설계평가 세션'), ('evaluator_name', '평가자'), ('control_code', '통제코드'),
+    ('control_name', '통제명'), ('key_control', '핵심통제'), ('sample_size', '샘플 수'),
+    ('exception_count', '예외 건수'), ('test_result', '테스트 결과'), ('test_procedure', '테스트 절차'),
+    ('findings', '발견사항'), ('population_count', '모집단 수'), ('evaluation_date', '평가 일자')
+)
+
 
 def get_user_info():
     """현재 로그인한 사용자 정보 반환"""
@@ -78,14 +96,26 @@ def operation_evaluation_rcm():
         flash('해당 RCM에 대한 접근 권한이 없습니다.', 'error')
         return redirect(url_for('operation.operation_evaluation'))
 
+    # GET 재조회는 리비전이 그대로면 조회/렌더링 없이 304
+    revision = get_rcm_revision(rcm_id)
+    etag = make_etag('operation_rcm', rcm_id, revision['revision'], user_info['user_id'])
+    not_modified = not_modified_response(etag, revision['last_modified'])
+    if not_modified:
+        log_user_activity(user_info, 'PAGE_ACCESS', 'RCM 운영평가',
+                         '/operation/rcm', request.remote_addr,
+                         request.headers.get('User-Agent'),
+                         {'rcm_id': rcm_id, 'not_modified': True})
+        return not_modified
+
     # RCM 정보 조회
     rcm_info = get_rcm_info(rcm_id)
     if not rcm_info:
         flash('RCM을 찾을 수 없습니다.', 'error')
         return redirect(url_for('operation.operation_evaluation'))
 
-    # RCM 세부 데이터 조회
-    rcm_details = get_rcm_details(rcm_id)
+    # RCM 세부 데이터 조회 (첫 페이지만 렌더링, 나머지는 통제 목록 API로 추가 로드)
+    control_count = count_rcm_details(rcm_id)
+    first_page = get_rcm_details_page(rcm_id, limit=RCM_DETAIL_PAGE_SIZE, columns=EVALUATION_LIST_COLUMNS)
 
     # 설계평가 세션 목록 조회 (운영평가는 설계평가 기반)
     design_sessions = get_design_sessions(rcm_id)
@@ -94,13 +124,17 @@ def operation_evaluation_rcm():
                      '/operation/rcm', request.remote_addr,
                      request.headers.get('User-Agent'))
 
-    return render_template('operation/operation_rcm_detail.html',
-                         rcm_id=rcm_id,
-                         rcm_info=rcm_info,
-                         rcm_details=rcm_details,
-                         design_sessions=design_sessions,
-                         is_logged_in=is_logged_in(),
-                         user_info=user_info)
+    return with_validators(render_template('operation/operation_rcm_detail.html',
+                                           rcm_id=rcm_id,
+                                           rcm_info=rcm_info,
+                                           rcm_details=first_page['controls'],
+                                           next_cursor=first_page['next_cursor'],
+                                           control_count=control_count,
+                                           list_columns=EVALUATION_LIST_COLUMNS,
+                                           design_sessions=design_sessions,
+                                           is_logged_in=is_logged_in(),
+                                           user_info=user_info),
+                           etag, revision['last_modified'])
 
 
 @bp_link3.route('/api/save', methods=['POST'])
@@ -159,6 +193,228 @@ def save_operation_evaluation_api():
         }), 500
 
 
+@bp_link3.route('/api/sample', methods=['POST'])
+@login_required
+def create_operation_sample_api():
+    """모집단 파일 업로드 후 표본 추출 API (multipart)
+
+    폼 필드: rcm_id, control_code, design_session, population_file(CSV/XLSX),
+    method(random/systematic, 기본 random), seed, risk_level(LOW/HIGH, 기본: 핵심통제 여부),
+    sample_size(없으면 통제 빈도와 위험으로 계산)
+    추출한 표본은 운영평가 라인에 연결되고 라인의 모집단 수/표본 수가 갱신된다.
+    """
+    user_info = get_user_info()
+
+    rcm_id = request.form.get('rcm_id', type=int)
+    control_code = request.form.get('control_code', '').strip()
+    design_session = request.form.get('design_session', '').strip()
+    file = request.files.get('population_file')
+    if not all([rcm_id, control_code, design_session, file and file.filename]):
+        return jsonify({'success': False, 'message': '필수 데이터가 누락되었습니다.'}), 400
+
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        return jsonify({'success': False, 'message': '해당 RCM에 대한 접근 권한이 없습니다.'}), 403
+
+    db = get_db()
+    detail = db.execute('''
+        SELECT control_frequency, key_control FROM ca_rcm_detail WHERE rcm_id = ? AND control_code = ?
+    ''', (rcm_id, control_code)).fetchone()
+    if not detail:
+        return jsonify({'success': False, 'message': '통제를 찾을 수 없습니다.'}), 404
+
+    try:
+        check_population_filename(file.filename)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    # 모집단 전체를 읽기 전에 설계평가 세션부터 확인
+    if get_design_header_id(db, rcm_id, design_session) is None:
+        return jsonify({'success': False, 'message': '설계평가 세션을 찾을 수 없습니다.'}), 400
+
+    # 표본 추출에 성공한 모집단 파일만 저장소에 둔다 (읽을 수 없는 파일은 임시 파일째 삭제)
+    spooled, sha256, size = spool_stream(file.stream)
+    try:
+        result = draw_sample(
+            spooled, detail['control_frequency'], detail['key_control'],
+            method=request.form.get('method', 'random'),
+            seed=request.form.get('seed', type=int),
+            risk_level=(request.form.get('risk_level') or '').upper() or None,
+            sample_size=request.form.get('sample_size', type=int),
+            filename=file.filename)
+        publish_spooled(db, spooled, sha256, size)
+        population_path = blob_path(sha256)
+
+        with db:
+            line_id = get_or_create_operation_line(db, rcm_id, user_info['user_id'], design_session, control_code)
+            attach(db, line_id, sha256, 'POPULATION', file.filename, file.mimetype, user_info['user_id'])
+            sample_id = store_sample(db, line_id, result, population_path, sha256, file.filename,
+                                     user_info['user_id'])
+            bump_rcm_revision(db, rcm_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        discard_spooled(spooled)
+
+    log_user_activity(user_info, 'OPERATION_SAMPLE_CREATE',
+                    f'운영평가 표본 추출 - {control_code}',
+                    '/operation/api/sample', request.remote_addr,
+                    request.headers.get('User-Agent'),
+                    {'rcm_id': rcm_id, 'control_code': control_code, 'sample_id': sample_id,
+                     'method': result['method'], 'seed': result['seed']})
+
+    return jsonify({'success': True, 'sample': get_sample(db, sample_id)})
+
+
+@bp_link3.route('/api/sample/<int:sample_id>')
+@login_required
+def operation_sample_api(sample_id):
+    """추출된 표본 조회 API"""
+    user_info = get_user_info()
+    sample = get_sample(get_db(), sample_id)
+    if not sample:
+        return jsonify({'success': False, 'message': '표본을 찾을 수 없습니다.'}), 404
+    if not has_rcm_access(user_info['user_id'], sample['rcm_id']):
+        return jsonify({'success': False, 'message': '해당 RCM에 대한 접근 권한이 없습니다.'}), 403
+    return jsonify({'success': True, 'sample': sample})
+
+
+@bp_link3.route('/api/evidence', methods=['POST'])
+@login_required
+def upload_evidence_api():
+    """운영평가 증빙 파일 업로드 API (multipart, 여러 파일 가능)
+
+    폼 필드: rcm_id, control_code, design_session, evidence_file(여러 개), attachment_type(기본 EVIDENCE)
+    같은 내용의 파일은 저장소에 한 번만 저장되고 첨부만 추가된다.
+    """
+    user_info = get_user_info()
+
+    rcm_id = request.form.get('rcm_id', type=int)
+    control_code = request.form.get('control_code', '').strip()
+    design_session = request.form.get('design_session', '').strip()
+    attachment_type = request.form.get('attachment_type', 'EVIDENCE').upper()
+    files = [file for file in request.files.getlist('evidence_file') if file.filename]
+    if not all([rcm_id, control_code, design_session, files]):
+        return jsonify({'success': False, 'message': '필수 데이터가 누락되었습니다.'}), 400
+    if attachment_type not in ATTACHMENT_TYPES:
+        return jsonify({'success': False, 'message': '지원하지 않는 첨부 유형입니다.'}), 400
+
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        return jsonify({'success': False, 'message': '해당 RCM에 대한 접근 권한이 없습니다.'}), 403
+
+    db = get_db()
+    if not db.execute('SELECT 1 FROM ca_rcm_detail WHERE rcm_id = ? AND control_code = ?',
+                      (rcm_id, control_code)).fetchone():
+        return jsonify({'success': False, 'message': '통제를 찾을 수 없습니다.'}), 404
+    if get_design_header_id(db, rcm_id, design_session) is None:
+        return jsonify({'success': False, 'message': '설계평가 세션을 찾을 수 없습니다.'}), 400
+
+    # 파일 쓰기(해시 계산)는 트랜잭션 밖에서 하고, 라인을 확인한 뒤에만 저장소에 두고 첨부를 기록
+    spooled = []
+    try:
+        for file in files:
+            spooled.append((file, *spool_stream(file.stream)))
+        with db:
+            line_id = get_or_create_operation_line(db, rcm_id, user_info['user_id'], design_session, control_code)
+        for file, path, sha256, size in spooled:
+            publish_spooled(db, path, sha256, size)
+        with db:
+            for file, _, sha256, _ in spooled:
+                attach(db, line_id, sha256, attachment_type, file.filename, file.mimetype, user_info['user_id'])
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
+    finally:
+        for _, path, _, _ in spooled:
+            discard_spooled(path)
+
+    log_user_activity(user_info, 'OPERATION_EVIDENCE_UPLOAD',
+                    f'운영평가 증빙 업로드 - {control_code}',
+                    '/operation/api/evidence', request.remote_addr,
+                    request.headers.get('User-Agent'),
+                    {'rcm_id': rcm_id, 'control_code': control_code, 'files': len(spooled)})
+
+    return jsonify({'success': True, 'line_id': line_id, 'attachments': list_attachments(db, line_id)})
+
+
+def can_manage_attachment(user_id, attachment):
+    """첨부 조회/삭제 권한 (관리자, 운영평가 평가자, 업로드한 사용자)
+
+    RCM 읽기 권한만으로는 다른 평가자의 증빙을 내려받거나 삭제할 수 없다.
+    """
+    if user_id in (attachment['owner_id'], attachment['uploaded_by']):
+        return True
+    return get_user_authorization(user_id)['is_admin']
+
+
+@bp_link3.route('/api/evidence/<int:attachment_id>')
+@login_required
+def download_evidence(attachment_id):
+    """증빙 파일 다운로드 (Range 요청, ETag 지원)"""
+    user_info = get_user_info()
+    attachment = get_attachment(get_db(), attachment_id)
+    if not attachment:
+        return jsonify({'success': False, 'message': '파일을 찾을 수 없습니다.'}), 404
+    if not has_rcm_access(user_info['user_id'], attachment['rcm_id']):
+        return jsonify({'success': False, 'message': '해당 RCM에 대한 접근 권한이 없습니다.'}), 403
+    if not can_manage_attachment(user_info['user_id'], attachment):
+        return jsonify({'success': False, 'message': '본인 평가의 증빙만 접근할 수 있습니다.'}), 403
+
+    # 내용이 바뀌지 않으므로 SHA-256을 강한 ETag로 사용
+    return send_file(blob_path(attachment['sha256']),
+                     mimetype=attachment['content_type'] or 'application/octet-stream',
+                     as_attachment=True,
+                     download_name=attachment['original_filename'] or attachment['sha256'],
+                     conditional=True, etag=attachment['sha256'], max_age=0)
+
+
+@bp_link3.route('/api/evidence/<int:attachment_id>/delete', methods=['POST'])
+@login_required
+def delete_evidence_api(attachment_id):
+    """증빙 첨부 삭제 API (파일은 다른 첨부가 없으면 gc-evidence가 정리)"""
+    user_info = get_user_info()
+    db = get_db()
+    attachment = get_attachment(db, attachment_id)
+    if not attachment:
+        return jsonify({'success': False, 'message': '파일을 찾을 수 없습니다.'}), 404
+    if not has_rcm_access(user_info['user_id'], attachment['rcm_id']):
+        return jsonify({'success': False, 'message': '해당 RCM에 대한 접근 권한이 없습니다.'}), 403
+    if not can_manage_attachment(user_info['user_id'], attachment):
+        return jsonify({'success': False, 'message': '본인 평가의 증빙만 접근할 수 있습니다.'}), 403
+
+    detach(db, attachment_id)
+    log_user_activity(user_info, 'OPERATION_EVIDENCE_DELETE',
+                    f"운영평가 증빙 삭제 - {attachment['control_code']}",
+                    f'/operation/api/evidence/{attachment_id}/delete', request.remote_addr,
+                    request.headers.get('User-Agent'),
+                    {'rcm_id': attachment['rcm_id'], 'attachment_id': attachment_id})
+    return jsonify({'success': True, 'message': '첨부가 삭제되었습니다.'})
+
+
+@bp_link3.route('/<int:rcm_id>/export')
+@login_required
+def operation_evaluation_export(rcm_id):
+    """운영평가 결과 Excel 다운로드 (design_session 파라미터가 없으면 전체 이력)"""
+    user_info = get_user_info()
+
+    if not has_rcm_access(user_info['user_id'], rcm_id):
+        flash('해당 RCM에 대한 접근 권한이 없습니다.', 'error')
+        return redirect(url_for('operation.operation_evaluation'))
+
+    rcm_info = get_rcm_info(rcm_id)
+    if not rcm_info:
+        flash('RCM을 찾을 수 없습니다.', 'error')
+        return redirect(url_for('operation.operation_evaluation'))
+
+    design_session = request.args.get('design_session') or None
+    rows = iter_operation_evaluation_rows(rcm_id, user_info['user_id'], design_session)
+
+    log_user_activity(user_info, 'OPERATION_EVAL_EXPORT', f'운영평가 Excel 내보내기 - {rcm_info["rcm_name"]}',
+                     f'/operation/{rcm_id}/export', request.remote_addr,
+                     request.headers.get('User-Agent'),
+                     {'rcm_id': rcm_id, 'design_session': design_session})
+
+    filename = f'{rcm_info["rcm_name"]}_운영평가_{design_session or "전체"}.xlsx'
+    return send_xlsx([('운영평가', OPERATION_EXPORT_COLUMNS, rows)], filename)
+
+
 # Helper functions
 def get_design_sessions(rcm_id):
     """설계평가 세션 목록 조회 (운영평가 기반)"""
@@ -175,36 +431,85 @@ def get_design_sessions(rcm_id):
         return [dict(session) for session in sessions]
 
 
+def iter_operation_evaluation_rows(rcm_id, user_id, design_session=None):
+    """내보내기용 운영평가 행 커서 (평가 헤더 x 통제, 미평가 통제 포함)
+
+    관리자가 아니면 본인 평가만 포함한다.
+    """
+    conditions = ['h.rcm_id = ?']
+    params = [rcm_id]
+    if design_session:
+        conditions.append('dh.evaluation_session = ?')
+        params.append(design_session)
+    if not get_user_authorization(user_id)['is_admin']:
+        conditions.append('h.user_id = ?')
+        params.append(user_id)
+
+    return get_db().execute(f'''
+        SELECT dh.evaluation_session AS design_session, u.user_name AS evaluator_name,
+               d.control_code, d.control_name, d.key_control,
+               l.sample_size, l.exception_count, l.test_result, l.test_procedure,
+               l.findings, l.population_count, l.evaluation_date
+        FROM ca_operation_evaluation_header h
+        JOIN ca_design_evaluation_header dh ON dh.header_id = h.design_header_id
+        LEFT JOIN ca_user u ON u.user_id = h.user_id
+        JOIN ca_rcm_detail d ON d.rcm_id = h.rcm_id
+        LEFT JOIN ca_operation_evaluation_line l
+               ON l.header_id = h.header_id AND l.control_code = d.control_code
+        WHERE {' AND '.join(conditions)}
+        ORDER BY h.start_date, h.header_id, d.control_code
+    ''', params)
+
+
+def get_design_header_id(conn, rcm_id, design_session):
+    """설계평가 세션의 헤더 ID, 없으면 None"""
+    design_header = conn.execute('''
+        SELECT header_id FROM ca_design_evaluation_header
+        WHERE rcm_id = ? AND evaluation_session = ?
+    ''', (rcm_id, design_session)).fetchone()
+    return design_header['header_id'] if design_header else None
+
+
+def get_or_create_operation_header(conn, rcm_id, user_id, design_session):
+    """설계평가 세션 기준 사용자 운영평가 헤더 ID 조회 (없으면 생성, 호출한 쪽 트랜잭션)"""
+    design_header_id = get_design_header_id(conn, rcm_id, design_session)
+    if design_header_id is None:
+        raise ValueError('설계평가 세션을 찾을 수 없습니다.')
+
+    # 운영평가 헤더 조회 또는 생성
+    operation_header = conn.execute('''
+        SELECT header_id FROM ca_operation_evaluation_header
+        WHERE design_header_id = ? AND user_id = ?
+    ''', (design_header_id, user_id)).fetchone()
+
+    if operation_header:
+        return operation_header['header_id']
+
+    cursor = conn.execute('''
+        INSERT INTO ca_operation_evaluation_header
+        (rcm_id, design_header_id, user_id, evaluation_status, total_controls)
+        VALUES (?, ?, ?, 'IN_PROGRESS', (SELECT COUNT(*) FROM ca_rcm_detail WHERE rcm_id = ?))
+    ''', (rcm_id, design_header_id, user_id, rcm_id))
+    return cursor.lastrowid
+
+
+def get_or_create_operation_line(conn, rcm_id, user_id, design_session, control_code):
+    """운영평가 라인 ID 조회 (헤더/라인이 없으면 빈 라인 생성, 호출한 쪽 트랜잭션)"""
+    header_id = get_or_create_operation_header(conn, rcm_id, user_id, design_session)
+    line = conn.execute('''
+        SELECT line_id FROM ca_operation_evaluation_line WHERE header_id = ? AND control_code = ?
+    ''', (header_id, control_code)).fetchone()
+    if line:
+        return line['line_id']
+    return conn.execute('''
+        INSERT INTO ca_operation_evaluation_line (header_id, control_code) VALUES (?, ?)
+    ''', (header_id, control_code)).lastrowid
+
+
 def save_operation_evaluation_data(rcm_id, control_code, user_id, design_session, evaluation_data):
     """운영평가 데이터 저장"""
     with get_db() as conn:
-        # 설계평가 헤더 ID 조회
-        design_header = conn.execute('''
-            SELECT header_id FROM ca_design_evaluation_header
-            WHERE rcm_id = ? AND evaluation_session = ?
-        ''', (rcm_id, design_session)).fetchone()
-
-        if not design_header:
-            raise ValueError('설계평가 세션을 찾을 수 없습니다.')
-
-        design_header_id = design_header['header_id']
-
-        # 운영평가 헤더 조회 또는 생성
-        operation_header = conn.execute('''
-            SELECT header_id FROM ca_operation_evaluation_header
-            WHERE design_header_id = ? AND user_id = ?
-        ''', (design_header_id, user_id)).fetchone()
-
-        if not operation_header:
-            # 헤더 생성
-            cursor = conn.execute('''
-                INSERT INTO ca_operation_evaluation_header
-                (rcm_id, design_header_id, user_id, evaluation_status)
-                VALUES (?, ?, ?, 'IN_PROGRESS')
-            ''', (rcm_id, design_header_id, user_id))
-            operation_header_id = cursor.lastrowid
-        else:
-            operation_header_id = operation_header['header_id']
+        operation_header_id = get_or_create_operation_header(conn, rcm_id, user_id, design_session)
 
         # 라인 데이터 저장
         existing = conn.execute('''
@@ -248,4 +553,6 @@ def save_operation_evaluation_data(rcm_id, control_code, user_id, design_session
                 evaluation_data.get('findings')
             ))
 
+        refresh_dashboard_rollup(conn, 'OPERATION', operation_header_id)
+        bump_rcm_revision(conn, rcm_id)
         conn.commit()
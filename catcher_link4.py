@@ -0,0 +1,247 @@
+"""
+Catcher Link 4: 대시보드
+설계/운영평가 결과 집계 (ca_dashboard_rollup) 및 대시보드 API
+
+평가 저장 경로(설계평가/운영평가)가 같은 트랜잭션에서 refresh_dashboard_rollup()을 호출해
+해당 평가 헤더(세션) 행만 다시 계산하고, 대시보드는 집계 테이블만 조회한다.
+RCM별 대표 세션(is_latest)은 가장 나중에 시작된 세션(헤더)이며, 저장 순서와 무관하다.
+통제가 추가 업로드되면 refresh_rcm_dashboard()로 헤더 통제 수와 해당 RCM 집계를 다시 계산한다.
+"""
+
+import click
+from flask import Blueprint, request, jsonify, render_template, session
+from flask.cli import with_appcontext
+from catcher_auth import (
+    login_required, get_current_user, get_user_authorization,
+    log_user_activity, get_db
+)
+
+bp_link4 = Blueprint('dashboard', __name__, url_prefix='/dashboard')
+
+# 평가 유형별 (헤더 테이블, 라인 테이블, 결론 컬럼, 예외 건수 컬럼)
+ROLLUP_SOURCES = {
+    'DESIGN': ('ca_design_evaluation_header', 'ca_design_evaluation_line', 'overall_effectiveness', None),
+    'OPERATION': ('ca_operation_evaluation_header', 'ca_operation_evaluation_line', 'test_result', 'exception_count'),
+}
+
+# 결론 값 분류 (대소문자 무시), 그 외 값은 비효과적으로 본다
+EFFECTIVE_RESULTS = ('EFFECTIVE', '효과적')
+UNTESTED_RESULTS = ('NOT_TESTED', '미테스트')
+
+# 대시보드 집계 기준
+ROLLUP_GROUPS = {
+    'company': ('company_name',),
+    'category': ('control_category',),
+    'rcm': ('company_name', 'control_category', 'rcm_id', 'rcm_name', 'evaluation_session'),
+}
+
+
+def get_user_info():
+    """현재 로그인한 사용자 정보 반환"""
+    return get_current_user()
+
+
+def is_logged_in():
+    """로그인 상태 확인"""
+    return 'user_info' in session
+
+
+def _header_session_sql(evaluation_type):
+    """헤더의 세션명 컬럼 (운영평가는 기반 설계평가 세션명)"""
+    if evaluation_type == 'OPERATION':
+        return '''(SELECT dh.evaluation_session FROM ca_design_evaluation_header dh
+                   WHERE dh.header_id = h.design_header_id)'''
+    return 'h.evaluation_session'
+
+
+def refresh_dashboard_rollup(conn, evaluation_type, header_id):
+    """평가 헤더 1건의 대시보드 집계 갱신 (호출한 쪽 트랜잭션 안에서 실행)"""
+    header_table, line_table, column, exception_column = ROLLUP_SOURCES[evaluation_type]
+    placeholders = ', '.join('?' for _ in EFFECTIVE_RESULTS)
+    untested_placeholders = ', '.join('?' for _ in UNTESTED_RESULTS)
+    exception_sql = f'COALESCE(SUM(l.{exception_column}), 0)' if exception_column else '0'
+
+    header = conn.execute(f'''
+        SELECT h.header_id, h.rcm_id, h.total_controls, h.progress_percentage,
+               {_header_session_sql(evaluation_type)} AS evaluation_session,
+               r.rcm_name, r.control_category, COALESCE(u.company_name, '') AS company_name
+        FROM {header_table} h
+        JOIN ca_rcm r ON r.rcm_id = h.rcm_id
+        LEFT JOIN ca_user u ON u.user_id = r.upload_user_id
+        WHERE h.header_id = ?
+    ''', (header_id,)).fetchone()
+    if not header:
+        return
+
+    counts = conn.execute(f'''
+        SELECT
+            COALESCE(SUM(UPPER(l.{column}) IN ({placeholders})), 0) AS effective_count,
+            COALESCE(SUM(l.{column} IS NOT NULL AND l.{column} != ''
+                         AND UPPER(l.{column}) NOT IN ({placeholders})
+                         AND UPPER(l.{column}) NOT IN ({untested_placeholders})), 0) AS ineffective_count,
+            {exception_sql} AS exception_total
+        FROM {line_table} l
+        WHERE l.header_id = ?
+    ''', (*EFFECTIVE_RESULTS, *EFFECTIVE_RESULTS, *UNTESTED_RESULTS, header_id)).fetchone()
+
+    total = header['total_controls'] or 0
+    untested = max(total - counts['effective_count'] - counts['ineffective_count'], 0)
+
+    conn.execute('''
+        INSERT INTO ca_dashboard_rollup (
+            evaluation_type, header_id, rcm_id, rcm_name, control_category, company_name,
+            evaluation_session, total_controls, effective_count, ineffective_count,
+            untested_count, exception_total, progress_percentage, is_latest, last_updated
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 1, CURRENT_TIMESTAMP)
+        ON CONFLICT(evaluation_type, header_id) DO UPDATE SET
+            rcm_name = excluded.rcm_name,
+            control_category = excluded.control_category,
+            company_name = excluded.company_name,
+            evaluation_session = excluded.evaluation_session,
+            total_controls = excluded.total_controls,
+            effective_count = excluded.effective_count,
+            ineffective_count = excluded.ineffective_count,
+            untested_count = excluded.untested_count,
+            exception_total = excluded.exception_total,
+            progress_percentage = excluded.progress_percentage,
+            last_updated = CURRENT_TIMESTAMP
+    ''', (
+        evaluation_type, header_id, header['rcm_id'], header['rcm_name'],
+        header['control_category'], header['company_name'], header['evaluation_session'],
+        total, counts['effective_count'], counts['ineffective_count'], untested,
+        counts['exception_total'], header['progress_percentage'] or 0
+    ))
+
+    # 해당 RCM에서 가장 나중에 시작된 세션을 최신 세션으로 표시 (평가자가 여럿이어도 저장할 때마다 바뀌지 않음)
+    conn.execute('''
+        UPDATE ca_dashboard_rollup
+        SET is_latest = (header_id = (
+            SELECT MAX(header_id) FROM ca_dashboard_rollup WHERE rcm_id = ? AND evaluation_type = ?
+        ))
+        WHERE rcm_id = ? AND evaluation_type = ?
+    ''', (header['rcm_id'], evaluation_type, header['rcm_id'], evaluation_type))
+
+
+def refresh_rcm_dashboard(conn, rcm_id):
+    """RCM 통제 수가 바뀐 뒤 헤더 진행률과 해당 RCM의 대시보드 집계 갱신"""
+    from catcher_progress import reconcile_evaluation_progress
+    reconcile_evaluation_progress(conn, rcm_id)
+    with conn:
+        for evaluation_type, (header_table, _, _, _) in ROLLUP_SOURCES.items():
+            header_ids = [row[0] for row in conn.execute(
+                f'SELECT header_id FROM {header_table} WHERE rcm_id = ?', (rcm_id,))]
+            for header_id in header_ids:
+                refresh_dashboard_rollup(conn, evaluation_type, header_id)
+
+
+def rebuild_dashboard_rollup(conn):
+    """전체 대시보드 집계 재생성 (초기 적재 및 진행률 재계산 후 사용), 갱신된 헤더 수 반환"""
+    rebuilt = 0
+    with conn:
+        conn.execute('DELETE FROM ca_dashboard_rollup')
+        for evaluation_type, (header_table, _, _, _) in ROLLUP_SOURCES.items():
+            header_ids = [row[0] for row in conn.execute(
+                f'SELECT header_id FROM {header_table} ORDER BY last_updated, header_id'
+            )]
+            for header_id in header_ids:
+                refresh_dashboard_rollup(conn, evaluation_type, header_id)
+            rebuilt += len(header_ids)
+    return rebuilt
+
+
+def get_dashboard_summary(user_id, evaluation_type='OPERATION', group_by='category',
+                          company_name=None, control_category=None):
+    """대시보드 집계 조회 (권한 있는 활성 RCM, RCM별 최신 세션 기준)"""
+    group_columns = [f'd.{column}' for column in ROLLUP_GROUPS[group_by]]
+    conditions = ['d.evaluation_type = ?', 'd.is_latest = 1']
+    params = [evaluation_type]
+
+    if company_name:
+        conditions.append('d.company_name = ?')
+        params.append(company_name)
+    if control_category:
+        conditions.append('d.control_category = ?')
+        params.append(control_category)
+
+    authorization = get_user_authorization(user_id)
+    if not authorization['is_admin']:
+        rcm_ids = sorted(authorization['rcm_ids'])
+        if not rcm_ids:
+            return []
+        conditions.append(f"d.rcm_id IN ({', '.join('?' for _ in rcm_ids)})")
+        params.extend(rcm_ids)
+
+    group_sql = ', '.join(group_columns)
+    rows = get_db().execute(f'''
+        SELECT {group_sql},
+               COUNT(*) AS rcm_count,
+               SUM(d.total_controls) AS total_controls,
+               SUM(d.effective_count) AS effective_count,
+               SUM(d.ineffective_count) AS ineffective_count,
+               SUM(d.untested_count) AS untested_count,
+               SUM(d.exception_total) AS exception_total,
+               CASE WHEN SUM(d.total_controls) > 0
+                    THEN ROUND(SUM(d.effective_count + d.ineffective_count) * 100.0 / SUM(d.total_controls), 1)
+                    ELSE 0 END AS progress_percentage,
+               CASE WHEN SUM(d.effective_count + d.ineffective_count) > 0
+                    THEN ROUND(SUM(d.effective_count) * 100.0 / SUM(d.effective_count + d.ineffective_count), 1)
+                    ELSE NULL END AS effective_ratio
+        FROM ca_dashboard_rollup d
+        JOIN ca_rcm r ON r.rcm_id = d.rcm_id AND r.is_active = 'Y'
+        WHERE {' AND '.join(conditions)}
+        GROUP BY {group_sql}
+        ORDER BY {group_sql}
+    ''', params).fetchall()
+    return [dict(row) for row in rows]
+
+
+@bp_link4.route('/')
+@login_required
+def dashboard():
+    """통합 대시보드"""
+    user_info = get_user_info()
+
+    log_user_activity(user_info, 'PAGE_ACCESS', '대시보드',
+                     '/dashboard/', request.remote_addr,
+                     request.headers.get('User-Agent'))
+
+    return render_template('dashboard.html',
+                         is_logged_in=is_logged_in(),
+                         user_info=user_info)
+
+
+@bp_link4.route('/api/summary')
+@login_required
+def dashboard_summary_api():
+    """대시보드 집계 API
+
+    쿼리 파라미터: evaluation_type(DESIGN/OPERATION), group_by(company/category/rcm),
+    company_name, control_category
+    """
+    user_info = get_user_info()
+
+    evaluation_type = request.args.get('evaluation_type', 'OPERATION').upper()
+    group_by = request.args.get('group_by', 'category')
+    if evaluation_type not in ROLLUP_SOURCES or group_by not in ROLLUP_GROUPS:
+        return jsonify({'success': False, 'message': '잘못된 조회 조건입니다.'}), 400
+
+    summary = get_dashboard_summary(
+        user_info['user_id'], evaluation_type, group_by,
+        company_name=request.args.get('company_name') or None,
+        control_category=request.args.get('control_category') or None
+    )
+
+    return jsonify({
+        'success': True,
+        'evaluation_type': evaluation_type,
+        'group_by': group_by,
+        'summary': summary
+    })
+
+
+@click.command('rebuild-dashboard')
+@with_appcontext
+def rebuild_dashboard_command():
+    """대시보드 집계 테이블 전체 재생성"""
+    rebuilt = rebuild_dashboard_rollup(get_db())
+    click.echo(f'✓ 대시보드 집계 재생성: {rebuilt}개 평가 세션')
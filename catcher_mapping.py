@@ -0,0 +1,288 @@
+"""
+Catcher Standard Control Mapping
+RCM 통제를 표준 통제 라이브러리(ca_standard_control)에 자동 매핑
+
+표준 통제 텍스트(통제명, 설명, 위험)로 문자 n-gram TF-IDF 행렬을 한 번 만들고,
+표준 통제 테이블 내용의 해시를 키로 디스크(.npz)와 프로세스 메모리에 캐시한다.
+RCM 통제는 chunk 단위로 같은 어휘의 벡터로 바꾼 뒤 행렬 곱 한 번으로 모든 표준 통제와의
+코사인 유사도를 계산하고, 상위 k개 후보를 ca_rcm_standard_mapping에 일괄 기록한다.
+
+한글은 띄어쓰기/조사 변형이 많아 단어 대신 단어 경계 문자 2~3-gram을 쓴다.
+어휘에 없는 n-gram도 벡터 길이에는 포함해, 표준 통제에 없는 내용이 많을수록 신뢰도가 낮아진다.
+
+환경 변수:
+- CATCHER_MAPPING_CACHE_DIR: 표준 통제 행렬 캐시 폴더 (기본: 시스템 임시 폴더/catcher_mapping)
+- CATCHER_MAPPING_MAX_FEATURES: 어휘 최대 크기 (기본: 20000)
+- CATCHER_MAPPING_TOP_K: 통제별 후보 수 (기본: 3)
+- CATCHER_MAPPING_MIN_CONFIDENCE: 후보로 기록할 최소 유사도 x100 (기본: 20)
+- CATCHER_MAPPING_ACCEPT_CONFIDENCE: 자동 확정(AUTO) 유사도 x100, 미만은 REVIEW (기본: 60)
+"""
+
+import hashlib
+import math
+import os
+import re
+import tempfile
+import threading
+from collections import Counter
+import click
+import numpy as np
+from flask.cli import with_appcontext
+from catcher_auth import get_db, bump_rcm_revision
+from catcher_completeness import refresh_completeness
+from catcher_db import env_int
+
+ENGINE_VERSION = 'char-wb-2-3-v1'  # 벡터화 방식이 바뀌면 올려서 디스크 캐시 무효화
+NGRAM_SIZES = (2, 3)
+CHUNK_SIZE = 256
+STANDARD_TEXT_FIELDS = ('control_name', 'control_description', 'risk_description')
+
+_WHITESPACE_RE = re.compile(r'\s+')
+_index_memo = {}
+_index_lock = threading.Lock()
+
+
+def control_text(*parts):
+    """매핑에 쓰는 통제 텍스트 (소문자, 공백 정리)"""
+    return _WHITESPACE_RE.sub(' ', ' '.join(part for part in parts if part).lower()).strip()
+
+
+def char_ngrams(text):
+    """단어 경계 문자 n-gram 빈도"""
+    grams = Counter()
+    for word in text.split(' '):
+        padded = f' {word} '
+        for size in NGRAM_SIZES:
+            for start in range(len(padded) - size + 1):
+                grams[padded[start:start + size]] += 1
+    return grams
+
+
+class StandardControlIndex:
+    """표준 통제 TF-IDF 행렬 (행: 표준 통제, L2 정규화)"""
+
+    def __init__(self, std_ids, vocabulary, idf, matrix, document_count):
+        self.std_ids = std_ids
+        self.vocabulary = vocabulary
+        self.term_index = {term: j for j, term in enumerate(vocabulary)}
+        self.idf = idf
+        self.matrix = matrix
+        self.document_count = document_count
+        # 어휘에 없는 n-gram의 idf (문서 빈도 0)
+        self.unseen_idf = math.log((1 + document_count) / 1) + 1
+
+    @classmethod
+    def build(cls, std_ids, texts, max_features):
+        documents = [char_ngrams(text) for text in texts]
+        document_frequency = Counter()
+        for grams in documents:
+            document_frequency.update(grams.keys())
+        vocabulary = sorted(document_frequency, key=lambda term: (-document_frequency[term], term))[:max_features]
+
+        n = len(documents)
+        idf = np.array([math.log((1 + n) / (1 + document_frequency[term])) + 1 for term in vocabulary],
+                       dtype=np.float32)
+        index = cls(np.array(std_ids, dtype=np.int64), vocabulary, idf,
+                    np.zeros((n, len(vocabulary)), dtype=np.float32), n)
+        for row, grams in enumerate(documents):
+            for term, count in grams.items():
+                column = index.term_index.get(term)
+                if column is not None:
+                    index.matrix[row, column] = (1 + math.log(count)) * idf[column]
+        norms = np.linalg.norm(index.matrix, axis=1, keepdims=True)
+        np.divide(index.matrix, norms, out=index.matrix, where=norms > 0)
+        return index
+
+    def vectorize(self, texts):
+        """통제 텍스트 목록을 (len(texts) × 어휘) 행렬로 변환 (어휘 밖 n-gram도 길이에 포함)"""
+        vectors = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            unseen_square = 0.0
+            for term, count in char_ngrams(text).items():
+                weight = 1 + math.log(count)
+                column = self.term_index.get(term)
+                if column is None:
+                    unseen_square += (weight * self.unseen_idf) ** 2
+                else:
+                    vectors[row, column] = weight * self.idf[column]
+            norm = math.sqrt(float(np.dot(vectors[row], vectors[row])) + unseen_square)
+            if norm:
+                vectors[row] /= norm
+        return vectors
+
+    def top_candidates(self, texts, top_k):
+        """텍스트별 상위 k개 (표준 통제 ID, 유사도) 목록"""
+        if not len(self.std_ids):
+            return [[] for _ in texts]
+        scores = self.vectorize(texts) @ self.matrix.T  # (통제 수 × 표준 통제 수)
+        k = min(top_k, scores.shape[1])
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, columns in enumerate(top):
+            ordered = sorted(columns, key=lambda column: -scores[row, column])
+            results.append([(int(self.std_ids[column]), float(scores[row, column])) for column in ordered])
+        return results
+
+    def save(self, path):
+        """.npz로 원자적 저장"""
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as fileobj:
+            np.savez(fileobj, std_ids=self.std_ids, vocabulary=np.array(self.vocabulary, dtype=str),
+                     idf=self.idf, matrix=self.matrix, document_count=np.array(self.document_count))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as data:
+            return cls(data['std_ids'], data['vocabulary'].tolist(), data['idf'], data['matrix'],
+                       int(data['document_count']))
+
+
+def _cache_dir():
+    return os.getenv('CATCHER_MAPPING_CACHE_DIR') or os.path.join(tempfile.gettempdir(), 'catcher_mapping')
+
+
+def get_standard_index(conn):
+    """표준 통제 인덱스 (테이블 해시 기준 메모리 → 디스크 캐시 → 새로 생성)"""
+    max_features = env_int('CATCHER_MAPPING_MAX_FEATURES', 20000)
+    rows = conn.execute(f'''
+        SELECT std_control_id, {', '.join(STANDARD_TEXT_FIELDS)}
+        FROM ca_standard_control WHERE is_active = 'Y' ORDER BY std_control_id
+    ''').fetchall()
+
+    digest = hashlib.sha256(f'{ENGINE_VERSION}:{max_features}'.encode('utf-8'))
+    for row in rows:
+        digest.update('\x1f'.join(str(value or '') for value in row).encode('utf-8'))
+        digest.update(b'\x1e')
+    key = digest.hexdigest()
+
+    with _index_lock:
+        index = _index_memo.get(key)
+        if index is not None:
+            return index
+
+        path = os.path.join(_cache_dir(), f'std_index_{key[:32]}.npz')
+        if os.path.exists(path):
+            index = StandardControlIndex.load(path)
+        else:
+            index = StandardControlIndex.build([row[0] for row in rows],
+                                               [control_text(*row[1:]) for row in rows], max_features)
+            os.makedirs(_cache_dir(), exist_ok=True)
+            index.save(path)
+        _index_memo.clear()  # 표준 통제가 바뀌면 이전 인덱스는 버림
+        _index_memo[key] = index
+        return index
+
+
+def map_rcm_controls(conn, rcm_id, top_k=None, min_confidence=None, accept_confidence=None):
+    """RCM 통제 자동 매핑 (MANUAL로 지정된 통제 제외)
+
+    반환: {'controls', 'auto', 'review', 'unmapped'}
+    """
+    top_k = top_k or env_int('CATCHER_MAPPING_TOP_K', 3)
+    if min_confidence is None:
+        min_confidence = env_int('CATCHER_MAPPING_MIN_CONFIDENCE', 20) / 100
+    if accept_confidence is None:
+        accept_confidence = env_int('CATCHER_MAPPING_ACCEPT_CONFIDENCE', 60) / 100
+
+    summary = {'controls': 0, 'auto': 0, 'review': 0, 'unmapped': 0}
+    index = get_standard_index(conn)
+    if not len(index.std_ids):
+        return summary
+
+    details = conn.execute('''
+        SELECT detail_id, control_name, control_description, risk_description
+        FROM ca_rcm_detail
+        WHERE rcm_id = ? AND (mapping_status IS NULL OR mapping_status != 'MANUAL')
+        ORDER BY detail_id
+    ''', (rcm_id,)).fetchall()
+
+    with conn:
+        for start in range(0, len(details), CHUNK_SIZE):
+            chunk = details[start:start + CHUNK_SIZE]
+            candidates = index.top_candidates([control_text(*row[1:]) for row in chunk], top_k)
+
+            mapping_rows = []
+            detail_updates = []
+            for row, scored in zip(chunk, candidates):
+                scored = [(std_id, score) for std_id, score in scored if score >= min_confidence]
+                mapping_rows.extend((row[0], std_id, rank, round(score, 4))
+                                    for rank, (std_id, score) in enumerate(scored, start=1))
+                if not scored:
+                    status, best = 'UNMAPPED', None
+                else:
+                    status = 'AUTO' if scored[0][1] >= accept_confidence else 'REVIEW'
+                    best = scored[0][0]
+                summary[status.lower()] += 1
+                detail_updates.append((best, status, row[0]))
+
+            conn.executemany('DELETE FROM ca_rcm_standard_mapping WHERE detail_id = ?',
+                             [(row[0],) for row in chunk])
+            conn.executemany('''
+                INSERT INTO ca_rcm_standard_mapping (detail_id, std_control_id, candidate_rank, mapping_confidence)
+                VALUES (?, ?, ?, ?)
+            ''', mapping_rows)
+            conn.executemany('''
+                UPDATE ca_rcm_detail
+                SET mapped_std_control_id = ?, mapping_status = ?, mapped_date = CURRENT_TIMESTAMP
+                WHERE detail_id = ?
+            ''', detail_updates)
+            summary['controls'] += len(chunk)
+        if summary['controls']:
+            bump_rcm_revision(conn, rcm_id, details=True)
+    return summary
+
+
+def upsert_standard_controls(conn, controls):
+    """표준 통제 추가/갱신 (control_code 기준), 처리 건수 반환"""
+    rows = [(c['control_code'], c.get('control_name') or c['control_code'], c.get('control_description'),
+             c.get('control_category'), c.get('process_area'), c.get('risk_description'))
+            for c in controls if c.get('control_code')]
+    with conn:
+        conn.executemany('''
+            INSERT INTO ca_standard_control
+                (control_code, control_name, control_description, control_category, process_area, risk_description)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(control_code) DO UPDATE SET
+                control_name = excluded.control_name,
+                control_description = excluded.control_description,
+                control_category = excluded.control_category,
+                process_area = excluded.process_area,
+                risk_description = excluded.risk_description,
+                is_active = 'Y'
+        ''', rows)
+    return len(rows)
+
+
+@click.command('import-standard-controls')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@with_appcontext
+def import_standard_controls_command(path):
+    """표준 통제 Excel 적재 (RCM 업로드와 같은 컬럼 자동 매핑)"""
+    from catcher_excel import RcmSheetReader
+    from catcher_link1 import perform_auto_mapping
+    with RcmSheetReader(path) as reader:
+        controls = list(reader.iter_controls(perform_auto_mapping(reader.headers)))
+    count = upsert_standard_controls(get_db(), controls)
+    click.echo(f'✓ 표준 통제 적재: {count}개')
+    # 첫 적재면 매핑률이 점수에 들어가므로 기존 완전성 결과를 다시 계산
+    refreshed = refresh_completeness(get_db())
+    if refreshed:
+        click.echo(f'✓ 완전성 평가: {refreshed}개 RCM 다시 계산')
+
+
+@click.command('map-controls')
+@click.option('--rcm-id', type=int, help='매핑할 RCM ID (없으면 활성 RCM 전체)')
+@click.option('--top-k', type=int, default=None, help='통제별 후보 수')
+@with_appcontext
+def map_controls_command(rcm_id, top_k):
+    """RCM 통제를 표준 통제에 자동 매핑"""
+    db = get_db()
+    if rcm_id:
+        rcm_ids = [rcm_id]
+    else:
+        rcm_ids = [row[0] for row in db.execute("SELECT rcm_id FROM ca_rcm WHERE is_active = 'Y' ORDER BY rcm_id")]
+    for target in rcm_ids:
+        summary = map_rcm_controls(db, target, top_k=top_k)
+        click.echo(f"✓ RCM {target}: 통제 {summary['controls']}개 "
+                   f"(자동 {summary['auto']}, 검토 {summary['review']}, 미매핑 {summary['unmapped']})")
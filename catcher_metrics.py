@@ -0,0 +1,457 @@
+"""
+Catcher Metrics
+의존성 없는 메트릭 레지스트리 (counter, gauge, 고정 bucket histogram) 및 /metrics 노출
+
+/metrics는 Prometheus 텍스트 형식(0.0.4)으로 응답하며, 관리자 세션이거나
+CATCHER_METRICS_TOKEN과 같은 Bearer 토큰(Authorization 헤더)이 있을 때만 허용한다.
+같은 호스트의 리버스 프록시 뒤에서는 모든 요청이 127.0.0.1로 들어오므로 접속 주소는 보지 않는다.
+
+요청 수/지연(엔드포인트별), DB 연결 풀, 활동 로그 큐, 업로드 작업, 캐시 적중률을 노출한다.
+풀/큐/캐시 값은 수집 시점에 각 모듈의 stats()를 읽어 만든다.
+
+WSGI 워커가 여러 개이면 CATCHER_METRICS_DB에 SQLite 파일 경로를 지정한다.
+각 프로세스는 자신의 누적 값을 요청 종료 시 CATCHER_METRICS_FLUSH_SECONDS 간격으로
+pid별 행에 기록하고, /metrics는 모든 프로세스의 행을 합쳐 노출한다.
+counter/histogram은 합산하고, gauge는 pid 라벨을 붙여 최근 기록한 프로세스 값만 노출한다.
+
+환경 변수:
+- CATCHER_METRICS: 0이면 요청 메트릭 수집 안 함 (기본: 1)
+- CATCHER_METRICS_DB: 멀티 프로세스 집계용 SQLite 파일 경로 (기본: 없음, 프로세스 단독)
+- CATCHER_METRICS_FLUSH_SECONDS: 멀티 프로세스 기록 주기(초) (기본: 5)
+- CATCHER_METRICS_TOKEN: 수집기(Prometheus 등)용 Bearer 토큰 (기본: 없음, 관리자 세션만 허용)
+"""
+
+import atexit
+import hmac
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from flask import abort, g, request, session
+from catcher_db import env_int
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class _Metric:
+    """라벨 값 조합별 값을 가진 메트릭 공통 부분"""
+
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames) or any(n not in labels for n in self.labelnames):
+            raise ValueError(f'{self.name} 라벨이 맞지 않습니다: {sorted(labels)}')
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _items(self):
+        with self._lock:
+            return [(dict(zip(self.labelnames, key)), value) for key, value in self._values.items()]
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def collect(self):
+        """(이름, 종류, 설명, [(sample 이름, 라벨, 값)])"""
+        return self.name, self.kind, self.help, [(self.name, labels, value) for labels, value in self._items()]
+
+
+class Counter(_Metric):
+    """증가만 하는 누적 값"""
+
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if amount < 0:
+            raise ValueError('counter는 감소할 수 없습니다')
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    """임의로 설정하는 현재 값"""
+
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """고정 bucket 분포 (bucket별 개수, 합계, 개수)"""
+
+    kind = 'histogram'
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        if 'le' in labelnames:
+            raise ValueError('histogram에는 le 라벨을 쓸 수 없습니다')
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)  # value <= 상한인 첫 bucket, 없으면 +Inf
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def collect(self):
+        with self._lock:
+            items = [(dict(zip(self.labelnames, key)), list(counts), total, count)
+                     for key, (counts, total, count) in self._values.items()]
+        samples = []
+        for labels, counts, total, count in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((self.name + '_bucket', dict(labels, le=_format_value(bound)), cumulative))
+            samples.append((self.name + '_sum', labels, total))
+            samples.append((self.name + '_count', labels, count))
+        return self.name, self.kind, self.help, samples
+
+
+class MetricsRegistry:
+    """메트릭과 수집 함수(collector) 모음"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, cls, name, help_text, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f'{name} 메트릭이 다른 형태로 이미 등록되어 있습니다')
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._register(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._register(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def register_collector(self, collector):
+        """수집 시점에 family 목록을 반환하는 함수 등록"""
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def collect(self):
+        """전체 family 목록 [(이름, 종류, 설명, samples)]"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        families = [metric.collect() for metric in metrics]
+        for collector in collectors:
+            families.extend(collector())
+        return families
+
+    def reset(self):
+        """메트릭 값 초기화 (fork된 자식 프로세스, 테스트용)"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        for metric in metrics:
+            metric.reset()
+
+
+def family(name, help_text, kind, values):
+    """collector용 family 생성, values는 [(라벨 dict, 값)]"""
+    return name, kind, help_text, [(name, labels, value) for labels, value in values]
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels.items()) + '}'
+
+
+def render_text(families):
+    """family 목록을 텍스트 노출 형식으로 변환"""
+    lines = []
+    for name, kind, help_text, samples in families:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample_name, labels, value in samples:
+            lines.append(f'{sample_name}{_format_labels(labels)} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class SqliteMetricsStore:
+    """여러 워커 프로세스의 메트릭 값을 모으는 SQLite 파일"""
+
+    def __init__(self, path, stale_after=60):
+        self.path = path
+        self.stale_after = stale_after
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5)
+        conn.execute('PRAGMA journal_mode = WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS metric_sample (
+                pid INTEGER NOT NULL,
+                family TEXT NOT NULL,
+                sample TEXT NOT NULL,
+                labels TEXT NOT NULL,
+                value REAL NOT NULL,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (pid, sample, labels)
+            )
+        ''')
+        return conn
+
+    def write(self, pid, families):
+        """프로세스의 현재 값 전체 기록 (pid별 덮어쓰기)"""
+        now = time.time()
+        rows = [(pid, name, sample_name, json.dumps(labels, sort_keys=True), value, now)
+                for name, _, _, samples in families
+                for sample_name, labels, value in samples]
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO metric_sample (pid, family, sample, labels, value, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(pid, sample, labels) DO UPDATE SET
+                        value = excluded.value, updated_at = excluded.updated_at
+                ''', rows)
+        finally:
+            conn.close()
+
+    def merge(self, families):
+        """모든 프로세스의 값을 합친 family 목록 (설명/종류는 현재 프로세스 정의 사용)"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT pid, family, sample, labels, value, updated_at FROM metric_sample ORDER BY sample, labels, pid'
+            ).fetchall()
+        finally:
+            conn.close()
+
+        stale_before = time.time() - self.stale_after
+        merged = {name: {} for name, _, _, _ in families}
+        kinds = {name: kind for name, kind, _, _ in families}
+        for pid, name, sample_name, labels_json, value, updated_at in rows:
+            if name not in merged:
+                continue
+            labels = json.loads(labels_json)
+            if kinds[name] == 'gauge':
+                if updated_at < stale_before:
+                    continue  # 종료된 워커의 gauge는 노출하지 않음
+                labels['pid'] = str(pid)
+                key = (sample_name, json.dumps(labels, sort_keys=True))
+                merged[name][key] = (sample_name, labels, value)
+            else:
+                key = (sample_name, labels_json)
+                previous = merged[name].get(key)
+                merged[name][key] = (sample_name, labels, value + (previous[2] if previous else 0))
+        return [(name, kind, help_text, list(merged[name].values()))
+                for name, kind, help_text, _ in families]
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUESTS = REGISTRY.counter(
+    'catcher_http_requests_total', '엔드포인트별 요청 수', ('endpoint', 'method', 'status'))
+HTTP_REQUEST_DURATION = REGISTRY.histogram(
+    'catcher_http_request_duration_seconds', '엔드포인트별 요청 처리 시간(초)', ('endpoint',))
+
+_flush_lock = threading.Lock()
+_last_flush = 0.0
+_store = None
+
+
+def get_store():
+    """CATCHER_METRICS_DB가 설정되어 있으면 멀티 프로세스 저장소, 아니면 None"""
+    global _store
+    path = os.getenv('CATCHER_METRICS_DB')
+    if not path:
+        return None
+    if _store is None or _store.path != path:
+        _store = SqliteMetricsStore(path, stale_after=max(60, 3 * env_int('CATCHER_METRICS_FLUSH_SECONDS', 5)))
+    return _store
+
+
+def flush_metrics(force=False):
+    """멀티 프로세스 모드에서 현재 프로세스 값을 저장소에 기록 (주기가 지났거나 force일 때)"""
+    global _last_flush
+    store = get_store()
+    if store is None:
+        return False
+    now = time.monotonic()
+    with _flush_lock:
+        if not force and now - _last_flush < env_int('CATCHER_METRICS_FLUSH_SECONDS', 5):
+            return False
+        _last_flush = now
+    store.write(os.getpid(), REGISTRY.collect())
+    return True
+
+
+def generate_latest():
+    """노출할 텍스트 (멀티 프로세스 모드이면 모든 워커 합산)"""
+    store = get_store()
+    if store is None:
+        return render_text(REGISTRY.collect())
+    flush_metrics(force=True)
+    return render_text(store.merge(REGISTRY.collect()))
+
+
+def _reset_after_fork():
+    """fork된 자식은 부모 값을 이어받지 않고 0에서 시작"""
+    global _last_flush
+    REGISTRY.reset()
+    _last_flush = 0.0
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def _collect_db_pools():
+    from catcher_db import pool_stats
+    stats = [(os.path.basename(s['db_path']), s) for s in pool_stats()]
+    return [
+        family('catcher_db_pool_in_use', '사용 중인 DB 연결 수', 'gauge',
+               [({'db': db}, s['in_use']) for db, s in stats]),
+        family('catcher_db_pool_idle', '유휴 DB 연결 수', 'gauge',
+               [({'db': db}, s['idle']) for db, s in stats]),
+        family('catcher_db_pool_max_size', 'DB 연결 풀 최대 크기', 'gauge',
+               [({'db': db}, s['max_size']) for db, s in stats]),
+        family('catcher_db_pool_checkouts_total', 'DB 연결 획득 수', 'counter',
+               [({'db': db}, s['checkouts']) for db, s in stats]),
+        family('catcher_db_pool_waits_total', 'DB 연결 대기 발생 수', 'counter',
+               [({'db': db}, s['waits']) for db, s in stats]),
+        family('catcher_db_pool_wait_seconds_total', 'DB 연결 대기 시간 합계(초)', 'counter',
+               [({'db': db}, s['wait_time_ms'] / 1000.0) for db, s in stats]),
+        family('catcher_db_pool_timeouts_total', 'DB 연결 대기 시간 초과 수', 'counter',
+               [({'db': db}, s['timeouts']) for db, s in stats]),
+    ]
+
+
+def _collect_activity_log():
+    from catcher_activity import get_activity_writer
+    stats = get_activity_writer().stats()
+    families = [family('catcher_activity_queue_depth', '활동 로그 큐 길이', 'gauge',
+                       [({}, stats['queue_depth'])])]
+    for key in ('enqueued', 'written', 'dropped', 'failed'):
+        families.append(family(f'catcher_activity_{key}_total', f'활동 로그 {key} 건수', 'counter',
+                               [({}, stats[key])]))
+    return families
+
+
+def _collect_caches():
+    from catcher_cache import named_caches
+    stats = sorted((name, cache.stats()) for name, cache in named_caches().items())
+    return [
+        family('catcher_cache_hits_total', '캐시 적중 수', 'counter',
+               [({'cache': name}, s['hits']) for name, s in stats]),
+        family('catcher_cache_misses_total', '캐시 미스 수', 'counter',
+               [({'cache': name}, s['misses']) for name, s in stats]),
+        family('catcher_cache_evictions_total', '캐시 LRU 제거 수', 'counter',
+               [({'cache': name}, s['evictions']) for name, s in stats]),
+        family('catcher_cache_size', '캐시 항목 수', 'gauge',
+               [({'cache': name}, s['size']) for name, s in stats]),
+        family('catcher_cache_hit_ratio', '캐시 적중률 (프로세스 시작 이후)', 'gauge',
+               [({'cache': name}, s['hits'] / (s['hits'] + s['misses']) if s['hits'] + s['misses'] else 0)
+                for name, s in stats]),
+    ]
+
+
+REGISTRY.register_collector(_collect_db_pools)
+REGISTRY.register_collector(_collect_activity_log)
+REGISTRY.register_collector(_collect_caches)
+
+
+def _is_metrics_allowed():
+    """설정된 Bearer 토큰 또는 관리자 세션"""
+    token = os.getenv('CATCHER_METRICS_TOKEN')
+    if token:
+        scheme, _, value = request.headers.get('Authorization', '').partition(' ')
+        if scheme.lower() == 'bearer' and hmac.compare_digest(value.strip().encode(), token.encode()):
+            return True
+    user_id = session.get('user_id')
+    if not user_id:
+        return False
+    from catcher_auth import get_user_authorization
+    return get_user_authorization(user_id)['is_admin']
+
+
+def metrics_view():
+    """메트릭 텍스트 노출"""
+    if not _is_metrics_allowed():
+        abort(403)
+    return generate_latest(), 200, {'Content-Type': CONTENT_TYPE, 'Cache-Control': 'no-store'}
+
+
+def _start_request():
+    g.metrics_started = time.perf_counter()
+
+
+def _finish_request(response):
+    started = g.pop('metrics_started', None)
+    if started is not None:
+        endpoint = request.endpoint or 'unmatched'  # 없는 URL은 하나로 묶어 라벨 수 제한
+        HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+        HTTP_REQUEST_DURATION.observe(time.perf_counter() - started, endpoint=endpoint)
+        flush_metrics()
+    return response
+
+
+def init_metrics(app):
+    """/metrics 등록 및 (CATCHER_METRICS=1일 때) 요청 메트릭 훅 등록"""
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
+    if env_int('CATCHER_METRICS', 1) != 1:
+        return False
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    if get_store() is not None:
+        atexit.register(flush_metrics, True)
+    return True
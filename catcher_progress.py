@@ -0,0 +1,68 @@
+"""
+Catcher Evaluation Progress
+설계/운영평가 헤더 진행률 카운터 재계산
+
+평소에는 평가 라인 트리거(마이그레이션 20261018_004)가 카운터를 증감하며,
+RCM 통제가 다시 업로드되었거나 카운터가 어긋났을 때 전체를 한 번에 다시 계산한다.
+
+사용법: flask --app catcher reconcile-progress [--rcm-id N]
+"""
+
+import click
+from flask.cli import with_appcontext
+from catcher_auth import get_db, bump_rcm_revision
+
+# (헤더 테이블, 라인 테이블, 평가 완료로 보는 결론 컬럼)
+PROGRESS_TABLES = (
+    ('ca_design_evaluation_header', 'ca_design_evaluation_line', 'overall_effectiveness'),
+    ('ca_operation_evaluation_header', 'ca_operation_evaluation_line', 'test_result'),
+)
+
+
+def reconcile_evaluation_progress(conn, rcm_id=None):
+    """헤더의 total/evaluated/progress 카운터를 실제 데이터로 다시 계산
+
+    반환: {헤더 테이블: 값이 바뀐 헤더 수}
+    """
+    changed = {}
+    with conn:
+        for header_table, line_table, column in PROGRESS_TABLES:
+            before = conn.total_changes
+            conn.execute(f'''
+                WITH actual AS (
+                    SELECT h.header_id,
+                           (SELECT COUNT(*) FROM ca_rcm_detail d
+                            WHERE d.rcm_id = h.rcm_id) AS total_controls,
+                           (SELECT COUNT(*) FROM {line_table} l
+                            WHERE l.header_id = h.header_id
+                              AND l.{column} IS NOT NULL AND l.{column} != '') AS evaluated_controls
+                    FROM {header_table} h
+                    WHERE ? IS NULL OR h.rcm_id = ?
+                )
+                UPDATE {header_table}
+                SET total_controls = actual.total_controls,
+                    evaluated_controls = actual.evaluated_controls,
+                    progress_percentage = CASE WHEN actual.total_controls > 0
+                        THEN ROUND(actual.evaluated_controls * 100.0 / actual.total_controls, 1)
+                        ELSE 0 END
+                FROM actual
+                WHERE {header_table}.header_id = actual.header_id
+                  AND ({header_table}.total_controls IS NOT actual.total_controls
+                       OR {header_table}.evaluated_controls IS NOT actual.evaluated_controls)
+            ''', (rcm_id, rcm_id))
+            # CTE로 시작하는 UPDATE는 cursor.rowcount가 -1이므로 total_changes로 계산
+            changed[header_table] = conn.total_changes - before
+        # 진행률이 바뀌었으면 세션 목록 ETag 무효화
+        if any(changed.values()):
+            bump_rcm_revision(conn, rcm_id)
+    return changed
+
+
+@click.command('reconcile-progress')
+@click.option('--rcm-id', type=int, default=None, help='특정 RCM만 재계산')
+@with_appcontext
+def reconcile_progress_command(rcm_id):
+    """설계/운영평가 진행률 카운터 재계산"""
+    changed = reconcile_evaluation_progress(get_db(), rcm_id)
+    for header_table, count in changed.items():
+        click.echo(f'✓ {header_table}: {count}개 헤더 갱신')
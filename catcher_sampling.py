@@ -0,0 +1,305 @@
+"""
+Catcher Sampling
+운영평가 모집단 파일(CSV/XLSX) 표본 추출 (ca_operation_sample, 마이그레이션 20261018_012)
+
+모집단은 한 행씩 스트리밍으로 읽고 메모리에는 표본 크기만큼만 보관한다.
+모집단 파일은 증빙 저장소(catcher_evidence.py)에 저장되므로 같은 파일을 여러 통제에 올려도 한 번만 저장된다.
+- 무작위(random): reservoir sampling (Algorithm L) 한 번 통과, 건너뛸 행 수를 한 번에 뽑아 난수 호출을 줄인다.
+- 체계적(systematic): 모집단 수를 알아야 간격을 정할 수 있으므로 행 수를 세는 통과 + 추출 통과 (두 번 스트리밍).
+같은 파일, 방법, 시드, 표본 수면 항상 같은 표본이 나온다.
+손상되었거나 형식이 맞지 않는 파일(zip이 아닌 .xlsx, CSV 필드 길이 초과 등)은 ValueError로 알린다.
+
+표본 수는 통제 빈도와 위험(핵심통제면 HIGH)으로 정하고 모집단 수를 넘지 않는다.
+
+환경 변수:
+- CATCHER_SAMPLE_MAX_SIZE: 직접 지정할 수 있는 최대 표본 수 (기본: 1000)
+"""
+
+import csv
+import json
+import math
+import os
+import random
+import secrets
+import zipfile
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from catcher_db import env_int
+
+SAMPLE_METHODS = ('random', 'systematic')
+RISK_LEVELS = ('LOW', 'HIGH')
+POPULATION_EXTENSIONS = ('.csv', '.txt', '.xlsx')
+
+# 통제 빈도별 표본 수 (위험 LOW, HIGH)
+FREQUENCY_SAMPLE_SIZES = {
+    'ANNUAL': (1, 1),
+    'SEMIANNUAL': (1, 2),
+    'QUARTERLY': (2, 2),
+    'MONTHLY': (2, 5),
+    'WEEKLY': (5, 15),
+    'DAILY': (20, 40),
+    'MULTIPLE': (25, 60),
+}
+# 빈도 키워드 (앞에서부터 먼저 일치하는 빈도 사용, 알 수 없으면 MULTIPLE)
+FREQUENCY_KEYWORDS = (
+    ('MULTIPLE', ('수시', '수회', '다회', '건별', 'multiple', 'transaction', 'recurring')),
+    ('SEMIANNUAL', ('반기', 'semi')),
+    ('QUARTERLY', ('분기', 'quarter')),
+    ('ANNUAL', ('연', '년', 'annual', 'year')),
+    ('MONTHLY', ('월', 'month')),
+    ('WEEKLY', ('주', 'week')),
+    ('DAILY', ('일', 'daily', 'day')),
+)
+KEY_CONTROL_VALUES = ('y', 'yes', 'o', 'true', '예', '핵심', '핵심통제')
+# 파일을 읽을 수 없을 때 CSV/openpyxl reader가 내는 오류 (KeyError: xlsx가 아닌 zip)
+READ_ERRORS = (csv.Error, zipfile.BadZipFile, InvalidFileException, KeyError, UnicodeDecodeError)
+
+
+def normalize_frequency(control_frequency):
+    """통제 빈도 텍스트를 FREQUENCY_SAMPLE_SIZES 키로 변환"""
+    text = (control_frequency or '').strip().lower()
+    for frequency, keywords in FREQUENCY_KEYWORDS:
+        if any(keyword in text for keyword in keywords):
+            return frequency
+    return 'MULTIPLE'
+
+
+def risk_level_for(key_control):
+    """핵심통제이면 HIGH, 아니면 LOW"""
+    return 'HIGH' if (key_control or '').strip().lower() in KEY_CONTROL_VALUES else 'LOW'
+
+
+def required_sample_size(control_frequency, risk_level, population_count=None):
+    """통제 빈도와 위험으로 표본 수 계산 (모집단 수를 넘지 않음)"""
+    low, high = FREQUENCY_SAMPLE_SIZES[normalize_frequency(control_frequency)]
+    size = high if risk_level == 'HIGH' else low
+    if population_count is not None:
+        size = min(size, population_count)
+    return size
+
+
+def _cell_text(value):
+    return str(value) if value is not None else ''
+
+
+def _detect_encoding(path):
+    """CSV 인코딩 (UTF-8이 아니면 Excel 한글 CSV의 cp949로 간주)"""
+    with open(path, 'rb') as fileobj:
+        head = fileobj.read(65536)
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # 버퍼 끝에서 잘린 멀티바이트 문자는 UTF-8로 본다
+        if e.start < len(head) - 3:
+            return 'cp949'
+    return 'utf-8-sig'
+
+
+def check_population_filename(filename):
+    """모집단 파일 형식 확인 (CSV/XLSX가 아니면 ValueError)"""
+    if os.path.splitext(filename or '')[1].lower() not in POPULATION_EXTENSIONS:
+        raise ValueError('모집단 파일은 CSV 또는 Excel(.xlsx)만 가능합니다.')
+
+
+class PopulationReader:
+    """모집단 파일 스트리밍 reader (첫 행은 헤더, 빈 행 제외)
+
+    형식은 filename(없으면 path)의 확장자로 판단한다 (저장소 파일은 확장자가 없음).
+
+    with PopulationReader(path, filename) as reader:
+        for row in reader.iter_rows():
+            ...
+    """
+
+    def __init__(self, path, filename=None):
+        self.path = path
+        self._workbook = None
+        self._fileobj = None
+        try:
+            if (filename or path).lower().endswith('.xlsx'):
+                self._workbook = load_workbook(path, read_only=True, data_only=True)
+                rows = self._workbook.active.iter_rows(values_only=True)
+            else:
+                self._fileobj = open(path, newline='', encoding=_detect_encoding(path))
+                rows = csv.reader(self._fileobj)
+            self._rows = rows
+            self.headers = [_cell_text(value) for value in next(rows, None) or ()]
+        except READ_ERRORS as e:
+            self.close()
+            raise ValueError(f'모집단 파일을 읽을 수 없습니다: {e}') from e
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        if self._workbook is not None:
+            self._workbook.close()
+        if self._fileobj is not None:
+            self._fileobj.close()
+
+    def iter_rows(self):
+        """데이터 행을 문자열 튜플로 생성"""
+        try:
+            for row in self._rows:
+                values = tuple(_cell_text(value) for value in row)
+                if any(values):
+                    yield values
+        except READ_ERRORS as e:
+            raise ValueError(f'모집단 파일을 읽을 수 없습니다: {e}') from e
+
+
+def _uniform(rng):
+    """(0, 1) 균등 난수 (log(0) 방지)"""
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+    return value
+
+
+def reservoir_sample(rows, k, rng):
+    """무작위 표본 k개를 한 번 통과로 추출 (Algorithm L)
+
+    반환: ([(모집단 행 번호(1부터), 행)], 모집단 수), 표본은 행 번호 순
+    """
+    numbered = enumerate(rows, start=1)
+    reservoir = []
+    count = 0
+    if k > 0:
+        for count, row in numbered:
+            reservoir.append((count, row))
+            if count == k:
+                break
+    if count < k or k <= 0:
+        count += sum(1 for _ in numbered)
+        return reservoir, count
+
+    weight = math.exp(math.log(_uniform(rng)) / k)
+    next_index = k + math.floor(math.log(_uniform(rng)) / math.log1p(-weight)) + 1
+    for count, row in numbered:
+        if count == next_index:
+            reservoir[rng.randrange(k)] = (count, row)
+            weight *= math.exp(math.log(_uniform(rng)) / k)
+            next_index += math.floor(math.log(_uniform(rng)) / math.log1p(-weight)) + 1
+    reservoir.sort(key=lambda item: item[0])
+    return reservoir, count
+
+
+def systematic_sample(path, k, rng, filename=None):
+    """체계적 표본 k개 추출 (행 수 세기 + 추출, 두 번 스트리밍)
+
+    무작위 시작점에서 모집단 수 / k 간격으로 행을 고른다.
+    반환: reservoir_sample과 같은 형식
+    """
+    with PopulationReader(path, filename) as reader:
+        count = sum(1 for _ in reader.iter_rows())
+    k = min(k, count)
+    if k <= 0:
+        return [], count
+
+    interval = count / k
+    start = rng.random() * interval
+    targets = {math.floor(start + i * interval) + 1 for i in range(k)}
+    sample = []
+    with PopulationReader(path, filename) as reader:
+        for number, row in enumerate(reader.iter_rows(), start=1):
+            if number in targets:
+                sample.append((number, row))
+                if len(sample) == k:
+                    break
+    return sample, count
+
+
+def draw_sample(path, control_frequency=None, key_control=None, method='random', seed=None,
+                risk_level=None, sample_size=None, filename=None):
+    """모집단 파일에서 표본 추출
+
+    sample_size가 없으면 통제 빈도와 위험으로 계산한다. seed가 없으면 새로 만든다.
+    filename은 원본 파일명 (형식 판단용, 없으면 path 사용)
+    반환: {'method', 'seed', 'risk_level', 'control_frequency', 'sample_size', 'population_count',
+           'columns', 'items': [(행 번호, 행 값 튜플)]}
+    """
+    if method not in SAMPLE_METHODS:
+        raise ValueError(f'지원하지 않는 표본 추출 방법입니다: {method}')
+    risk_level = risk_level or risk_level_for(key_control)
+    if risk_level not in RISK_LEVELS:
+        raise ValueError(f'위험 수준은 {", ".join(RISK_LEVELS)} 중 하나여야 합니다.')
+    if sample_size is None:
+        sample_size = required_sample_size(control_frequency, risk_level)
+    elif not 1 <= sample_size <= env_int('CATCHER_SAMPLE_MAX_SIZE', 1000):
+        raise ValueError('표본 수가 허용 범위를 벗어났습니다.')
+    seed = secrets.randbits(31) if seed is None else seed
+    rng = random.Random(seed)
+
+    if method == 'systematic':
+        with PopulationReader(path, filename) as reader:
+            columns = reader.headers
+        items, population_count = systematic_sample(path, sample_size, rng, filename)
+    else:
+        with PopulationReader(path, filename) as reader:
+            columns = reader.headers
+            items, population_count = reservoir_sample(reader.iter_rows(), sample_size, rng)
+
+    return {
+        'method': method,
+        'seed': seed,
+        'risk_level': risk_level,
+        'control_frequency': normalize_frequency(control_frequency),
+        'sample_size': len(items),
+        'population_count': population_count,
+        'columns': columns,
+        'items': items,
+    }
+
+
+def store_sample(conn, line_id, result, population_path, population_sha256=None, original_filename=None,
+                 user_id=None):
+    """표본과 표본 행 저장 후 운영평가 라인의 모집단 경로/모집단 수/표본 수 갱신 (호출한 쪽 트랜잭션)
+
+    반환: sample_id
+    """
+    cursor = conn.execute('''
+        INSERT INTO ca_operation_sample
+            (line_id, population_file_path, original_filename, population_sha256, population_count,
+             population_columns, sample_method, sample_seed, sample_size, control_frequency, risk_level, created_by)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (line_id, population_path, original_filename, population_sha256, result['population_count'],
+          json.dumps(result['columns'], ensure_ascii=False), result['method'], result['seed'],
+          result['sample_size'], result['control_frequency'], result['risk_level'], user_id))
+    sample_id = cursor.lastrowid
+    conn.executemany('''
+        INSERT INTO ca_operation_sample_item (sample_id, sample_no, row_number, row_data) VALUES (?, ?, ?, ?)
+    ''', [(sample_id, sample_no, row_number, json.dumps(list(row), ensure_ascii=False))
+          for sample_no, (row_number, row) in enumerate(result['items'], start=1)])
+    conn.execute('''
+        UPDATE ca_operation_evaluation_line
+        SET population_path = ?, population_count = ?, sample_size = ?, last_updated = CURRENT_TIMESTAMP
+        WHERE line_id = ?
+    ''', (population_path, result['population_count'], result['sample_size'], line_id))
+    return sample_id
+
+
+def get_sample(conn, sample_id):
+    """표본 조회 (표본 행 포함), 없으면 None"""
+    sample = conn.execute('''
+        SELECT s.*, h.rcm_id, l.control_code
+        FROM ca_operation_sample s
+        JOIN ca_operation_evaluation_line l ON l.line_id = s.line_id
+        JOIN ca_operation_evaluation_header h ON h.header_id = l.header_id
+        WHERE s.sample_id = ?
+    ''', (sample_id,)).fetchone()
+    if not sample:
+        return None
+    sample = dict(sample)
+    sample.pop('population_file_path')  # 서버 경로는 노출하지 않음
+    sample['population_columns'] = json.loads(sample['population_columns'] or '[]')
+    sample['items'] = [
+        {'sample_no': row['sample_no'], 'row_number': row['row_number'], 'values': json.loads(row['row_data'])}
+        for row in conn.execute('''
+            SELECT sample_no, row_number, row_data FROM ca_operation_sample_item
+            WHERE sample_id = ? ORDER BY sample_no
+        ''', (sample_id,))
+    ]
+    return sample
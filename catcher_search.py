@@ -0,0 +1,191 @@
+"""
+Catcher Control Search
+RCM 통제 전문 검색 (FTS5 trigram 인덱스 ca_rcm_detail_fts, 마이그레이션 20261018_006)
+
+trigram 토크나이저는 3글자 이상 검색어만 인덱스로 찾을 수 있으므로,
+'매출'처럼 짧은 검색어는 인덱스로 찾은 결과를 LIKE 조건으로 함께 거른다.
+짧은 검색어만 있으면 특정 RCM(rcm_id)을 지정한 경우에만 그 RCM 안에서 LIKE로 찾고,
+전체 RCM 검색은 'too_short'로 거절한다 (전체 통제 테이블을 LIKE로 훑지 않도록).
+검색 결과의 하이라이트/스니펫은 HTML 이스케이프 후 <mark>로 감싸서 반환한다.
+"""
+
+import html
+from catcher_auth import get_db, get_user_authorization
+
+SEARCH_TABLE = 'ca_rcm_detail_fts'
+SEARCH_COLUMNS = ('control_code', 'control_name', 'control_description', 'risk_description', 'test_procedure')
+# bm25 컬럼 가중치 (통제코드/통제명 일치를 우선)
+SEARCH_WEIGHTS = (10.0, 5.0, 1.0, 1.0, 1.0)
+SEARCH_MIN_TERM_LENGTH = 3
+SEARCH_MAX_TERMS = 10
+SEARCH_PAGE_SIZE = 20
+SEARCH_MAX_PAGE_SIZE = 100
+SNIPPET_TOKENS = 24
+SNIPPET_CHARS = 60
+
+# 하이라이트 구분자 (HTML 이스케이프 후 <mark> 태그로 치환)
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+
+def split_search_terms(query):
+    """검색어를 공백 기준으로 나눔 (중복 제거, 최대 SEARCH_MAX_TERMS개)"""
+    terms = []
+    for term in (query or '').split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:SEARCH_MAX_TERMS]
+
+
+def _fts_available(db):
+    row = db.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (SEARCH_TABLE,)
+    ).fetchone()
+    return row is not None
+
+
+def _match_expression(terms):
+    """FTS5 MATCH 식 (각 검색어를 구문으로 감싸 AND 결합)"""
+    return ' '.join('"' + term.replace('"', '""') + '"' for term in terms)
+
+
+def _like_condition(term, params):
+    """검색 컬럼 중 하나라도 검색어를 포함하는 조건"""
+    pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    params.extend(pattern for _ in SEARCH_COLUMNS)
+    return '(' + ' OR '.join(f"d.{column} LIKE ? ESCAPE '\\'" for column in SEARCH_COLUMNS) + ')'
+
+
+def _mark_terms(text, terms):
+    """검색어 위치에 하이라이트 구분자 삽입 (대소문자 무시)"""
+    if not text:
+        return text
+    lowered = text.lower()
+    marked = [False] * len(text)
+    for term in terms:
+        term = term.lower()
+        start = lowered.find(term)
+        while start != -1:
+            for index in range(start, start + len(term)):
+                marked[index] = True
+            start = lowered.find(term, start + 1)
+
+    result = []
+    for index, char in enumerate(text):
+        if marked[index] and (index == 0 or not marked[index - 1]):
+            result.append(_MARK_START)
+        result.append(char)
+        if marked[index] and (index == len(text) - 1 or not marked[index + 1]):
+            result.append(_MARK_END)
+    return ''.join(result)
+
+
+def _like_snippet(row, terms):
+    """검색어가 처음 나타나는 컬럼에서 앞뒤 SNIPPET_CHARS 글자 발췌"""
+    for column in SEARCH_COLUMNS:
+        text = row[column] or ''
+        lowered = text.lower()
+        positions = [lowered.find(term.lower()) for term in terms if term.lower() in lowered]
+        if positions:
+            start = max(min(positions) - SNIPPET_CHARS // 2, 0)
+            end = start + SNIPPET_CHARS
+            excerpt = text[start:end]
+            prefix = '…' if start > 0 else ''
+            suffix = '…' if end < len(text) else ''
+            return prefix + _mark_terms(excerpt, terms) + suffix
+    return ''
+
+
+def render_highlight(text):
+    """하이라이트 구분자가 들어간 텍스트를 안전한 HTML로 변환"""
+    if not text:
+        return ''
+    return html.escape(text).replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+
+def search_rcm_controls(user_id, query, rcm_id=None, page=1, limit=SEARCH_PAGE_SIZE):
+    """권한 있는 RCM의 통제 검색 (관련도 순, 페이지 단위)
+
+    rcm_id: 특정 RCM으로 한정 (접근 권한은 호출한 쪽에서 확인)
+    반환: {'results': [...], 'page': n, 'has_more': bool, 'mode': 'fts' | 'like' | 'too_short'}
+    짧은 검색어만 있고 rcm_id가 없으면 조회하지 않고 mode 'too_short'를 반환한다.
+    """
+    terms = split_search_terms(query)
+    response = {'results': [], 'page': page, 'has_more': False, 'mode': 'fts'}
+    if not terms:
+        return response
+
+    db = get_db()
+    fts_terms = [term for term in terms if len(term) >= SEARCH_MIN_TERM_LENGTH]
+    if not _fts_available(db):
+        fts_terms = []
+    if not fts_terms and rcm_id is None:
+        response['mode'] = 'too_short'
+        return response
+
+    conditions = ["r.is_active = 'Y'"]
+    params = []
+    if rcm_id is not None:
+        conditions.append('d.rcm_id = ?')
+        params.append(rcm_id)
+    else:
+        authorization = get_user_authorization(user_id)
+        if not authorization['is_admin']:
+            rcm_ids = sorted(authorization['rcm_ids'])
+            if not rcm_ids:
+                return response
+            conditions.append(f"d.rcm_id IN ({', '.join('?' for _ in rcm_ids)})")
+            params.extend(rcm_ids)
+
+    like_terms = [term for term in terms if term not in fts_terms]
+    for term in like_terms:
+        conditions.append(_like_condition(term, params))
+
+    offset = (page - 1) * limit
+    if fts_terms:
+        weights = ', '.join(str(weight) for weight in SEARCH_WEIGHTS)
+        rows = db.execute(f'''
+            SELECT d.detail_id, d.rcm_id, r.rcm_name, r.control_category, d.control_code,
+                   highlight({SEARCH_TABLE}, 1, ?, ?) AS control_name,
+                   snippet({SEARCH_TABLE}, -1, ?, ?, '…', {SNIPPET_TOKENS}) AS snippet,
+                   bm25({SEARCH_TABLE}, {weights}) AS score
+            FROM {SEARCH_TABLE}
+            JOIN ca_rcm_detail d ON d.detail_id = {SEARCH_TABLE}.rowid
+            JOIN ca_rcm r ON r.rcm_id = d.rcm_id
+            WHERE {SEARCH_TABLE} MATCH ? AND {' AND '.join(conditions)}
+            ORDER BY score, d.rcm_id, d.control_code
+            LIMIT ? OFFSET ?
+        ''', (_MARK_START, _MARK_END, _MARK_START, _MARK_END,
+              _match_expression(fts_terms), *params, limit + 1, offset)).fetchall()
+        results = [dict(row) for row in rows[:limit]]
+    else:
+        # 짧은 검색어만 있는 경우: 지정한 RCM 안에서만 LIKE 조회
+        response['mode'] = 'like'
+        rows = db.execute(f'''
+            SELECT d.detail_id, d.rcm_id, r.rcm_name, r.control_category,
+                   {', '.join(f'd.{column}' for column in SEARCH_COLUMNS)}
+            FROM ca_rcm_detail d
+            JOIN ca_rcm r ON r.rcm_id = d.rcm_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY d.rcm_id, d.control_code
+            LIMIT ? OFFSET ?
+        ''', (*params, limit + 1, offset)).fetchall()
+        results = [{
+            'detail_id': row['detail_id'],
+            'rcm_id': row['rcm_id'],
+            'rcm_name': row['rcm_name'],
+            'control_category': row['control_category'],
+            'control_code': row['control_code'],
+            'control_name': _mark_terms(row['control_name'], terms),
+            'snippet': _like_snippet(row, terms),
+            'score': None
+        } for row in rows[:limit]]
+
+    for result in results:
+        result['control_name_html'] = render_highlight(result['control_name'])
+        result['snippet_html'] = render_highlight(result.pop('snippet'))
+        result['control_name'] = (result['control_name'] or '').replace(_MARK_START, '').replace(_MARK_END, '')
+
+    response['results'] = results
+    response['has_more'] = len(rows) > limit
+    return response
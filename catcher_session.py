@@ -0,0 +1,195 @@
+"""
+Catcher Session Store
+서버 측 세션 (Flask SessionInterface 구현)
+
+쿠키에는 추측할 수 없는 세션 ID만 담고, 세션 내용은 ca_session 테이블(마이그레이션 20261018_008)에
+저장한다. 프로세스마다 TTLCache를 앞에 두어 요청마다 DB를 읽지 않으며, 내용이 바뀌지 않은
+요청은 만료 시각 연장이 필요할 때(CATCHER_SESSION_TOUCH_INTERVAL)만 기록한다.
+로그인 사용자가 바뀌면 세션 ID를 새로 발급한다 (세션 고정 방지).
+
+세션 폐기(revoke_user_sessions)는 다른 워커 프로세스의 캐시에 CATCHER_SESSION_CACHE_TTL이 지난 뒤 반영된다.
+CATCHER_SESSION_BACKEND=cookie 이면 Flask 기본 서명 쿠키 세션을 그대로 사용한다.
+"""
+
+import os
+import secrets
+import time
+import click
+from flask.cli import with_appcontext
+from flask.sessions import SecureCookieSession, SessionInterface, session_json_serializer
+from catcher_cache import TTLCache
+from catcher_db import env_int, get_pool
+
+SESSION_IDLE_TIMEOUT = env_int('CATCHER_SESSION_IDLE_TIMEOUT', 8 * 60 * 60)
+SESSION_TOUCH_INTERVAL = env_int('CATCHER_SESSION_TOUCH_INTERVAL', 300)
+
+# 세션 ID -> (직렬화된 세션 내용, 만료 시각)
+_session_cache = TTLCache(max_size=env_int('CATCHER_SESSION_CACHE_SIZE', 4096),
+                          ttl=env_int('CATCHER_SESSION_CACHE_TTL', 30), name='session')
+
+
+class ServerSideSession(SecureCookieSession):
+    """세션 ID와 만료 시각을 가진 세션 dict"""
+
+    def __init__(self, initial=None, sid=None, expires_at=0):
+        super().__init__(initial)
+        self.sid = sid
+        self.expires_at = expires_at
+        self.loaded_user_id = self.get('user_id')
+        self.accessed = False
+
+
+def _load_record(sid):
+    """세션 내용 조회 (캐시 → DB), 없거나 만료되었으면 None"""
+    record = _session_cache.get(sid)
+    if record is None:
+        with get_pool().connection() as conn:
+            row = conn.execute(
+                'SELECT data, expires_at FROM ca_session WHERE session_id = ?', (sid,)
+            ).fetchone()
+        if row is None:
+            return None
+        record = (row[0], row[1])
+        _session_cache.set(sid, record)
+
+    payload, expires_at = record
+    if expires_at <= time.time():
+        _session_cache.invalidate(sid)
+        return None
+    return session_json_serializer.loads(payload), expires_at
+
+
+def _store_record(sid, data, expires_at):
+    """세션 내용 저장 (DB와 로컬 캐시 함께 갱신)"""
+    payload = session_json_serializer.dumps(data)
+    with get_pool().connection() as conn:
+        with conn:
+            conn.execute('''
+                INSERT INTO ca_session (session_id, user_id, data, expires_at)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET
+                    user_id = excluded.user_id,
+                    data = excluded.data,
+                    expires_at = excluded.expires_at
+            ''', (sid, data.get('user_id'), payload, expires_at))
+    _session_cache.set(sid, (payload, expires_at))
+
+
+def _delete_record(sid):
+    with get_pool().connection() as conn:
+        with conn:
+            conn.execute('DELETE FROM ca_session WHERE session_id = ?', (sid,))
+    _session_cache.invalidate(sid)
+
+
+def issue_session(data):
+    """세션을 직접 발급하고 세션 ID 반환 (부하 테스트 등 로그인 화면을 거치지 않는 도구용)"""
+    sid = secrets.token_urlsafe(32)
+    _store_record(sid, dict(data), int(time.time()) + SESSION_IDLE_TIMEOUT)
+    return sid
+
+
+def revoke_user_sessions(user_id):
+    """사용자의 모든 세션 폐기 (권한 변경, 계정 만료 시), 삭제한 세션 수 반환"""
+    with get_pool().connection() as conn:
+        with conn:
+            sids = [row[0] for row in conn.execute(
+                'SELECT session_id FROM ca_session WHERE user_id = ?', (user_id,)
+            )]
+            conn.execute('DELETE FROM ca_session WHERE user_id = ?', (user_id,))
+    for sid in sids:
+        _session_cache.invalidate(sid)
+    return len(sids)
+
+
+def purge_expired_sessions():
+    """만료된 세션 행 삭제, 삭제한 행 수 반환"""
+    with get_pool().connection() as conn:
+        with conn:
+            cursor = conn.execute('DELETE FROM ca_session WHERE expires_at <= ?', (int(time.time()),))
+    return cursor.rowcount
+
+
+def clear_session_cache():
+    """프로세스 세션 캐시 비우기 (테스트 정리용)"""
+    _session_cache.clear()
+
+
+class SqliteSessionInterface(SessionInterface):
+    """ca_session 테이블 기반 세션 인터페이스"""
+
+    session_class = ServerSideSession
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid:
+            record = _load_record(sid)
+            if record:
+                data, expires_at = record
+                return self.session_class(data, sid=sid, expires_at=expires_at)
+        return self.session_class()
+
+    def save_session(self, app, session, response):
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add('Cookie')
+
+        # 비어 있는 세션 (로그아웃 등): 저장된 세션과 쿠키 삭제
+        if not session:
+            if session.sid:
+                _delete_record(session.sid)
+                response.delete_cookie(name, domain=domain, path=path, secure=secure,
+                                       samesite=samesite, httponly=httponly)
+                response.vary.add('Cookie')
+            return
+
+        now = int(time.time())
+        rotate = session.sid is None or session.get('user_id') != session.loaded_user_id
+        if rotate:
+            if session.sid:
+                _delete_record(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+
+        needs_touch = session.expires_at - SESSION_IDLE_TIMEOUT + SESSION_TOUCH_INTERVAL <= now
+        if rotate or session.modified or needs_touch:
+            session.expires_at = now + SESSION_IDLE_TIMEOUT
+            _store_record(session.sid, dict(session), session.expires_at)
+
+        # 쿠키 값은 세션 ID가 바뀔 때만 다시 보낸다 (영구 세션은 만료 시각 갱신을 위해 매번)
+        if rotate or session.permanent:
+            response.set_cookie(name, session.sid, expires=self.get_expiration_time(app, session),
+                                httponly=httponly, domain=domain, path=path, secure=secure,
+                                samesite=samesite)
+            response.vary.add('Cookie')
+
+
+def init_session(app):
+    """CATCHER_SESSION_BACKEND 설정에 따라 세션 인터페이스 등록 (sqlite 기본, cookie)"""
+    backend = os.environ.get('CATCHER_SESSION_BACKEND', 'sqlite')
+    if backend == 'sqlite':
+        app.session_interface = SqliteSessionInterface()
+    elif backend != 'cookie':
+        raise ValueError(f'지원하지 않는 세션 저장소입니다: {backend}')
+
+
+@click.command('revoke-sessions')
+@click.option('--user-id', type=int, required=True, help='세션을 폐기할 사용자 ID')
+@with_appcontext
+def revoke_sessions_command(user_id):
+    """사용자의 모든 서버 측 세션 폐기"""
+    revoked = revoke_user_sessions(user_id)
+    click.echo(f'✓ 세션 폐기: {revoked}개')
+
+
+@click.command('purge-sessions')
+@with_appcontext
+def purge_sessions_command():
+    """만료된 서버 측 세션 삭제"""
+    purged = purge_expired_sessions()
+    click.echo(f'✓ 만료 세션 삭제: {purged}개')
@@ -0,0 +1,82 @@
+"""
+Catcher 운영 서버 설정 (gunicorn)
+실행: gunicorn -c gunicorn.conf.py
+
+멀티 프로세스(워커) × 멀티 스레드(gthread)로 catcher 모듈의 앱(create_app()으로 만든 catcher:app)을 실행한다.
+모듈을 import하면 앱이 만들어지므로 create_app()을 다시 호출하지 않는다 (앱 생성·마이그레이션은 프로세스당 1회).
+preload(기본 사용)이면 마스터에서 앱을 한 번 만들고(마이그레이션도 1회 적용) fork하며,
+각 워커는 post_fork에서 부모에게 물려받은 DB 연결 풀과 프로세스 캐시를 버리고 새로 시작한다.
+
+무중단 재시작:
+- kill -HUP <마스터 pid>: 설정을 다시 읽고 워커를 차례로 교체 (preload이면 코드는 다시 읽지 않음)
+- 코드 배포: kill -USR2 <마스터 pid>로 새 마스터를 띄운 뒤 이전 마스터에 QUIT
+워커는 종료 신호 후 CATCHER_GRACEFUL_TIMEOUT초 동안 처리 중인 요청을 마친다.
+
+환경 변수:
+- CATCHER_BIND: 바인드 주소 (기본: 0.0.0.0:5001)
+- CATCHER_WORKERS: 워커 프로세스 수 (기본: CPU 수)
+- CATCHER_THREADS: 워커당 스레드 수 (기본: 4)
+- CATCHER_PRELOAD: 1이면 마스터에서 앱 미리 로드 (기본: 1)
+- CATCHER_WORKER_TIMEOUT: 응답 없는 워커 재시작 기준(초) (기본: 120)
+- CATCHER_GRACEFUL_TIMEOUT: 종료 시 요청 마무리 대기(초) (기본: 30)
+- CATCHER_MAX_REQUESTS: 워커 재시작 전 최대 요청 수, 0이면 사용 안 함 (기본: 0)
+- CATCHER_ACCESS_LOG: 접근 로그 경로, '-'이면 표준 출력 (기본: 없음)
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from catcher_db import env_int
+
+wsgi_app = 'catcher:app'
+
+bind = os.getenv('CATCHER_BIND', '0.0.0.0:5001')
+workers = env_int('CATCHER_WORKERS', multiprocessing.cpu_count())
+worker_class = 'gthread'
+threads = env_int('CATCHER_THREADS', 4)
+preload_app = env_int('CATCHER_PRELOAD', 1) == 1
+timeout = env_int('CATCHER_WORKER_TIMEOUT', 120)
+graceful_timeout = env_int('CATCHER_GRACEFUL_TIMEOUT', 30)
+keepalive = 5
+max_requests = env_int('CATCHER_MAX_REQUESTS', 0)
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv('CATCHER_ACCESS_LOG') or None
+
+# 워커가 여러 개이면 /metrics가 모든 워커 값을 합치도록 공유 메트릭 파일 사용
+if workers > 1:
+    os.environ.setdefault('CATCHER_METRICS_DB', os.path.join(tempfile.gettempdir(), 'catcher_metrics.db'))
+
+
+def on_starting(server):
+    """마스터 시작: 이전 실행의 워커별 메트릭 행 삭제"""
+    path = os.environ.get('CATCHER_METRICS_DB')
+    if path:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+
+
+def post_fork(server, worker):
+    """워커 시작: 부모에서 만든 DB 연결과 프로세스 캐시 폐기 (연결은 워커에서 새로 생성), 중단된 업로드 작업 정리"""
+    from catcher_auth import invalidate_user_authorization
+    from catcher_db import close_pools
+    from catcher_session import clear_session_cache
+    close_pools()
+    invalidate_user_authorization()
+    clear_session_cache()
+    if preload_app:
+        # 종료된 이전 워커가 처리하던 업로드 작업 정리 (preload가 아니면 워커의 create_app에서 처리)
+        from catcher import recover_upload_jobs
+        recover_upload_jobs()
+
+
+def worker_exit(server, worker):
+    """워커 종료: 대기 중인 활동 로그와 메트릭 기록"""
+    from catcher_activity import get_activity_writer
+    from catcher_metrics import flush_metrics
+    get_activity_writer().stop()
+    flush_metrics(force=True)
@@ -0,0 +1,81 @@
+"""
+Catcher Database Migrations
+migrations/versions/ 아래 'YYYYMMDD_NNN_이름.py' 파일을 버전 순서대로 적용
+
+각 마이그레이션 파일은 upgrade(conn) / downgrade(conn) 함수를 가진다.
+적용 이력은 ca_migration_history 테이블에 기록된다.
+"""
+
+import importlib.util
+import os
+import re
+import time
+
+VERSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'versions')
+MIGRATION_FILE_PATTERN = re.compile(r'^(\d{8}_\d{3})_(\w+)\.py$')
+
+
+def _ensure_history_table(conn):
+    """마이그레이션 이력 테이블 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_migration_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            version TEXT NOT NULL UNIQUE,
+            name TEXT NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            execution_time_ms INTEGER,
+            status TEXT DEFAULT 'success'
+        )
+    ''')
+    conn.commit()
+
+
+def discover_migrations():
+    """버전 순으로 정렬된 (version, name, path) 목록"""
+    migrations = []
+    for filename in os.listdir(VERSIONS_DIR):
+        match = MIGRATION_FILE_PATTERN.match(filename)
+        if match:
+            migrations.append((match.group(1), match.group(2), os.path.join(VERSIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def _load_module(version, path):
+    spec = importlib.util.spec_from_file_location(f'catcher_migration_{version}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def apply_migrations(conn):
+    """적용되지 않은 마이그레이션을 순서대로 적용하고 적용된 버전 목록 반환"""
+    _ensure_history_table(conn)
+    applied = {row[0] for row in conn.execute('SELECT version FROM ca_migration_history')}
+
+    newly_applied = []
+    for version, name, path in discover_migrations():
+        if version in applied:
+            continue
+        module = _load_module(version, path)
+        started = time.perf_counter()
+        module.upgrade(conn)
+        elapsed_ms = int((time.perf_counter() - started) * 1000)
+        conn.execute('''
+            INSERT INTO ca_migration_history (version, name, execution_time_ms)
+            VALUES (?, ?, ?)
+        ''', (version, name, elapsed_ms))
+        conn.commit()
+        newly_applied.append(version)
+    return newly_applied
+
+
+def rollback_migration(conn, version):
+    """지정한 버전의 마이그레이션 되돌리기"""
+    for migration_version, name, path in discover_migrations():
+        if migration_version == version:
+            module = _load_module(version, path)
+            module.downgrade(conn)
+            conn.execute('DELETE FROM ca_migration_history WHERE version = ?', (version,))
+            conn.commit()
+            return True
+    return False
@@ -0,0 +1,35 @@
+"""
+마이그레이션 실행: python -m migrations [--db 경로]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catcher_db import get_db_path
+from migrations import apply_migrations
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Catcher DB 마이그레이션')
+    parser.add_argument('--db', default=get_db_path(), help='데이터베이스 파일 경로')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    try:
+        applied = apply_migrations(conn)
+    finally:
+        conn.close()
+
+    if applied:
+        for version in applied:
+            print(f"✓ 마이그레이션 적용: {version}")
+    else:
+        print("✓ 적용할 마이그레이션이 없습니다.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,167 @@
+"""
+Catcher 기본 스키마
+snowball.db 기준 ca_ 기본 테이블 (마이그레이션 적용 전 상태)
+
+운영 DB는 snowball.db를 복사해 사용하므로 이 스키마는 빈 DB를 만들 때(테스트, 벤치마크 데이터 생성)만 쓴다.
+이후 변경은 migrations/versions/의 마이그레이션으로 적용한다.
+"""
+
+
+def create_base_schema(conn):
+    """ca_ 기본 테이블 생성 (이미 있으면 건너뜀)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_user (
+            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT UNIQUE NOT NULL,
+            user_name TEXT NOT NULL,
+            company_name TEXT,
+            user_password TEXT,
+            admin_flag TEXT DEFAULT 'N',
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_login TIMESTAMP,
+            effective_end_date TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_rcm (
+            rcm_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rcm_name TEXT NOT NULL,
+            control_category TEXT NOT NULL,
+            description TEXT,
+            upload_user_id INTEGER,
+            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completion_date TIMESTAMP,
+            original_filename TEXT,
+            is_active TEXT DEFAULT 'Y',
+            FOREIGN KEY (upload_user_id) REFERENCES ca_user(user_id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_rcm_detail (
+            detail_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rcm_id INTEGER NOT NULL,
+            control_code TEXT NOT NULL,
+            control_name TEXT,
+            control_description TEXT,
+            key_control TEXT,
+            control_frequency TEXT,
+            control_type TEXT,
+            control_nature TEXT,
+            population TEXT,
+            population_completeness_check TEXT,
+            population_count TEXT,
+            test_procedure TEXT,
+            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id),
+            UNIQUE(rcm_id, control_code)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_user_rcm (
+            mapping_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER NOT NULL,
+            rcm_id INTEGER NOT NULL,
+            permission_type TEXT DEFAULT 'READ',
+            granted_by INTEGER,
+            granted_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active TEXT DEFAULT 'Y',
+            FOREIGN KEY (user_id) REFERENCES ca_user(user_id),
+            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id),
+            UNIQUE(user_id, rcm_id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_user_activity_log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER,
+            user_email TEXT,
+            user_name TEXT,
+            action_type TEXT,
+            page_name TEXT,
+            url_path TEXT,
+            ip_address TEXT,
+            user_agent TEXT,
+            additional_info TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_design_evaluation_header (
+            header_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rcm_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            evaluation_session TEXT NOT NULL,
+            evaluation_status TEXT DEFAULT 'IN_PROGRESS',
+            total_controls INTEGER DEFAULT 0,
+            evaluated_controls INTEGER DEFAULT 0,
+            progress_percentage REAL DEFAULT 0.0,
+            start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_date TIMESTAMP DEFAULT NULL,
+            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id),
+            FOREIGN KEY (user_id) REFERENCES ca_user(user_id),
+            UNIQUE(rcm_id, user_id, evaluation_session)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_design_evaluation_line (
+            line_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            header_id INTEGER NOT NULL,
+            control_code TEXT NOT NULL,
+            control_sequence INTEGER DEFAULT 1,
+            description_adequacy TEXT,
+            improvement_suggestion TEXT,
+            overall_effectiveness TEXT,
+            evaluation_rationale TEXT,
+            recommended_actions TEXT,
+            evaluation_date TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (header_id) REFERENCES ca_design_evaluation_header(header_id) ON DELETE CASCADE,
+            UNIQUE(header_id, control_code)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_operation_evaluation_header (
+            header_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            rcm_id INTEGER NOT NULL,
+            design_header_id INTEGER NOT NULL,
+            user_id INTEGER NOT NULL,
+            evaluation_status TEXT DEFAULT 'IN_PROGRESS',
+            total_controls INTEGER DEFAULT 0,
+            evaluated_controls INTEGER DEFAULT 0,
+            progress_percentage REAL DEFAULT 0.0,
+            start_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            completed_date TIMESTAMP DEFAULT NULL,
+            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id),
+            FOREIGN KEY (design_header_id) REFERENCES ca_design_evaluation_header(header_id),
+            FOREIGN KEY (user_id) REFERENCES ca_user(user_id)
+        )
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_operation_evaluation_line (
+            line_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            header_id INTEGER NOT NULL,
+            control_code TEXT NOT NULL,
+            sample_size INTEGER,
+            exception_count INTEGER,
+            test_result TEXT,
+            test_procedure TEXT,
+            findings TEXT,
+            population_path TEXT DEFAULT NULL,
+            samples_path TEXT DEFAULT NULL,
+            population_count INTEGER DEFAULT 0,
+            evaluation_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_updated TIMESTAMP DEFAULT NULL,
+            FOREIGN KEY (header_id) REFERENCES ca_operation_evaluation_header(header_id)
+        )
+    ''')
+
+    conn.commit()
@@ -0,0 +1,39 @@
+"""
+RCM 업로드 작업 테이블 추가
+백그라운드 업로드 작업의 상태와 진행 상황 기록 (rcm_upload_session과 같은 방식의 TEXT 키)
+"""
+
+
+def upgrade(conn):
+    """업로드 작업 테이블 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_rcm_upload_job (
+            job_id TEXT PRIMARY KEY,
+            user_id INTEGER NOT NULL,
+            target_user_id INTEGER NOT NULL,
+            rcm_name TEXT NOT NULL,
+            upload_mode TEXT NOT NULL,
+            control_category TEXT,
+            description TEXT,
+            original_filename TEXT,
+            file_path TEXT,
+            status TEXT DEFAULT 'PENDING',  -- PENDING, RUNNING, COMPLETED, FAILED
+            rows_parsed INTEGER DEFAULT 0,
+            rows_written INTEGER DEFAULT 0,
+            category_counts TEXT,  -- JSON: 카테고리별 통제 수
+            rcm_ids TEXT,  -- JSON: 카테고리별 RCM ID
+            error_message TEXT,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            started_date TIMESTAMP DEFAULT NULL,
+            completed_date TIMESTAMP DEFAULT NULL,
+            FOREIGN KEY (user_id) REFERENCES ca_user (user_id),
+            FOREIGN KEY (target_user_id) REFERENCES ca_user (user_id)
+        )
+    ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """업로드 작업 테이블 삭제"""
+    conn.execute('DROP TABLE IF EXISTS ca_rcm_upload_job')
+    conn.commit()
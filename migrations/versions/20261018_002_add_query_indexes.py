@@ -0,0 +1,55 @@
+"""
+조회 쿼리용 복합 인덱스 추가
+get_user_rcms, get_evaluation_sessions, get_design_sessions, save_operation_evaluation_data의
+WHERE/ORDER BY 컬럼 순서에 맞춘 인덱스 (좁은 컬럼은 포함시켜 테이블 조회 없이 처리)
+
+테이블이나 컬럼이 없는 이전 스키마에서는 해당 인덱스를 건너뛴다.
+"""
+
+INDEXES = [
+    # get_user_rcms (관리자): is_active + control_category 필터, control_category/upload_date 정렬
+    ('idx_ca_rcm_active_category_date', 'ca_rcm',
+     ('is_active', 'control_category', 'upload_date', 'upload_user_id')),
+    # get_user_rcms (일반 사용자): 사용자별 활성 권한
+    ('idx_ca_user_rcm_user_active', 'ca_user_rcm',
+     ('user_id', 'is_active', 'rcm_id', 'permission_type')),
+    # get_evaluation_sessions (관리자): RCM별 세션, 최신순
+    ('idx_ca_design_header_rcm_date', 'ca_design_evaluation_header',
+     ('rcm_id', 'start_date')),
+    # get_evaluation_sessions (일반 사용자): RCM + 사용자별 세션, 최신순
+    ('idx_ca_design_header_rcm_user_date', 'ca_design_evaluation_header',
+     ('rcm_id', 'user_id', 'start_date')),
+    # get_design_sessions: 완료된 세션, 최신순
+    ('idx_ca_design_header_rcm_status_date', 'ca_design_evaluation_header',
+     ('rcm_id', 'evaluation_status', 'start_date', 'evaluation_session')),
+    # save_operation_evaluation_data: 설계평가 세션명으로 헤더 조회
+    ('idx_ca_design_header_rcm_session', 'ca_design_evaluation_header',
+     ('rcm_id', 'evaluation_session', 'header_id')),
+    # save_operation_evaluation_data: 설계평가 헤더 + 사용자별 운영평가 헤더
+    ('idx_ca_operation_header_design_user', 'ca_operation_evaluation_header',
+     ('design_header_id', 'user_id')),
+    # save_operation_evaluation_data: 통제별 운영평가 라인
+    ('idx_ca_operation_line_header_control', 'ca_operation_evaluation_line',
+     ('header_id', 'control_code')),
+]
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def upgrade(conn):
+    """인덱스 생성 후 통계 갱신"""
+    for name, table, columns in INDEXES:
+        if not set(columns) <= _table_columns(conn, table):
+            continue
+        conn.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {table} ({", ".join(columns)})')
+    conn.execute('ANALYZE')
+    conn.commit()
+
+
+def downgrade(conn):
+    """인덱스 삭제"""
+    for name, _, _ in INDEXES:
+        conn.execute(f'DROP INDEX IF EXISTS {name}')
+    conn.commit()
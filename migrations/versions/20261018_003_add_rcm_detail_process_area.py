@@ -0,0 +1,20 @@
+"""
+RCM 상세 프로세스 컬럼 추가
+업로드 자동 매핑에서 찾은 '프로세스' 컬럼을 저장하고 목록 필터로 사용
+"""
+
+
+def upgrade(conn):
+    """ca_rcm_detail.process_area 컬럼 추가"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_detail)')}
+    if columns and 'process_area' not in columns:
+        conn.execute('ALTER TABLE ca_rcm_detail ADD COLUMN process_area TEXT')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_rcm_detail.process_area 컬럼 삭제"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_detail)')}
+    if 'process_area' in columns:
+        conn.execute('ALTER TABLE ca_rcm_detail DROP COLUMN process_area')
+    conn.commit()
@@ -0,0 +1,96 @@
+"""
+평가 진행률 카운터 트리거 추가
+평가 라인 INSERT/UPDATE/DELETE 시 같은 트랜잭션에서 헤더의 evaluated_controls와
+progress_percentage를 증감한다. 결론 컬럼(설계: overall_effectiveness, 운영: test_result)이
+비어 있지 않은 라인을 평가 완료로 본다.
+
+트리거 생성 후 기존 데이터 기준으로 카운터를 한 번 다시 계산한다.
+"""
+
+PROGRESS_TABLES = (
+    ('design', 'ca_design_evaluation_header', 'ca_design_evaluation_line', 'overall_effectiveness'),
+    ('operation', 'ca_operation_evaluation_header', 'ca_operation_evaluation_line', 'test_result'),
+)
+
+HEADER_COLUMNS = {'header_id', 'rcm_id', 'total_controls', 'evaluated_controls', 'progress_percentage'}
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _evaluated(row, column):
+    return f"({row}.{column} IS NOT NULL AND {row}.{column} != '')"
+
+
+def _apply_delta(header_table, header_id, delta):
+    """헤더 카운터 증감 UPDATE 문"""
+    return f'''
+        UPDATE {header_table}
+        SET evaluated_controls = evaluated_controls + ({delta}),
+            progress_percentage = CASE WHEN total_controls > 0
+                THEN ROUND((evaluated_controls + ({delta})) * 100.0 / total_controls, 1)
+                ELSE 0 END
+        WHERE header_id = {header_id};
+    '''
+
+
+def upgrade(conn):
+    """진행률 트리거 생성 및 카운터 재계산"""
+    for prefix, header_table, line_table, column in PROGRESS_TABLES:
+        if not HEADER_COLUMNS <= _table_columns(conn, header_table):
+            continue
+        if not {'header_id', column} <= _table_columns(conn, line_table):
+            continue
+
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{prefix}_line_progress_insert
+            AFTER INSERT ON {line_table}
+            WHEN {_evaluated('NEW', column)}
+            BEGIN
+                {_apply_delta(header_table, 'NEW.header_id', 1)}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{prefix}_line_progress_delete
+            AFTER DELETE ON {line_table}
+            WHEN {_evaluated('OLD', column)}
+            BEGIN
+                {_apply_delta(header_table, 'OLD.header_id', -1)}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{prefix}_line_progress_update
+            AFTER UPDATE OF header_id, {column} ON {line_table}
+            WHEN {_evaluated('OLD', column)} != {_evaluated('NEW', column)}
+                OR OLD.header_id != NEW.header_id
+            BEGIN
+                {_apply_delta(header_table, 'OLD.header_id', '-' + _evaluated('OLD', column))}
+                {_apply_delta(header_table, 'NEW.header_id', _evaluated('NEW', column))}
+            END
+        ''')
+
+        conn.execute(f'''
+            UPDATE {header_table}
+            SET total_controls = (
+                    SELECT COUNT(*) FROM ca_rcm_detail d WHERE d.rcm_id = {header_table}.rcm_id
+                ),
+                evaluated_controls = (
+                    SELECT COUNT(*) FROM {line_table} l
+                    WHERE l.header_id = {header_table}.header_id AND {_evaluated('l', column)}
+                )
+        ''')
+        conn.execute(f'''
+            UPDATE {header_table}
+            SET progress_percentage = CASE WHEN total_controls > 0
+                THEN ROUND(evaluated_controls * 100.0 / total_controls, 1) ELSE 0 END
+        ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """진행률 트리거 삭제"""
+    for prefix, _, _, _ in PROGRESS_TABLES:
+        for event in ('insert', 'update', 'delete'):
+            conn.execute(f'DROP TRIGGER IF EXISTS trg_{prefix}_line_progress_{event}')
+    conn.commit()
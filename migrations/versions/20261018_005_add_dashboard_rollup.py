@@ -0,0 +1,45 @@
+"""
+대시보드 집계 테이블 추가
+평가 헤더(세션)별로 효과적/비효과적/미테스트 통제 수, 예외 합계, 진행률을 저장한다.
+평가 저장 시 해당 헤더 행만 다시 계산되며, 대시보드 API는 이 테이블만 조회한다.
+"""
+
+
+def upgrade(conn):
+    """집계 테이블 및 조회 인덱스 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_dashboard_rollup (
+            rollup_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            evaluation_type TEXT NOT NULL,  -- DESIGN, OPERATION
+            header_id INTEGER NOT NULL,
+            rcm_id INTEGER NOT NULL,
+            rcm_name TEXT,
+            control_category TEXT,
+            company_name TEXT,
+            evaluation_session TEXT,
+            total_controls INTEGER DEFAULT 0,
+            effective_count INTEGER DEFAULT 0,
+            ineffective_count INTEGER DEFAULT 0,
+            untested_count INTEGER DEFAULT 0,
+            exception_total INTEGER DEFAULT 0,
+            progress_percentage REAL DEFAULT 0.0,
+            is_latest INTEGER DEFAULT 1,  -- RCM별 가장 최근에 저장된 세션
+            last_updated TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE(evaluation_type, header_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ca_dashboard_rollup_scope
+        ON ca_dashboard_rollup (evaluation_type, is_latest, company_name, control_category, rcm_id)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ca_dashboard_rollup_rcm
+        ON ca_dashboard_rollup (rcm_id, evaluation_type)
+    ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """집계 테이블 삭제"""
+    conn.execute('DROP TABLE IF EXISTS ca_dashboard_rollup')
+    conn.commit()
@@ -0,0 +1,76 @@
+"""
+통제 전문 검색 인덱스 추가
+ca_rcm_detail을 원본(external content)으로 하는 FTS5 가상 테이블 ca_rcm_detail_fts를 만들고
+INSERT/UPDATE/DELETE 트리거로 동기화한다. 한글은 형태소 분리 없이도 부분 일치가 되도록
+trigram 토크나이저를 사용한다.
+
+업로드 자동 매핑에서 찾던 '위험설명' 컬럼(risk_description)도 함께 저장하도록 컬럼을 추가한다.
+"""
+
+FTS_TABLE = 'ca_rcm_detail_fts'
+FTS_COLUMNS = ('control_code', 'control_name', 'control_description', 'risk_description', 'test_procedure')
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+
+
+def _fts_values(row):
+    return ', '.join(f'{row}.{column}' for column in FTS_COLUMNS)
+
+
+def upgrade(conn):
+    """risk_description 컬럼, FTS5 테이블, 동기화 트리거 생성 후 인덱스 채우기"""
+    columns = _table_columns(conn, 'ca_rcm_detail')
+    if not columns:
+        conn.commit()
+        return
+    if 'risk_description' not in columns:
+        conn.execute('ALTER TABLE ca_rcm_detail ADD COLUMN risk_description TEXT')
+
+    column_list = ', '.join(FTS_COLUMNS)
+    conn.execute(f'''
+        CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+            {column_list},
+            content='ca_rcm_detail', content_rowid='detail_id',
+            tokenize='trigram'
+        )
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rcm_detail_fts_insert
+        AFTER INSERT ON ca_rcm_detail
+        BEGIN
+            INSERT INTO {FTS_TABLE} (rowid, {column_list})
+            VALUES (NEW.detail_id, {_fts_values('NEW')});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rcm_detail_fts_delete
+        AFTER DELETE ON ca_rcm_detail
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {column_list})
+            VALUES ('delete', OLD.detail_id, {_fts_values('OLD')});
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_rcm_detail_fts_update
+        AFTER UPDATE OF {column_list} ON ca_rcm_detail
+        BEGIN
+            INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, {column_list})
+            VALUES ('delete', OLD.detail_id, {_fts_values('OLD')});
+            INSERT INTO {FTS_TABLE} (rowid, {column_list})
+            VALUES (NEW.detail_id, {_fts_values('NEW')});
+        END
+    ''')
+    conn.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')")
+    conn.commit()
+
+
+def downgrade(conn):
+    """FTS5 테이블, 트리거, risk_description 컬럼 삭제"""
+    for trigger in ('insert', 'delete', 'update'):
+        conn.execute(f'DROP TRIGGER IF EXISTS trg_rcm_detail_fts_{trigger}')
+    conn.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+    if 'risk_description' in _table_columns(conn, 'ca_rcm_detail'):
+        conn.execute('ALTER TABLE ca_rcm_detail DROP COLUMN risk_description')
+    conn.commit()
@@ -0,0 +1,26 @@
+"""
+RCM 리비전 테이블 추가
+RCM 통제 저장, RCM 삭제, 설계/운영평가 저장 시 같은 트랜잭션에서 revision을 1 올린다.
+조회 화면과 API는 revision으로 ETag / Last-Modified를 만들어 304 응답 여부를 판단한다.
+"""
+
+
+def upgrade(conn):
+    """ca_rcm_revision 테이블 생성 및 기존 RCM 행 채우기"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_rcm_revision (
+            rcm_id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL DEFAULT 1,
+            last_modified TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'ca_rcm' in tables:
+        conn.execute('INSERT OR IGNORE INTO ca_rcm_revision (rcm_id) SELECT rcm_id FROM ca_rcm')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_rcm_revision 테이블 삭제"""
+    conn.execute('DROP TABLE IF EXISTS ca_rcm_revision')
+    conn.commit()
@@ -0,0 +1,27 @@
+"""
+서버 측 세션 저장소 테이블 추가
+쿠키에는 세션 ID만 담고 세션 내용은 ca_session에 저장한다 (catcher_session.py).
+expires_at은 UNIX 시각(초)이며, 만료된 행은 조회 시 무시되고 purge-sessions 명령으로 삭제한다.
+"""
+
+
+def upgrade(conn):
+    """ca_session 테이블 및 인덱스 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_session (
+            session_id TEXT PRIMARY KEY,
+            user_id INTEGER,
+            data TEXT NOT NULL,
+            expires_at INTEGER NOT NULL,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_session_user ON ca_session (user_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_session_expires ON ca_session (expires_at)')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_session 테이블 삭제"""
+    conn.execute('DROP TABLE IF EXISTS ca_session')
+    conn.commit()
@@ -0,0 +1,65 @@
+"""
+표준 통제 라이브러리 및 자동 매핑 테이블 추가
+ca_standard_control: 표준 통제 (import-standard-controls 명령으로 적재)
+ca_rcm_standard_mapping: 통제별 표준 통제 후보 (순위, 신뢰도), 자동 매핑 엔진(catcher_mapping.py)이 기록
+ca_rcm_detail.mapped_std_control_id / mapping_status / mapped_date: 선택된 표준 통제와 상태
+(AUTO: 자동 확정, REVIEW: 검토 필요, UNMAPPED: 후보 없음, MANUAL: 사용자가 지정 - 자동 매핑이 덮어쓰지 않음)
+"""
+
+DETAIL_COLUMNS = (
+    ('mapped_std_control_id', 'INTEGER'),
+    ('mapping_status', 'TEXT'),
+    ('mapped_date', 'TIMESTAMP'),
+)
+
+
+def upgrade(conn):
+    """표준 통제/매핑 테이블 생성 및 ca_rcm_detail 매핑 컬럼 추가"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_standard_control (
+            std_control_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            control_code TEXT NOT NULL UNIQUE,
+            control_name TEXT NOT NULL,
+            control_description TEXT,
+            control_category TEXT,
+            process_area TEXT,
+            risk_description TEXT,
+            is_active TEXT DEFAULT 'Y',
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_rcm_standard_mapping (
+            mapping_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            detail_id INTEGER NOT NULL,
+            std_control_id INTEGER NOT NULL,
+            candidate_rank INTEGER NOT NULL,
+            mapping_confidence REAL NOT NULL,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (detail_id) REFERENCES ca_rcm_detail(detail_id),
+            FOREIGN KEY (std_control_id) REFERENCES ca_standard_control(std_control_id),
+            UNIQUE(detail_id, std_control_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ca_rcm_standard_mapping_detail
+        ON ca_rcm_standard_mapping (detail_id, candidate_rank)
+    ''')
+
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_detail)')}
+    if columns:
+        for column, column_type in DETAIL_COLUMNS:
+            if column not in columns:
+                conn.execute(f'ALTER TABLE ca_rcm_detail ADD COLUMN {column} {column_type}')
+    conn.commit()
+
+
+def downgrade(conn):
+    """매핑 컬럼 및 테이블 삭제"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_detail)')}
+    for column, _ in DETAIL_COLUMNS:
+        if column in columns:
+            conn.execute(f'ALTER TABLE ca_rcm_detail DROP COLUMN {column}')
+    conn.execute('DROP TABLE IF EXISTS ca_rcm_standard_mapping')
+    conn.execute('DROP TABLE IF EXISTS ca_standard_control')
+    conn.commit()
@@ -0,0 +1,29 @@
+"""
+RCM 완전성 평가 결과 테이블 추가
+ca_rcm_completeness_eval: RCM별 필수 항목 누락 수, 표준 통제 매핑 수, 완전성 점수 (catcher_completeness.py가 계산)
+revision은 계산 당시 ca_rcm_revision.revision이며, 현재 리비전과 다르면 다시 계산한다.
+"""
+
+
+def upgrade(conn):
+    """ca_rcm_completeness_eval 테이블 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_rcm_completeness_eval (
+            rcm_id INTEGER PRIMARY KEY,
+            revision INTEGER NOT NULL,
+            total_controls INTEGER NOT NULL DEFAULT 0,
+            mapped_controls INTEGER NOT NULL DEFAULT 0,
+            missing_fields_count INTEGER NOT NULL DEFAULT 0,
+            completeness_score REAL NOT NULL DEFAULT 0,
+            eval_details TEXT,
+            eval_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id)
+        )
+    ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_rcm_completeness_eval 테이블 삭제"""
+    conn.execute('DROP TABLE IF EXISTS ca_rcm_completeness_eval')
+    conn.commit()
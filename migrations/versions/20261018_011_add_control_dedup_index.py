@@ -0,0 +1,63 @@
+"""
+통제 유사 중복 탐지 인덱스 추가
+ca_control_minhash: 통제별 MinHash 서명 (통제명 + 통제설명 문자 shingle, catcher_dedup.py가 계산)
+ca_control_lsh_bucket: 서명을 band로 나눈 LSH 버킷 (같은 버킷의 통제만 유사 후보로 비교)
+
+통제명/통제설명이 바뀌거나 통제가 삭제되면 트리거가 서명과 버킷을 지우고,
+다음 인덱싱(업로드 후)에서 서명이 없는 통제만 다시 계산한다.
+"""
+
+DEDUP_TRIGGERS = ('trg_rcm_detail_dedup_update', 'trg_rcm_detail_dedup_delete')
+
+
+def upgrade(conn):
+    """MinHash/LSH 테이블, 인덱스, 무효화 트리거 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_control_minhash (
+            detail_id INTEGER PRIMARY KEY,
+            rcm_id INTEGER NOT NULL,
+            signature BLOB,
+            indexed_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (detail_id) REFERENCES ca_rcm_detail(detail_id)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_control_lsh_bucket (
+            band INTEGER NOT NULL,
+            bucket_hash INTEGER NOT NULL,
+            detail_id INTEGER NOT NULL,
+            rcm_id INTEGER NOT NULL,
+            PRIMARY KEY (band, bucket_hash, detail_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_control_lsh_bucket_detail ON ca_control_lsh_bucket (detail_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_control_lsh_bucket_rcm ON ca_control_lsh_bucket (rcm_id)')
+
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'ca_rcm_detail' in tables:
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rcm_detail_dedup_update
+            AFTER UPDATE OF control_name, control_description ON ca_rcm_detail
+            BEGIN
+                DELETE FROM ca_control_lsh_bucket WHERE detail_id = OLD.detail_id;
+                DELETE FROM ca_control_minhash WHERE detail_id = OLD.detail_id;
+            END
+        ''')
+        conn.execute('''
+            CREATE TRIGGER IF NOT EXISTS trg_rcm_detail_dedup_delete
+            AFTER DELETE ON ca_rcm_detail
+            BEGIN
+                DELETE FROM ca_control_lsh_bucket WHERE detail_id = OLD.detail_id;
+                DELETE FROM ca_control_minhash WHERE detail_id = OLD.detail_id;
+            END
+        ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """트리거와 MinHash/LSH 테이블 삭제"""
+    for trigger in DEDUP_TRIGGERS:
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute('DROP TABLE IF EXISTS ca_control_lsh_bucket')
+    conn.execute('DROP TABLE IF EXISTS ca_control_minhash')
+    conn.commit()
@@ -0,0 +1,48 @@
+"""
+운영평가 표본 추출 테이블 추가
+ca_operation_sample: 운영평가 라인별 표본 추출 이력 (모집단 파일, 모집단 수, 추출 방법, 시드, 표본 수)
+ca_operation_sample_item: 추출된 표본 행 (모집단 행 번호와 행 값 JSON)
+같은 모집단 파일 + 방법 + 시드 + 표본 수면 같은 표본이 다시 추출된다 (catcher_sampling.py).
+"""
+
+
+def upgrade(conn):
+    """표본/표본 행 테이블 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_operation_sample (
+            sample_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            line_id INTEGER NOT NULL,
+            population_file_path TEXT NOT NULL,
+            original_filename TEXT,
+            population_sha256 TEXT,
+            population_count INTEGER NOT NULL,
+            population_columns TEXT,
+            sample_method TEXT NOT NULL,
+            sample_seed INTEGER NOT NULL,
+            sample_size INTEGER NOT NULL,
+            control_frequency TEXT,
+            risk_level TEXT,
+            created_by INTEGER,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (line_id) REFERENCES ca_operation_evaluation_line(line_id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_operation_sample_line ON ca_operation_sample (line_id)')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_operation_sample_item (
+            sample_id INTEGER NOT NULL,
+            sample_no INTEGER NOT NULL,
+            row_number INTEGER NOT NULL,
+            row_data TEXT NOT NULL,
+            PRIMARY KEY (sample_id, sample_no),
+            FOREIGN KEY (sample_id) REFERENCES ca_operation_sample(sample_id)
+        ) WITHOUT ROWID
+    ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """표본/표본 행 테이블 삭제"""
+    conn.execute('DROP TABLE IF EXISTS ca_operation_sample_item')
+    conn.execute('DROP TABLE IF EXISTS ca_operation_sample')
+    conn.commit()
@@ -0,0 +1,69 @@
+"""
+운영평가 증빙 파일 저장소 추가 (내용 주소 기반, catcher_evidence.py)
+ca_evidence_blob: SHA-256별 파일 1개 (크기, 참조 수, 마지막 참조 시각)
+ca_evidence_attachment: 운영평가 라인에 첨부된 파일 (증빙/모집단/표본), 같은 내용은 blob 하나를 공유
+
+첨부 추가/삭제 시 트리거가 blob 참조 수를 증감하며,
+참조 수가 0이고 유예 시간이 지난 blob은 gc-evidence 명령이 파일과 함께 삭제한다.
+"""
+
+EVIDENCE_TRIGGERS = ('trg_evidence_attachment_insert', 'trg_evidence_attachment_delete')
+
+
+def upgrade(conn):
+    """blob/첨부 테이블과 참조 수 트리거 생성"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_evidence_blob (
+            sha256 TEXT PRIMARY KEY,
+            size_bytes INTEGER NOT NULL,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_referenced TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_evidence_blob_unreferenced '
+                 'ON ca_evidence_blob (last_referenced) WHERE ref_count = 0')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS ca_evidence_attachment (
+            attachment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            line_id INTEGER NOT NULL,
+            sha256 TEXT NOT NULL,
+            attachment_type TEXT NOT NULL DEFAULT 'EVIDENCE',
+            original_filename TEXT,
+            content_type TEXT,
+            uploaded_by INTEGER,
+            uploaded_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (line_id) REFERENCES ca_operation_evaluation_line(line_id),
+            FOREIGN KEY (sha256) REFERENCES ca_evidence_blob(sha256)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_evidence_attachment_line ON ca_evidence_attachment (line_id)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_ca_evidence_attachment_sha256 ON ca_evidence_attachment (sha256)')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_evidence_attachment_insert
+        AFTER INSERT ON ca_evidence_attachment
+        BEGIN
+            UPDATE ca_evidence_blob
+            SET ref_count = ref_count + 1, last_referenced = CURRENT_TIMESTAMP
+            WHERE sha256 = NEW.sha256;
+        END
+    ''')
+    conn.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_evidence_attachment_delete
+        AFTER DELETE ON ca_evidence_attachment
+        BEGIN
+            UPDATE ca_evidence_blob
+            SET ref_count = ref_count - 1, last_referenced = CURRENT_TIMESTAMP
+            WHERE sha256 = OLD.sha256;
+        END
+    ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """트리거와 blob/첨부 테이블 삭제 (저장소 파일은 남김)"""
+    for trigger in EVIDENCE_TRIGGERS:
+        conn.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    conn.execute('DROP TABLE IF EXISTS ca_evidence_attachment')
+    conn.execute('DROP TABLE IF EXISTS ca_evidence_blob')
+    conn.commit()
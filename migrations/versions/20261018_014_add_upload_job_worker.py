@@ -0,0 +1,28 @@
+"""
+업로드 작업 처리 프로세스 컬럼 추가
+작업을 큐에 넣은 프로세스(호스트, pid)를 기록해 재시작으로 중단된 PENDING/RUNNING 작업을 찾는다.
+"""
+
+
+def upgrade(conn):
+    """ca_rcm_upload_job.worker_host, worker_pid 컬럼 추가"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_upload_job)')}
+    if columns and 'worker_host' not in columns:
+        conn.execute('ALTER TABLE ca_rcm_upload_job ADD COLUMN worker_host TEXT')
+    if columns and 'worker_pid' not in columns:
+        conn.execute('ALTER TABLE ca_rcm_upload_job ADD COLUMN worker_pid INTEGER')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_ca_rcm_upload_job_status
+        ON ca_rcm_upload_job (status)
+    ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_rcm_upload_job.worker_host, worker_pid 컬럼 삭제"""
+    conn.execute('DROP INDEX IF EXISTS idx_ca_rcm_upload_job_status')
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_upload_job)')}
+    for column in ('worker_host', 'worker_pid'):
+        if column in columns:
+            conn.execute(f'ALTER TABLE ca_rcm_upload_job DROP COLUMN {column}')
+    conn.commit()
@@ -0,0 +1,25 @@
+"""
+RCM 통제 내용 리비전 컬럼 추가
+ca_rcm_revision.revision은 평가 저장 때도 올라가므로, 통제 저장/표준 통제 매핑 때만 올리는
+detail_revision을 따로 두고 완전성 평가(ca_rcm_completeness_eval.revision)는 이 값과 비교한다.
+기존 완전성 결과는 어느 리비전 기준인지 알 수 없으므로 다시 계산 대상으로 표시한다.
+"""
+
+
+def upgrade(conn):
+    """ca_rcm_revision.detail_revision 컬럼 추가"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_revision)')}
+    if columns and 'detail_revision' not in columns:
+        conn.execute('ALTER TABLE ca_rcm_revision ADD COLUMN detail_revision INTEGER NOT NULL DEFAULT 0')
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if 'ca_rcm_completeness_eval' in tables:
+        conn.execute('UPDATE ca_rcm_completeness_eval SET revision = -1')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_rcm_revision.detail_revision 컬럼 삭제"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_revision)')}
+    if 'detail_revision' in columns:
+        conn.execute('ALTER TABLE ca_rcm_revision DROP COLUMN detail_revision')
+    conn.commit()
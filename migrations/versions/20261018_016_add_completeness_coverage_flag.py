@@ -0,0 +1,30 @@
+"""
+RCM 완전성 평가 매핑률 반영 여부 컬럼 추가
+점수는 활성 표준 통제가 있을 때만 매핑률을 포함하므로, 계산 당시 반영 여부를 저장하고
+표준 통제 적재/비활성화로 현재 상태와 달라진 결과는 다시 계산 대상으로 본다.
+기존 결과는 eval_details에 기록된 값으로 채운다.
+"""
+
+
+def upgrade(conn):
+    """ca_rcm_completeness_eval.coverage_applicable 컬럼 추가"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_completeness_eval)')}
+    if columns and 'coverage_applicable' not in columns:
+        conn.execute('''
+            ALTER TABLE ca_rcm_completeness_eval
+            ADD COLUMN coverage_applicable INTEGER NOT NULL DEFAULT 0
+        ''')
+        conn.execute('''
+            UPDATE ca_rcm_completeness_eval
+            SET coverage_applicable = COALESCE(json_extract(eval_details, '$.coverage_applicable'), 0)
+            WHERE json_valid(eval_details)
+        ''')
+    conn.commit()
+
+
+def downgrade(conn):
+    """ca_rcm_completeness_eval.coverage_applicable 컬럼 삭제"""
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(ca_rcm_completeness_eval)')}
+    if 'coverage_applicable' in columns:
+        conn.execute('ALTER TABLE ca_rcm_completeness_eval DROP COLUMN coverage_applicable')
+    conn.commit()
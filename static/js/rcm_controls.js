@@ -0,0 +1,96 @@
+// Catcher - RCM 통제 목록 점진 로드
+// 첫 페이지는 서버에서 렌더링하고, 이후 페이지는 /rcm/api/<rcm_id>/controls 에서 keyset 커서로 가져온다.
+
+function escapeHtml(value) {
+    if (value === null || value === undefined) {
+        return '';
+    }
+    return String(value)
+        .replace(/&/g, '&amp;')
+        .replace(/</g, '&lt;')
+        .replace(/>/g, '&gt;')
+        .replace(/"/g, '&quot;')
+        .replace(/'/g, '&#39;');
+}
+
+// options: {rcmId, tbody, loadMoreButton, countElements, filterForm, fields, nextCursor, renderRow}
+function initControlTable(options) {
+    const tbody = options.tbody;
+    const loadMoreButton = options.loadMoreButton;
+    const countElements = options.countElements || [];
+    let nextCursor = options.nextCursor || null;
+    let loading = false;
+
+    function currentFilters() {
+        const params = new URLSearchParams();
+        if (options.filterForm) {
+            new FormData(options.filterForm).forEach((value, key) => {
+                if (value) {
+                    params.append(key, value);
+                }
+            });
+        }
+        return params;
+    }
+
+    function updateLoadMore() {
+        if (loadMoreButton) {
+            loadMoreButton.classList.toggle('d-none', !nextCursor);
+        }
+    }
+
+    async function loadPage(reset) {
+        if (loading || (!reset && !nextCursor)) {
+            return;
+        }
+        loading = true;
+
+        const params = currentFilters();
+        if (options.fields) {
+            params.set('fields', options.fields.join(','));
+        }
+        if (!reset) {
+            params.set('after', nextCursor);
+        }
+
+        try {
+            const response = await fetch(`/rcm/api/${options.rcmId}/controls?${params.toString()}`);
+            const result = await response.json();
+            if (!result.success) {
+                throw new Error(result.message);
+            }
+
+            if (reset) {
+                tbody.innerHTML = '';
+                countElements.forEach(el => { el.textContent = result.total; });
+            }
+            tbody.insertAdjacentHTML('beforeend', result.controls.map(options.renderRow).join(''));
+            nextCursor = result.next_cursor;
+            updateLoadMore();
+        } catch (error) {
+            console.error('Control list error:', error);
+            alert('통제 목록을 불러오는 중 오류가 발생했습니다.');
+        } finally {
+            loading = false;
+        }
+    }
+
+    if (loadMoreButton) {
+        loadMoreButton.addEventListener('click', () => loadPage(false));
+
+        // 목록 끝이 보이면 다음 페이지 자동 로드
+        if ('IntersectionObserver' in window) {
+            new IntersectionObserver(entries => {
+                if (entries.some(entry => entry.isIntersecting)) {
+                    loadPage(false);
+                }
+            }).observe(loadMoreButton);
+        }
+    }
+
+    if (options.filterForm) {
+        options.filterForm.addEventListener('change', () => loadPage(true));
+    }
+
+    updateLoadMore();
+}
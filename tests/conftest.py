@@ -45,6 +45,7 @@ def app():
     else:
         # Create basic test tables if no DB exists
         _create_basic_test_tables(db_path)
+    _apply_test_migrations(db_path)
 
     # Override DB path
     os.environ['CATCHER_DB_PATH'] = db_path
@@ -52,100 +53,40 @@ def app():
     yield flask_app
 
     # Cleanup
+    from catcher_activity import get_activity_writer
+    from catcher_auth import invalidate_user_authorization
+    from catcher_db import close_pools
+    from catcher_session import clear_session_cache
+    get_activity_writer().flush()
+    invalidate_user_authorization()
+    clear_session_cache()
+    close_pools()
     os.close(db_fd)
-    if os.path.exists(db_path):
-        os.unlink(db_path)
+    for path in (db_path, db_path + '-wal', db_path + '-shm'):
+        if os.path.exists(path):
+            os.unlink(path)
 
 
 def _create_basic_test_tables(db_path):
     """Create basic test tables if database doesn't exist"""
     import sqlite3
+    from migrations.base_schema import create_base_schema
     conn = sqlite3.connect(db_path)
-    cursor = conn.cursor()
-
-    # Create essential tables for testing (based on snowball schema)
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ca_user (
-            user_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_email TEXT UNIQUE NOT NULL,
-            user_name TEXT NOT NULL,
-            company_name TEXT,
-            user_password TEXT,
-            admin_flag TEXT DEFAULT 'N',
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            last_login TIMESTAMP,
-            effective_end_date TIMESTAMP
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ca_rcm (
-            rcm_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            rcm_name TEXT NOT NULL,
-            control_category TEXT NOT NULL,
-            description TEXT,
-            upload_user_id INTEGER,
-            upload_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            completion_date TIMESTAMP,
-            original_filename TEXT,
-            is_active TEXT DEFAULT 'Y',
-            FOREIGN KEY (upload_user_id) REFERENCES ca_user(user_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ca_rcm_detail (
-            detail_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            rcm_id INTEGER NOT NULL,
-            control_code TEXT NOT NULL,
-            control_name TEXT,
-            control_description TEXT,
-            key_control TEXT,
-            control_frequency TEXT,
-            control_type TEXT,
-            control_nature TEXT,
-            population TEXT,
-            population_completeness_check TEXT,
-            population_count TEXT,
-            test_procedure TEXT,
-            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id),
-            UNIQUE(rcm_id, control_code)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ca_user_rcm (
-            mapping_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            rcm_id INTEGER NOT NULL,
-            permission_type TEXT DEFAULT 'READ',
-            granted_by INTEGER,
-            granted_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            is_active TEXT DEFAULT 'Y',
-            FOREIGN KEY (user_id) REFERENCES ca_user(user_id),
-            FOREIGN KEY (rcm_id) REFERENCES ca_rcm(rcm_id),
-            UNIQUE(user_id, rcm_id)
-        )
-    ''')
-
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS ca_user_activity_log (
-            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER,
-            user_email TEXT,
-            user_name TEXT,
-            action_type TEXT,
-            page_name TEXT,
-            url_path TEXT,
-            ip_address TEXT,
-            user_agent TEXT,
-            additional_info TEXT,
-            created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    ''')
+    try:
+        create_base_schema(conn)
+    finally:
+        conn.close()
+
 
-    conn.commit()
-    conn.close()
+def _apply_test_migrations(db_path):
+    """Apply schema migrations to the test database"""
+    import sqlite3
+    from migrations import apply_migrations
+    conn = sqlite3.connect(db_path)
+    try:
+        apply_migrations(conn)
+    finally:
+        conn.close()
 
 
 @pytest.fixture
@@ -0,0 +1,93 @@
+"""
+Tests for the batched activity log writer
+"""
+import sqlite3
+import pytest
+from catcher_activity import ActivityLogWriter, get_activity_writer
+from catcher_db import close_pools
+
+
+def _row(n):
+    return (1, 'a@catcher.com', 'A', 'PAGE_ACCESS', f'page {n}', '/x', '127.0.0.1', 'pytest', None)
+
+
+@pytest.fixture
+def log_db(tmp_path):
+    """Create a database with only the activity log table."""
+    path = str(tmp_path / 'activity.db')
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE ca_user_activity_log (
+            log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id INTEGER, user_email TEXT, user_name TEXT, action_type TEXT,
+            page_name TEXT, url_path TEXT, ip_address TEXT, user_agent TEXT,
+            additional_info TEXT, created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
+    conn.close()
+    yield path
+    close_pools()
+
+
+def _count_rows(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM ca_user_activity_log').fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestActivityLogWriter:
+    """Test batching, flushing and drop policy"""
+
+    def test_records_are_written_in_batches(self, log_db):
+        """Test queued records are written with few transactions"""
+        writer = ActivityLogWriter(batch_size=50, flush_interval_ms=1000)
+        for n in range(120):
+            assert writer.submit(log_db, _row(n))
+        assert writer.flush()
+
+        stats = writer.stats()
+        assert _count_rows(log_db) == 120
+        assert stats['written'] == 120
+        assert stats['batches'] <= 3
+        writer.stop()
+
+    def test_stop_flushes_pending_records(self, log_db):
+        """Test shutdown writes everything still queued"""
+        writer = ActivityLogWriter(batch_size=1000, flush_interval_ms=60000)
+        for n in range(10):
+            writer.submit(log_db, _row(n))
+        writer.stop()
+
+        assert _count_rows(log_db) == 10
+
+    def test_full_queue_drops_and_counts(self, log_db):
+        """Test records beyond the queue bound are dropped and counted"""
+        writer = ActivityLogWriter(max_queue=5, policy='drop')
+        # Writer thread is not started yet, so the queue fills up
+        writer._ensure_started = lambda: None
+        accepted = [writer.submit(log_db, _row(n)) for n in range(8)]
+
+        assert accepted.count(True) == 5
+        assert writer.stats()['dropped'] == 3
+        assert writer.stats()['max_depth'] == 5
+
+
+class TestActivityLogRoutes:
+    """Test routes enqueue activity instead of committing inline"""
+
+    def test_rcm_view_is_logged_after_flush(self, app, admin_client, test_rcm):
+        """Test RCM view activity reaches the table once flushed"""
+        response = admin_client.get(f"/rcm/{test_rcm['rcm_id']}/view")
+        assert response.status_code == 200
+
+        assert get_activity_writer().flush()
+        with app.app_context():
+            from catcher_auth import get_db
+            logs = get_db().execute(
+                'SELECT * FROM ca_user_activity_log WHERE action_type = ?',
+                ('RCM_VIEW',)
+            ).fetchall()
+            assert len(logs) == 1
@@ -0,0 +1,86 @@
+"""
+Tests for the application factory and the gunicorn worker hooks
+"""
+import importlib.util
+import os
+import pytest
+import catcher_db
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'gunicorn.conf.py')
+
+
+def _load_gunicorn_conf():
+    spec = importlib.util.spec_from_file_location('catcher_gunicorn_conf', CONF_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class TestCreateApp:
+    """Test create_app builds independent, non-debug apps"""
+
+    def test_debug_off_by_default(self, app, monkeypatch):
+        """Test debug mode is only enabled when requested"""
+        from catcher import create_app
+        monkeypatch.delenv('CATCHER_DEBUG', raising=False)
+        assert create_app().config['DEBUG'] is False
+
+        monkeypatch.setenv('CATCHER_DEBUG', '1')
+        assert create_app().config['DEBUG'] is True
+
+    def test_config_overrides_defaults(self, app):
+        """Test the config mapping is applied on top of the defaults"""
+        from catcher import create_app
+        created = create_app({'TESTING': True, 'SESSION_COOKIE_SECURE': True})
+        assert created is not app
+        assert created.config['TESTING'] is True
+        assert created.config['SESSION_COOKIE_SECURE'] is True
+
+    def test_routes_and_blueprints_registered(self, app):
+        """Test a new app serves the main routes and all blueprints"""
+        from catcher import create_app
+        created = create_app({'TESTING': True})
+        assert {'rcm', 'design', 'operation', 'dashboard'} <= set(created.blueprints)
+        client = created.test_client()
+        assert client.get('/').status_code == 200
+        assert client.get('/login').status_code == 200
+        assert client.get('/no-such-page').status_code == 404
+
+
+class TestGunicornConfig:
+    """Test worker settings and per-worker initialization"""
+
+    def test_settings_from_environment(self, monkeypatch):
+        """Test worker count, threads and preload come from environment variables"""
+        monkeypatch.setenv('CATCHER_WORKERS', '3')
+        monkeypatch.setenv('CATCHER_THREADS', '8')
+        monkeypatch.setenv('CATCHER_PRELOAD', '0')
+        monkeypatch.setenv('CATCHER_METRICS_DB', '/tmp/catcher-test-metrics.db')
+        conf = _load_gunicorn_conf()
+        assert conf.workers == 3
+        assert conf.threads == 8
+        assert conf.preload_app is False
+        assert conf.wsgi_app == 'catcher:app'
+
+    def test_wsgi_app_reuses_module_app(self, monkeypatch):
+        """Test gunicorn loads the app built at import instead of calling create_app again"""
+        import importlib
+        import catcher
+        conf = _load_gunicorn_conf()
+        module_name, _, attribute = conf.wsgi_app.partition(':')
+        calls = []
+        monkeypatch.setattr(catcher, 'create_app', lambda *args: calls.append(args))
+        assert attribute.isidentifier()
+        assert getattr(importlib.import_module(module_name), attribute) is catcher.app
+        assert calls == []
+
+    def test_post_fork_discards_inherited_pools(self, app, monkeypatch):
+        """Test a forked worker starts without the parent's pooled connections"""
+        monkeypatch.setenv('CATCHER_WORKERS', '1')
+        conf = _load_gunicorn_conf()
+        with catcher_db.get_pool().connection() as conn:
+            conn.execute('SELECT 1')
+        assert catcher_db.pool_stats()
+
+        conf.post_fork(None, None)
+        assert catcher_db.pool_stats() == []
@@ -229,3 +229,69 @@ class TestLogout:
         response = authenticated_client.get('/logout', follow_redirects=False)
         assert response.status_code == 302
         assert response.location.endswith('/') or 'index' in response.location
+
+
+class TestAuthorizationCache:
+    """Test request-scoped and process-wide authorization caching"""
+
+    def _count_queries(self, conn):
+        statements = []
+        conn.set_trace_callback(statements.append)
+        return statements
+
+    def test_access_check_is_memoized_per_request(self, app, test_user, test_rcm):
+        """Test repeated checks in one request hit the database once"""
+        with app.app_context():
+            from catcher_auth import get_db, has_rcm_access
+            conn = get_db()
+            statements = self._count_queries(conn)
+            try:
+                for _ in range(5):
+                    assert has_rcm_access(test_user['user_id'], test_rcm['rcm_id']) is False
+            finally:
+                conn.set_trace_callback(None)
+            assert len(statements) == 2
+
+    def test_access_check_uses_process_cache_across_requests(self, app, test_user, test_rcm):
+        """Test a later request reuses the cached authorization"""
+        from catcher_auth import get_db, has_rcm_access
+        with app.app_context():
+            has_rcm_access(test_user['user_id'], test_rcm['rcm_id'])
+
+        with app.app_context():
+            conn = get_db()
+            statements = self._count_queries(conn)
+            try:
+                has_rcm_access(test_user['user_id'], test_rcm['rcm_id'])
+            finally:
+                conn.set_trace_callback(None)
+            assert statements == []
+
+    def test_grant_invalidates_cache(self, app, admin_user, test_user, test_rcm):
+        """Test grant_rcm_access makes the new permission visible immediately"""
+        from catcher_auth import has_rcm_access, grant_rcm_access
+        with app.app_context():
+            assert has_rcm_access(test_user['user_id'], test_rcm['rcm_id']) is False
+            grant_rcm_access(test_user['user_id'], test_rcm['rcm_id'], admin_user['user_id'])
+            assert has_rcm_access(test_user['user_id'], test_rcm['rcm_id']) is True
+
+        with app.app_context():
+            assert has_rcm_access(test_user['user_id'], str(test_rcm['rcm_id'])) is True
+
+    def test_rcm_delete_clears_cache(self, app, admin_client, test_user, test_rcm):
+        """Test deleting an RCM invalidates every cached entry"""
+        from catcher_auth import get_user_authorization
+        with app.app_context():
+            get_user_authorization(test_user['user_id'])
+
+        admin_client.post(f"/rcm/{test_rcm['rcm_id']}/delete")
+
+        with app.app_context():
+            from catcher_auth import get_db
+            conn = get_db()
+            statements = self._count_queries(conn)
+            try:
+                get_user_authorization(test_user['user_id'])
+            finally:
+                conn.set_trace_callback(None)
+            assert statements
@@ -0,0 +1,218 @@
+"""
+Tests for the incremental RCM completeness engine
+"""
+import pytest
+from catcher_auth import get_db, save_rcm_details
+from catcher_completeness import (REQUIRED_FIELDS, evaluate_rcm_completeness, get_completeness_scores,
+                                  refresh_completeness, stale_rcm_ids)
+
+
+def _full_control(code):
+    control = {field: f'{field} {code}' for field in REQUIRED_FIELDS}
+    control['control_code'] = code
+    return control
+
+
+def _eval_row(rcm_id):
+    return get_db().execute('SELECT * FROM ca_rcm_completeness_eval WHERE rcm_id = ?', (rcm_id,)).fetchone()
+
+
+class TestCompletenessScore:
+    """Test scores computed from ca_rcm_detail aggregates"""
+
+    def test_save_rcm_details_computes_score(self, app, test_rcm):
+        """Test saving controls stores a score with per-field missing counts"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            save_rcm_details(rcm_id, [_full_control('C-1'), {'control_code': 'C-2', 'control_name': 'Only name'}])
+
+            row = _eval_row(rcm_id)
+            assert row['total_controls'] == 2
+            assert row['missing_fields_count'] == len(REQUIRED_FIELDS) - 1
+            # No standard library: score is the filled-field rate only
+            expected = round((1 - (len(REQUIRED_FIELDS) - 1) / (2 * len(REQUIRED_FIELDS))) * 100, 1)
+            assert row['completeness_score'] == expected
+
+            details = get_completeness_scores(get_db(), [rcm_id])[rcm_id]['eval_details']
+            assert details['missing_by_field']['control_name'] == 0
+            assert details['missing_by_field']['test_procedure'] == 1
+            assert details['coverage_applicable'] is False
+
+    def test_blank_values_count_as_missing(self, app, test_rcm):
+        """Test whitespace-only values are treated as missing"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            control = _full_control('C-1')
+            control['control_description'] = '   '
+            save_rcm_details(rcm_id, [control])
+            assert _eval_row(rcm_id)['missing_fields_count'] == 1
+
+    def test_standard_coverage_included(self, app, test_rcm):
+        """Test mapped controls raise the score once a standard library exists"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            save_rcm_details(rcm_id, [_full_control('C-1'), _full_control('C-2')])
+            db = get_db()
+            db.execute("INSERT INTO ca_standard_control (control_code, control_name) VALUES ('STD-1', 'Std')")
+            db.execute("UPDATE ca_rcm_detail SET mapped_std_control_id = 1, mapping_status = 'AUTO' "
+                       "WHERE control_code = 'C-1'")
+            db.execute("UPDATE ca_rcm_detail SET mapped_std_control_id = 1, mapping_status = 'REVIEW' "
+                       "WHERE control_code = 'C-2'")
+            db.commit()
+
+            evaluate_rcm_completeness(db, [rcm_id])
+            row = _eval_row(rcm_id)
+            assert row['mapped_controls'] == 1
+            assert row['completeness_score'] == pytest.approx(85.0)
+            assert get_completeness_scores(db, [rcm_id])[rcm_id]['eval_details']['review_controls'] == 1
+
+    def test_rcm_without_controls(self, app, test_rcm):
+        """Test an empty RCM scores zero"""
+        with app.app_context():
+            evaluate_rcm_completeness(get_db(), [test_rcm['rcm_id']])
+            row = _eval_row(test_rcm['rcm_id'])
+            assert row['total_controls'] == 0
+            assert row['completeness_score'] == 0
+
+
+class TestIncrementalRefresh:
+    """Test only RCMs whose control content changed are recomputed"""
+
+    def test_only_changed_rcms_recomputed(self, app, admin_user, test_rcm):
+        """Test refresh skips RCMs already evaluated at their current revision"""
+        with app.app_context():
+            from catcher_auth import create_rcm
+            other = create_rcm('Other RCM', 'TLC', '', admin_user['user_id'], 'other.xlsx')
+            db = get_db()
+            assert set(stale_rcm_ids(db)) >= {test_rcm['rcm_id'], other}
+            assert refresh_completeness(db) >= 2
+            assert stale_rcm_ids(db) == []
+            assert refresh_completeness(db) == 0
+
+            save_rcm_details(other, [_full_control('T-1')])
+            # save_rcm_details already refreshed the changed RCM
+            assert stale_rcm_ids(db) == []
+
+            # Evaluation saves bump the RCM revision but not the control content
+            db.execute('UPDATE ca_rcm_revision SET revision = revision + 1 WHERE rcm_id = ?', (other,))
+            db.commit()
+            assert stale_rcm_ids(db) == []
+
+            db.execute('UPDATE ca_rcm_revision SET detail_revision = detail_revision + 1 WHERE rcm_id = ?',
+                       (other,))
+            db.commit()
+            assert stale_rcm_ids(db) == [other]
+            assert refresh_completeness(db, [test_rcm['rcm_id'], other]) == 1
+
+    def test_standard_import_marks_results_stale(self, app, test_rcm):
+        """Test scores computed without a standard library are recomputed once one is imported"""
+        from catcher_mapping import upsert_standard_controls
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            save_rcm_details(rcm_id, [_full_control('C-1')])
+            db = get_db()
+            assert _eval_row(rcm_id)['completeness_score'] == pytest.approx(100.0)
+            assert stale_rcm_ids(db, [rcm_id]) == []
+
+            upsert_standard_controls(db, [{'control_code': 'STD-1', 'control_name': 'Std'}])
+            assert stale_rcm_ids(db, [rcm_id]) == [rcm_id]
+            assert refresh_completeness(db, [rcm_id]) == 1
+            assert _eval_row(rcm_id)['completeness_score'] == pytest.approx(70.0)
+
+            db.execute("UPDATE ca_standard_control SET is_active = 'N'")
+            db.commit()
+            assert stale_rcm_ids(db, [rcm_id]) == [rcm_id]
+
+    def test_evaluation_save_keeps_result(self, app, admin_user, test_rcm):
+        """Test design evaluation autosaves do not invalidate the stored score"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            from catcher_link2 import save_design_evaluation_batch
+            save_rcm_details(rcm_id, [_full_control('C-1')])
+            save_design_evaluation_batch(rcm_id, admin_user['user_id'], 'S1', [
+                {'control_code': 'C-1', 'evaluation_data': {'overall_effectiveness': 'effective'}}])
+            assert stale_rcm_ids(get_db(), [rcm_id]) == []
+
+    def test_ingest_refreshes_once(self, app, admin_user, test_rcm, monkeypatch, tmp_path):
+        """Test a chunked upload computes the score once per RCM, after all rows are saved"""
+        import catcher_completeness
+        from catcher_link1 import ingest_rcm_workbook
+        from openpyxl import Workbook
+        rcm_id = test_rcm['rcm_id']
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['통제코드', '통제명'])
+        for n in range(25):
+            sheet.append([f'C-{n:03d}', f'통제 {n}'])
+        path = str(tmp_path / 'ingest.xlsx')
+        workbook.save(path)
+
+        calls = []
+        original = catcher_completeness.evaluate_rcm_completeness
+        # Empty calls (nothing stale) compute nothing, so only record real evaluations
+        monkeypatch.setattr(catcher_completeness, 'evaluate_rcm_completeness',
+                            lambda conn, ids: (ids and calls.append(list(ids))) or original(conn, ids))
+        with app.app_context():
+            ingest_rcm_workbook(path, 'individual', 'RCM', 'ITGC', '', admin_user['user_id'],
+                                'ingest.xlsx', admin_user['user_id'], rcm_id=rcm_id, chunk_size=10)
+            assert calls == [[rcm_id]]
+            assert _eval_row(rcm_id)['total_controls'] == 25
+
+    def test_unchanged_upload_does_not_recompute(self, app, test_rcm):
+        """Test re-saving identical controls keeps the stored evaluation"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            save_rcm_details(rcm_id, [_full_control('C-1')])
+            first = _eval_row(rcm_id)
+            save_rcm_details(rcm_id, [_full_control('C-1')])
+            assert tuple(_eval_row(rcm_id)) == tuple(first)
+
+    def test_cli_force(self, app, runner, test_rcm):
+        """Test the CLI command recomputes everything with --force"""
+        with app.app_context():
+            refresh_completeness(get_db())
+        result = runner.invoke(args=['evaluate-completeness'])
+        assert '0개' in result.output
+        result = runner.invoke(args=['evaluate-completeness', '--rcm-id', str(test_rcm['rcm_id']), '--force'])
+        assert result.exit_code == 0, result.output
+        assert '1개' in result.output
+
+
+class TestCompletenessApi:
+    """Test the completeness API used by the RCM list"""
+
+    def test_returns_scores_for_accessible_rcms(self, app, admin_client, test_rcm):
+        """Test the API returns stored scores keyed by RCM ID without recomputing"""
+        with app.app_context():
+            save_rcm_details(test_rcm['rcm_id'], [_full_control('C-1')])
+        response = admin_client.get('/rcm/api/completeness')
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] is True
+        assert data['scores'][str(test_rcm['rcm_id'])]['completeness_score'] == 100.0
+
+        assert data['scores'][str(test_rcm['rcm_id'])]['stale'] is False
+
+        response = admin_client.get(f"/rcm/api/completeness?rcm_id={test_rcm['rcm_id']}")
+        assert list(response.get_json()['scores']) == [str(test_rcm['rcm_id'])]
+
+    def test_read_does_not_write(self, app, admin_client, test_rcm):
+        """Test stale scores are flagged, not recomputed, by the GET API"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            save_rcm_details(rcm_id, [_full_control('C-1')])
+            db = get_db()
+            db.execute('UPDATE ca_rcm_revision SET detail_revision = detail_revision + 1 WHERE rcm_id = ?',
+                       (rcm_id,))
+            db.commit()
+            before = tuple(_eval_row(rcm_id))
+
+        score = admin_client.get(f'/rcm/api/completeness?rcm_id={rcm_id}').get_json()['scores'][str(rcm_id)]
+        assert score['stale'] is True
+        with app.app_context():
+            assert tuple(_eval_row(rcm_id)) == before
+
+    def test_forbidden_rcm(self, authenticated_client, test_rcm):
+        """Test users cannot read scores of RCMs they cannot access"""
+        response = authenticated_client.get(f"/rcm/api/completeness?rcm_id={test_rcm['rcm_id']}")
+        assert response.status_code == 403
@@ -0,0 +1,142 @@
+"""
+Tests for ETag / Last-Modified handling on RCM read endpoints
+"""
+import pytest
+
+
+def _etag(response):
+    return response.headers['ETag']
+
+
+def _login_as(client, user):
+    """Switch the client session to another user"""
+    with client.session_transaction() as session:
+        session['user_id'] = user['user_id']
+        session['user_email'] = user['user_email']
+        session['user_info'] = user
+
+
+class TestRcmRevision:
+    """Test revision bumps on write paths"""
+
+    def test_writes_bump_revision(self, app, admin_user, test_rcm):
+        """Test control saves and evaluation saves increase the revision"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details, get_rcm_revision
+            from catcher_link2 import save_design_evaluation_batch
+            rcm_id = test_rcm['rcm_id']
+            start = get_rcm_revision(rcm_id)['revision']
+
+            save_rcm_details(rcm_id, [{'control_code': 'C-1', 'control_name': 'A'}])
+            assert get_rcm_revision(rcm_id)['revision'] == start + 1
+
+            # Unchanged re-upload does not invalidate caches
+            save_rcm_details(rcm_id, [{'control_code': 'C-1', 'control_name': 'A'}])
+            assert get_rcm_revision(rcm_id)['revision'] == start + 1
+
+            save_design_evaluation_batch(rcm_id, admin_user['user_id'], 'S1', [
+                {'control_code': 'C-1', 'evaluation_data': {'overall_effectiveness': 'effective'}}
+            ])
+            revision = get_rcm_revision(rcm_id)
+            assert revision['revision'] == start + 2
+            assert revision['last_modified'].tzinfo is not None
+
+
+class TestConditionalGet:
+    """Test 304 responses on RCM and session endpoints"""
+
+    def test_rcm_view_not_modified_until_changed(self, app, admin_client, test_rcm):
+        """Test rcm_view returns 304 for a matching ETag and 200 after a change"""
+        url = f"/rcm/{test_rcm['rcm_id']}/view"
+        first = admin_client.get(url)
+        assert first.status_code == 200
+        assert first.headers['Cache-Control'] == 'private, no-cache'
+        assert 'Last-Modified' in first.headers
+
+        cached = admin_client.get(url, headers={'If-None-Match': _etag(first)})
+        assert cached.status_code == 304
+        assert cached.data == b''
+        assert _etag(cached) == _etag(first)
+
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], [{'control_code': 'C-9'}])
+
+        changed = admin_client.get(url, headers={'If-None-Match': _etag(first)})
+        assert changed.status_code == 200
+        assert _etag(changed) != _etag(first)
+
+    def test_if_modified_since(self, admin_client, test_rcm):
+        """Test Last-Modified revalidation without an ETag"""
+        url = f"/rcm/api/{test_rcm['rcm_id']}/status"
+        first = admin_client.get(url)
+        cached = admin_client.get(url, headers={'If-Modified-Since': first.headers['Last-Modified']})
+        assert cached.status_code == 304
+
+    def test_status_api_changes_after_delete(self, admin_client, test_rcm):
+        """Test deleting an RCM invalidates its status ETag"""
+        url = f"/rcm/api/{test_rcm['rcm_id']}/status"
+        first = admin_client.get(url)
+        assert admin_client.get(url, headers={'If-None-Match': _etag(first)}).status_code == 304
+
+        admin_client.post(f"/rcm/{test_rcm['rcm_id']}/delete")
+        assert admin_client.get(url, headers={'If-None-Match': _etag(first)}).status_code == 200
+
+    def test_sessions_api_changes_after_session_create(self, admin_client, test_rcm):
+        """Test creating a design session invalidates the session list"""
+        url = f"/design/api/sessions/{test_rcm['rcm_id']}"
+        first = admin_client.get(url)
+        assert admin_client.get(url, headers={'If-None-Match': _etag(first)}).status_code == 304
+
+        admin_client.post('/design/api/create-session', json={
+            'rcm_id': test_rcm['rcm_id'], 'session_name': '2026 하반기'
+        })
+        refreshed = admin_client.get(url, headers={'If-None-Match': _etag(first)})
+        assert refreshed.status_code == 200
+        assert refreshed.get_json()['sessions'][0]['session_name'] == '2026 하반기'
+
+    def test_etag_is_per_user(self, app, admin_client, test_user, test_rcm):
+        """Test users never share ETags for user-specific responses"""
+        with app.app_context():
+            from catcher_auth import grant_rcm_access
+            grant_rcm_access(test_user['user_id'], test_rcm['rcm_id'], 'READ', 1)
+
+        url = f"/design/api/sessions/{test_rcm['rcm_id']}"
+        admin_etag = _etag(admin_client.get(url))
+
+        _login_as(admin_client, test_user)
+        response = admin_client.get(url, headers={'If-None-Match': admin_etag})
+        assert response.status_code == 200
+        assert _etag(response) != admin_etag
+
+    @pytest.mark.parametrize('module, url, session_key', [
+        ('catcher_link1', '/rcm/{rcm_id}/view', None),
+        ('catcher_link2', '/design/rcm', 'current_design_rcm_id'),
+        ('catcher_link3', '/operation/rcm', 'current_operation_rcm_id'),
+    ])
+    def test_not_modified_page_is_logged(self, admin_client, test_rcm, monkeypatch, module, url, session_key):
+        """Test every RCM page audits revalidated (304) views the same way"""
+        import importlib
+        logged = []
+        monkeypatch.setattr(importlib.import_module(module), 'log_user_activity',
+                            lambda *args: logged.append(args))
+        if session_key:
+            with admin_client.session_transaction() as session:
+                session[session_key] = test_rcm['rcm_id']
+        url = url.format(rcm_id=test_rcm['rcm_id'])
+
+        first = admin_client.get(url)
+        assert first.status_code == 200
+        cached = admin_client.get(url, headers={'If-None-Match': _etag(first)})
+        assert cached.status_code == 304
+        assert len(logged) == 2
+        assert logged[-1][-1] == {'rcm_id': test_rcm['rcm_id'], 'not_modified': True}
+
+    def test_access_checked_before_not_modified(self, admin_client, test_user, test_rcm):
+        """Test a matching ETag never bypasses the access check"""
+        url = f"/rcm/api/{test_rcm['rcm_id']}/status"
+        etag = _etag(admin_client.get(url))
+
+        _login_as(admin_client, test_user)
+        response = admin_client.get(url, headers={'If-None-Match': etag})
+        assert response.status_code == 403
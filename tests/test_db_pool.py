@@ -0,0 +1,108 @@
+"""
+Tests for the SQLite connection pool
+"""
+import sqlite3
+import threading
+import pytest
+from catcher_db import ConnectionPool, PoolTimeoutError
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """Create a small pool over a temporary database."""
+    pool = ConnectionPool(str(tmp_path / 'pool.db'), max_size=2, timeout=1,
+                          health_check_interval=0)
+    yield pool
+    pool.close()
+
+
+class TestPoolConfiguration:
+    """Test pragmas applied to pooled connections"""
+
+    def test_connections_are_pragma_tuned(self, pool):
+        """Test WAL, synchronous, cache, mmap and temp_store settings"""
+        with pool.connection() as conn:
+            assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+            assert conn.execute('PRAGMA cache_size').fetchone()[0] == -pool.cache_kb
+            assert conn.execute('PRAGMA temp_store').fetchone()[0] == 2  # MEMORY
+            assert conn.row_factory is sqlite3.Row
+
+    def test_pool_size_from_env(self, tmp_path, monkeypatch):
+        """Test pool size is configurable via environment"""
+        monkeypatch.setenv('CATCHER_DB_POOL_SIZE', '7')
+        pool = ConnectionPool(str(tmp_path / 'env.db'))
+        assert pool.max_size == 7
+        pool.close()
+
+
+class TestPoolCheckout:
+    """Test checkout and reuse behaviour"""
+
+    def test_connection_is_reused(self, pool):
+        """Test released connections are handed out again"""
+        first = pool.acquire()
+        pool.release(first)
+        second = pool.acquire()
+        pool.release(second)
+
+        assert first is second
+        assert pool.stats()['connections_created'] == 1
+        assert pool.stats()['checkouts'] == 2
+
+    def test_same_thread_gets_same_connection(self, pool):
+        """Test nested checkout on one thread is reentrant"""
+        outer = pool.acquire()
+        inner = pool.acquire()
+        assert outer is inner
+
+        pool.release(inner)
+        assert pool.stats()['in_use'] == 1
+        pool.release(outer)
+        assert pool.stats()['in_use'] == 0
+
+    def test_release_rolls_back_open_transaction(self, pool):
+        """Test uncommitted work is discarded on release"""
+        with pool.connection() as conn:
+            conn.execute('CREATE TABLE t (v INTEGER)')
+            conn.commit()
+            conn.execute('INSERT INTO t VALUES (1)')
+
+        with pool.connection() as conn:
+            assert conn.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 0
+
+    def test_exhausted_pool_times_out(self, pool):
+        """Test checkout waits and then fails when pool is exhausted"""
+        held = []
+
+        def hold():
+            held.append(pool.acquire())
+
+        threads = [threading.Thread(target=hold) for _ in range(2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        with pytest.raises(PoolTimeoutError):
+            pool.acquire()
+
+        stats = pool.stats()
+        assert stats['waits'] == 1
+        assert stats['timeouts'] == 1
+        assert stats['peak_in_use'] == 2
+
+        for conn in held:
+            pool.release(conn)
+
+    def test_broken_connection_is_replaced(self, pool):
+        """Test health check replaces a connection that fails"""
+        conn = pool.acquire()
+        pool.release(conn)
+        conn.close()
+
+        replacement = pool.acquire()
+        assert replacement is not conn
+        assert replacement.execute('SELECT 1').fetchone()[0] == 1
+        pool.release(replacement)
+        assert pool.stats()['health_check_failures'] == 1
@@ -0,0 +1,129 @@
+"""
+Tests for near-duplicate control detection (MinHash/LSH)
+"""
+import pytest
+from catcher_auth import get_db, save_rcm_details
+from catcher_dedup import (NUM_PERM, duplicate_clusters, index_rcm_controls, minhash_signature,
+                           similar_controls)
+
+ACCOUNT_CONTROL = {'control_code': 'C-01', 'control_name': '신규 사용자 계정 승인',
+                   'control_description': '시스템 신규 사용자 계정은 부서장 승인 후 생성하며 승인 내역을 보관한다'}
+ACCOUNT_VARIANT = {'control_code': 'C-02', 'control_name': '신규 사용자 계정 승인',
+                   'control_description': '시스템 신규 사용자 계정은 팀장 승인 후 생성하며 승인 내역을 보관한다'}
+BACKUP_CONTROL = {'control_code': 'C-03', 'control_name': '데이터 백업',
+                  'control_description': '중요 데이터는 매일 자동 백업하고 분기별 복구 테스트를 수행한다'}
+
+
+def _detail_id(rcm_id, control_code):
+    return get_db().execute('SELECT detail_id FROM ca_rcm_detail WHERE rcm_id = ? AND control_code = ?',
+                            (rcm_id, control_code)).fetchone()[0]
+
+
+@pytest.fixture
+def two_rcms(app, admin_user, test_rcm):
+    """Two RCMs sharing an edited copy of the same control"""
+    with app.app_context():
+        from catcher_auth import create_rcm
+        other = create_rcm('Subsidiary RCM - ITGC', 'ITGC', '', admin_user['user_id'], 'sub.xlsx')
+        save_rcm_details(test_rcm['rcm_id'], [ACCOUNT_CONTROL, BACKUP_CONTROL])
+        save_rcm_details(other, [dict(ACCOUNT_VARIANT, control_code='S-01')])
+    return test_rcm['rcm_id'], other
+
+
+class TestMinHash:
+    """Test signature estimation"""
+
+    def test_signature_estimates_jaccard(self):
+        """Test near-identical texts agree on most hashes and unrelated texts on few"""
+        base = minhash_signature(ACCOUNT_CONTROL['control_description'])
+        assert base.shape == (NUM_PERM,)
+        assert (base == minhash_signature(ACCOUNT_CONTROL['control_description'])).all()
+        assert (base == minhash_signature(ACCOUNT_VARIANT['control_description'])).mean() > 0.6
+        assert (base == minhash_signature(BACKUP_CONTROL['control_description'])).mean() < 0.2
+
+    def test_empty_text(self):
+        """Test controls without text get no signature"""
+        assert minhash_signature('') is None
+
+
+class TestDedupIndex:
+    """Test incremental indexing and similarity queries"""
+
+    def test_upload_indexes_controls(self, app, two_rcms):
+        """Test save_rcm_details indexes new controls and nothing is left to index"""
+        with app.app_context():
+            db = get_db()
+            assert db.execute('SELECT COUNT(*) FROM ca_control_minhash').fetchone()[0] == 3
+            assert index_rcm_controls(db) == 0
+
+    def test_similar_controls_across_rcms(self, app, two_rcms):
+        """Test an edited copy in another RCM is found and unrelated controls are not"""
+        rcm_id, other = two_rcms
+        with app.app_context():
+            db = get_db()
+            results = similar_controls(db, _detail_id(rcm_id, 'C-01'), threshold=0.5)
+            assert [(row['rcm_id'], row['control_code']) for row in results] == [(other, 'S-01')]
+            assert 0.5 <= results[0]['similarity'] < 1
+            assert similar_controls(db, _detail_id(rcm_id, 'C-03'), threshold=0.5) == []
+            # Results are limited to the caller's RCMs
+            assert similar_controls(db, _detail_id(rcm_id, 'C-01'), threshold=0.5, rcm_ids={rcm_id}) == []
+
+    def test_edit_reindexes_control(self, app, two_rcms):
+        """Test changing a control's text replaces its signature on the next save"""
+        rcm_id, other = two_rcms
+        with app.app_context():
+            db = get_db()
+            save_rcm_details(other, [dict(BACKUP_CONTROL, control_code='S-01')])
+            results = similar_controls(db, _detail_id(rcm_id, 'C-03'), threshold=0.9)
+            assert [row['control_code'] for row in results] == ['S-01']
+            assert similar_controls(db, _detail_id(rcm_id, 'C-01'), threshold=0.5) == []
+
+    def test_duplicate_clusters_in_rcm(self, app, test_rcm):
+        """Test near-duplicates inside one RCM are grouped together"""
+        with app.app_context():
+            save_rcm_details(test_rcm['rcm_id'], [
+                ACCOUNT_CONTROL, ACCOUNT_VARIANT, BACKUP_CONTROL,
+                dict(ACCOUNT_CONTROL, control_code='C-04'),
+            ])
+            clusters = duplicate_clusters(get_db(), test_rcm['rcm_id'], threshold=0.5)
+            assert len(clusters) == 1
+            assert [row['control_code'] for row in clusters[0]['controls']] == ['C-01', 'C-02', 'C-04']
+            assert clusters[0]['max_similarity'] == 1.0
+
+    def test_rebuild_command(self, app, runner, two_rcms):
+        """Test the CLI rebuilds signatures for an RCM"""
+        rcm_id, _ = two_rcms
+        result = runner.invoke(args=['rebuild-dedup-index', '--rcm-id', str(rcm_id)])
+        assert result.exit_code == 0, result.output
+        assert '2개' in result.output
+
+
+class TestDedupApi:
+    """Test the similar-controls and duplicates APIs"""
+
+    def test_similar_api(self, app, admin_client, two_rcms):
+        """Test the similar controls API returns matches with similarity"""
+        rcm_id, other = two_rcms
+        with app.app_context():
+            detail_id = _detail_id(rcm_id, 'C-01')
+        response = admin_client.get(f'/rcm/api/controls/{detail_id}/similar?threshold=0.5')
+        assert response.status_code == 200
+        assert [row['rcm_id'] for row in response.get_json()['controls']] == [other]
+        assert admin_client.get('/rcm/api/controls/999999/similar').status_code == 404
+
+    def test_read_apis_do_not_index(self, app, admin_client, test_rcm):
+        """Test the GET APIs only read the index maintained by uploads"""
+        from catcher_auth import bulk_upsert_rcm_details
+        with app.app_context():
+            bulk_upsert_rcm_details(test_rcm['rcm_id'], [ACCOUNT_CONTROL, dict(ACCOUNT_CONTROL, control_code='C-04')])
+            detail_id = _detail_id(test_rcm['rcm_id'], 'C-01')
+
+        assert admin_client.get(f"/rcm/api/{test_rcm['rcm_id']}/duplicates").get_json()['clusters'] == []
+        assert admin_client.get(f'/rcm/api/controls/{detail_id}/similar').get_json()['controls'] == []
+        with app.app_context():
+            assert get_db().execute('SELECT COUNT(*) FROM ca_control_minhash').fetchone()[0] == 0
+
+    def test_duplicates_api_requires_access(self, authenticated_client, test_rcm):
+        """Test users without access to the RCM get 403"""
+        response = authenticated_client.get(f"/rcm/api/{test_rcm['rcm_id']}/duplicates")
+        assert response.status_code == 403
@@ -0,0 +1,179 @@
+"""
+Tests for the content-addressed evidence store
+"""
+import io
+import os
+import pytest
+from catcher_auth import get_db
+from catcher_evidence import attach, blob_path, collect_garbage, detach, store_stream
+
+CONTENT = b'population extract\n' * 10000
+
+
+@pytest.fixture(autouse=True)
+def evidence_dir(tmp_path, monkeypatch):
+    path = tmp_path / 'evidence'
+    monkeypatch.setenv('CATCHER_EVIDENCE_DIR', str(path))
+    return path
+
+
+@pytest.fixture
+def operation_line(app, admin_user, test_rcm):
+    """An operation evaluation line for ITGC-001 in design session S1"""
+    with app.app_context():
+        from catcher_auth import save_rcm_details
+        from catcher_link2 import save_design_evaluation_batch
+        from catcher_link3 import get_or_create_operation_line
+        save_rcm_details(test_rcm['rcm_id'], [{'control_code': 'ITGC-001'}, {'control_code': 'ITGC-002'}])
+        save_design_evaluation_batch(test_rcm['rcm_id'], admin_user['user_id'], 'S1', [
+            {'control_code': 'ITGC-001', 'evaluation_data': {'overall_effectiveness': 'effective'}}])
+        db = get_db()
+        with db:
+            return get_or_create_operation_line(db, test_rcm['rcm_id'], admin_user['user_id'], 'S1', 'ITGC-001')
+
+
+def _blob(sha256):
+    return get_db().execute('SELECT size_bytes, ref_count FROM ca_evidence_blob WHERE sha256 = ?',
+                            (sha256,)).fetchone()
+
+
+class TestEvidenceStore:
+    """Test hashing, deduplication and reference counting"""
+
+    def test_same_content_stored_once(self, app, evidence_dir, operation_line):
+        """Test identical uploads share one sharded file and count references"""
+        with app.app_context():
+            db = get_db()
+            sha256, size = store_stream(db, io.BytesIO(CONTENT))
+            again, _ = store_stream(db, io.BytesIO(CONTENT))
+            assert again == sha256
+            assert size == len(CONTENT)
+            path = blob_path(sha256)
+            assert path == os.path.join(str(evidence_dir), sha256[:2], sha256[2:4], sha256)
+            with open(path, 'rb') as fileobj:
+                assert fileobj.read() == CONTENT
+            assert os.listdir(evidence_dir / 'tmp') == []
+
+            with db:
+                first = attach(db, operation_line, sha256)
+                attach(db, operation_line, sha256, 'POPULATION')
+            assert tuple(_blob(sha256)) == (len(CONTENT), 2)
+            detach(db, first)
+            assert _blob(sha256)['ref_count'] == 1
+
+    def test_gc_removes_only_unreferenced_blobs(self, app, operation_line):
+        """Test garbage collection keeps referenced blobs and respects the grace period"""
+        with app.app_context():
+            db = get_db()
+            kept, _ = store_stream(db, io.BytesIO(b'kept'))
+            orphan, _ = store_stream(db, io.BytesIO(b'orphan'))
+            with db:
+                attach(db, operation_line, kept)
+
+            assert collect_garbage(db, grace_seconds=3600)['blobs'] == 0
+            result = collect_garbage(db, grace_seconds=0)
+            assert result == {'blobs': 1, 'bytes': len(b'orphan'), 'tmp_files': 0}
+            assert not os.path.exists(blob_path(orphan))
+            assert _blob(orphan) is None
+            assert os.path.exists(blob_path(kept))
+
+    def test_invalid_attachment_type(self, app, operation_line):
+        """Test unknown attachment types are rejected"""
+        with app.app_context():
+            db = get_db()
+            sha256, _ = store_stream(db, io.BytesIO(b'x'))
+            with pytest.raises(ValueError):
+                attach(db, operation_line, sha256, 'OTHER')
+
+
+class TestEvidenceApi:
+    """Test upload, ranged download and delete endpoints"""
+
+    def _upload(self, client, rcm_id, control_code, files):
+        return client.post('/operation/api/evidence', data={
+            'rcm_id': rcm_id, 'control_code': control_code, 'design_session': 'S1',
+            'evidence_file': [(io.BytesIO(content), name) for name, content in files],
+        }, content_type='multipart/form-data')
+
+    def test_upload_dedup_and_range_download(self, app, admin_client, test_rcm, operation_line, evidence_dir):
+        """Test the same file on two controls is stored once and served with ranges"""
+        response = self._upload(admin_client, test_rcm['rcm_id'], 'ITGC-001', [('pop.csv', CONTENT)])
+        assert response.status_code == 200, response.get_json()
+        attachment = response.get_json()['attachments'][0]
+        response = self._upload(admin_client, test_rcm['rcm_id'], 'ITGC-002', [('copy.csv', CONTENT)])
+        assert response.get_json()['attachments'][0]['sha256'] == attachment['sha256']
+        with app.app_context():
+            assert _blob(attachment['sha256'])['ref_count'] == 2
+        shards = [name for name in os.listdir(evidence_dir) if name != 'tmp']
+        assert len(shards) == 1
+
+        url = f"/operation/api/evidence/{attachment['attachment_id']}"
+        full = admin_client.get(url)
+        assert full.status_code == 200
+        assert full.data == CONTENT
+        assert full.headers['ETag'] == f'"{attachment["sha256"]}"'
+        assert full.headers['Accept-Ranges'] == 'bytes'
+
+        partial = admin_client.get(url, headers={'Range': 'bytes=100-199'})
+        assert partial.status_code == 206
+        assert partial.data == CONTENT[100:200]
+        assert partial.headers['Content-Range'] == f'bytes 100-199/{len(CONTENT)}'
+
+        cached = admin_client.get(url, headers={'If-None-Match': full.headers['ETag']})
+        assert cached.status_code == 304
+
+    def test_rejects_unknown_control_and_session(self, app, admin_client, test_rcm, operation_line, evidence_dir):
+        """Test unknown controls or design sessions create no line and leave nothing in the store"""
+        response = self._upload(admin_client, test_rcm['rcm_id'], 'NOPE-999', [('a.pdf', b'%PDF-1.4')])
+        assert response.status_code == 404
+        response = admin_client.post('/operation/api/evidence', data={
+            'rcm_id': test_rcm['rcm_id'], 'control_code': 'ITGC-002', 'design_session': 'S9',
+            'evidence_file': [(io.BytesIO(b'%PDF-1.4'), 'a.pdf')],
+        }, content_type='multipart/form-data')
+        assert response.status_code == 400
+
+        with app.app_context():
+            db = get_db()
+            assert db.execute('SELECT COUNT(*) FROM ca_evidence_blob').fetchone()[0] == 0
+            assert db.execute(
+                "SELECT COUNT(*) FROM ca_operation_evaluation_line WHERE control_code != 'ITGC-001'"
+            ).fetchone()[0] == 0
+        assert [path for path in evidence_dir.rglob('*') if path.is_file()] == []
+
+    def test_delete_and_access(self, app, admin_client, test_user, test_rcm, operation_line):
+        """Test users without RCM access cannot download and deleting drops the reference"""
+        response = self._upload(admin_client, test_rcm['rcm_id'], 'ITGC-001', [('a.pdf', b'%PDF-1.4')])
+        attachment = response.get_json()['attachments'][0]
+        url = f"/operation/api/evidence/{attachment['attachment_id']}"
+
+        assert admin_client.post(f'{url}/delete').get_json()['success'] is True
+        assert admin_client.get(url).status_code == 404
+        with app.app_context():
+            assert _blob(attachment['sha256'])['ref_count'] == 0
+
+        response = self._upload(admin_client, test_rcm['rcm_id'], 'ITGC-001', [('b.pdf', b'%PDF-1.5')])
+        url = f"/operation/api/evidence/{response.get_json()['attachments'][0]['attachment_id']}"
+        with admin_client.session_transaction() as session:
+            session['user_id'] = test_user['user_id']
+            session['user_email'] = test_user['user_email']
+            session['user_info'] = test_user
+        assert admin_client.get(url).status_code == 403
+        assert admin_client.post(f'{url}/delete').status_code == 403
+
+    def test_read_access_is_not_enough(self, app, admin_client, admin_user, test_user, test_rcm, operation_line):
+        """Test a user with only read access to the RCM cannot fetch or delete another evaluator's evidence"""
+        response = self._upload(admin_client, test_rcm['rcm_id'], 'ITGC-001', [('c.pdf', b'%PDF-1.6')])
+        attachment = response.get_json()['attachments'][0]
+        url = f"/operation/api/evidence/{attachment['attachment_id']}"
+        with app.app_context():
+            from catcher_auth import grant_rcm_access
+            grant_rcm_access(test_user['user_id'], test_rcm['rcm_id'], admin_user['user_id'], 'READ')
+
+        with admin_client.session_transaction() as session:
+            session['user_id'] = test_user['user_id']
+            session['user_email'] = test_user['user_email']
+            session['user_info'] = test_user
+        assert admin_client.get(url).status_code == 403
+        assert admin_client.post(f'{url}/delete').status_code == 403
+        with app.app_context():
+            assert _blob(attachment['sha256'])['ref_count'] == 1
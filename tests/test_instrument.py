@@ -0,0 +1,92 @@
+"""
+Tests for request timing, query counting and the slow-query log
+"""
+import logging
+import sqlite3
+import pytest
+from flask import Flask
+import catcher_db
+import catcher_instrument
+from catcher_instrument import (InstrumentedConnection, init_instrumentation, redact_sql,
+                                get_endpoint_stats, reset_endpoint_stats)
+
+
+@pytest.fixture
+def instrumented_app(app):
+    """A small app with instrumentation enabled against the test database"""
+    test_app = Flask('instrumented')
+
+    @test_app.route('/queries/<int:count>')
+    def run_queries(count):
+        with catcher_db.get_pool().connection() as conn:
+            for _ in range(count):
+                conn.execute('SELECT COUNT(*) FROM ca_user').fetchone()
+        return 'ok'
+
+    assert init_instrumentation(test_app, enabled=True)
+    # Open the pooled connection up front so its PRAGMAs are not counted in requests
+    with catcher_db.get_pool().connection():
+        pass
+    reset_endpoint_stats()
+    yield test_app
+
+    catcher_db.connection_factory = sqlite3.Connection
+    catcher_db.close_pools()
+    reset_endpoint_stats()
+
+
+class TestInstrumentation:
+    """Test per-request query counting and Server-Timing"""
+
+    def test_disabled_by_default(self, app, client):
+        """Test the main app does not instrument unless enabled"""
+        assert catcher_db.connection_factory is sqlite3.Connection
+        response = client.get('/login')
+        assert 'Server-Timing' not in response.headers
+
+    def test_server_timing_counts_queries(self, instrumented_app):
+        """Test the Server-Timing header reports this request's query count"""
+        client = instrumented_app.test_client()
+        response = client.get('/queries/3')
+        assert response.status_code == 200
+        header = response.headers['Server-Timing']
+        assert 'db;desc="3 queries"' in header
+        assert 'total;dur=' in header
+
+    def test_pool_uses_instrumented_connection(self, instrumented_app):
+        """Test pooled connections are created with the instrumented factory"""
+        with catcher_db.get_pool().connection() as conn:
+            assert isinstance(conn, InstrumentedConnection)
+            assert conn.execute('SELECT 1').fetchone()[0] == 1
+
+    def test_endpoint_stats_accumulate(self, instrumented_app):
+        """Test per-endpoint latency and query totals accumulate across requests"""
+        client = instrumented_app.test_client()
+        client.get('/queries/2')
+        client.get('/queries/1')
+        stats = get_endpoint_stats()['run_queries']
+        assert stats['requests'] == 2
+        assert stats['queries'] == 3
+        assert stats['max_ms'] <= stats['total_ms']
+
+    def test_slow_query_logged_redacted(self, instrumented_app, monkeypatch, caplog):
+        """Test queries over the threshold are logged without literal values"""
+        monkeypatch.setattr(catcher_instrument, 'SLOW_QUERY_MS', 0)
+        with caplog.at_level(logging.WARNING, logger='catcher.slow_query'):
+            with catcher_db.get_pool().connection() as conn:
+                conn.execute("SELECT * FROM ca_user WHERE user_email = 'secret@example.com' AND user_id = ?",
+                             (42,)).fetchall()
+        messages = [record.getMessage() for record in caplog.records]
+        assert any('params=1' in message for message in messages)
+        assert all('secret@example.com' not in message for message in messages)
+
+
+class TestRedactSql:
+    """Test SQL redaction for the slow-query log"""
+
+    def test_literals_replaced(self):
+        sql = "SELECT *  FROM t\n WHERE name = 'O''Brien' AND id = 7 AND code = ?"
+        assert redact_sql(sql) == 'SELECT * FROM t WHERE name = ? AND id = ? AND code = ?'
+
+    def test_identifiers_with_digits_kept(self):
+        assert redact_sql('SELECT col1 FROM table2') == 'SELECT col1 FROM table2'
@@ -453,3 +453,245 @@ class TestUserPermissions:
                 assert permission is not None
                 assert permission['permission_type'] == 'READ'
                 assert permission['is_active'] == 'Y'
+
+
+class TestStreamingReader:
+    """Test read-only streaming Excel reader"""
+
+    def test_reader_headers_and_controls(self, sample_excel_file):
+        """Test reader returns headers and mapped control dicts"""
+        from catcher_excel import RcmSheetReader
+        from catcher_link1 import perform_auto_mapping
+
+        with RcmSheetReader(sample_excel_file) as reader:
+            assert reader.headers[0] == '통제코드'
+            mapping = perform_auto_mapping(reader.headers)
+            controls = list(reader.iter_controls(mapping))
+
+        assert [c['control_code'] for c in controls] == ['ITGC-001', 'ITGC-002', 'ITGC-003']
+        assert controls[0]['control_name'] == '시스템 접근 통제'
+        assert controls[2]['key_control'] == 'N'
+
+    def test_reader_categorized_controls(self, sample_integrated_excel_file):
+        """Test integrated reader yields category with each control"""
+        from catcher_excel import RcmSheetReader
+        from catcher_link1 import perform_auto_mapping, find_category_column
+
+        with RcmSheetReader(sample_integrated_excel_file) as reader:
+            mapping = perform_auto_mapping(reader.headers)
+            rows = list(reader.iter_categorized_controls(mapping, find_category_column(reader.headers)))
+
+        categories = [category for category, _ in rows]
+        assert categories == ['ELC', 'ELC', 'TLC', 'TLC', 'ITGC', 'ITGC']
+
+    def test_reader_pads_short_rows(self, tmp_path):
+        """Test rows shorter than the mapped columns yield empty strings"""
+        from openpyxl import Workbook
+        from catcher_excel import RcmSheetReader
+
+        path = str(tmp_path / 'short.xlsx')
+        wb = Workbook()
+        ws = wb.active
+        ws.append(['통제코드', '통제명', '통제설명'])
+        ws.append(['C-1'])
+        wb.save(path)
+
+        with RcmSheetReader(path) as reader:
+            controls = list(reader.iter_controls({'control_code': 0, 'control_description': 2}))
+
+        assert controls == [{'control_code': 'C-1', 'control_description': ''}]
+
+
+def _wait_for_job(client, status_url, timeout=10):
+    import time
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(status_url).get_json()
+        if job['status'] in ('COMPLETED', 'FAILED'):
+            return job
+        time.sleep(0.05)
+    raise AssertionError('upload job did not finish')
+
+
+class TestAsyncUpload:
+    """Test background upload jobs and status polling"""
+
+    def test_async_individual_upload(self, app, admin_client, sample_excel_file, test_user):
+        """Test async upload returns a job that completes with progress counts"""
+        with open(sample_excel_file, 'rb') as f:
+            response = admin_client.post('/rcm/process_upload', data={
+                'rcm_name': 'Async ITGC RCM',
+                'upload_mode': 'individual',
+                'control_category': 'ITGC',
+                'target_user_id': str(test_user['user_id']),
+                'async_mode': '1',
+                'excel_file': (f, 'async.xlsx')
+            }, content_type='multipart/form-data')
+
+        json_data = response.get_json()
+        assert json_data['success'] is True
+        assert json_data['job_id']
+
+        job = _wait_for_job(admin_client, json_data['status_url'])
+        assert job['status'] == 'COMPLETED'
+        assert job['rows_parsed'] == 3
+        assert job['rows_written'] == 3
+        assert job['category_counts'] == {'ITGC': 3}
+
+        with app.app_context():
+            rcm_id = job['rcm_ids']['ITGC']
+            count = get_db().execute(
+                'SELECT COUNT(*) FROM ca_rcm_detail WHERE rcm_id = ?', (rcm_id,)
+            ).fetchone()[0]
+            assert count == 3
+
+    def test_async_integrated_upload(self, admin_client, sample_integrated_excel_file, test_user):
+        """Test async integrated upload reports per-category counts"""
+        with open(sample_integrated_excel_file, 'rb') as f:
+            response = admin_client.post('/rcm/process_upload', data={
+                'rcm_name': 'Async 통합 RCM',
+                'upload_mode': 'integrated',
+                'target_user_id': str(test_user['user_id']),
+                'async_mode': '1',
+                'excel_file': (f, 'async_integrated.xlsx')
+            }, content_type='multipart/form-data')
+
+        job = _wait_for_job(admin_client, response.get_json()['status_url'])
+        assert job['status'] == 'COMPLETED'
+        assert job['category_counts'] == {'ELC': 2, 'TLC': 2, 'ITGC': 2}
+        assert job['controls_count'] == 6
+
+    def test_async_upload_failure_is_reported(self, admin_client, sample_excel_file, test_user):
+        """Test a failing job records FAILED with an error message"""
+        with open(sample_excel_file, 'rb') as f:
+            response = admin_client.post('/rcm/process_upload', data={
+                'rcm_name': 'No Category Column',
+                'upload_mode': 'integrated',
+                'target_user_id': str(test_user['user_id']),
+                'async_mode': '1',
+                'excel_file': (f, 'no_category.xlsx')
+            }, content_type='multipart/form-data')
+
+        job = _wait_for_job(admin_client, response.get_json()['status_url'])
+        assert job['status'] == 'FAILED'
+        assert '카테고리' in job['error_message']
+
+    def test_failed_job_deactivates_created_rcm(self, app, admin_client, test_user):
+        """Test a job that fails after creating its RCM leaves no active partial RCM"""
+        response = admin_client.post('/rcm/process_upload', data={
+            'rcm_name': 'Broken Upload',
+            'upload_mode': 'individual',
+            'control_category': 'ITGC',
+            'target_user_id': str(test_user['user_id']),
+            'async_mode': '1',
+            'excel_file': (io.BytesIO(b'not a workbook'), 'broken.xlsx')
+        }, content_type='multipart/form-data')
+
+        job = _wait_for_job(admin_client, response.get_json()['status_url'])
+        assert job['status'] == 'FAILED'
+        with app.app_context():
+            rcm_id = job['rcm_ids']['ITGC']
+            row = get_db().execute('SELECT is_active FROM ca_rcm WHERE rcm_id = ?', (rcm_id,)).fetchone()
+            assert row['is_active'] == 'N'
+
+    def test_post_commit_failure_keeps_completed_job(self, app, admin_client, sample_excel_file, test_user,
+                                                     monkeypatch):
+        """Test a failure after the job is committed does not fail it or deactivate its RCM"""
+        import catcher_auth
+        original = catcher_auth.log_user_activity
+
+        def failing_log(user_info, activity_type, *args, **kwargs):
+            if activity_type == 'RCM_UPLOAD_COMPLETE':
+                raise RuntimeError('activity log unavailable')
+            return original(user_info, activity_type, *args, **kwargs)
+
+        monkeypatch.setattr(catcher_auth, 'log_user_activity', failing_log)
+        with open(sample_excel_file, 'rb') as f:
+            response = admin_client.post('/rcm/process_upload', data={
+                'rcm_name': 'Logged Upload',
+                'upload_mode': 'individual',
+                'control_category': 'ITGC',
+                'target_user_id': str(test_user['user_id']),
+                'async_mode': '1',
+                'excel_file': (f, 'logged.xlsx')
+            }, content_type='multipart/form-data')
+
+        job = _wait_for_job(admin_client, response.get_json()['status_url'])
+        assert job['status'] == 'COMPLETED'
+        with app.app_context():
+            row = get_db().execute('SELECT is_active FROM ca_rcm WHERE rcm_id = ?',
+                                   (job['rcm_ids']['ITGC'],)).fetchone()
+            assert row['is_active'] == 'Y'
+
+    def test_orphaned_jobs_are_failed(self, app, admin_user, test_rcm):
+        """Test jobs whose worker process is gone are failed and their RCMs deactivated"""
+        import json
+        import os
+        import socket
+        import subprocess
+        import sys
+        from catcher_jobs import fail_orphaned_upload_jobs
+
+        dead = subprocess.Popen([sys.executable, '-c', 'pass'])
+        dead.wait()
+        with app.app_context():
+            db = get_db()
+            for job_id, pid, rcm_ids in (('orphan', dead.pid, {'ITGC': test_rcm['rcm_id']}),
+                                         ('alive', os.getpid(), {})):
+                db.execute('''
+                    INSERT INTO ca_rcm_upload_job (job_id, user_id, target_user_id, rcm_name, upload_mode,
+                                                   status, rcm_ids, worker_host, worker_pid)
+                    VALUES (?, ?, ?, 'Job', 'individual', 'RUNNING', ?, ?, ?)
+                ''', (job_id, admin_user['user_id'], admin_user['user_id'], json.dumps(rcm_ids),
+                      socket.gethostname(), pid))
+            db.commit()
+
+            assert fail_orphaned_upload_jobs(db) == 1
+            status = dict(db.execute('SELECT job_id, status FROM ca_rcm_upload_job').fetchall())
+            assert status == {'orphan': 'FAILED', 'alive': 'RUNNING'}
+            row = db.execute('SELECT is_active FROM ca_rcm WHERE rcm_id = ?', (test_rcm['rcm_id'],)).fetchone()
+            assert row['is_active'] == 'N'
+
+    def test_status_unknown_job(self, admin_client):
+        """Test status API returns 404 for unknown jobs"""
+        response = admin_client.get('/rcm/api/upload/unknown/status')
+        assert response.status_code == 404
+
+
+class TestRcmExport:
+    """Test streamed RCM Excel export"""
+
+    def test_export_round_trips_through_upload_mapping(self, app, admin_client, test_rcm, tmp_path):
+        """Test exported workbook is readable by the upload reader"""
+        controls = [{
+            'control_code': f'ITGC-{n:03d}', 'control_name': f'통제 {n}', 'control_description': '설명\x01',
+            'key_control': 'Y', 'control_frequency': '월별', 'control_type': '예방',
+            'process_area': '구매', 'risk_description': '발주 누락', 'test_procedure': '샘플 검토'
+        } for n in range(30)]
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], controls)
+
+        response = admin_client.get(f"/rcm/{test_rcm['rcm_id']}/export")
+        assert response.status_code == 200
+        assert response.mimetype == 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        assert 'attachment' in response.headers['Content-Disposition']
+
+        path = tmp_path / 'export.xlsx'
+        path.write_bytes(response.data)
+        from catcher_excel import RcmSheetReader
+        from catcher_link1 import perform_auto_mapping
+        with RcmSheetReader(str(path)) as reader:
+            exported = list(reader.iter_controls(perform_auto_mapping(reader.headers)))
+
+        assert len(exported) == 30
+        assert exported[0]['control_code'] == 'ITGC-000'
+        assert exported[0]['process_area'] == '구매'
+        assert exported[0]['risk_description'] == '발주 누락'
+        # Control characters Excel rejects are stripped
+        assert exported[0]['control_description'] == '설명'
+
+    def test_export_requires_access(self, authenticated_client, test_rcm):
+        """Test users without permission are redirected"""
+        response = authenticated_client.get(f"/rcm/{test_rcm['rcm_id']}/export")
+        assert response.status_code == 302
@@ -48,3 +48,124 @@ class TestDesignEvaluationList:
         """Test that admin can see all RCMs"""
         response = admin_client.get('/design/evaluation')
         assert response.status_code == 200
+
+
+class TestDesignBatchSave:
+    """Test batch saving of design evaluations"""
+
+    @pytest.fixture
+    def rcm_with_controls(self, app, test_rcm):
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], [
+                {'control_code': f'ITGC-{n:03d}', 'control_name': f'Control {n}'} for n in range(50)
+            ])
+        return test_rcm
+
+    def _post(self, client, rcm_id, evaluations):
+        return client.post('/design/api/save-batch', json={
+            'rcm_id': rcm_id,
+            'evaluation_session': '2026 상반기',
+            'evaluations': evaluations
+        })
+
+    def test_batch_save_inserts_and_updates(self, app, admin_client, rcm_with_controls):
+        """Test a batch upserts all lines under one header"""
+        rcm_id = rcm_with_controls['rcm_id']
+        evaluations = [{'control_code': f'ITGC-{n:03d}',
+                        'evaluation_data': {'overall_effectiveness': '효과적'}} for n in range(50)]
+
+        data = self._post(admin_client, rcm_id, evaluations).get_json()
+        assert data['success'] is True
+        assert data['saved'] == 50
+
+        evaluations[0]['evaluation_data'] = {'overall_effectiveness': '비효과적'}
+        data = self._post(admin_client, rcm_id, evaluations[:1]).get_json()
+        assert data['saved'] == 1
+
+        with app.app_context():
+            from catcher_auth import get_db
+            db = get_db()
+            assert db.execute('SELECT COUNT(*) FROM ca_design_evaluation_header').fetchone()[0] == 1
+            lines = db.execute('''
+                SELECT control_code, overall_effectiveness FROM ca_design_evaluation_line
+                ORDER BY control_code
+            ''').fetchall()
+            assert len(lines) == 50
+            assert lines[0]['overall_effectiveness'] == '비효과적'
+
+    def test_batch_save_reports_per_control_errors(self, admin_client, rcm_with_controls):
+        """Test invalid items are reported without blocking valid ones"""
+        data = self._post(admin_client, rcm_with_controls['rcm_id'], [
+            {'control_code': 'ITGC-001', 'evaluation_data': {'overall_effectiveness': '효과적'}},
+            {'control_code': 'UNKNOWN-1', 'evaluation_data': {}},
+            {'evaluation_data': {}},
+        ]).get_json()
+
+        assert data['saved'] == 1
+        assert data['failed'] == 2
+        assert [result['status'] for result in data['results']] == ['saved', 'error', 'error']
+
+    def test_batch_save_requires_access(self, authenticated_client, rcm_with_controls):
+        """Test users without permission cannot batch save"""
+        data = self._post(authenticated_client, rcm_with_controls['rcm_id'], [
+            {'control_code': 'ITGC-001', 'evaluation_data': {}}
+        ]).get_json()
+        assert data['success'] is False
+
+    def test_batch_save_uses_one_commit(self, app, admin_client, rcm_with_controls):
+        """Test a batch issues a single write transaction"""
+        statements = []
+        with app.app_context():
+            from catcher_auth import get_db
+            from catcher_link2 import save_design_evaluation_batch
+            conn = get_db()
+            conn.set_trace_callback(statements.append)
+            try:
+                save_design_evaluation_batch(
+                    rcm_with_controls['rcm_id'], 1, '2026 상반기',
+                    [{'control_code': f'ITGC-{n:03d}', 'evaluation_data': {}} for n in range(50)]
+                )
+            finally:
+                conn.set_trace_callback(None)
+
+        assert sum(1 for sql in statements if sql.strip().upper() == 'COMMIT') == 1
+
+
+class TestDesignExport:
+    """Test design evaluation Excel export"""
+
+    def test_export_includes_unevaluated_controls(self, app, admin_client, admin_user, test_rcm, tmp_path):
+        """Test each session lists every control with its evaluation"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            from catcher_link2 import save_design_evaluation_batch
+            save_rcm_details(test_rcm['rcm_id'], [{'control_code': f'ITGC-{n:03d}'} for n in range(3)])
+            for session_name in ('S1', 'S2'):
+                save_design_evaluation_batch(test_rcm['rcm_id'], admin_user['user_id'], session_name, [
+                    {'control_code': 'ITGC-001', 'evaluation_data': {'overall_effectiveness': 'effective'}}
+                ])
+
+        response = admin_client.get(f"/design/{test_rcm['rcm_id']}/export?session=S2")
+        assert response.status_code == 200
+        path = tmp_path / 'design.xlsx'
+        path.write_bytes(response.data)
+
+        from openpyxl import load_workbook
+        rows = list(load_workbook(path, read_only=True)['설계평가'].iter_rows(values_only=True))
+        assert rows[0][:3] == ('평가 세션', '통제코드', '통제명')
+        assert [row[1] for row in rows[1:]] == ['ITGC-000', 'ITGC-001', 'ITGC-002']
+        assert {row[0] for row in rows[1:]} == {'S2'}
+        assert rows[2][6] == 'effective'
+        # Read-only mode trims trailing empty cells
+        assert len(rows[1]) < 7
+
+        history = admin_client.get(f"/design/{test_rcm['rcm_id']}/export")
+        path.write_bytes(history.data)
+        rows = list(load_workbook(path, read_only=True)['설계평가'].iter_rows(values_only=True))
+        assert len(rows) == 1 + 2 * 3
+
+    def test_export_requires_access(self, authenticated_client, test_rcm):
+        """Test users without permission are redirected"""
+        response = authenticated_client.get(f"/design/{test_rcm['rcm_id']}/export")
+        assert response.status_code == 302
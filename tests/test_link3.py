@@ -48,3 +48,44 @@ class TestOperationEvaluationList:
         """Test that admin can see all RCMs"""
         response = admin_client.get('/operation/evaluation')
         assert response.status_code == 200
+
+
+class TestOperationExport:
+    """Test operation evaluation Excel export"""
+
+    def test_export_operation_results(self, app, admin_client, admin_user, test_rcm, tmp_path):
+        """Test exported rows carry test results per control"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            from catcher_link2 import save_design_evaluation_batch
+            from catcher_link3 import save_operation_evaluation_data
+            rcm_id = test_rcm['rcm_id']
+            save_rcm_details(rcm_id, [{'control_code': f'ITGC-{n:03d}'} for n in range(2)])
+            save_design_evaluation_batch(rcm_id, admin_user['user_id'], 'S1', [
+                {'control_code': 'ITGC-000', 'evaluation_data': {'overall_effectiveness': 'effective'}}
+            ])
+            save_operation_evaluation_data(rcm_id, 'ITGC-000', admin_user['user_id'], 'S1',
+                                           {'test_result': 'DEFICIENT', 'exception_count': 2,
+                                            'findings': '승인 누락'})
+
+        response = admin_client.get(f"/operation/{test_rcm['rcm_id']}/export?design_session=S1")
+        assert response.status_code == 200
+        path = tmp_path / 'operation.xlsx'
+        path.write_bytes(response.data)
+
+        from openpyxl import load_workbook
+        rows = list(load_workbook(path, read_only=True)['운영평가'].iter_rows(values_only=True))
+        assert len(rows) == 3
+        header = rows[0]
+        first = dict(zip(header, rows[1]))
+        assert first['설계평가 세션'] == 'S1'
+        assert first['평가자'] == admin_user['user_name']
+        assert first['테스트 결과'] == 'DEFICIENT'
+        assert first['예외 건수'] == 2
+        assert first['발견사항'] == '승인 누락'
+        assert dict(zip(header, rows[2])).get('테스트 결과') is None
+
+    def test_export_requires_access(self, authenticated_client, test_rcm):
+        """Test users without permission are redirected"""
+        response = authenticated_client.get(f"/operation/{test_rcm['rcm_id']}/export")
+        assert response.status_code == 302
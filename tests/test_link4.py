@@ -0,0 +1,153 @@
+"""
+Tests for Dashboard (Link4) rollups and API
+"""
+import pytest
+from catcher_auth import get_db
+
+
+@pytest.fixture
+def evaluated_rcm(app, admin_user, test_rcm):
+    """RCM with 4 controls, a design session and operation results"""
+    with app.app_context():
+        from catcher_auth import save_rcm_details
+        from catcher_link2 import save_design_evaluation_batch
+        from catcher_link3 import save_operation_evaluation_data
+        rcm_id = test_rcm['rcm_id']
+        save_rcm_details(rcm_id, [{'control_code': f'ITGC-{n:03d}'} for n in range(4)])
+        save_design_evaluation_batch(rcm_id, admin_user['user_id'], 'S1', [
+            {'control_code': 'ITGC-000', 'evaluation_data': {'overall_effectiveness': 'effective'}},
+            {'control_code': 'ITGC-001', 'evaluation_data': {'overall_effectiveness': 'ineffective'}},
+        ])
+        save_operation_evaluation_data(rcm_id, 'ITGC-000', admin_user['user_id'], 'S1',
+                                       {'test_result': 'EFFECTIVE', 'exception_count': 0})
+        save_operation_evaluation_data(rcm_id, 'ITGC-001', admin_user['user_id'], 'S1',
+                                       {'test_result': 'DEFICIENT', 'exception_count': 3})
+        save_operation_evaluation_data(rcm_id, 'ITGC-002', admin_user['user_id'], 'S1',
+                                       {'test_result': 'NOT_TESTED'})
+    return test_rcm
+
+
+class TestDashboardAccess:
+    """Test dashboard page access"""
+
+    def test_dashboard_requires_login(self, client):
+        """Test that the dashboard requires login"""
+        response = client.get('/dashboard/')
+        assert response.status_code == 302
+        assert '/login' in response.location
+
+    def test_dashboard_page(self, authenticated_client):
+        """Test that logged-in users can open the dashboard"""
+        response = authenticated_client.get('/dashboard/')
+        assert response.status_code == 200
+        assert '통합 대시보드' in response.data.decode('utf-8')
+
+
+class TestDashboardRollup:
+    """Test rollup rows maintained from evaluation saves"""
+
+    def test_save_paths_refresh_rollup(self, app, evaluated_rcm):
+        """Test design and operation saves keep rollup counts current"""
+        with app.app_context():
+            rows = {row['evaluation_type']: dict(row) for row in get_db().execute(
+                'SELECT * FROM ca_dashboard_rollup WHERE rcm_id = ?', (evaluated_rcm['rcm_id'],)
+            )}
+
+        assert rows['DESIGN']['effective_count'] == 1
+        assert rows['DESIGN']['ineffective_count'] == 1
+        assert rows['DESIGN']['untested_count'] == 2
+        assert rows['OPERATION']['effective_count'] == 1
+        assert rows['OPERATION']['ineffective_count'] == 1
+        assert rows['OPERATION']['untested_count'] == 2
+        assert rows['OPERATION']['exception_total'] == 3
+        assert rows['OPERATION']['evaluation_session'] == 'S1'
+        assert rows['OPERATION']['company_name'] == 'Catcher Corp'
+
+    def test_rebuild_matches_incremental(self, app, runner, evaluated_rcm):
+        """Test a full rebuild reproduces the incrementally maintained rows"""
+        columns = 'evaluation_type, header_id, effective_count, ineffective_count, untested_count, exception_total'
+        with app.app_context():
+            before = [tuple(row) for row in get_db().execute(
+                f'SELECT {columns} FROM ca_dashboard_rollup ORDER BY evaluation_type')]
+
+        result = runner.invoke(args=['rebuild-dashboard'])
+        assert result.exit_code == 0
+
+        with app.app_context():
+            after = [tuple(row) for row in get_db().execute(
+                f'SELECT {columns} FROM ca_dashboard_rollup ORDER BY evaluation_type')]
+        assert after == before
+
+    def test_latest_session_does_not_follow_autosave(self, app, admin_user, test_user, evaluated_rcm):
+        """Test saving an older session of another evaluator keeps the newest session as latest"""
+        rcm_id = evaluated_rcm['rcm_id']
+        with app.app_context():
+            from catcher_link2 import save_design_evaluation_batch
+            save_design_evaluation_batch(rcm_id, test_user['user_id'], 'S2', [
+                {'control_code': 'ITGC-000', 'evaluation_data': {'overall_effectiveness': 'effective'}}])
+            save_design_evaluation_batch(rcm_id, admin_user['user_id'], 'S1', [
+                {'control_code': 'ITGC-002', 'evaluation_data': {'overall_effectiveness': 'effective'}}])
+            latest = get_db().execute('''
+                SELECT evaluation_session FROM ca_dashboard_rollup
+                WHERE rcm_id = ? AND evaluation_type = 'DESIGN' AND is_latest = 1
+            ''', (rcm_id,)).fetchall()
+        assert [row['evaluation_session'] for row in latest] == ['S2']
+
+    def test_reupload_refreshes_totals(self, app, evaluated_rcm):
+        """Test adding controls to an RCM updates rollup totals and untested counts"""
+        rcm_id = evaluated_rcm['rcm_id']
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(rcm_id, [{'control_code': f'ITGC-{n:03d}'} for n in range(6)])
+            row = get_db().execute('''
+                SELECT total_controls, untested_count FROM ca_dashboard_rollup
+                WHERE rcm_id = ? AND evaluation_type = 'OPERATION'
+            ''', (rcm_id,)).fetchone()
+        assert (row['total_controls'], row['untested_count']) == (6, 4)
+
+
+class TestDashboardApi:
+    """Test dashboard summary API"""
+
+    def test_summary_by_category(self, admin_client, evaluated_rcm):
+        """Test admin summary groups operation results by category"""
+        data = admin_client.get('/dashboard/api/summary?group_by=category').get_json()
+        assert data['success'] is True
+        assert data['summary'] == [{
+            'control_category': 'ITGC', 'rcm_count': 1, 'total_controls': 4,
+            'effective_count': 1, 'ineffective_count': 1, 'untested_count': 2,
+            'exception_total': 3, 'progress_percentage': 50.0, 'effective_ratio': 50.0
+        }]
+
+    def test_summary_respects_rcm_access(self, authenticated_client, evaluated_rcm):
+        """Test users without access see no rollups"""
+        data = authenticated_client.get('/dashboard/api/summary').get_json()
+        assert data['summary'] == []
+
+    def test_summary_excludes_deleted_rcm(self, admin_client, evaluated_rcm):
+        """Test deleted (inactive) RCMs drop out of the summary"""
+        response = admin_client.post(f"/rcm/{evaluated_rcm['rcm_id']}/delete")
+        assert response.get_json()['success'] is True
+        data = admin_client.get('/dashboard/api/summary?group_by=category').get_json()
+        assert data['summary'] == []
+
+    def test_summary_rejects_unknown_grouping(self, admin_client):
+        """Test invalid parameters return 400"""
+        response = admin_client.get('/dashboard/api/summary?group_by=nope')
+        assert response.status_code == 400
+
+    def test_summary_query_uses_index(self, app, admin_user, evaluated_rcm):
+        """Test the summary query reads the rollup table through an index"""
+        with app.app_context():
+            from catcher_link4 import get_dashboard_summary
+            conn = get_db()
+            statements = []
+            conn.set_trace_callback(statements.append)
+            try:
+                get_dashboard_summary(admin_user['user_id'], 'OPERATION', 'company')
+            finally:
+                conn.set_trace_callback(None)
+            sql = [s for s in statements if 'ca_dashboard_rollup' in s][0]
+            plan = ' '.join(row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + sql))
+            assert 'USING INDEX idx_ca_dashboard_rollup_scope' in plan or \
+                'USING COVERING INDEX idx_ca_dashboard_rollup_scope' in plan
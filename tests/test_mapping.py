@@ -0,0 +1,231 @@
+"""
+Tests for the standard-control auto-mapping engine
+"""
+import os
+import pytest
+from catcher_auth import get_db, get_rcm_revision
+from catcher_mapping import (StandardControlIndex, control_text, get_standard_index,
+                             map_rcm_controls, upsert_standard_controls)
+import catcher_mapping
+from catcher_completeness import stale_rcm_ids
+
+STANDARD_CONTROLS = [
+    {'control_code': 'STD-ACC-01', 'control_name': '신규 사용자 계정 승인',
+     'control_description': '시스템 신규 사용자 계정은 부서장 승인 후 생성한다',
+     'risk_description': '승인되지 않은 사용자 접근'},
+    {'control_code': 'STD-CHG-01', 'control_name': '프로그램 변경 승인',
+     'control_description': '운영 환경 프로그램 변경은 변경관리 절차에 따라 테스트 후 승인한다',
+     'risk_description': '승인되지 않은 프로그램 변경'},
+    {'control_code': 'STD-BAK-01', 'control_name': '데이터 백업',
+     'control_description': '중요 데이터는 매일 백업하고 복구 테스트를 수행한다',
+     'risk_description': '데이터 유실'},
+]
+
+
+@pytest.fixture
+def mapping_cache(tmp_path, monkeypatch):
+    """Point the matrix cache at a temp directory and start with an empty memo"""
+    monkeypatch.setenv('CATCHER_MAPPING_CACHE_DIR', str(tmp_path))
+    catcher_mapping._index_memo.clear()
+    yield tmp_path
+    catcher_mapping._index_memo.clear()
+
+
+def _add_controls(rcm_id, controls):
+    db = get_db()
+    db.executemany('''
+        INSERT INTO ca_rcm_detail (rcm_id, control_code, control_name, control_description)
+        VALUES (?, ?, ?, ?)
+    ''', [(rcm_id, code, name, description) for code, name, description in controls])
+    db.commit()
+
+
+class TestStandardControlIndex:
+    """Test TF-IDF vectorization and scoring"""
+
+    def test_identical_text_scores_one(self):
+        """Test a control identical to a standard control has cosine similarity 1"""
+        texts = [control_text(c['control_name'], c['control_description']) for c in STANDARD_CONTROLS]
+        index = StandardControlIndex.build([1, 2, 3], texts, max_features=5000)
+        top = index.top_candidates([texts[1]], top_k=2)[0]
+        assert top[0][0] == 2
+        assert top[0][1] == pytest.approx(1.0, abs=1e-5)
+        assert top[1][1] < top[0][1]
+
+    def test_unseen_terms_lower_confidence(self):
+        """Test text outside the standard vocabulary reduces the score"""
+        texts = [control_text(c['control_name'], c['control_description']) for c in STANDARD_CONTROLS]
+        index = StandardControlIndex.build([1, 2, 3], texts, max_features=5000)
+        exact = index.top_candidates([texts[2]], 1)[0][0][1]
+        extended = index.top_candidates([texts[2] + ' 외부 위탁 보관소 소산 보관'], 1)[0][0][1]
+        assert extended < exact
+
+    def test_save_and_load_round_trip(self, tmp_path):
+        """Test the cached .npz reproduces the same scores"""
+        texts = [control_text(c['control_name']) for c in STANDARD_CONTROLS]
+        index = StandardControlIndex.build([10, 20, 30], texts, max_features=5000)
+        path = str(tmp_path / 'index.npz')
+        index.save(path)
+        loaded = StandardControlIndex.load(path)
+        assert loaded.vocabulary == index.vocabulary
+        assert loaded.top_candidates(['데이터 백업'], 3) == index.top_candidates(['데이터 백업'], 3)
+
+
+class TestMapRcmControls:
+    """Test mapping RCM controls and persisting candidates"""
+
+    def test_writes_candidates_and_status(self, app, test_rcm, mapping_cache):
+        """Test top-k candidates, best match and status are stored per control"""
+        with app.app_context():
+            db = get_db()
+            upsert_standard_controls(db, STANDARD_CONTROLS)
+            _add_controls(test_rcm['rcm_id'], [
+                ('C-01', '프로그램 변경 승인', '운영 프로그램 변경은 테스트 후 승인한다'),
+                ('C-02', '사용자 계정 승인', '신규 사용자 계정은 부서장 승인 후 생성'),
+                ('C-03', 'zzz', 'qqq'),
+            ])
+            before = get_rcm_revision(test_rcm['rcm_id'])['revision']
+
+            summary = map_rcm_controls(db, test_rcm['rcm_id'], top_k=2)
+
+            assert summary['controls'] == 3
+            assert summary['unmapped'] == 1
+            rows = {row['control_code']: row for row in db.execute('''
+                SELECT d.control_code, d.mapping_status, s.control_code AS std_code
+                FROM ca_rcm_detail d LEFT JOIN ca_standard_control s ON s.std_control_id = d.mapped_std_control_id
+                WHERE d.rcm_id = ?
+            ''', (test_rcm['rcm_id'],))}
+            assert rows['C-01']['std_code'] == 'STD-CHG-01'
+            assert rows['C-02']['std_code'] == 'STD-ACC-01'
+            assert rows['C-01']['mapping_status'] in ('AUTO', 'REVIEW')
+            assert rows['C-03']['mapping_status'] == 'UNMAPPED'
+            assert rows['C-03']['std_code'] is None
+
+            ranks = db.execute('''
+                SELECT m.candidate_rank, m.mapping_confidence FROM ca_rcm_standard_mapping m
+                JOIN ca_rcm_detail d ON d.detail_id = m.detail_id
+                WHERE d.control_code = 'C-01' ORDER BY m.candidate_rank
+            ''').fetchall()
+            assert [row[0] for row in ranks] == list(range(1, len(ranks) + 1))
+            assert 1 <= len(ranks) <= 2
+            assert ranks[0][1] >= ranks[-1][1]
+            assert get_rcm_revision(test_rcm['rcm_id'])['revision'] > before
+
+    def test_remapping_replaces_candidates_and_keeps_manual(self, app, test_rcm, mapping_cache):
+        """Test a second run replaces candidates and leaves MANUAL mappings alone"""
+        with app.app_context():
+            db = get_db()
+            upsert_standard_controls(db, STANDARD_CONTROLS)
+            _add_controls(test_rcm['rcm_id'], [
+                ('C-01', '데이터 백업', '매일 백업'),
+                ('C-02', '프로그램 변경 승인', '변경 테스트 후 승인'),
+            ])
+            map_rcm_controls(db, test_rcm['rcm_id'])
+            first = db.execute('SELECT COUNT(*) FROM ca_rcm_standard_mapping').fetchone()[0]
+
+            db.execute("UPDATE ca_rcm_detail SET mapping_status = 'MANUAL', mapped_std_control_id = 999 "
+                       "WHERE control_code = 'C-02'")
+            db.commit()
+            summary = map_rcm_controls(db, test_rcm['rcm_id'])
+
+            assert summary['controls'] == 1
+            assert db.execute('SELECT COUNT(*) FROM ca_rcm_standard_mapping').fetchone()[0] <= first
+            manual = db.execute("SELECT mapping_status, mapped_std_control_id FROM ca_rcm_detail "
+                                "WHERE control_code = 'C-02'").fetchone()
+            assert tuple(manual) == ('MANUAL', 999)
+
+    def test_index_cached_on_disk_by_table_hash(self, app, mapping_cache):
+        """Test the matrix is reused until the standard-control table changes"""
+        with app.app_context():
+            db = get_db()
+            upsert_standard_controls(db, STANDARD_CONTROLS)
+            first = get_standard_index(db)
+            assert len(os.listdir(mapping_cache)) == 1
+            assert get_standard_index(db) is first
+
+            catcher_mapping._index_memo.clear()
+            assert get_standard_index(db).vocabulary == first.vocabulary
+            assert len(os.listdir(mapping_cache)) == 1
+
+            upsert_standard_controls(db, [{'control_code': 'STD-NEW-01', 'control_name': '접근권한 정기 검토'}])
+            changed = get_standard_index(db)
+            assert changed is not first
+            assert len(changed.std_ids) == 4
+            assert len(os.listdir(mapping_cache)) == 2
+
+    def test_no_standard_controls(self, app, test_rcm, mapping_cache):
+        """Test mapping is a no-op while the standard library is empty"""
+        with app.app_context():
+            _add_controls(test_rcm['rcm_id'], [('C-01', '데이터 백업', '')])
+            summary = map_rcm_controls(get_db(), test_rcm['rcm_id'])
+            assert summary['controls'] == 0
+
+
+class TestMappingCommands:
+    """Test the import-standard-controls and map-controls CLI commands"""
+
+    def test_import_and_map(self, app, runner, test_rcm, mapping_cache, tmp_path):
+        """Test controls load from Excel and an RCM is mapped from the CLI"""
+        from openpyxl import Workbook
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['통제코드', '통제명', '통제설명', '위험'])
+        for control in STANDARD_CONTROLS:
+            sheet.append([control['control_code'], control['control_name'],
+                          control['control_description'], control['risk_description']])
+        path = tmp_path / 'standard.xlsx'
+        workbook.save(path)
+
+        result = runner.invoke(args=['import-standard-controls', str(path)])
+        assert result.exit_code == 0, result.output
+        assert '3개' in result.output
+
+        with app.app_context():
+            _add_controls(test_rcm['rcm_id'], [('C-01', '데이터 백업', '중요 데이터 매일 백업')])
+        result = runner.invoke(args=['map-controls', '--rcm-id', str(test_rcm['rcm_id'])])
+        assert result.exit_code == 0, result.output
+        assert '통제 1개' in result.output
+        with app.app_context():
+            row = get_db().execute('''
+                SELECT s.control_code FROM ca_rcm_detail d
+                JOIN ca_standard_control s ON s.std_control_id = d.mapped_std_control_id
+                WHERE d.rcm_id = ?
+            ''', (test_rcm['rcm_id'],)).fetchone()
+            assert row[0] == 'STD-BAK-01'
+
+
+class TestUploadMapping:
+    """Test uploads map controls the same way on every upload path"""
+
+    def test_synchronous_upload_maps_controls(self, app, admin_client, admin_user, mapping_cache, tmp_path):
+        """Test a non-async upload maps controls and scores coverage"""
+        from openpyxl import Workbook
+        with app.app_context():
+            upsert_standard_controls(get_db(), STANDARD_CONTROLS)
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['통제코드', '통제명', '통제설명'])
+        sheet.append(['C-01', '데이터 백업', '중요 데이터는 매일 백업한다'])
+        path = tmp_path / 'upload.xlsx'
+        workbook.save(path)
+
+        with open(path, 'rb') as fileobj:
+            response = admin_client.post('/rcm/process_upload', data={
+                'rcm_name': 'Mapped RCM', 'upload_mode': 'individual', 'control_category': 'ITGC',
+                'target_user_id': str(admin_user['user_id']), 'excel_file': (fileobj, 'upload.xlsx'),
+            }, content_type='multipart/form-data')
+        assert response.status_code == 200, response.get_json()
+        rcm_id = response.get_json()['rcm_id']
+
+        with app.app_context():
+            db = get_db()
+            row = db.execute('''
+                SELECT s.control_code FROM ca_rcm_detail d
+                JOIN ca_standard_control s ON s.std_control_id = d.mapped_std_control_id
+                WHERE d.rcm_id = ?
+            ''', (rcm_id,)).fetchone()
+            assert row[0] == 'STD-BAK-01'
+            evaluation = db.execute('SELECT coverage_applicable FROM ca_rcm_completeness_eval '
+                                    'WHERE rcm_id = ?', (rcm_id,)).fetchone()
+            assert evaluation['coverage_applicable'] == 1
+            assert stale_rcm_ids(db, [rcm_id]) == []
@@ -0,0 +1,128 @@
+"""
+Tests for the metrics registry and the /metrics endpoint
+"""
+import pytest
+from catcher_metrics import (MetricsRegistry, SqliteMetricsStore, render_text,
+                             HTTP_REQUESTS, CONTENT_TYPE)
+
+REMOTE = {'REMOTE_ADDR': '10.0.0.5'}
+
+
+class TestMetricsRegistry:
+    """Test counters, gauges, histograms and the text format"""
+
+    def test_counter_and_gauge_render(self):
+        """Test labelled counters and gauges render in exposition format"""
+        registry = MetricsRegistry()
+        requests = registry.counter('app_requests_total', 'Requests', ('endpoint',))
+        depth = registry.gauge('app_queue_depth', 'Queue depth')
+        requests.inc(endpoint='rcm.rcm_view')
+        requests.inc(2, endpoint='rcm.rcm_view')
+        depth.set(7)
+
+        text = render_text(registry.collect())
+        assert '# TYPE app_requests_total counter' in text
+        assert 'app_requests_total{endpoint="rcm.rcm_view"} 3' in text
+        assert 'app_queue_depth 7' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets count observations at or below each bound"""
+        registry = MetricsRegistry()
+        latency = registry.histogram('app_latency_seconds', 'Latency', buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value)
+
+        text = render_text(registry.collect())
+        assert 'app_latency_seconds_bucket{le="0.1"} 2' in text
+        assert 'app_latency_seconds_bucket{le="1"} 3' in text
+        assert 'app_latency_seconds_bucket{le="+Inf"} 4' in text
+        assert 'app_latency_seconds_count 4' in text
+        assert 'app_latency_seconds_sum 3.65' in text
+
+    def test_label_mismatch_rejected(self):
+        """Test observations with wrong label names raise"""
+        registry = MetricsRegistry()
+        counter = registry.counter('app_total', 'Total', ('endpoint',))
+        with pytest.raises(ValueError):
+            counter.inc(status=200)
+        with pytest.raises(ValueError):
+            counter.inc(-1, endpoint='x')
+
+    def test_label_values_escaped(self):
+        """Test quotes and newlines in label values are escaped"""
+        registry = MetricsRegistry()
+        registry.counter('app_total', 'Total', ('name',)).inc(name='a"b\nc')
+        assert 'app_total{name="a\\"b\\nc"} 1' in render_text(registry.collect())
+
+
+class TestSqliteMetricsStore:
+    """Test merging values written by several worker processes"""
+
+    def test_counters_summed_gauges_per_pid(self, tmp_path):
+        """Test counters are summed across pids and gauges keep a pid label"""
+        registry = MetricsRegistry()
+        counter = registry.counter('app_total', 'Total', ('endpoint',))
+        gauge = registry.gauge('app_in_use', 'In use')
+        store = SqliteMetricsStore(str(tmp_path / 'metrics.db'))
+
+        counter.inc(3, endpoint='a')
+        gauge.set(2)
+        store.write(101, registry.collect())
+        registry.reset()
+        counter.inc(4, endpoint='a')
+        gauge.set(5)
+        store.write(102, registry.collect())
+
+        text = render_text(store.merge(registry.collect()))
+        assert 'app_total{endpoint="a"} 7' in text
+        assert 'app_in_use{pid="101"} 2' in text
+        assert 'app_in_use{pid="102"} 5' in text
+
+    def test_stale_gauges_dropped(self, tmp_path):
+        """Test gauges from processes that stopped reporting are not exposed"""
+        registry = MetricsRegistry()
+        registry.gauge('app_in_use', 'In use').set(1)
+        store = SqliteMetricsStore(str(tmp_path / 'metrics.db'), stale_after=-1)
+        store.write(101, registry.collect())
+        assert 'pid="101"' not in render_text(store.merge(registry.collect()))
+
+
+class TestMetricsEndpoint:
+    """Test /metrics access control and request metrics"""
+
+    def test_token_allowed(self, client, monkeypatch):
+        """Test scrapers with the configured bearer token can read metrics without logging in"""
+        monkeypatch.setenv('CATCHER_METRICS_TOKEN', 'scrape-secret')
+        response = client.get('/metrics', headers={'Authorization': 'Bearer scrape-secret'})
+        assert response.status_code == 200
+        assert response.headers['Content-Type'] == CONTENT_TYPE
+        body = response.get_data(as_text=True)
+        assert '# TYPE catcher_http_request_duration_seconds histogram' in body
+        assert 'catcher_db_pool_in_use' in body
+        assert 'catcher_activity_queue_depth' in body
+        assert 'catcher_cache_hit_ratio{cache="auth"}' in body
+
+    def test_localhost_without_token_forbidden(self, client, monkeypatch):
+        """Test localhost is not trusted, since a same-host reverse proxy forwards from 127.0.0.1"""
+        assert client.get('/metrics').status_code == 403
+        monkeypatch.setenv('CATCHER_METRICS_TOKEN', 'scrape-secret')
+        assert client.get('/metrics', headers={'Authorization': 'Bearer wrong'}).status_code == 403
+
+    def test_remote_non_admin_forbidden(self, authenticated_client):
+        """Test remote users without admin rights are rejected"""
+        assert authenticated_client.get('/metrics', environ_base=REMOTE).status_code == 403
+
+    def test_remote_anonymous_forbidden(self, client):
+        """Test remote anonymous requests are rejected"""
+        assert client.get('/metrics', environ_base=REMOTE).status_code == 403
+
+    def test_remote_admin_allowed(self, admin_client):
+        """Test admins can read metrics from any address"""
+        assert admin_client.get('/metrics', environ_base=REMOTE).status_code == 200
+
+    def test_requests_counted_per_endpoint(self, authenticated_client):
+        """Test each request increments the per-endpoint counter"""
+        before = HTTP_REQUESTS.value(endpoint='rcm.rcm_list', method='GET', status=200)
+        authenticated_client.get('/rcm/')
+        after = HTTP_REQUESTS.value(endpoint='rcm.rcm_list', method='GET', status=200)
+        assert after == before + 1
@@ -0,0 +1,101 @@
+"""
+Tests for evaluation progress counters and reconciliation
+"""
+import pytest
+from catcher_auth import get_db
+
+
+@pytest.fixture
+def rcm_with_controls(app, test_rcm):
+    with app.app_context():
+        from catcher_auth import save_rcm_details
+        save_rcm_details(test_rcm['rcm_id'], [
+            {'control_code': f'ITGC-{n:03d}', 'control_name': f'Control {n}'} for n in range(4)
+        ])
+    return test_rcm
+
+
+def _design_header(rcm_id):
+    return dict(get_db().execute('''
+        SELECT total_controls, evaluated_controls, progress_percentage
+        FROM ca_design_evaluation_header WHERE rcm_id = ?
+    ''', (rcm_id,)).fetchone())
+
+
+class TestProgressTriggers:
+    """Test line triggers keep header counters current"""
+
+    def test_design_counters_follow_line_changes(self, app, admin_user, rcm_with_controls):
+        """Test insert, update and delete of design lines adjust the header"""
+        rcm_id = rcm_with_controls['rcm_id']
+        with app.app_context():
+            from catcher_link2 import save_design_evaluation_data, save_design_evaluation_batch
+            save_design_evaluation_data(rcm_id, 'ITGC-000', admin_user['user_id'], 'S1',
+                                        {'overall_effectiveness': '효과적'})
+            assert _design_header(rcm_id) == {
+                'total_controls': 4, 'evaluated_controls': 1, 'progress_percentage': 25.0
+            }
+
+            # Lines without a conclusion are not counted
+            save_design_evaluation_batch(rcm_id, admin_user['user_id'], 'S1', [
+                {'control_code': 'ITGC-001', 'evaluation_data': {'overall_effectiveness': '효과적'}},
+                {'control_code': 'ITGC-002', 'evaluation_data': {'evaluation_rationale': '작성 중'}},
+            ])
+            assert _design_header(rcm_id)['evaluated_controls'] == 2
+
+            # Clearing a conclusion and deleting a line both decrement
+            save_design_evaluation_data(rcm_id, 'ITGC-000', admin_user['user_id'], 'S1',
+                                        {'overall_effectiveness': ''})
+            db = get_db()
+            db.execute("DELETE FROM ca_design_evaluation_line WHERE control_code = 'ITGC-001'")
+            db.commit()
+            assert _design_header(rcm_id) == {
+                'total_controls': 4, 'evaluated_controls': 0, 'progress_percentage': 0.0
+            }
+
+    def test_operation_counters_follow_line_changes(self, app, admin_user, rcm_with_controls):
+        """Test operation lines update the operation header"""
+        rcm_id = rcm_with_controls['rcm_id']
+        with app.app_context():
+            from catcher_link2 import save_design_evaluation_data
+            from catcher_link3 import save_operation_evaluation_data
+            save_design_evaluation_data(rcm_id, 'ITGC-000', admin_user['user_id'], 'S1',
+                                        {'overall_effectiveness': '효과적'})
+            for code in ('ITGC-000', 'ITGC-001'):
+                save_operation_evaluation_data(rcm_id, code, admin_user['user_id'], 'S1',
+                                               {'test_result': '적정'})
+
+            header = get_db().execute('''
+                SELECT total_controls, evaluated_controls, progress_percentage
+                FROM ca_operation_evaluation_header
+            ''').fetchone()
+            assert tuple(header) == (4, 2, 50.0)
+
+
+class TestReconcileProgress:
+    """Test bulk recomputation of progress counters"""
+
+    def test_reconcile_fixes_drifted_counters(self, app, admin_user, rcm_with_controls):
+        """Test reconcile recomputes totals and evaluated counts"""
+        rcm_id = rcm_with_controls['rcm_id']
+        with app.app_context():
+            from catcher_link2 import save_design_evaluation_data
+            from catcher_progress import reconcile_evaluation_progress
+            save_design_evaluation_data(rcm_id, 'ITGC-000', admin_user['user_id'], 'S1',
+                                        {'overall_effectiveness': '효과적'})
+            db = get_db()
+            db.execute('UPDATE ca_design_evaluation_header SET total_controls = 0, evaluated_controls = 9')
+            db.commit()
+
+            changed = reconcile_evaluation_progress(db)
+            assert changed['ca_design_evaluation_header'] == 1
+            assert _design_header(rcm_id) == {
+                'total_controls': 4, 'evaluated_controls': 1, 'progress_percentage': 25.0
+            }
+            assert reconcile_evaluation_progress(db)['ca_design_evaluation_header'] == 0
+
+    def test_reconcile_cli(self, app, runner, admin_user, rcm_with_controls):
+        """Test the reconcile-progress CLI command"""
+        result = runner.invoke(args=['reconcile-progress', '--rcm-id', str(rcm_with_controls['rcm_id'])])
+        assert result.exit_code == 0
+        assert 'ca_design_evaluation_header' in result.output
@@ -0,0 +1,271 @@
+"""
+Tests for RCM detail storage and retrieval
+"""
+import pytest
+from catcher_auth import get_db
+
+
+def _controls(count, suffix=''):
+    return [{
+        'control_code': f'C-{n:04d}',
+        'control_name': f'Control {n}{suffix}',
+        'control_description': 'desc',
+        'key_control': 'Y' if n % 2 else 'N',
+        'control_frequency': '월별',
+        'control_type': '예방',
+    } for n in range(count)]
+
+
+class TestBulkUpsert:
+    """Test bulk upsert of RCM details"""
+
+    def test_first_upload_inserts_all(self, app, test_rcm):
+        """Test all controls are inserted on first upload"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            counts = save_rcm_details(test_rcm['rcm_id'], _controls(30))
+
+            assert counts == {'inserted': 30, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+            total = get_db().execute(
+                'SELECT COUNT(*) FROM ca_rcm_detail WHERE rcm_id = ?', (test_rcm['rcm_id'],)
+            ).fetchone()[0]
+            assert total == 30
+
+    def test_reupload_skips_unchanged_rows(self, app, test_rcm):
+        """Test unchanged controls are not rewritten"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], _controls(10))
+
+            controls = _controls(12)
+            controls[0]['control_name'] = 'Renamed'
+            counts = save_rcm_details(test_rcm['rcm_id'], controls)
+
+            assert counts == {'inserted': 2, 'updated': 1, 'unchanged': 9, 'skipped': 0}
+            name = get_db().execute(
+                'SELECT control_name FROM ca_rcm_detail WHERE rcm_id = ? AND control_code = ?',
+                (test_rcm['rcm_id'], 'C-0000')
+            ).fetchone()[0]
+            assert name == 'Renamed'
+
+    def test_force_update_without_hash_check(self, app, test_rcm):
+        """Test skip_unchanged=False rewrites existing rows"""
+        with app.app_context():
+            from catcher_auth import bulk_upsert_rcm_details
+            bulk_upsert_rcm_details(test_rcm['rcm_id'], _controls(5))
+            counts = bulk_upsert_rcm_details(test_rcm['rcm_id'], _controls(5), skip_unchanged=False)
+
+            assert counts['updated'] == 5
+            assert counts['unchanged'] == 0
+
+    def test_generator_input_across_chunks(self, app, test_rcm):
+        """Test generators larger than one chunk are fully stored"""
+        with app.app_context():
+            from catcher_auth import bulk_upsert_rcm_details
+            counts = bulk_upsert_rcm_details(test_rcm['rcm_id'], iter(_controls(25)), chunk_size=10)
+
+            assert counts['inserted'] == 25
+
+    def test_rows_without_control_code_are_skipped(self, app, test_rcm):
+        """Test rows missing control_code are counted as skipped"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            controls = _controls(3) + [{'control_code': '', 'control_name': 'blank'}]
+            counts = save_rcm_details(test_rcm['rcm_id'], controls)
+
+            assert counts['inserted'] == 3
+            assert counts['skipped'] == 1
+
+
+class TestDetailPagination:
+    """Test keyset-paginated, filtered RCM detail retrieval"""
+
+    def test_pages_cover_all_controls_in_order(self, app, test_rcm):
+        """Test following next_cursor returns every control exactly once"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details, get_rcm_details_page
+            save_rcm_details(test_rcm['rcm_id'], _controls(25))
+
+            codes, cursor = [], None
+            while True:
+                page = get_rcm_details_page(test_rcm['rcm_id'], after=cursor, limit=10)
+                codes.extend(control['control_code'] for control in page['controls'])
+                cursor = page['next_cursor']
+                if cursor is None:
+                    break
+
+            assert codes == [f'C-{n:04d}' for n in range(25)]
+
+    def test_filters_and_count(self, app, test_rcm):
+        """Test server-side filters apply to both pages and COUNT(*)"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details, get_rcm_details_page, count_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], _controls(10))
+
+            page = get_rcm_details_page(test_rcm['rcm_id'], filters={'key_control': 'Y'})
+            assert [c['key_control'] for c in page['controls']] == ['Y'] * 5
+            assert count_rcm_details(test_rcm['rcm_id'], {'key_control': 'Y'}) == 5
+            assert count_rcm_details(test_rcm['rcm_id']) == 10
+
+    def test_projection_limits_columns(self, app, test_rcm):
+        """Test requested columns are the only ones returned"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details, get_rcm_details_page
+            save_rcm_details(test_rcm['rcm_id'], _controls(2))
+
+            page = get_rcm_details_page(test_rcm['rcm_id'], columns=['control_name'])
+            assert set(page['controls'][0]) == {'control_code', 'control_name'}
+
+            with pytest.raises(ValueError):
+                get_rcm_details_page(test_rcm['rcm_id'], columns=['control_name; DROP TABLE x'])
+
+    def test_controls_api(self, app, admin_client, test_rcm):
+        """Test controls API returns pages with total on the first page"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], _controls(15))
+
+        first = admin_client.get(f"/rcm/api/{test_rcm['rcm_id']}/controls?limit=10").get_json()
+        assert first['total'] == 15
+        assert len(first['controls']) == 10
+
+        second = admin_client.get(
+            f"/rcm/api/{test_rcm['rcm_id']}/controls?limit=10&after={first['next_cursor']}"
+        ).get_json()
+        assert len(second['controls']) == 5
+        assert second['next_cursor'] is None
+        assert 'total' not in second
+
+        bad = admin_client.get(f"/rcm/api/{test_rcm['rcm_id']}/controls?fields=nope")
+        assert bad.status_code == 400
+
+    def test_controls_api_requires_access(self, authenticated_client, test_rcm):
+        """Test users without permission cannot page controls"""
+        response = authenticated_client.get(f"/rcm/api/{test_rcm['rcm_id']}/controls")
+        assert response.status_code == 403
+
+    def test_view_renders_first_page_only(self, app, admin_client, test_rcm):
+        """Test the detail page renders one page and the full count"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details, RCM_DETAIL_PAGE_SIZE
+            save_rcm_details(test_rcm['rcm_id'], _controls(RCM_DETAIL_PAGE_SIZE + 5))
+
+        html = admin_client.get(f"/rcm/{test_rcm['rcm_id']}/view").data.decode('utf-8')
+        assert f'C-{RCM_DETAIL_PAGE_SIZE - 1:04d}' in html
+        assert f'C-{RCM_DETAIL_PAGE_SIZE:04d}' not in html
+        assert f'{RCM_DETAIL_PAGE_SIZE + 5}개' in html
+
+    def test_status_api_counts_controls(self, app, admin_client, test_rcm):
+        """Test status API reports the control count"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], _controls(7))
+
+        data = admin_client.get(f"/rcm/api/{test_rcm['rcm_id']}/status").get_json()
+        assert data['total_controls'] == 7
+
+
+SEARCH_CONTROLS = [
+    {'control_code': 'REV-001', 'control_name': '매출채권 회수 검토',
+     'control_description': '월말 매출채권 연령 분석을 검토한다', 'risk_description': '대손 누락'},
+    {'control_code': 'REV-002', 'control_name': '매출 인식 승인',
+     'control_description': '매출채권 <b>전표</b> 승인', 'test_procedure': '샘플 전표 확인'},
+    {'control_code': 'PUR-001', 'control_name': '구매 발주 승인',
+     'control_description': '구매 요청 검토', 'risk_description': '미승인 매출채권 상계'},
+]
+
+
+class TestControlSearch:
+    """Test full-text control search"""
+
+    def test_index_follows_detail_changes(self, app, test_rcm):
+        """Test triggers keep the FTS index in sync with ca_rcm_detail"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            from catcher_search import search_rcm_controls
+            save_rcm_details(test_rcm['rcm_id'], SEARCH_CONTROLS)
+            found = search_rcm_controls(None, '대손', rcm_id=test_rcm['rcm_id'])
+            assert [r['control_code'] for r in found['results']] == ['REV-001']
+
+            get_db().execute("UPDATE ca_rcm_detail SET risk_description = '환율 변동' "
+                             "WHERE control_code = 'REV-001'")
+            get_db().commit()
+            assert search_rcm_controls(None, '대손 누락', rcm_id=test_rcm['rcm_id'])['results'] == []
+            assert len(search_rcm_controls(None, '환율 변동', rcm_id=test_rcm['rcm_id'])['results']) == 1
+
+            get_db().execute('DELETE FROM ca_rcm_detail WHERE rcm_id = ?', (test_rcm['rcm_id'],))
+            get_db().commit()
+            assert search_rcm_controls(None, '매출채권', rcm_id=test_rcm['rcm_id'])['results'] == []
+
+    def test_search_ranks_and_highlights(self, app, admin_client, test_rcm):
+        """Test name matches rank first and highlights are escaped HTML"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], SEARCH_CONTROLS)
+
+        data = admin_client.get('/rcm/api/search?q=매출채권').get_json()
+        assert data['success'] is True
+        assert data['mode'] == 'fts'
+        codes = [r['control_code'] for r in data['results']]
+        assert codes[0] == 'REV-001'
+        assert set(codes) == {'REV-001', 'REV-002', 'PUR-001'}
+        assert data['results'][0]['control_name_html'] == '<mark>매출채권</mark> 회수 검토'
+        assert data['results'][0]['control_name'] == '매출채권 회수 검토'
+
+        snippet = next(r for r in data['results'] if r['control_code'] == 'REV-002')['snippet_html']
+        assert '&lt;b&gt;' in snippet
+        assert '<b>' not in snippet
+
+    def test_short_terms_and_pagination(self, app, admin_client, test_rcm):
+        """Test terms shorter than a trigram fall back to LIKE within one RCM and pages chain"""
+        rcm_id = test_rcm['rcm_id']
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(rcm_id, SEARCH_CONTROLS)
+
+        data = admin_client.get(f'/rcm/api/search?q=승인&limit=1&rcm_id={rcm_id}').get_json()
+        assert data['mode'] == 'like'
+        assert data['has_more'] is True
+        assert '<mark>승인</mark>' in data['results'][0]['control_name_html']
+
+        second = admin_client.get(f'/rcm/api/search?q=승인&limit=1&page=2&rcm_id={rcm_id}').get_json()
+        assert second['has_more'] is False
+        assert {data['results'][0]['control_code'], second['results'][0]['control_code']} == \
+            {'PUR-001', 'REV-002'}
+
+        mixed = admin_client.get('/rcm/api/search?q=매출채권 승인').get_json()
+        assert {r['control_code'] for r in mixed['results']} == {'PUR-001', 'REV-002'}
+
+    def test_short_terms_require_rcm(self, app, admin_client, test_rcm):
+        """Test short-only queries across all RCMs are rejected without scanning"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            from catcher_search import search_rcm_controls
+            save_rcm_details(test_rcm['rcm_id'], SEARCH_CONTROLS)
+            conn = get_db()
+            statements = []
+            conn.set_trace_callback(statements.append)
+            try:
+                result = search_rcm_controls(None, '승인 매출')
+            finally:
+                conn.set_trace_callback(None)
+            assert result['mode'] == 'too_short'
+            assert not [s for s in statements if 'LIKE' in s]
+
+        response = admin_client.get('/rcm/api/search?q=승인')
+        assert response.status_code == 400
+        assert response.get_json()['mode'] == 'too_short'
+
+    def test_search_respects_rcm_access(self, app, authenticated_client, test_rcm):
+        """Test users only see controls of granted RCMs"""
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            save_rcm_details(test_rcm['rcm_id'], SEARCH_CONTROLS)
+
+        data = authenticated_client.get('/rcm/api/search?q=매출채권').get_json()
+        assert data['results'] == []
+
+        response = authenticated_client.get(f"/rcm/api/search?q=매출채권&rcm_id={test_rcm['rcm_id']}")
+        assert response.status_code == 403
+
+        assert authenticated_client.get('/rcm/api/search?q=').status_code == 400
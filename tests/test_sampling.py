@@ -0,0 +1,221 @@
+"""
+Tests for operation evaluation sample selection
+"""
+import csv
+import io
+import random
+import pytest
+from catcher_auth import get_db
+from catcher_sampling import (PopulationReader, draw_sample, normalize_frequency, required_sample_size,
+                              reservoir_sample)
+
+
+@pytest.fixture
+def population_csv(tmp_path):
+    """A 5,000-row CSV population"""
+    path = tmp_path / 'population.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as fileobj:
+        writer = csv.writer(fileobj)
+        writer.writerow(['전표번호', '금액'])
+        for n in range(1, 5001):
+            writer.writerow([f'JE-{n:05d}', n * 100])
+    return str(path)
+
+
+@pytest.fixture(autouse=True)
+def evidence_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv('CATCHER_EVIDENCE_DIR', str(tmp_path / 'evidence'))
+
+
+class TestSampleSize:
+    """Test sample sizes derived from frequency and risk"""
+
+    @pytest.mark.parametrize('frequency, expected', [
+        ('연 1회', 'ANNUAL'), ('분기', 'QUARTERLY'), ('반기', 'SEMIANNUAL'), ('월별', 'MONTHLY'),
+        ('주간', 'WEEKLY'), ('매일', 'DAILY'), ('수시', 'MULTIPLE'), ('Monthly', 'MONTHLY'), ('', 'MULTIPLE'),
+    ])
+    def test_normalize_frequency(self, frequency, expected):
+        """Test Korean and English frequency labels are recognized"""
+        assert normalize_frequency(frequency) == expected
+
+    def test_risk_and_population_cap(self):
+        """Test high risk raises the size and small populations cap it"""
+        assert required_sample_size('매일', 'LOW') == 20
+        assert required_sample_size('매일', 'HIGH') == 40
+        assert required_sample_size('매일', 'HIGH', population_count=12) == 12
+
+
+class TestReservoirSample:
+    """Test single-pass reservoir sampling"""
+
+    def test_sample_is_uniform_and_ordered(self):
+        """Test every position is selected with roughly equal probability"""
+        hits = [0] * 100
+        for seed in range(2000):
+            sample, count = reservoir_sample(iter(range(100)), 10, random.Random(seed))
+            assert count == 100
+            assert len(sample) == 10
+            assert [number for number, _ in sample] == sorted(number for number, _ in sample)
+            for number, value in sample:
+                assert value == number - 1
+                hits[value] += 1
+        # Expected 200 hits per position
+        assert min(hits) > 140 and max(hits) < 260
+
+    def test_population_smaller_than_sample(self):
+        """Test the whole population is returned when it is smaller than k"""
+        sample, count = reservoir_sample(iter('abc'), 5, random.Random(1))
+        assert count == 3
+        assert [row for _, row in sample] == ['a', 'b', 'c']
+
+
+class TestDrawSample:
+    """Test drawing samples from population files"""
+
+    def test_seed_reproduces_sample(self, population_csv):
+        """Test the same seed draws the same rows and a different seed does not"""
+        first = draw_sample(population_csv, '매일', 'Y', seed=42)
+        assert first['sample_size'] == 40
+        assert first['population_count'] == 5000
+        assert first['columns'] == ['전표번호', '금액']
+        assert draw_sample(population_csv, '매일', 'Y', seed=42)['items'] == first['items']
+        assert draw_sample(population_csv, '매일', 'Y', seed=43)['items'] != first['items']
+
+    def test_systematic_interval(self, population_csv):
+        """Test systematic samples are evenly spaced"""
+        result = draw_sample(population_csv, '매일', 'N', method='systematic', seed=7)
+        numbers = [number for number, _ in result['items']]
+        assert len(numbers) == 20
+        assert {b - a for a, b in zip(numbers, numbers[1:])} <= {249, 250, 251}
+
+    def test_xlsx_population(self, tmp_path):
+        """Test Excel populations are streamed and blank rows skipped"""
+        from openpyxl import Workbook
+        workbook = Workbook()
+        sheet = workbook.active
+        sheet.append(['번호'])
+        for n in range(30):
+            sheet.append([n])
+        sheet.append([None])
+        path = str(tmp_path / 'population.xlsx')
+        workbook.save(path)
+        with PopulationReader(path) as reader:
+            assert reader.headers == ['번호']
+        result = draw_sample(path, '월', 'N', sample_size=5, seed=1)
+        assert result['population_count'] == 30
+        assert len(result['items']) == 5
+
+    def test_cp949_csv(self, tmp_path):
+        """Test CSV files saved by Korean Excel are decoded"""
+        path = tmp_path / 'population.csv'
+        path.write_bytes('거래처,금액\n가나상사,100\n다라상사,200\n'.encode('cp949'))
+        result = draw_sample(str(path), '연', 'N', seed=3)
+        assert result['columns'] == ['거래처', '금액']
+        assert result['items'][0][1][0] in ('가나상사', '다라상사')
+
+    @pytest.mark.parametrize('filename, content', [
+        ('population.xlsx', b'not a workbook'),
+        ('population.csv', b'a\n"' + b'x' * (csv.field_size_limit() + 1) + b'"\n'),
+    ])
+    def test_unreadable_population(self, tmp_path, filename, content):
+        """Test corrupt workbooks and malformed CSV files raise ValueError"""
+        path = tmp_path / filename
+        path.write_bytes(content)
+        with pytest.raises(ValueError):
+            draw_sample(str(path), '연', 'N', seed=1)
+
+    def test_invalid_method(self, population_csv):
+        """Test unknown methods are rejected"""
+        with pytest.raises(ValueError):
+            draw_sample(population_csv, method='judgmental')
+
+
+class TestSampleApi:
+    """Test the sample API links samples to operation lines"""
+
+    @pytest.fixture
+    def design_session(self, app, admin_user, test_rcm):
+        with app.app_context():
+            from catcher_auth import save_rcm_details
+            from catcher_link2 import save_design_evaluation_batch
+            save_rcm_details(test_rcm['rcm_id'], [
+                {'control_code': 'ITGC-001', 'control_frequency': '일별', 'key_control': 'Y'}])
+            save_design_evaluation_batch(test_rcm['rcm_id'], admin_user['user_id'], 'S1', [
+                {'control_code': 'ITGC-001', 'evaluation_data': {'overall_effectiveness': 'effective'}}])
+        return 'S1'
+
+    def test_create_and_fetch_sample(self, app, admin_client, test_rcm, design_session, population_csv):
+        """Test uploading a population stores the sample and updates the line"""
+        with open(population_csv, 'rb') as fileobj:
+            response = admin_client.post('/operation/api/sample', data={
+                'rcm_id': test_rcm['rcm_id'], 'control_code': 'ITGC-001', 'design_session': design_session,
+                'seed': '99', 'population_file': (io.BytesIO(fileobj.read()), 'population.csv'),
+            }, content_type='multipart/form-data')
+        assert response.status_code == 200, response.get_json()
+        sample = response.get_json()['sample']
+        assert sample['sample_seed'] == 99
+        assert sample['sample_size'] == 40
+        assert sample['risk_level'] == 'HIGH'
+        assert len(sample['items']) == 40
+        assert 'population_file_path' not in sample
+
+        with app.app_context():
+            line = get_db().execute('''
+                SELECT sample_size, population_count, population_path FROM ca_operation_evaluation_line
+                WHERE control_code = 'ITGC-001'
+            ''').fetchone()
+            assert (line['sample_size'], line['population_count']) == (40, 5000)
+            assert line['population_path']
+
+        fetched = admin_client.get(f"/operation/api/sample/{sample['sample_id']}").get_json()
+        assert fetched['sample']['items'] == sample['items']
+
+    def test_rejects_unsupported_file(self, admin_client, test_rcm, design_session):
+        """Test non CSV/XLSX populations are rejected"""
+        response = admin_client.post('/operation/api/sample', data={
+            'rcm_id': test_rcm['rcm_id'], 'control_code': 'ITGC-001', 'design_session': design_session,
+            'population_file': (io.BytesIO(b'x'), 'population.pdf'),
+        }, content_type='multipart/form-data')
+        assert response.status_code == 400
+
+    def test_rejects_corrupt_workbook(self, app, admin_client, test_rcm, design_session, tmp_path):
+        """Test a corrupt XLSX is rejected and not kept in the evidence store"""
+        response = admin_client.post('/operation/api/sample', data={
+            'rcm_id': test_rcm['rcm_id'], 'control_code': 'ITGC-001', 'design_session': design_session,
+            'population_file': (io.BytesIO(b'not a workbook'), 'population.xlsx'),
+        }, content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
+
+        with app.app_context():
+            assert get_db().execute('SELECT COUNT(*) FROM ca_evidence_blob').fetchone()[0] == 0
+        stored = [path for path in (tmp_path / 'evidence').rglob('*') if path.is_file()]
+        assert stored == []
+
+    def test_rejects_unknown_session_before_sampling(self, app, admin_client, test_rcm, design_session,
+                                                     population_csv, monkeypatch, tmp_path):
+        """Test an unknown design session is rejected without reading or storing the population"""
+        import catcher_link3
+
+        def fail_draw(*args, **kwargs):
+            raise AssertionError('population must not be read')
+
+        monkeypatch.setattr(catcher_link3, 'draw_sample', fail_draw)
+        with open(population_csv, 'rb') as fileobj:
+            response = admin_client.post('/operation/api/sample', data={
+                'rcm_id': test_rcm['rcm_id'], 'control_code': 'ITGC-001', 'design_session': 'S9',
+                'population_file': (io.BytesIO(fileobj.read()), 'population.csv'),
+            }, content_type='multipart/form-data')
+        assert response.status_code == 400
+
+        with app.app_context():
+            assert get_db().execute('SELECT COUNT(*) FROM ca_evidence_blob').fetchone()[0] == 0
+        assert [path for path in (tmp_path / 'evidence').rglob('*') if path.is_file()] == []
+
+    def test_requires_access(self, authenticated_client, test_rcm):
+        """Test users without RCM access cannot draw samples"""
+        response = authenticated_client.post('/operation/api/sample', data={
+            'rcm_id': test_rcm['rcm_id'], 'control_code': 'ITGC-001', 'design_session': 'S1',
+            'population_file': (io.BytesIO(b'a\n1\n'), 'population.csv'),
+        }, content_type='multipart/form-data')
+        assert response.status_code == 403
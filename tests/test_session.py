@@ -0,0 +1,103 @@
+"""
+Tests for the server-side session store
+"""
+import pytest
+from catcher_auth import get_db
+
+
+def _session_cookie(client):
+    cookie = client.get_cookie('session')
+    return cookie.value if cookie else None
+
+
+class TestServerSideSession:
+    """Test session payloads live in ca_session, not in the cookie"""
+
+    def test_cookie_carries_only_session_id(self, app, authenticated_client, test_user):
+        """Test the cookie is an opaque id and data is stored server-side"""
+        sid = _session_cookie(authenticated_client)
+        assert sid and test_user['user_email'] not in sid
+        assert len(sid) < 64
+
+        with app.app_context():
+            row = get_db().execute('SELECT user_id, data FROM ca_session WHERE session_id = ?',
+                                   (sid,)).fetchone()
+        assert row['user_id'] == test_user['user_id']
+        assert test_user['user_email'] in row['data']
+
+        response = authenticated_client.get('/rcm/')
+        assert response.status_code == 200
+        # Unchanged sessions do not resend the cookie
+        assert 'Set-Cookie' not in response.headers
+
+    def test_logout_deletes_session(self, app, authenticated_client):
+        """Test logging out removes the stored session"""
+        sid = _session_cookie(authenticated_client)
+        authenticated_client.get('/logout')
+
+        with app.app_context():
+            row = get_db().execute('SELECT 1 FROM ca_session WHERE session_id = ?', (sid,)).fetchone()
+        assert row is None
+        assert authenticated_client.get('/rcm/').status_code == 302
+
+    def test_login_rotates_session_id(self, client, test_user, admin_user):
+        """Test switching the logged-in user issues a new session id"""
+        with client.session_transaction() as session:
+            session['user_id'] = test_user['user_id']
+            session['user_info'] = test_user
+        first = _session_cookie(client)
+
+        with client.session_transaction() as session:
+            session['user_id'] = admin_user['user_id']
+            session['user_info'] = admin_user
+        assert _session_cookie(client) != first
+
+    def test_revoked_sessions_are_rejected(self, app, authenticated_client, test_user):
+        """Test revoking a user's sessions logs them out"""
+        with app.app_context():
+            from catcher_session import revoke_user_sessions
+            assert revoke_user_sessions(test_user['user_id']) == 1
+
+        response = authenticated_client.get('/rcm/')
+        assert response.status_code == 302
+        assert '/login' in response.location
+
+    def test_expired_sessions_are_ignored_and_purged(self, app, runner, authenticated_client):
+        """Test expired rows are treated as logged out and removed by the CLI"""
+        from catcher_session import clear_session_cache
+        with app.app_context():
+            get_db().execute('UPDATE ca_session SET expires_at = 0')
+            get_db().commit()
+        clear_session_cache()
+
+        assert authenticated_client.get('/rcm/').status_code == 302
+
+        result = runner.invoke(args=['purge-sessions'])
+        assert result.exit_code == 0
+        with app.app_context():
+            assert get_db().execute('SELECT COUNT(*) FROM ca_session').fetchone()[0] == 0
+
+    def test_issued_session_authenticates(self, client, test_user):
+        """Test a session issued outside the login flow is accepted by the app"""
+        from catcher_session import issue_session
+        sid = issue_session({'user_id': test_user['user_id'], 'user_info': test_user})
+        client.set_cookie('session', sid)
+        assert client.get('/rcm/').status_code == 200
+
+
+class TestAdminFlagFreshness:
+    """Test admin checks use current rights, not the session copy"""
+
+    def test_revoked_admin_loses_access(self, app, admin_client, admin_user):
+        """Test removing admin rights takes effect without a new login"""
+        assert admin_client.get('/rcm/upload').status_code == 200
+
+        with app.app_context():
+            from catcher_auth import invalidate_user_authorization
+            get_db().execute("UPDATE ca_user SET admin_flag = 'N' WHERE user_id = ?",
+                             (admin_user['user_id'],))
+            get_db().commit()
+            invalidate_user_authorization(admin_user['user_id'])
+
+        response = admin_client.get('/rcm/upload')
+        assert response.status_code == 302